@@ -1,7 +1,7 @@
 
 import streamlit as st
 
-st.set_page_config(layout="wide", page_title="Dashboard JII2025")
+st.set_page_config(layout="wide", page_title="Dashboard JII")
 
 # ============================
 # Documentación académica
@@ -49,4 +49,8 @@ Este dashboard es adecuado para entornos académicos donde se requiera evaluar l
 2. **Dashboard Principal:** Visualizaciones y métricas clave del evento
 3. **Análisis de Encuesta:** Evaluación cuantitativa de respuestas de calificación (escala 1-5)
 4. **Análisis de Sentimientos:** Procesamiento de respuestas de texto libre
+5. **Comparativa entre Ediciones:** Participación y calificaciones de varias ediciones lado a lado
+6. **Diagnóstico:** Latencia, volumen y caché de las consultas a la base de datos (administradores)
+
+La edición a consultar se elige en la barra lateral; cada consulta solo lee los datos de esa edición.
 """)
@@ -0,0 +1,11 @@
+"""
+Suite de benchmarks del Dashboard JII 2025
+Compatible con asv (ver asv.conf.json) y ejecutable sin asv con
+`python -m benchmarks.ejecutar`.
+"""
+import sys
+from pathlib import Path
+
+# Agregar el directorio raíz al path para poder importar utils
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
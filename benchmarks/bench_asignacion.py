@@ -0,0 +1,48 @@
+"""
+Benchmarks de la asignación de la lista de espera (utils/asignacion.py)
+Se mide resolver todas las promociones de una edición y acomodar una inscripción
+nueva a la lista de espera, que debe tomar menos de un segundo aun en las escalas
+grandes para resolver de nuevo conforme llegan los registros.
+"""
+import pandas as pd
+
+from benchmarks.bench_paginas import ESCALAS, preparar_datos
+from utils import asignacion, embudo
+from utils.fuente_local import leer_tabla_csv
+
+
+class AsignacionListaEspera:
+    params = ESCALAS
+    param_names = ["escala"]
+    timeout = 600
+
+    def setup(self, escala):
+        directorio = preparar_datos(escala)
+        self.inscripciones = leer_tabla_csv(directorio, "inscripciones_workshop")
+        self.actividades = leer_tabla_csv(directorio, "actividades")
+        indice = embudo.construir_indice(
+            leer_tabla_csv(directorio, "participantes"), self.inscripciones,
+            leer_tabla_csv(directorio, "asistencias"), pd.DataFrame(columns=["participante_email"]),
+        )
+        self.tasas, self.tasa_global = asignacion.tasas_no_show(indice.conversion("actividad_codigo"))
+        self.resultado = self._construir()
+
+    def _construir(self):
+        return asignacion.construir_asignacion(self.inscripciones, self.actividades, self.tasas, self.tasa_global)
+
+    def time_construir(self, escala):
+        self._construir()
+
+    def time_resolver(self, escala):
+        self.resultado.resolver()
+
+    def time_agregar(self, escala):
+        # Registro más reciente que todos: se acomoda con un solo camino aumentante
+        self.resultado.agregar(f"nuevo{len(self.resultado.asignados)}@example.com", "W1", creado="2100-01-01")
+
+    def time_reportes(self, escala):
+        self.resultado.resumen()
+        self.resultado.promociones()
+
+    def peakmem_construir(self, escala):
+        self._construir()
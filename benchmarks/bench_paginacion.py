@@ -0,0 +1,111 @@
+"""
+Paginación de las consultas a Supabase contra el Supabase simulado
+El simulado corta cada respuesta en filas_max filas, como el max-rows de PostgREST;
+las tablas sintéticas son más grandes que ese tope, así que una consulta sin paginar
+llega truncada. Se comparan las filas de cada tabla leídas por
+utils/supabase_client.py con las del CSV del que salen las respuestas, y se mide
+cuánto cuesta pedir una tabla por páginas.
+
+Uso:
+    python -m benchmarks.bench_paginacion                  # sale con 1 si falta alguna fila
+    python -m benchmarks.bench_paginacion --filas-max 250 1000 --escala 10
+"""
+import argparse
+import os
+import sys
+import timeit
+
+from benchmarks.bench_paginas import preparar_datos
+from utils import supabase_client
+from utils.conexion import reiniciar_cliente
+from utils.fuente_local import TABLAS, leer_tabla_csv
+from utils.supabase_simulado import CondicionesRed, SupabaseSimulado
+
+ESCALA = 10
+FILAS_MAX = [250, 1000]
+EDICION = 2025
+
+
+def _iniciar(directorio, filas_max: int) -> SupabaseSimulado:
+    """Levanta el simulado y apunta el cliente de Supabase a él, con páginas del tamaño del tope"""
+    simulado = SupabaseSimulado(directorio=directorio, condiciones=CondicionesRed(filas_max=filas_max)).iniciar()
+    os.environ.pop("JII_DATOS_LOCALES", None)
+    os.environ.update({
+        "SUPABASE_URL": simulado.url,
+        "SUPABASE_KEY": "simulado",
+        supabase_client.VARIABLE_FILAS_POR_PAGINA: str(filas_max),
+    })
+    reiniciar_cliente()
+    return simulado
+
+
+def _leer(tabla: str):
+    # Directo a Supabase, sin la caché de consultas
+    df, _, _ = supabase_client._consultar_supabase(tabla, "*", (), None, EDICION)
+    return df
+
+
+def faltantes(directorio) -> dict:
+    """{tabla: filas del CSV que no llegaron de Supabase} (0 en todas si la paginación funciona)"""
+    resultado = {}
+    for tabla in TABLAS:
+        esperado = leer_tabla_csv(directorio, tabla, edicion=EDICION)
+        leido = _leer(tabla)
+        if len(leido) and "id" in esperado:
+            resultado[tabla] = len(set(esperado["id"]) - set(leido["id"]))
+        else:
+            resultado[tabla] = len(esperado) - len(leido)
+    return resultado
+
+
+class PaginacionSupabase:
+    params = FILAS_MAX
+    param_names = ["filas_max"]
+    timeout = 600
+
+    def setup(self, filas_max):
+        self.directorio = preparar_datos(ESCALA)
+        self.simulado = _iniciar(self.directorio, filas_max)
+
+    def teardown(self, filas_max):
+        self.simulado.detener()
+        reiniciar_cliente()
+
+    def time_asistencias(self, filas_max):
+        _leer("asistencias")
+
+    def track_filas_faltantes(self, filas_max):
+        return sum(faltantes(self.directorio).values())
+
+    track_filas_faltantes.unit = "filas"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Paginación de consultas contra el Supabase simulado")
+    parser.add_argument("--filas-max", type=int, nargs="*", default=FILAS_MAX)
+    parser.add_argument("--escala", type=float, default=ESCALA)
+    args = parser.parse_args(argv)
+
+    directorio = preparar_datos(args.escala)
+    completo = True
+    for filas_max in args.filas_max:
+        simulado = _iniciar(directorio, filas_max)
+        try:
+            simulado.reiniciar_estadisticas()
+            por_tabla = faltantes(directorio)
+            peticiones = simulado.estadisticas["peticiones"]
+            segundos = min(timeit.repeat(lambda: _leer("asistencias"), number=1, repeat=3))
+        finally:
+            simulado.detener()
+            reiniciar_cliente()
+        completo = completo and not any(por_tabla.values())
+        print(
+            f"filas_max {filas_max}: {peticiones} peticiones, asistencias en {segundos * 1000:.1f} ms; "
+            f"filas faltantes {por_tabla}"
+        )
+    if not completo:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
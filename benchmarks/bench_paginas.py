@@ -0,0 +1,136 @@
+"""
+Benchmarks de las páginas del dashboard sobre datos sintéticos
+Cada clase mide por separado las etapas de obtención (fetch), transformación
+y agregación que ejecuta una página en `pages/`, sin levantar Streamlit.
+"""
+from pathlib import Path
+
+from benchmarks import ROOT
+from utils import analitica, audiencias
+from utils.audiencias import AUDIENCIAS_DISPONIBLE
+from utils.datos_sinteticos import generar_datos, guardar_csv
+from utils.fuente_local import leer_tabla_csv
+from utils.preguntas_encuesta import PREGUNTAS_CALIFICACION
+
+DIR_DATOS = ROOT / ".benchmarks" / "datos"
+ESCALAS = [10, 100, 1000]
+
+
+def preparar_datos(escala) -> Path:
+    """Genera (una sola vez) los CSV sintéticos de una escala y retorna su carpeta"""
+    destino = DIR_DATOS / f"escala_{escala:g}"
+    if not (destino / "encuesta_respuestas.csv").exists():
+        guardar_csv(generar_datos(escala), destino)
+    return destino
+
+
+class _BenchPagina:
+    params = ESCALAS
+    param_names = ["escala"]
+    timeout = 600
+    tablas = []
+
+    def setup(self, escala):
+        self.directorio = preparar_datos(escala)
+        self.datos = {t: leer_tabla_csv(self.directorio, t) for t in self.tablas}
+
+    def time_fetch(self, escala):
+        for tabla in self.tablas:
+            leer_tabla_csv(self.directorio, tabla)
+
+    def peakmem_fetch(self, escala):
+        self.time_fetch(escala)
+
+
+class TablaDeDatos(_BenchPagina):
+    """pages/1_Tabla_de_datos.py"""
+    tablas = ["participantes", "asistencias", "equipos_concurso", "actividades"]
+
+    def time_transform(self, escala):
+        # Exportación CSV de cada tabla para los botones de descarga
+        for df in self.datos.values():
+            df.to_csv(index=False).encode("utf-8")
+
+    def time_aggregate(self, escala):
+        analitica.calcular_kpis(
+            self.datos["participantes"], self.datos["asistencias"], self.datos["equipos_concurso"]
+        )
+        analitica.distribucion(self.datos["actividades"], "tipo", "Tipo")
+
+
+class Dashboard(_BenchPagina):
+    """pages/2_Dashboard.py"""
+    tablas = ["participantes", "asistencias", "equipos_concurso"]
+
+    def time_aggregate(self, escala):
+        participantes = self.datos["participantes"]
+        asistencias = self.datos["asistencias"]
+        analitica.calcular_kpis(participantes, asistencias, self.datos["equipos_concurso"])
+        analitica.distribucion(participantes, "programa", "Programa")
+        analitica.distribucion(participantes, "categoria", "Categoría")
+        analitica.distribucion(asistencias, "estado", "Estado")
+        analitica.distribucion(asistencias, "actividad_codigo", "Workshop")
+        analitica.serie_temporal(asistencias, "fecha_asistencia")
+        analitica.serie_temporal(self.datos["equipos_concurso"], "fecha_registro")
+
+    def peakmem_aggregate(self, escala):
+        self.time_aggregate(escala)
+
+    def time_audiencias(self, escala):
+        if not AUDIENCIAS_DISPONIBLE:
+            raise NotImplementedError("SciPy no está instalado")
+        incidencia = audiencias.construir_incidencia(self.datos["asistencias"])
+        audiencias.pares_actividades(audiencias.coasistencia(incidencia))
+        audiencias.afinidad_equipos(incidencia, self.datos["equipos_concurso"])
+
+
+class AnalisisEncuesta(_BenchPagina):
+    """pages/3_Analisis_Encuesta.py"""
+    tablas = ["encuesta_respuestas"]
+
+    def setup(self, escala):
+        super().setup(escala)
+        self.calificaciones = analitica.filtrar_calificaciones(self.datos["encuesta_respuestas"])
+
+    def time_transform(self, escala):
+        analitica.filtrar_calificaciones(self.datos["encuesta_respuestas"])
+
+    def peakmem_transform(self, escala):
+        self.time_transform(escala)
+
+    def time_aggregate(self, escala):
+        analitica.estadisticas_calificacion(self.calificaciones)
+        analitica.promedios_por_categoria(self.calificaciones)
+        for pregunta in PREGUNTAS_CALIFICACION:
+            analitica.distribucion_calificacion(self.calificaciones, pregunta["id"])
+            analitica.resumen_pregunta(self.calificaciones, pregunta["id"])
+
+
+class AnalisisSentimientos(_BenchPagina):
+    """pages/4_Analisis_Sentimientos.py"""
+    tablas = ["encuesta_respuestas"]
+
+    def setup(self, escala):
+        super().setup(escala)
+        self.texto = analitica.filtrar_texto_largo(self.datos["encuesta_respuestas"])
+
+    def time_transform(self, escala):
+        analitica.filtrar_texto_largo(self.datos["encuesta_respuestas"])
+
+    def time_aggregate(self, escala):
+        for _, grupo in self.texto.groupby("pregunta_id"):
+            analitica.estadisticas_longitud(grupo["respuesta"])
+            analitica.frecuencia_palabras(grupo["respuesta"], 20)
+
+    def peakmem_aggregate(self, escala):
+        self.time_aggregate(escala)
+
+    def time_sentimiento(self, escala):
+        if not analitica.TEXTBLOB_DISPONIBLE:
+            raise NotImplementedError("TextBlob no está instalado")
+        for _, grupo in self.texto.groupby("pregunta_id"):
+            analitica.analizar_sentimiento(grupo["respuesta"], motor="textblob")
+
+    def time_sentimiento_lexico(self, escala):
+        for _, grupo in self.texto.groupby("pregunta_id"):
+            analitica.analizar_sentimiento(grupo["respuesta"], motor="lexico")
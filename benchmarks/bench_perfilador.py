@@ -0,0 +1,203 @@
+"""
+Benchmark del costo del perfilador (utils/perfilador.py) en las páginas
+Se ejecutan las agregaciones del Dashboard como una ejecución de página: vistas de
+las tablas en caché (utils/almacen.py), perfil_pagina, las agregaciones y terminar(),
+que también resume la memoria de las vistas de la sesión (almacen.cerrar_ejecucion).
+Se compara contra las mismas agregaciones sin el decorador @medir_fase ni el perfil.
+
+El costo de dejar el perfilador activo es la mezcla, con la fracción de muestreo por
+defecto, de las ejecuciones sin traza (cada llamada decorada más terminar()) y las
+ejecuciones con traza (ver sobrecosto).
+
+Uso:
+    python -m benchmarks.bench_perfilador
+    python -m benchmarks.bench_perfilador --escala 1000 --repeticiones 20
+"""
+import argparse
+import os
+import tempfile
+import timeit
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.bench_paginas import ESCALAS, preparar_datos
+from utils import almacen, analitica, perfilador
+from utils.fuente_local import leer_tabla_csv
+
+# Las ejecuciones del benchmark cuentan como una sesión de Streamlit para que terminar()
+# resuma sus vistas como en una página real
+SESION = "benchmark"
+
+
+def _original(funcion):
+    return funcion.__wrapped__
+
+
+def _decorada(funcion):
+    return funcion
+
+
+def agregar_dashboard(datos: dict, llamar=_decorada):
+    """Agregaciones de pages/2_Dashboard.py; llamar elige la función decorada o la original"""
+    participantes, asistencias, equipos = datos["participantes"], datos["asistencias"], datos["equipos_concurso"]
+    llamar(analitica.calcular_kpis)(participantes, asistencias, equipos)
+    llamar(analitica.distribucion)(participantes, "programa", "Programa")
+    llamar(analitica.distribucion)(participantes, "categoria", "Categoría")
+    llamar(analitica.distribucion)(asistencias, "estado", "Estado")
+    llamar(analitica.distribucion)(asistencias, "actividad_codigo", "Workshop")
+    llamar(analitica.serie_temporal)(asistencias, "fecha_asistencia")
+    llamar(analitica.serie_temporal)(equipos, "fecha_registro")
+
+
+def _cargar(escala) -> dict:
+    directorio = preparar_datos(escala)
+    return {t: leer_tabla_csv(directorio, t) for t in ["participantes", "asistencias", "equipos_concurso"]}
+
+
+@contextmanager
+def entorno_pagina():
+    """Sesión simulada y trazas en un archivo temporal; restaura el entorno al salir"""
+    with ExitStack() as pila:
+        directorio = pila.enter_context(tempfile.TemporaryDirectory())
+        pila.enter_context(mock.patch.dict(os.environ, {perfilador.VARIABLE_LOG: str(Path(directorio) / "trazas.jsonl")}))
+        pila.enter_context(mock.patch.object(almacen, "_sesion_actual", return_value=SESION))
+        yield
+        perfilador._local.traza = None
+        almacen.olvidar_sesiones()
+
+
+def _vistas(datos: dict) -> dict:
+    """Lo que recibe una página de la caché: una vista de cada tabla"""
+    return {tabla: almacen.vista(df, tabla) for tabla, df in datos.items()}
+
+
+def ejecutar_pagina(datos: dict, muestreo: float) -> int:
+    """
+    Una ejecución de página con el perfilador: perfil, agregaciones y terminar()
+
+    Returns:
+        Llamadas a funciones medidas (0 si la ejecución no entró en la muestra)
+    """
+    with mock.patch.dict(os.environ, {perfilador.VARIABLE_MUESTREO: str(muestreo)}):
+        perfil = perfilador.perfil_pagina("Benchmark")
+    traza = perfilador._local.traza
+    try:
+        agregar_dashboard(_vistas(datos))
+        perfil.terminar()
+    finally:
+        perfil.descartar()
+    return sum(traza.llamadas.values()) if traza is not None else 0
+
+
+def ejecutar_original(datos: dict):
+    """La misma ejecución sin @medir_fase ni perfil"""
+    agregar_dashboard(_vistas(datos), _original)
+
+
+@perfilador.medir_fase("transform")
+def _vacia():
+    return None
+
+
+def costo_por_llamada(numero: int = 200_000) -> float:
+    """Microsegundos que agrega @medir_fase a cada llamada en una ejecución sin traza"""
+    perfilador._local.traza = None
+    original = min(timeit.repeat(_vacia.__wrapped__, number=numero, repeat=5))
+    decorada = min(timeit.repeat(_vacia, number=numero, repeat=5))
+    return (decorada - original) / numero * 1e6
+
+
+def costo_terminar(datos: dict, numero: int = 200) -> float:
+    """Milisegundos de terminar() sin traza, con las vistas de una ejecución vivas"""
+    vistas = _vistas(datos)  # noqa: F841 (vivas mientras se mide)
+    perfil = perfilador.Perfil(pagina="Benchmark")
+    return min(timeit.repeat(perfil.terminar, number=numero, repeat=5)) / numero * 1000
+
+
+def sobrecosto(datos: dict, repeticiones: int = 10, numero: int = 3,
+               muestreo: float = perfilador.MUESTREO_DEFECTO) -> dict:
+    """
+    Costo de dejar el perfilador activo, mezclando ejecuciones con y sin traza
+
+    Medir la diferencia entre dos corridas completas sin traza queda por debajo del
+    ruido de la máquina; para ellas se mide el costo de una llamada decorada y el de
+    terminar() por separado. Las ejecuciones con traza se miden completas.
+
+    Args:
+        muestreo: Fracción de ejecuciones con traza (por defecto la de JII_PERFIL_MUESTREO)
+
+    Returns:
+        Diccionario con ms de la ejecución original y con traza, llamadas medidas, us
+        por llamada, ms de terminar(), y el costo en porcentaje de la ejecución sin
+        traza, con traza y mezclado según muestreo
+    """
+    with entorno_pagina():
+        llamadas = ejecutar_pagina(datos, 1)
+        original = min(timeit.repeat(lambda: ejecutar_original(datos), number=numero, repeat=repeticiones)) / numero
+        con_traza = min(timeit.repeat(lambda: ejecutar_pagina(datos, 1), number=numero, repeat=repeticiones)) / numero
+        por_llamada = costo_por_llamada()
+        terminar = costo_terminar(datos)
+
+    sin_traza_pct = (llamadas * por_llamada / 1e6 + terminar / 1000) / original * 100
+    con_traza_pct = (con_traza - original) / original * 100
+    return {
+        "original_ms": original * 1000,
+        "con_traza_ms": con_traza * 1000,
+        "llamadas": llamadas,
+        "us_por_llamada": por_llamada,
+        "terminar_ms": terminar,
+        "sin_traza_pct": sin_traza_pct,
+        "con_traza_pct": con_traza_pct,
+        "muestreo": muestreo,
+        "sobrecosto_pct": (1 - muestreo) * sin_traza_pct + muestreo * con_traza_pct,
+    }
+
+
+class SobrecostoPerfilador:
+    params = ESCALAS
+    param_names = ["escala"]
+    timeout = 600
+
+    def setup(self, escala):
+        self.datos = _cargar(escala)
+        self._entorno = entorno_pagina()
+        self._entorno.__enter__()
+
+    def teardown(self, escala):
+        self._entorno.__exit__(None, None, None)
+
+    def time_original(self, escala):
+        ejecutar_original(self.datos)
+
+    def time_sin_traza(self, escala):
+        ejecutar_pagina(self.datos, 0)
+
+    def time_con_traza(self, escala):
+        ejecutar_pagina(self.datos, 1)
+
+    def track_sobrecosto_pct(self, escala):
+        return sobrecosto(self.datos, repeticiones=3)["sobrecosto_pct"]
+
+    track_sobrecosto_pct.unit = "%"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Costo del perfilador en las agregaciones del Dashboard")
+    parser.add_argument("--escala", type=float, nargs="*", default=ESCALAS)
+    parser.add_argument("--repeticiones", type=int, default=10)
+    parser.add_argument("--muestreo", type=float, default=perfilador.MUESTREO_DEFECTO)
+    args = parser.parse_args(argv)
+
+    for escala in args.escala:
+        r = sobrecosto(_cargar(escala), args.repeticiones, muestreo=args.muestreo)
+        print(
+            f"escala {escala:g}: {r['original_ms']:.2f} ms sin perfilador, {r['con_traza_ms']:.2f} ms con traza "
+            f"({r['con_traza_pct']:+.2f}%); sin traza {r['llamadas']} llamadas x {r['us_por_llamada']:.2f} us "
+            f"+ terminar() {r['terminar_ms']:.3f} ms ({r['sin_traza_pct']:.3f}%); "
+            f"mezcla con muestreo {r['muestreo']:g}: {r['sobrecosto_pct']:.2f}% de la ejecución"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark de los motores de sentimiento sobre una muestra etiquetada
+muestra_sentimiento.csv tiene respuestas abiertas escritas como las de la
+encuesta, etiquetadas a mano como Positivo, Neutral o Negativo. Se mide la
+exactitud de cada motor sobre la muestra y su velocidad sobre la muestra
+repetida hasta el tamaño de una edición grande.
+
+Uso:
+    python -m benchmarks.bench_sentimiento
+    python -m benchmarks.bench_sentimiento --textos 50000 --repeticiones 5
+"""
+import argparse
+import statistics
+import time
+
+import pandas as pd
+
+from benchmarks import ROOT
+from utils import analitica
+
+MUESTRA = ROOT / "benchmarks" / "muestra_sentimiento.csv"
+ETIQUETAS = ["Positivo", "Neutral", "Negativo"]
+
+
+def cargar_muestra() -> pd.DataFrame:
+    """Muestra etiquetada [texto, etiqueta]"""
+    return pd.read_csv(MUESTRA)
+
+
+def textos_repetidos(muestra: pd.DataFrame, cantidad: int) -> pd.Series:
+    """
+    La muestra repetida hasta `cantidad` textos, cada copia con un sufijo distinto
+    para que no se aprovechen los textos repetidos
+    """
+    veces = -(-cantidad // len(muestra))
+    textos = pd.concat([muestra["texto"] + f" ({i})" for i in range(veces)], ignore_index=True)
+    return textos.iloc[:cantidad]
+
+
+def exactitud(muestra: pd.DataFrame, motor: str) -> dict:
+    """
+    Exactitud y F1 macro de un motor sobre la muestra
+
+    Returns:
+        Diccionario {exactitud, f1_macro, por_etiqueta: {etiqueta: f1}}
+    """
+    prediccion = analitica.analizar_sentimiento(muestra["texto"], motor)["sentimiento"]
+    real = muestra["etiqueta"]
+    f1 = {}
+    for etiqueta in ETIQUETAS:
+        verdaderos = ((prediccion == etiqueta) & (real == etiqueta)).sum()
+        predichos, reales = (prediccion == etiqueta).sum(), (real == etiqueta).sum()
+        f1[etiqueta] = 2 * verdaderos / (predichos + reales) if predichos + reales else 0.0
+    return {
+        "exactitud": float((prediccion == real).mean()),
+        "f1_macro": float(statistics.mean(f1.values())),
+        "por_etiqueta": f1,
+    }
+
+
+def _motores() -> list:
+    return [m for m in analitica.MOTORES_SENTIMIENTO if m != "textblob" or analitica.TEXTBLOB_DISPONIBLE]
+
+
+class MotoresSentimiento:
+    """analitica.analizar_sentimiento con cada motor (formato asv)"""
+    params = (list(analitica.MOTORES_SENTIMIENTO), [1000, 10000])
+    param_names = ["motor", "textos"]
+    timeout = 600
+
+    def setup(self, motor, textos):
+        if motor not in _motores():
+            raise NotImplementedError("TextBlob no está instalado")
+        self.muestra = cargar_muestra()
+        self.textos = textos_repetidos(self.muestra, textos)
+
+    def time_analizar(self, motor, textos):
+        analitica.analizar_sentimiento(self.textos, motor)
+
+    def peakmem_analizar(self, motor, textos):
+        analitica.analizar_sentimiento(self.textos, motor)
+
+    def track_exactitud(self, motor, textos):
+        return exactitud(self.muestra, motor)["exactitud"]
+
+    track_exactitud.unit = "fracción"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara los motores de sentimiento")
+    parser.add_argument("--textos", type=int, default=10000, help="Textos para medir la velocidad")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    muestra = cargar_muestra()
+    textos = textos_repetidos(muestra, args.textos)
+    print(f"Muestra etiquetada: {len(muestra)} textos ({muestra['etiqueta'].value_counts().to_dict()})")
+    print(f"{'motor':<10} {'exactitud':>9} {'F1 macro':>9} {'textos/s':>12}")
+    for motor in analitica.MOTORES_SENTIMIENTO:
+        if motor not in _motores():
+            print(f"{motor:<10} omitido: TextBlob no está instalado")
+            continue
+        metricas = exactitud(muestra, motor)
+        tiempos = []
+        for _ in range(args.repeticiones):
+            inicio = time.perf_counter()
+            analitica.analizar_sentimiento(textos, motor)
+            tiempos.append(time.perf_counter() - inicio)
+        print(
+            f"{motor:<10} {metricas['exactitud']:>9.1%} {metricas['f1_macro']:>9.3f} "
+            f"{len(textos) / statistics.median(tiempos):>12,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
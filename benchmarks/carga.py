@@ -0,0 +1,357 @@
+"""
+Prueba de carga del dashboard con sesiones simultáneas
+Simula N sesiones de Streamlit (AppTest) que recorren Analisis_JII2025.py y las
+páginas de `pages/` sobre datos locales: cada sesión abre la página y cambia
+algunos de sus widgets (selectbox, radio, multiselect, checkbox, slider), como un
+usuario. Todas las sesiones de un nivel corren en hilos de un mismo proceso, igual
+que en un servidor de Streamlit, y comparten sus cachés.
+
+Cada nivel de concurrencia se ejecuta en un proceso nuevo para que la memoria pico
+y las cachés no se mezclen entre niveles. Por nivel se reportan la latencia de cada
+ejecución del script (p50/p95/p99 por página), ejecuciones por segundo, consultas a
+la fuente y aciertos de caché (utils/metricas.py) y la memoria residente pico.
+
+Con --simulado los datos se consultan por HTTP a utils/supabase_simulado.py con
+las condiciones de red indicadas, en lugar de leer los CSV directamente.
+
+Uso:
+    python -m benchmarks.carga --sesiones 1 5 20 --escala 10 --salida carga.json
+    python -m benchmarks.carga --sesiones 5 20 --paginas Dashboard Encuesta --comparar carga.json
+    python -m benchmarks.carga --sesiones 20 --simulado latencia=0.08 tasa_error=0.02 filas_max=1000
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks import ROOT
+
+try:
+    import resource
+    RESOURCE_DISPONIBLE = True
+except ImportError:  # Windows
+    RESOURCE_DISPONIBLE = False
+
+PAGINAS = [ROOT / "Analisis_JII2025.py"] + sorted((ROOT / "pages").glob("*.py"))
+
+# Widgets que se cambian al simular un usuario (los botones no: pueden vaciar cachés)
+TIPOS_WIDGET = ("selectbox", "radio", "multiselect", "checkbox", "toggle", "slider")
+
+
+def _widgets(at) -> list:
+    return [w for tipo in TIPOS_WIDGET for w in getattr(at, tipo) if not getattr(w, "disabled", False)]
+
+
+def _sin_formato(widget, opcion: str) -> bool:
+    try:
+        return str(widget.format_func(opcion)) == opcion
+    except Exception:
+        return False
+
+
+def _cambiar(widget, azar: random.Random) -> bool:
+    """Asigna al widget otro valor plausible; False si no se pudo"""
+    tipo = type(widget).__name__
+    if tipo in ("Checkbox", "Toggle"):
+        widget.set_value(not widget.value)
+    elif tipo in ("Selectbox", "Radio"):
+        # AppTest solo conoce las opciones ya formateadas: se omiten los widgets con
+        # format_func (p. ej. el selector de edición) porque no se puede recuperar el valor
+        otras = [o for i, o in enumerate(widget.options) if i != widget.index and _sin_formato(widget, o)]
+        if not otras:
+            return False
+        widget.set_value(azar.choice(otras))
+    elif tipo == "Multiselect":
+        if not widget.options:
+            return False
+        widget.set_value(azar.sample(widget.options, k=azar.randint(1, min(3, len(widget.options)))))
+    elif tipo == "Slider":
+        if isinstance(widget.value, (tuple, list)) or widget.min is None:
+            return False
+        widget.set_value(azar.choice([widget.min, widget.max, type(widget.value)((widget.min + widget.max) / 2)]))
+    else:
+        return False
+    return True
+
+
+def _ejecutar(at, pagina: str, tipo: str, registros: list, lock: threading.Lock):
+    inicio = time.perf_counter()
+    error = None
+    try:
+        at.run()
+        if len(at.exception):
+            error = str(at.exception[0].value)[:200]
+    except Exception as e:
+        # Incluye el tiempo de espera agotado de AppTest
+        error = f"{type(e).__name__}: {e}"[:200]
+    with lock:
+        registros.append({
+            "pagina": pagina, "tipo": tipo, "segundos": time.perf_counter() - inicio, "error": error,
+        })
+    return error is None
+
+
+def sesion(numero: int, paginas: list, interacciones: int, pausa: float, tiempo_limite: float,
+           registros: list, lock: threading.Lock):
+    """Una sesión simulada: abre cada página y cambia algunos de sus widgets"""
+    from streamlit.testing.v1 import AppTest
+
+    azar = random.Random(numero)
+    for ruta in paginas:
+        at = AppTest.from_file(str(ruta), default_timeout=tiempo_limite)
+        if not _ejecutar(at, ruta.stem, "carga", registros, lock):
+            continue
+        for _ in range(interacciones):
+            time.sleep(pausa)
+            candidatos = _widgets(at)
+            azar.shuffle(candidatos)
+            if not any(_cambiar(w, azar) for w in candidatos):
+                break
+            if not _ejecutar(at, ruta.stem, "interaccion", registros, lock):
+                break
+
+
+def _rss_pico_mb():
+    if not RESOURCE_DISPONIBLE:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB y macOS bytes
+    return pico / 1024 ** 2 if sys.platform == "darwin" else pico / 1024
+
+
+def medir_nivel(sesiones: int, paginas: list, interacciones: int, pausa: float, tiempo_limite: float,
+                calentar: bool = True) -> dict:
+    """
+    Corre un nivel de concurrencia en este proceso
+
+    Args:
+        sesiones: Sesiones simultáneas (un hilo cada una)
+        paginas: Rutas de los scripts que recorre cada sesión
+        interacciones: Cambios de widget por página
+        pausa: Segundos entre interacciones de una sesión
+        tiempo_limite: Segundos máximos de cada ejecución del script
+        calentar: Recorrer las páginas una vez antes de medir (cachés calientes)
+
+    Returns:
+        Resultados del nivel (ver resumir)
+    """
+    from streamlit import logger as st_logger
+
+    from utils import metricas
+    from utils.precalentamiento import iniciar_precalentamiento
+
+    st_logger.set_log_level("error")
+    # Como en utils/servidor.py, el precalentamiento arranca antes de la primera sesión
+    iniciar_precalentamiento()
+    if calentar:
+        sesion(-1, paginas, 0, 0.0, tiempo_limite, [], threading.Lock())
+    metricas.reiniciar()
+
+    registros = []
+    lock = threading.Lock()
+    hilos = [
+        threading.Thread(target=sesion, args=(i, paginas, interacciones, pausa, tiempo_limite, registros, lock))
+        for i in range(sesiones)
+    ]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    duracion = time.perf_counter() - inicio
+
+    consultas = metricas.resumen()
+    return resumir(sesiones, registros, duracion, {
+        "consultas_fuente": int(consultas["consultas"].sum()) if len(consultas) else 0,
+        "aciertos_cache": int(consultas["aciertos_cache"].sum()) if len(consultas) else 0,
+        "rss_pico_mb": _rss_pico_mb(),
+    })
+
+
+def resumir(sesiones: int, registros: list, duracion: float, extra: dict) -> dict:
+    """
+    Percentiles por página y totales de un nivel
+
+    Returns:
+        {sesiones, duracion_s, ejecuciones, ejecuciones_por_s, errores, consultas_fuente,
+        aciertos_cache, rss_pico_mb, paginas: [{pagina, ejecuciones, p50_ms, p95_ms, p99_ms,
+        max_ms, errores}], ejemplos_error}
+    """
+    por_pagina = {}
+    for r in registros:
+        por_pagina.setdefault(r["pagina"], []).append(r)
+
+    paginas = []
+    for pagina, filas in por_pagina.items():
+        ms = np.array([r["segundos"] for r in filas]) * 1000
+        paginas.append({
+            "pagina": pagina,
+            "ejecuciones": len(filas),
+            "p50_ms": float(np.percentile(ms, 50)),
+            "p95_ms": float(np.percentile(ms, 95)),
+            "p99_ms": float(np.percentile(ms, 99)),
+            "max_ms": float(ms.max()),
+            "errores": sum(r["error"] is not None for r in filas),
+        })
+    errores = [r["error"] for r in registros if r["error"] is not None]
+    return {
+        "sesiones": sesiones,
+        "duracion_s": duracion,
+        "ejecuciones": len(registros),
+        "ejecuciones_por_s": len(registros) / duracion if duracion else 0.0,
+        "errores": len(errores),
+        **extra,
+        "paginas": paginas,
+        "ejemplos_error": sorted(set(errores))[:5],
+    }
+
+
+def _nivel_en_subproceso(sesiones: int, args, directorio: Path, simulado=None) -> dict:
+    """Corre medir_nivel en un proceso nuevo y lee su resultado"""
+    with tempfile.TemporaryDirectory() as temporal:
+        salida = Path(temporal) / "nivel.json"
+        comando = [
+            sys.executable, "-m", "benchmarks.carga", "--nivel", str(sesiones), "--resultado", str(salida),
+            "--interacciones", str(args.interacciones), "--pausa", str(args.pausa),
+            "--tiempo-limite", str(args.tiempo_limite),
+        ]
+        if args.paginas:
+            comando += ["--paginas", *args.paginas]
+        if args.en_frio:
+            comando.append("--en-frio")
+        if simulado is None:
+            entorno = {**os.environ, "JII_DATOS_LOCALES": str(directorio)}
+        else:
+            entorno = {k: v for k, v in os.environ.items() if k != "JII_DATOS_LOCALES"}
+            entorno.update({"SUPABASE_URL": simulado.url, "SUPABASE_KEY": "simulado"})
+        proceso = subprocess.run(comando, cwd=ROOT, env=entorno, stdout=subprocess.DEVNULL,
+                                 stderr=subprocess.PIPE, text=True)
+        if proceso.returncode != 0 or not salida.exists():
+            raise RuntimeError(f"El nivel de {sesiones} sesiones falló:\n{proceso.stderr[-2000:]}")
+        return json.loads(salida.read_text(encoding="utf-8"))
+
+
+def imprimir(nivel: dict):
+    rss = f"{nivel['rss_pico_mb']:.0f} MB" if nivel["rss_pico_mb"] is not None else "-"
+    print(
+        f"\n{nivel['sesiones']} sesiones: {nivel['ejecuciones']} ejecuciones en {nivel['duracion_s']:.1f} s "
+        f"({nivel['ejecuciones_por_s']:.2f}/s), {nivel['consultas_fuente']} consultas a la fuente, "
+        f"{nivel['aciertos_cache']} aciertos de caché, RSS pico {rss}, {nivel['errores']} errores"
+    )
+    print(f"  {'pagina':<28} {'ejec.':>6} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9} {'errores':>8}")
+    for p in nivel["paginas"]:
+        print(
+            f"  {p['pagina']:<28} {p['ejecuciones']:>6} {p['p50_ms']:>9.0f} {p['p95_ms']:>9.0f} "
+            f"{p['p99_ms']:>9.0f} {p['errores']:>8}"
+        )
+    if "simulado" in nivel:
+        print("  Supabase simulado: " + ", ".join(f"{k}={v}" for k, v in nivel["simulado"].items()))
+    for error in nivel["ejemplos_error"]:
+        print(f"  error: {error}")
+
+
+def comparar(resultados: list, base: list, tolerancia: float) -> list:
+    """Páginas cuyo p95 o niveles cuyo rendimiento empeoraron más que la tolerancia"""
+    indice = {n["sesiones"]: n for n in base}
+    regresiones = []
+    for nivel in resultados:
+        anterior = indice.get(nivel["sesiones"])
+        if not anterior:
+            continue
+        if nivel["ejecuciones_por_s"] < anterior["ejecuciones_por_s"] * (1 - tolerancia):
+            regresiones.append((nivel["sesiones"], "total", "ejecuciones_por_s",
+                                anterior["ejecuciones_por_s"], nivel["ejecuciones_por_s"]))
+        paginas_base = {p["pagina"]: p for p in anterior["paginas"]}
+        for p in nivel["paginas"]:
+            previa = paginas_base.get(p["pagina"])
+            if previa and previa["p95_ms"] > 0 and p["p95_ms"] > previa["p95_ms"] * (1 + tolerancia):
+                regresiones.append((nivel["sesiones"], p["pagina"], "p95_ms", previa["p95_ms"], p["p95_ms"]))
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga del dashboard con sesiones simultáneas")
+    parser.add_argument("--sesiones", type=int, nargs="+", default=[1, 5, 20], help="Niveles de concurrencia")
+    parser.add_argument("--escala", type=float, default=10, help="Escala de los datos sintéticos")
+    parser.add_argument("--datos", help="Carpeta de CSV locales (en lugar de los sintéticos)")
+    parser.add_argument("--paginas", nargs="+", help="Solo las páginas cuyo nombre contenga alguno de estos textos")
+    parser.add_argument("--interacciones", type=int, default=3, help="Cambios de widget por página")
+    parser.add_argument("--pausa", type=float, default=0.0, help="Segundos entre interacciones de una sesión")
+    parser.add_argument("--tiempo-limite", type=float, default=300, help="Segundos máximos por ejecución")
+    parser.add_argument("--en-frio", action="store_true", help="Medir con las cachés vacías")
+    parser.add_argument("--simulado", nargs="*", metavar="CONDICION",
+                        help="Consultar los datos por HTTP a utils/supabase_simulado.py con estas condiciones "
+                             "de red (p. ej. latencia=0.08 tasa_error=0.02 filas_max=1000)")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", help="Archivo JSON de una corrida anterior (línea base)")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Empeoramiento permitido (0.25 = 25%%)")
+    # Uso interno: un nivel dentro del subproceso
+    parser.add_argument("--nivel", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--resultado", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    paginas = [p for p in PAGINAS if not args.paginas or any(texto in p.stem for texto in args.paginas)]
+    if not paginas:
+        parser.error("Ninguna página coincide con --paginas")
+
+    if args.nivel is not None:
+        nivel = medir_nivel(args.nivel, paginas, args.interacciones, args.pausa, args.tiempo_limite,
+                            calentar=not args.en_frio)
+        Path(args.resultado).write_text(json.dumps(nivel), encoding="utf-8")
+        return
+
+    if args.datos:
+        directorio = Path(args.datos)
+    else:
+        from benchmarks.bench_paginas import preparar_datos
+        directorio = preparar_datos(args.escala)
+    print(f"Datos: {directorio}; páginas: {', '.join(p.stem for p in paginas)}")
+
+    resultados = []
+    simulado = None
+    if args.simulado is not None:
+        from utils.supabase_simulado import SupabaseSimulado, condiciones_desde_texto
+        try:
+            condiciones = condiciones_desde_texto(args.simulado)
+        except ValueError as e:
+            parser.error(str(e))
+        simulado = SupabaseSimulado(directorio=directorio, condiciones=condiciones).iniciar()
+        print(f"Supabase simulado en {simulado.url}: {condiciones}")
+
+    try:
+        for sesiones in args.sesiones:
+            if simulado is not None:
+                simulado.reiniciar_estadisticas()
+            nivel = _nivel_en_subproceso(sesiones, args, directorio, simulado)
+            if simulado is not None:
+                nivel["simulado"] = {k: v for k, v in simulado.estadisticas.items() if k != "por_tabla"}
+            imprimir(nivel)
+            resultados.append(nivel)
+    finally:
+        if simulado is not None:
+            simulado.detener()
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regresiones = comparar(resultados, base, args.tolerancia)
+        for sesiones, pagina, metrica, anterior, actual in regresiones:
+            print(f"REGRESIÓN {sesiones} sesiones {pagina} {metrica}: {anterior:.2f} -> {actual:.2f}")
+        if regresiones:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
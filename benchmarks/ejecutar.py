@@ -0,0 +1,123 @@
+"""
+Ejecutor de la suite de benchmarks sin asv
+Mide tiempo de pared y memoria pico de cada etapa y compara contra una
+línea base para detectar regresiones antes del evento.
+
+Uso:
+    python -m benchmarks.ejecutar --escalas 10 100 --salida resultados.json
+    python -m benchmarks.ejecutar --escalas 10 --comparar resultados.json
+"""
+import argparse
+import inspect
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmarks import bench_paginas
+
+
+def _clases_benchmark():
+    for nombre, clase in inspect.getmembers(bench_paginas, inspect.isclass):
+        if issubclass(clase, bench_paginas._BenchPagina) and not nombre.startswith("_"):
+            yield nombre, clase
+
+
+def medir(funcion, repeticiones: int) -> dict:
+    """Ejecuta la función varias veces y retorna tiempo mediano y memoria pico"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "tiempo_s": statistics.median(tiempos),
+        "tiempo_min_s": min(tiempos),
+        "memoria_pico_mb": pico / 1024 ** 2,
+    }
+
+
+def ejecutar(escalas, repeticiones: int = 3, filtro: str = None) -> list:
+    """
+    Corre todas las etapas time_* de cada página para cada escala
+
+    Returns:
+        Lista de resultados {pagina, etapa, escala, tiempo_s, tiempo_min_s, memoria_pico_mb}
+    """
+    resultados = []
+    for escala in escalas:
+        for nombre, clase in _clases_benchmark():
+            if filtro and filtro not in nombre:
+                continue
+            bench = clase()
+            bench.setup(escala)
+            for metodo, funcion in inspect.getmembers(bench, inspect.ismethod):
+                if not metodo.startswith("time_"):
+                    continue
+                try:
+                    medicion = medir(lambda: funcion(escala), repeticiones)
+                except NotImplementedError as e:
+                    # Convención de asv para etapas que no aplican en este entorno
+                    print(f"{nombre:<22} {metodo[5:]:<10} x{escala:<6g} omitido: {e}")
+                    continue
+                resultado = {"pagina": nombre, "etapa": metodo[5:], "escala": escala, **medicion}
+                resultados.append(resultado)
+                print(
+                    f"{nombre:<22} {resultado['etapa']:<10} x{escala:<6g} "
+                    f"{medicion['tiempo_s'] * 1000:>10.1f} ms {medicion['memoria_pico_mb']:>9.1f} MB"
+                )
+    return resultados
+
+
+def comparar(resultados: list, base: list, tolerancia: float) -> list:
+    """Retorna las mediciones que empeoraron más que la tolerancia respecto a la base"""
+    indice = {(r["pagina"], r["etapa"], r["escala"]): r for r in base}
+    regresiones = []
+    for r in resultados:
+        anterior = indice.get((r["pagina"], r["etapa"], r["escala"]))
+        if not anterior:
+            continue
+        for metrica in ("tiempo_s", "memoria_pico_mb"):
+            if anterior[metrica] > 0 and r[metrica] > anterior[metrica] * (1 + tolerancia):
+                regresiones.append({**r, "metrica": metrica, "anterior": anterior[metrica]})
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de las páginas del dashboard")
+    parser.add_argument("--escalas", type=float, nargs="+", default=[10, 100])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--pagina", help="Solo ejecutar las clases que contengan este texto")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", help="Archivo JSON de una corrida anterior (línea base)")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Empeoramiento permitido (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    resultados = ejecutar(args.escalas, args.repeticiones, args.pagina)
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regresiones = comparar(resultados, base, args.tolerancia)
+        for r in regresiones:
+            print(
+                f"REGRESIÓN {r['pagina']}.{r['etapa']} x{r['escala']:g} {r['metrica']}: "
+                f"{r['anterior']:.3f} -> {r[r['metrica']]:.3f}"
+            )
+        if regresiones:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 """
-Página de Datos Generales - Dashboard JII2025
+Página de Datos Generales - Dashboard JII
 Visualización de tablas y estadísticas generales del evento
 """
 import streamlit as st
@@ -15,12 +15,20 @@ from utils.supabase_client import (
     obtener_participantes,
     obtener_inscripciones_workshop,
     obtener_equipos_concurso,
-    obtener_actividades
+    obtener_actividades,
+    mostrar_frescura,
 )
+from utils.identidades import resumen_identidades, personas_con_varios_emails
+from utils.perfilador import perfil_pagina
+from utils import derivados
+from utils.ediciones import selector_edicion, nombre_edicion, sufijo_archivo
 
-st.set_page_config(page_title="Tablas de Datos JII 2025", layout="wide")
+st.set_page_config(page_title="Tablas de Datos JII", layout="wide")
 
-st.title("Tablas de Datos - Jornada de Ingeniería Industrial 2025")
+edicion = selector_edicion()
+perfil = perfil_pagina("Tablas de Datos", edicion=edicion)
+
+st.title(f"Tablas de Datos - {nombre_edicion(edicion)}")
 st.markdown("Consulta de datos en tiempo real desde Supabase")
 st.divider()
 
@@ -35,15 +43,27 @@ tab1, tab2, tab3, tab4 = st.tabs([
 with tab1:
     st.subheader("Participantes Registrados")
     with st.spinner("Cargando datos de participantes..."):
-        df_participantes = obtener_participantes()
+        df_participantes = obtener_participantes(edicion)
+    mostrar_frescura(["participantes"], edicion)
         
     if not df_participantes.empty:
-        col1, col2, col3 = st.columns(3)
+        mapa_personas = derivados.personas(edicion)
+        resumen = resumen_identidades(mapa_personas)
+        col1, col2, col3, col4 = st.columns(4)
         col1.metric("Total Participantes", len(df_participantes))
-        col2.metric("Encuestas Completadas", 
-                   len(df_participantes[df_participantes["encuesta_completada"] == True]))
+        # Como en analitica.calcular_kpis: los CSV de datos/ no traen encuesta_completada
+        encuestas = 0
+        if "encuesta_completada" in df_participantes.columns:
+            encuestas = int((df_participantes["encuesta_completada"] == True).sum())
+        col2.metric("Encuestas Completadas", encuestas)
         col3.metric("Con Brazalete", 
                    len(df_participantes[df_participantes["brazalete"].notna()]))
+        col4.metric("Personas Únicas", resumen["personas"],
+                    help="Personas distintas en todas las tablas, unificando los emails de una misma persona")
+
+        if resumen["unificados"]:
+            with st.expander(f"Personas con más de un email ({resumen['unificados']} emails unificados)"):
+                st.dataframe(personas_con_varios_emails(mapa_personas), use_container_width=True, hide_index=True)
         
         st.dataframe(df_participantes, use_container_width=True)
         
@@ -52,7 +72,7 @@ with tab1:
         st.download_button(
             label="Descargar CSV",
             data=csv,
-            file_name="participantes_jii2025.csv",
+            file_name=f"participantes_{sufijo_archivo(edicion)}.csv",
             mime="text/csv"
         )
     else:
@@ -61,7 +81,8 @@ with tab1:
 with tab2:
     st.subheader("Asistencias a Actividades")
     with st.spinner("Cargando datos de asistencias..."):
-        df_inscripciones = obtener_inscripciones_workshop()
+        df_inscripciones = obtener_inscripciones_workshop(edicion)
+    mostrar_frescura(["asistencias"], edicion)
         
     if not df_inscripciones.empty:
         col1, col2, col3 = st.columns(3)
@@ -74,7 +95,7 @@ with tab2:
         st.download_button(
             label="Descargar CSV",
             data=csv,
-            file_name="inscripciones_jii2025.csv",
+            file_name=f"inscripciones_{sufijo_archivo(edicion)}.csv",
             mime="text/csv"
         )
     else:
@@ -83,7 +104,8 @@ with tab2:
 with tab3:
     st.subheader("Equipos del Concurso")
     with st.spinner("Cargando datos de equipos..."):
-        df_equipos = obtener_equipos_concurso()
+        df_equipos = obtener_equipos_concurso(edicion)
+    mostrar_frescura(["equipos_concurso"], edicion)
         
     if not df_equipos.empty:
         col1, col2 = st.columns(2)
@@ -100,7 +122,7 @@ with tab3:
         st.download_button(
             label="Descargar CSV",
             data=csv,
-            file_name="equipos_concurso_jii2025.csv",
+            file_name=f"equipos_concurso_{sufijo_archivo(edicion)}.csv",
             mime="text/csv"
         )
     else:
@@ -109,7 +131,8 @@ with tab3:
 with tab4:
     st.subheader("Actividades Programadas")
     with st.spinner("Cargando datos de actividades..."):
-        df_actividades = obtener_actividades()
+        df_actividades = obtener_actividades(edicion)
+    mostrar_frescura(["actividades"], edicion)
         
     if not df_actividades.empty:
         col1, col2 = st.columns(2)
@@ -127,8 +150,10 @@ with tab4:
         st.download_button(
             label="Descargar CSV",
             data=csv,
-            file_name="actividades_jii2025.csv",
+            file_name=f"actividades_{sufijo_archivo(edicion)}.csv",
             mime="text/csv"
         )
     else:
         st.info("No hay datos de actividades disponibles")
+
+perfil.terminar()
@@ -1,11 +1,11 @@
 """
-Dashboard Principal - Jornada de Ingeniería Industrial 2025
+Dashboard Principal - Jornada de Ingeniería Industrial
 Visualizaciones y análisis de datos del evento desde Supabase
 """
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 import sys
+import numpy as np
+import pandas as pd
 from pathlib import Path
 
 # Agregar el directorio raíz al path para poder importar utils
@@ -17,27 +17,162 @@ from utils.supabase_client import (
     obtener_inscripciones_workshop,
     obtener_asistencias,
     obtener_equipos_concurso,
-    obtener_actividades,
-    obtener_estadisticas_participacion
+    mostrar_frescura,
+)
+from utils.perfilador import perfil_pagina, perfil_seccion
+from utils import derivados
+from utils.ediciones import selector_edicion, nombre_edicion, sufijo_archivo
+from utils.analitica import distribucion
+from utils.asignacion import RIESGO_DEFECTO
+from utils.audiencias import AUDIENCIAS_DISPONIBLE, UMBRAL_RED
+from utils.embudo import DIMENSIONES as DIMENSIONES_EMBUDO
+from utils.graficas import (
+    grafica_barras_conteo,
+    grafica_pastel_conteo,
+    grafica_serie_temporal,
+    grafica_coasistencia,
+    grafica_embudo,
+    grafica_red_actividades,
 )
 
 st.set_page_config(
-    page_title="Dashboard JII 2025", 
+    page_title="Dashboard JII", 
     page_icon="📊", 
     layout="wide", 
     initial_sidebar_state="expanded"
 )
 
-st.title("Dashboard de Análisis - Jornada de Ingeniería Industrial 2025")
+edicion = selector_edicion()
+perfil = perfil_pagina("Dashboard", edicion=edicion)
+
+
+# Las secciones con widgets son fragmentos: al cambiar un widget Streamlit vuelve a
+# ejecutar solo la sección, que toma sus datos de la caché de derivados
+@st.fragment
+@perfil_seccion("Dashboard")
+def seccion_embudo(edicion: int):
+    """Embudo y no-shows del grupo elegido; los selectores solo vuelven a ejecutar esta sección"""
+    indice = derivados.indice_embudo(edicion)
+    if indice.inscripciones.empty:
+        st.info("No hay datos de inscripciones a workshops.")
+    else:
+        dimension = st.selectbox(
+            "Desglosar por",
+            options=list(DIMENSIONES_EMBUDO),
+            format_func=DIMENSIONES_EMBUDO.get,
+            key="embudo_dimension",
+        )
+        df_conversion = indice.conversion(dimension)
+        grupo = st.selectbox(
+            DIMENSIONES_EMBUDO[dimension],
+            options=["Todos"] + df_conversion[dimension].tolist(),
+            key="embudo_grupo",
+        )
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            if grupo == "Todos":
+                etapas, titulo = indice.etapas(), "Todas las inscripciones"
+            else:
+                etapas, titulo = indice.etapas(dimension, grupo), f"{DIMENSIONES_EMBUDO[dimension]}: {grupo}"
+            st.plotly_chart(grafica_embudo(etapas, titulo), use_container_width=True)
+        with col2:
+            st.dataframe(
+                df_conversion,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'tasa_asistencia': st.column_config.NumberColumn('Tasa de asistencia', format='percent'),
+                    'tasa_encuesta': st.column_config.NumberColumn('Tasa de encuesta', format='percent'),
+                },
+            )
+
+        no_shows = indice.no_shows() if grupo == "Todos" else indice.no_shows(dimension, grupo)
+        with st.expander(f"No-shows: {len(no_shows)} inscripciones confirmadas sin asistencia"):
+            st.dataframe(no_shows, use_container_width=True, hide_index=True)
+
+
+@st.fragment
+@perfil_seccion("Dashboard")
+def seccion_lista_espera(edicion: int):
+    """Promociones de la lista de espera; mover el riesgo solo vuelve a resolver esta sección"""
+    riesgo = st.slider(
+        "Riesgo aceptado de rebasar el cupo", 0.0, 0.2, RIESGO_DEFECTO, 0.01,
+        key="asignacion_riesgo",
+        help="Probabilidad de que asistan más personas que el cupo al llenar los lugares que dejan los no-shows",
+    )
+    resultado = derivados.asignacion_lista_espera(edicion, riesgo)
+    if resultado.workshops.empty:
+        st.info("No hay datos de inscripciones a workshops.")
+        return
+    df_resumen = resultado.resumen()
+    promociones = resultado.promociones()
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Promociones", len(promociones))
+    col2.metric("En lista de espera sin lugar", int(df_resumen['sin_lugar'].sum()))
+    col3.metric("Asistencia esperada", f"{df_resumen['asistencia_esperada'].sum():.0f} de {int(df_resumen['cupo'].sum())} lugares")
+
+    st.dataframe(
+        df_resumen,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'tasa_no_show': st.column_config.NumberColumn('Tasa de no-show', format='percent'),
+            'objetivo': st.column_config.NumberColumn('Objetivo', help='Inscripciones que acepta el workshop con su tasa de no-show'),
+            'asistencia_esperada': st.column_config.NumberColumn('Asistencia esperada', format='%.1f'),
+        },
+    )
+    _, _, ediciones_historial = derivados.tasas_no_show(edicion)
+    st.caption(
+        "Tasas de no-show estimadas con la asistencia de "
+        + (", ".join(str(e) for e in ediciones_historial) if ediciones_historial else "ninguna edición (sin sobreventa)")
+        + ". Cada persona recibe a lo más un workshop por horario, en orden de registro."
+    )
+    if not resultado.conflictos.empty:
+        st.warning(
+            f"{resultado.conflictos['participante_email'].nunique()} personas tienen lugar en más de un workshop del mismo horario."
+        )
+        with st.expander("Inscripciones empalmadas"):
+            st.dataframe(resultado.conflictos, use_container_width=True, hide_index=True)
+
+    with st.expander(f"Promociones: {len(promociones)} inscripciones de la lista de espera"):
+        st.dataframe(
+            promociones,
+            use_container_width=True,
+            hide_index=True,
+            column_config={'prob_asistencia': st.column_config.NumberColumn('Prob. de asistencia', format='percent')},
+        )
+        st.download_button(
+            label="Descargar CSV",
+            data=promociones.to_csv(index=False).encode('utf-8'),
+            file_name=f"promociones_lista_espera_{sufijo_archivo(edicion)}.csv",
+            mime="text/csv",
+        )
+
+
+@st.fragment
+@perfil_seccion("Dashboard")
+def seccion_red(edicion: int):
+    """Red de actividades; mover el umbral solo vuelve a dibujar la red"""
+    df_coasistencia = derivados.coasistencia(edicion)
+    audiencia = pd.Series(np.diag(df_coasistencia), index=df_coasistencia.index)
+    umbral = st.slider("Jaccard mínimo para unir dos actividades", 0.0, 1.0, UMBRAL_RED, 0.05)
+    st.plotly_chart(grafica_red_actividades(derivados.pares_actividades(edicion), audiencia, umbral), use_container_width=True)
+
+
+st.title(f"Dashboard de Análisis - {nombre_edicion(edicion)}")
 st.markdown("Análisis en tiempo real de datos del evento")
 
 # Cargar datos desde Supabase
 with st.spinner("Cargando datos desde Supabase..."):
-    df_participantes = obtener_participantes()
-    df_inscripciones = obtener_inscripciones_workshop()
-    df_asistencias = obtener_asistencias()  # Para evolución temporal
-    df_equipos = obtener_equipos_concurso()
-    stats = obtener_estadisticas_participacion()
+    df_participantes = obtener_participantes(edicion)
+    df_inscripciones = obtener_inscripciones_workshop(edicion)
+    df_asistencias = obtener_asistencias(edicion)  # Para evolución temporal
+    df_equipos = obtener_equipos_concurso(edicion)
+# obtener_inscripciones_workshop también lee la tabla asistencias
+mostrar_frescura(["participantes", "asistencias", "equipos_concurso"], edicion)
+
+stats = derivados.kpis(edicion).iloc[0]
 
 # KPIs principales
 st.subheader("Indicadores Clave")
@@ -66,9 +201,8 @@ st.markdown("---")
 # Participantes por programa
 st.subheader("Participantes por Programa Académico")
 if not df_participantes.empty:
-    prog_counts = df_participantes['programa'].value_counts().reset_index()
-    prog_counts.columns = ['Programa', 'Cantidad']
-    fig_prog = px.bar(prog_counts, x='Programa', y='Cantidad', color='Programa', text='Cantidad')
+    prog_counts = distribucion(df_participantes, 'programa', 'Programa')
+    fig_prog = grafica_barras_conteo(prog_counts)
     st.plotly_chart(fig_prog, use_container_width=True)
 else:
     st.info("No hay datos de participantes.")
@@ -76,9 +210,8 @@ else:
 # Participantes por categoría
 st.subheader("Participantes por Categoría")
 if not df_participantes.empty:
-    cat_counts = df_participantes['categoria'].value_counts().reset_index()
-    cat_counts.columns = ['Categoría', 'Cantidad']
-    fig_cat = px.pie(cat_counts, names='Categoría', values='Cantidad', hole=0.4)
+    cat_counts = distribucion(df_participantes, 'categoria', 'Categoría')
+    fig_cat = grafica_pastel_conteo(cat_counts)
     st.plotly_chart(fig_cat, use_container_width=True)
 else:
     st.info("No hay datos de participantes.")
@@ -86,9 +219,8 @@ else:
 # Inscripciones por estado
 st.subheader("Inscripciones a Workshops por Estado")
 if not df_inscripciones.empty:
-    insc_counts = df_inscripciones['estado'].value_counts().reset_index()
-    insc_counts.columns = ['Estado', 'Cantidad']
-    fig_insc = px.bar(insc_counts, x='Estado', y='Cantidad', color='Estado', text='Cantidad')
+    insc_counts = distribucion(df_inscripciones, 'estado', 'Estado')
+    fig_insc = grafica_barras_conteo(insc_counts)
     st.plotly_chart(fig_insc, use_container_width=True)
 else:
     st.info("No hay datos de inscripciones a workshops.")
@@ -96,9 +228,8 @@ else:
 # Inscripciones por actividad
 st.subheader("Inscripciones por Actividad")
 if not df_inscripciones.empty:
-    act_counts = df_inscripciones['actividad_codigo'].value_counts().reset_index()
-    act_counts.columns = ['Workshop', 'Cantidad']
-    fig_act = px.bar(act_counts, x='Workshop', y='Cantidad', color='Workshop', text='Cantidad')
+    act_counts = distribucion(df_inscripciones, 'actividad_codigo', 'Workshop')
+    fig_act = grafica_barras_conteo(act_counts)
     st.plotly_chart(fig_act, use_container_width=True)
 else:
     st.info("No hay datos de inscripciones a workshops.")
@@ -106,33 +237,9 @@ else:
 # Evolución temporal de asistencias (dato real)
 st.subheader("Evolución Temporal de Asistencias")
 if not df_asistencias.empty and 'fecha_asistencia' in df_asistencias.columns:
-    df_temp = df_asistencias.copy()
-    df_temp['fecha_asistencia'] = pd.to_datetime(df_temp['fecha_asistencia'], errors='coerce')
-    
-    # Determinar si agrupar por hora o por día según el rango de fechas
-    rango_dias = (df_temp['fecha_asistencia'].max() - df_temp['fecha_asistencia'].min()).days
-    
-    if rango_dias <= 2:  # Si es 2 días o menos, agrupar por hora
-        df_temp['periodo'] = df_temp['fecha_asistencia'].dt.floor('h')
-        titulo = 'Asistencias por Hora'
-        label_x = 'Hora'
-    else:  # Si es más de 2 días, agrupar por día
-        df_temp['periodo'] = df_temp['fecha_asistencia'].dt.date
-        titulo = 'Asistencias por Día'
-        label_x = 'Fecha'
-    
-    periodo_counts = df_temp.groupby('periodo').size().reset_index(name='Cantidad')
-    
-    fig_asist = px.line(
-        periodo_counts, 
-        x='periodo', 
-        y='Cantidad', 
-        markers=True, 
-        title=titulo,
-        labels={'periodo': label_x, 'Cantidad': 'Número de Asistencias'}
-    )
-    fig_asist.update_traces(line_color='#1f77b4', line_width=2, marker=dict(size=8))
-    fig_asist.update_layout(hovermode='x unified')
+    # Agrupa por hora si el rango es de 2 días o menos, si no por día
+    periodo_counts = derivados.serie_asistencias(edicion)
+    fig_asist = grafica_serie_temporal(periodo_counts, 'Asistencias', 'Número de Asistencias', '#1f77b4')
     st.plotly_chart(fig_asist, use_container_width=True)
 else:
     st.info("No hay datos de fechas de asistencias.")
@@ -140,9 +247,8 @@ else:
 # Equipos por estado_registro
 st.subheader("Equipos por Estado de Registro")
 if not df_equipos.empty and 'estado_registro' in df_equipos.columns:
-    eq_counts = df_equipos['estado_registro'].value_counts().reset_index()
-    eq_counts.columns = ['Estado de Registro', 'Cantidad']
-    fig_eq = px.bar(eq_counts, x='Estado de Registro', y='Cantidad', color='Estado de Registro', text='Cantidad')
+    eq_counts = distribucion(df_equipos, 'estado_registro', 'Estado de Registro')
+    fig_eq = grafica_barras_conteo(eq_counts)
     st.plotly_chart(fig_eq, use_container_width=True)
 else:
     st.info("No hay datos de equipos.")
@@ -150,33 +256,73 @@ else:
 # Evolución temporal de equipos registrados
 st.subheader("Evolución Temporal de Registro de Equipos")
 if not df_equipos.empty and 'fecha_registro' in df_equipos.columns:
-    df_equipos_temp = df_equipos.copy()
-    df_equipos_temp['fecha_registro'] = pd.to_datetime(df_equipos_temp['fecha_registro'], errors='coerce')
-    
-    # Determinar si agrupar por hora o por día según el rango de fechas
-    rango_dias_eq = (df_equipos_temp['fecha_registro'].max() - df_equipos_temp['fecha_registro'].min()).days
-    
-    if rango_dias_eq <= 2:  # Si es 2 días o menos, agrupar por hora
-        df_equipos_temp['periodo'] = df_equipos_temp['fecha_registro'].dt.floor('h')
-        titulo_eq = 'Registro de Equipos por Hora'
-        label_x_eq = 'Hora'
-    else:  # Si es más de 2 días, agrupar por día
-        df_equipos_temp['periodo'] = df_equipos_temp['fecha_registro'].dt.date
-        titulo_eq = 'Registro de Equipos por Día'
-        label_x_eq = 'Fecha'
-    
-    eq_fecha_counts = df_equipos_temp.groupby('periodo').size().reset_index(name='Cantidad')
-    
-    fig_eq_fecha = px.line(
-        eq_fecha_counts, 
-        x='periodo', 
-        y='Cantidad', 
-        markers=True,
-        title=titulo_eq,
-        labels={'periodo': label_x_eq, 'Cantidad': 'Número de Equipos'}
-    )
-    fig_eq_fecha.update_traces(line_color='#ff7f0e', line_width=2, marker=dict(size=8))
-    fig_eq_fecha.update_layout(hovermode='x unified')
+    # Agrupa por hora si el rango es de 2 días o menos, si no por día
+    eq_fecha_counts = derivados.serie_equipos(edicion)
+    fig_eq_fecha = grafica_serie_temporal(eq_fecha_counts, 'Registro de Equipos', 'Número de Equipos', '#ff7f0e')
     st.plotly_chart(fig_eq_fecha, use_container_width=True)
 else:
     st.info("No hay datos de fechas de registro de equipos.")
+
+# Embudo de conversión de los workshops
+st.markdown("---")
+st.subheader("Embudo de Conversión de Workshops")
+st.caption("Inscripción → confirmación (fuera de lista de espera) → asistencia al workshop → respuesta a la encuesta.")
+seccion_embudo(edicion=edicion)
+
+# Promociones de la lista de espera de los workshops
+st.markdown("---")
+st.subheader("Lista de Espera de Workshops")
+st.caption(
+    "Quiénes de la lista de espera pueden ocupar los lugares que quedan libres o que dejarán los no-shows, "
+    "según el cupo de cada workshop y la asistencia registrada."
+)
+seccion_lista_espera(edicion=edicion)
+
+# Audiencias compartidas entre actividades
+st.markdown("---")
+st.subheader("Audiencias Compartidas entre Actividades")
+st.caption(
+    "Qué sesiones comparten asistentes. Las actividades con mucha audiencia en común "
+    "no deberían programarse al mismo tiempo en la siguiente edición."
+)
+if not AUDIENCIAS_DISPONIBLE:
+    st.warning("⚠️ SciPy no está instalado. Ejecuta: `pip install scipy` para ver las audiencias compartidas.")
+elif df_asistencias.empty:
+    st.info("No hay datos de asistencias.")
+else:
+    df_pares = derivados.pares_actividades(edicion)
+
+    tab_mapa, tab_red, tab_pares = st.tabs(["Mapa de calor", "Red", "Pares"])
+    with tab_mapa:
+        st.plotly_chart(grafica_coasistencia(derivados.jaccard_actividades(edicion)), use_container_width=True)
+    with tab_red:
+        seccion_red(edicion=edicion)
+    with tab_pares:
+        choques = df_pares[df_pares['choque']]
+        if not choques.empty:
+            st.warning(f"{len(choques)} pares de actividades con audiencia en común tienen horarios empalmados.")
+        st.dataframe(
+            df_pares.head(50),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'jaccard': st.column_config.NumberColumn('Jaccard', format='%.2f'),
+                'solapamiento': st.column_config.NumberColumn('Solapamiento', format='%.2f',
+                                                              help='En común / audiencia de la menor'),
+                'choque': st.column_config.CheckboxColumn('Horario empalmado'),
+            },
+        )
+
+    st.subheader("Equipos del Concurso en las Sesiones")
+    df_afinidad = derivados.afinidad_equipos(edicion)
+    if df_afinidad.empty:
+        st.info("No hay datos de equipos.")
+    else:
+        col1, col2 = st.columns(2)
+        col1.metric("Afinidad promedio", f"{df_afinidad['afinidad'].mean():.2f}",
+                    help="Jaccard promedio entre las actividades de cada par de compañeros de equipo")
+        col2.metric("Integrantes con asistencias",
+                    f"{int(df_afinidad['con_asistencia'].sum())} de {int(df_afinidad['integrantes'].sum())}")
+        st.dataframe(df_afinidad, use_container_width=True, hide_index=True)
+
+perfil.terminar()
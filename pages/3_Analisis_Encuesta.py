@@ -1,11 +1,8 @@
 """
-Análisis de Encuesta - Jornada de Ingeniería Industrial 2025
+Análisis de Encuesta - Jornada de Ingeniería Industrial
 Análisis cuantitativo de respuestas de calificación (1-5)
 """
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import sys
 from pathlib import Path
 
@@ -13,21 +10,39 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
 
-from utils.supabase_client import obtener_respuestas_encuesta, obtener_respuestas_por_pregunta
-from utils.preguntas_encuesta import PREGUNTAS_CALIFICACION, TODAS_PREGUNTAS, obtener_pregunta_por_id
+from utils.supabase_client import obtener_respuestas_encuesta, mostrar_frescura
+from utils.preguntas_encuesta import obtener_preguntas_por_tipo, obtener_pregunta_por_id
+from utils.perfilador import perfil_pagina, perfil_seccion
+from utils import derivados
+from utils.ediciones import selector_edicion, nombre_edicion, sufijo_archivo
+from utils.analitica import distribucion_calificacion, resumen_pregunta
+from utils.identidades import asignar_persona
+from utils.matriz_calificaciones import PREGUNTA_GENERAL
+from utils.graficas import (
+    grafica_promedios,
+    grafica_distribucion_calificacion,
+    grafica_promedios_categoria,
+    grafica_radar_categoria,
+    grafica_correlaciones,
+    grafica_impulsores,
+)
 
 st.set_page_config(
-    page_title="Análisis de Encuesta JII 2025",
+    page_title="Análisis de Encuesta JII",
     page_icon="📊",
     layout="wide"
 )
 
-st.title("Análisis de Encuesta - Jornada de Ingeniería Industrial 2025")
+edicion = selector_edicion()
+perfil = perfil_pagina("Análisis de Encuesta", edicion=edicion)
+
+st.title(f"Análisis de Encuesta - {nombre_edicion(edicion)}")
 st.markdown("Análisis cuantitativo de respuestas de calificación")
 
-# Cargar todas las respuestas de encuesta (SIN anonimizar - datos cuantitativos)
+# Cargar solo las respuestas de calificación (SIN anonimizar - datos cuantitativos)
 with st.spinner("Cargando respuestas de encuesta..."):
-    df_respuestas = obtener_respuestas_encuesta()
+    df_respuestas = obtener_respuestas_encuesta(edicion=edicion, tipos=['calificacion_1_5'])
+mostrar_frescura(["encuesta_respuestas"], edicion)
 
 if df_respuestas.empty:
     st.warning("No hay respuestas de encuesta disponibles")
@@ -38,210 +53,163 @@ st.subheader("Estadísticas Generales")
 col1, col2, col3, col4 = st.columns(4)
 
 total_respuestas = len(df_respuestas)
-participantes_unicos = df_respuestas['participante_email'].nunique() if 'participante_email' in df_respuestas.columns else 0
+# Personas y no emails: quien respondió con dos correos cuenta una vez
+participantes_unicos = (
+    asignar_persona(df_respuestas, derivados.personas(edicion)).nunique()
+    if 'participante_email' in df_respuestas.columns else 0
+)
 preguntas_respondidas = df_respuestas['pregunta_id'].nunique()
 
-col1.metric("Total de Respuestas", total_respuestas)
+col1.metric("Respuestas de Calificación", total_respuestas)
 col2.metric("Participantes Únicos", participantes_unicos)
-col3.metric("Preguntas Respondidas", preguntas_respondidas)
+col3.metric("Preguntas de Calificación", preguntas_respondidas)
 col4.metric("Promedio Respuestas/Participante", round(total_respuestas / participantes_unicos, 1) if participantes_unicos > 0 else 0)
 
 st.markdown("---")
 
-# Filtrar solo preguntas de calificación
-ids_calificacion = [p['id'] for p in PREGUNTAS_CALIFICACION]
-df_calificaciones = df_respuestas[df_respuestas['pregunta_id'].isin(ids_calificacion)].copy()
-
-# Convertir respuestas a numérico
-df_calificaciones['respuesta_num'] = pd.to_numeric(df_calificaciones['respuesta'], errors='coerce')
-
-# Análisis por pregunta
-st.subheader("Análisis por Pregunta de Calificación (1-5)")
-
-# Tabs para diferentes análisis
-tab1, tab2, tab3 = st.tabs(["Promedios por Pregunta", "Distribución de Respuestas", "Análisis Detallado"])
+# Filtrar solo preguntas de calificación con la respuesta convertida a numérico
+df_calificaciones = derivados.calificaciones(edicion)
 
-with tab1:
-    st.markdown("### Calificaciones Promedio por Pregunta")
-    
-    # Calcular promedios
-    promedios = df_calificaciones.groupby(['pregunta_id', 'pregunta_texto'])['respuesta_num'].agg([
-        ('promedio', 'mean'),
-        ('total', 'count'),
-        ('desv_std', 'std')
-    ]).reset_index()
-    
-    promedios = promedios.sort_values('promedio', ascending=True)
-    
-    # Gráfico de barras horizontales
-    fig_promedios = px.bar(
-        promedios,
-        y='pregunta_texto',
-        x='promedio',
-        orientation='h',
-        text='promedio',
-        title='Calificación Promedio por Pregunta',
-        color='promedio',
-        color_continuous_scale='RdYlGn',
-        range_color=[1, 5]
-    )
-    
-    fig_promedios.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-    fig_promedios.update_layout(
-        xaxis_title="Calificación Promedio",
-        yaxis_title="",
-        height=max(400, len(promedios) * 40),
-        showlegend=False
-    )
-    
-    st.plotly_chart(fig_promedios, use_container_width=True)
-    
-    # Tabla de datos
-    st.markdown("### Tabla de Resultados")
-    promedios_display = promedios.copy()
-    promedios_display['promedio'] = promedios_display['promedio'].round(2)
-    promedios_display['desv_std'] = promedios_display['desv_std'].round(2)
-    promedios_display.columns = ['ID Pregunta', 'Pregunta', 'Promedio', 'Total Respuestas', 'Desviación Estándar']
-    
-    st.dataframe(promedios_display, use_container_width=True, hide_index=True)
 
-with tab2:
+# Las secciones con widgets son fragmentos: al cambiar un widget Streamlit vuelve a
+# ejecutar solo la sección, que toma sus datos de la caché de derivados
+@st.fragment
+@perfil_seccion("Análisis de Encuesta")
+def seccion_distribucion(edicion: int):
+    """Distribución de una pregunta; cambiar la pregunta solo vuelve a ejecutar esta sección"""
     st.markdown("### Distribución de Respuestas por Pregunta")
     
+    df_calificaciones = derivados.calificaciones(edicion)
+    
     # Selector de pregunta
-    preguntas_opciones = {f"{p['id']}: {p['texto'][:60]}...": p['id'] for p in PREGUNTAS_CALIFICACION}
+    preguntas_opciones = {f"{p['id']}: {p['texto'][:60]}...": p['id'] for p in obtener_preguntas_por_tipo('calificacion_1_5', edicion)}
     pregunta_seleccionada = st.selectbox(
         "Selecciona una pregunta",
         options=list(preguntas_opciones.keys())
     )
     
     pregunta_id = preguntas_opciones[pregunta_seleccionada]
-    pregunta_info = obtener_pregunta_por_id(pregunta_id)
+    pregunta_info = obtener_pregunta_por_id(pregunta_id, edicion)
     
-    # Filtrar respuestas de la pregunta seleccionada
-    df_pregunta = df_calificaciones[df_calificaciones['pregunta_id'] == pregunta_id]
+    # Distribución de respuestas de la pregunta seleccionada
+    distribucion = distribucion_calificacion(df_calificaciones, pregunta_id)
     
-    if not df_pregunta.empty:
+    if not distribucion.empty:
         col1, col2 = st.columns([2, 1])
         
         with col1:
             # Histograma de distribución
-            distribucion = df_pregunta['respuesta_num'].value_counts().sort_index()
-            
-            fig_dist = px.bar(
-                x=distribucion.index,
-                y=distribucion.values,
-                labels={'x': 'Calificación', 'y': 'Cantidad'},
-                title=f"Distribución de Respuestas: {pregunta_info['texto'][:80]}...",
-                text=distribucion.values
-            )
-            
-            fig_dist.update_traces(textposition='outside', marker_color='steelblue')
-            fig_dist.update_layout(
-                xaxis=dict(tickmode='linear', tick0=1, dtick=1),
-                showlegend=False
-            )
+            fig_dist = grafica_distribucion_calificacion(distribucion, pregunta_info['texto'])
             
             st.plotly_chart(fig_dist, use_container_width=True)
         
         with col2:
             # Estadísticas de la pregunta
             st.markdown("#### Estadísticas")
-            promedio = df_pregunta['respuesta_num'].mean()
-            mediana = df_pregunta['respuesta_num'].median()
-            moda = df_pregunta['respuesta_num'].mode().iloc[0] if not df_pregunta['respuesta_num'].mode().empty else 0
-            desv_std = df_pregunta['respuesta_num'].std()
-            total = len(df_pregunta)
+            resumen = resumen_pregunta(df_calificaciones, pregunta_id).iloc[0]
             
-            st.metric("Promedio", f"{promedio:.2f}")
-            st.metric("Mediana", f"{mediana:.1f}")
-            st.metric("Moda", f"{moda:.0f}")
-            st.metric("Desviación Estándar", f"{desv_std:.2f}")
-            st.metric("Total Respuestas", total)
+            st.metric("Promedio", f"{resumen['promedio']:.2f}")
+            st.metric("Mediana", f"{resumen['mediana']:.1f}")
+            st.metric("Moda", f"{resumen['moda']:.0f}")
+            st.metric("Desviación Estándar", f"{resumen['desv_std']:.2f}")
+            st.metric("Total Respuestas", int(resumen['total']))
             
             # Porcentajes por calificación
             st.markdown("#### Porcentajes")
-            porcentajes = (df_pregunta['respuesta_num'].value_counts(normalize=True) * 100).sort_index()
-            for cal, pct in porcentajes.items():
+            for cal, pct in zip(distribucion['calificacion'], distribucion['porcentaje']):
                 st.write(f"**{int(cal)}:** {pct:.1f}%")
     else:
         st.info("No hay respuestas para esta pregunta")
 
-with tab3:
-    st.markdown("### Análisis Detallado por Categoría de Pregunta")
+
+# Análisis por pregunta
+st.subheader("Análisis por Pregunta de Calificación (1-5)")
+
+# Tabs para diferentes análisis
+tab1, tab2, tab3, tab4 = st.tabs([
+    "Promedios por Pregunta",
+    "Distribución de Respuestas",
+    "Análisis Detallado",
+    "Relaciones entre Preguntas"
+])
+
+with tab1:
+    st.markdown("### Calificaciones Promedio por Pregunta")
     
-    # Agrupar preguntas por categoría (Generales, Workshop, Mundialito)
-    from utils.preguntas_encuesta import PREGUNTAS_GENERALES, PREGUNTAS_WORKSHOP, PREGUNTAS_MUNDIALITO
+    # Calcular promedios
+    promedios = derivados.estadisticas_calificaciones(edicion)
     
-    categorias = {
-        "Preguntas Generales": [p['id'] for p in PREGUNTAS_GENERALES if p['tipo'] == 'calificacion_1_5'],
-        "Workshop": [p['id'] for p in PREGUNTAS_WORKSHOP if p['tipo'] == 'calificacion_1_5'],
-        "Mundialito Mexicano": [p['id'] for p in PREGUNTAS_MUNDIALITO if p['tipo'] == 'calificacion_1_5']
-    }
+    # Gráfico de barras horizontales
+    fig_promedios = grafica_promedios(promedios)
     
-    # Calcular promedios por categoría
-    resultados_categoria = []
+    st.plotly_chart(fig_promedios, use_container_width=True)
     
-    for categoria, pregunta_ids in categorias.items():
-        df_cat = df_calificaciones[df_calificaciones['pregunta_id'].isin(pregunta_ids)]
-        if not df_cat.empty:
-            promedio = df_cat['respuesta_num'].mean()
-            total = len(df_cat)
-            resultados_categoria.append({
-                'Categoría': categoria,
-                'Promedio': promedio,
-                'Total Respuestas': total
-            })
+    # Tabla de datos
+    st.markdown("### Tabla de Resultados")
+    promedios_display = promedios.round({'promedio': 2, 'desv_std': 2})
+    promedios_display.columns = ['ID Pregunta', 'Pregunta', 'Promedio', 'Total Respuestas', 'Desviación Estándar']
     
-    if resultados_categoria:
-        df_categorias = pd.DataFrame(resultados_categoria)
-        
+    st.dataframe(promedios_display, use_container_width=True, hide_index=True)
+
+with tab2:
+    seccion_distribucion(edicion=edicion)
+
+with tab3:
+    st.markdown("### Análisis Detallado por Categoría de Pregunta")
+    
+    # Promedios por categoría de pregunta (Generales, Workshop, Mundialito)
+    df_categorias = derivados.promedios_categoria(edicion)
+    
+    if not df_categorias.empty:
         col1, col2 = st.columns([1, 1])
         
         with col1:
             # Gráfico de barras por categoría
-            fig_cat = px.bar(
-                df_categorias,
-                x='Categoría',
-                y='Promedio',
-                text='Promedio',
-                title='Calificación Promedio por Categoría',
-                color='Promedio',
-                color_continuous_scale='RdYlGn',
-                range_color=[1, 5]
-            )
-            
-            fig_cat.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-            fig_cat.update_layout(showlegend=False, yaxis_range=[0, 5.5])
+            fig_cat = grafica_promedios_categoria(df_categorias)
             
             st.plotly_chart(fig_cat, use_container_width=True)
         
         with col2:
             # Gráfico de radar
-            fig_radar = go.Figure()
-            
-            fig_radar.add_trace(go.Scatterpolar(
-                r=df_categorias['Promedio'].tolist() + [df_categorias['Promedio'].iloc[0]],
-                theta=df_categorias['Categoría'].tolist() + [df_categorias['Categoría'].iloc[0]],
-                fill='toself',
-                name='Promedio'
-            ))
-            
-            fig_radar.update_layout(
-                polar=dict(
-                    radialaxis=dict(
-                        visible=True,
-                        range=[0, 5]
-                    )
-                ),
-                title='Comparativa por Categoría',
-                showlegend=True
-            )
+            fig_radar = grafica_radar_categoria(df_categorias)
             
             st.plotly_chart(fig_radar, use_container_width=True)
     else:
         st.info("No hay datos suficientes para análisis por categoría")
 
+with tab4:
+    st.markdown("### Relaciones entre Preguntas")
+    
+    # Matriz participante × pregunta construida una vez por edición
+    matriz = derivados.matriz(edicion)
+    alfa = derivados.alfa_cronbach(edicion)
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Participantes en la Matriz", matriz.forma[0])
+    col2.metric("Preguntas de Calificación", matriz.forma[1])
+    col3.metric(
+        "Alfa de Cronbach",
+        f"{alfa['alfa']:.2f}" if alfa['alfa'] == alfa['alfa'] else "-",
+        help=f"Consistencia interna de las {alfa['preguntas']} preguntas, con los {alfa['participantes']} participantes que respondieron todas"
+    )
+    
+    if matriz.forma[1] >= 2:
+        st.plotly_chart(grafica_correlaciones(derivados.correlaciones(edicion)), use_container_width=True)
+    
+    df_impulsores = derivados.impulsores(edicion)
+    if not df_impulsores.empty:
+        st.markdown(f"#### Impulsores de la Calificación General (pregunta {PREGUNTA_GENERAL})")
+        st.caption(
+            f"Regresión estandarizada con {df_impulsores.attrs['participantes']} participantes; "
+            f"R² = {df_impulsores.attrs['r2']:.2f}. La participación de cada pregunta es beta × correlación sobre el R²."
+        )
+        st.plotly_chart(grafica_impulsores(df_impulsores, PREGUNTA_GENERAL), use_container_width=True)
+        impulsores_display = df_impulsores.round(3)
+        impulsores_display.columns = ['ID Pregunta', 'Pregunta', 'Correlación', 'Beta', 'Importancia', 'Participación']
+        st.dataframe(impulsores_display, use_container_width=True, hide_index=True)
+    else:
+        st.info(f"No hay suficientes participantes que respondieran las preguntas impulsoras y la pregunta {PREGUNTA_GENERAL}")
+
 # Descargar datos
 st.markdown("---")
 st.subheader("Exportar Datos")
@@ -254,7 +222,7 @@ with col1:
         st.download_button(
             label="Descargar Calificaciones (CSV)",
             data=csv_calificaciones,
-            file_name="calificaciones_encuesta_jii2025.csv",
+            file_name=f"calificaciones_encuesta_{sufijo_archivo(edicion)}.csv",
             mime="text/csv"
         )
 
@@ -264,9 +232,11 @@ with col2:
         st.download_button(
             label="Descargar Promedios (CSV)",
             data=csv_promedios,
-            file_name="promedios_encuesta_jii2025.csv",
+            file_name=f"promedios_encuesta_{sufijo_archivo(edicion)}.csv",
             mime="text/csv"
         )
 
 st.markdown("---")
-st.caption("Dashboard JII 2025 - Análisis de Encuesta")
+st.caption(f"Dashboard JII {edicion} - Análisis de Encuesta")
+
+perfil.terminar()
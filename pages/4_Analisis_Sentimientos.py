@@ -1,12 +1,8 @@
 """
-Análisis de Sentimientos - Jornada de Ingeniería Industrial 2025
+Análisis de Sentimientos - Jornada de Ingeniería Industrial
 Análisis de texto de respuestas abiertas usando procesamiento de lenguaje natural
 """
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from collections import Counter
 import sys
 from pathlib import Path
 
@@ -14,46 +10,78 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
 
-from utils.supabase_client import obtener_respuestas_encuesta
-from utils.preguntas_encuesta import PREGUNTAS_TEXTO_LARGO, obtener_pregunta_por_id
-
-# Importar TextBlob para análisis de sentimientos avanzado
-try:
-    from textblob import TextBlob
-    TEXTBLOB_DISPONIBLE = True
-except ImportError:
-    TEXTBLOB_DISPONIBLE = False
-    st.warning("⚠️ TextBlob no está instalado. Ejecuta: `pip install textblob textblob-es` para análisis avanzado.")
+from utils.supabase_client import obtener_respuestas_encuesta, mostrar_frescura
+from utils.preguntas_encuesta import obtener_preguntas_por_tipo, obtener_pregunta_por_id
+from utils.perfilador import perfil_pagina, perfil_seccion
+from utils import derivados
+from utils.ediciones import selector_edicion, nombre_edicion, sufijo_archivo
+from utils.analitica import (
+    MOTOR_DEFECTO,
+    MOTORES_SENTIMIENTO,
+    TEXTBLOB_DISPONIBLE,
+    estadisticas_longitud,
+)
+from utils.temas import TEMAS_DISPONIBLE
+from utils.duplicados import MODO_DEFECTO, resumen_duplicados
+from utils.graficas import (
+    grafica_longitudes,
+    grafica_frecuencia_palabras,
+    grafica_sentimientos,
+    grafica_polaridad,
+    grafica_polaridad_subjetividad,
+    grafica_subjetividad,
+    grafica_temas_pregunta,
+)
 
 st.set_page_config(
-    page_title="Análisis de Sentimientos JII 2025",
+    page_title="Análisis de Sentimientos JII",
     page_icon="💬",
     layout="wide"
 )
 
-st.title("Análisis de Sentimientos - Jornada de Ingeniería Industrial 2025")
+edicion = selector_edicion()
+perfil = perfil_pagina("Análisis de Sentimientos", edicion=edicion)
+
+st.title(f"Análisis de Sentimientos - {nombre_edicion(edicion)}")
 st.markdown("Análisis de respuestas de texto largo mediante procesamiento de lenguaje natural")
 
-# Cargar todas las respuestas de encuesta (ANONIMIZADAS)
+# Cargar solo las respuestas de texto largo (ANONIMIZADAS)
 with st.spinner("Cargando respuestas de encuesta..."):
-    df_respuestas = obtener_respuestas_encuesta(anonimizar=True)
+    df_respuestas = obtener_respuestas_encuesta(anonimizar=True, edicion=edicion, tipos=['texto_largo'])
+mostrar_frescura(["encuesta_respuestas"], edicion)
 
 if df_respuestas.empty:
     st.warning("No hay respuestas de encuesta disponibles")
     st.stop()
 
-# Filtrar solo preguntas de texto largo
-ids_texto_largo = [p['id'] for p in PREGUNTAS_TEXTO_LARGO]
-df_texto = df_respuestas[df_respuestas['pregunta_id'].isin(ids_texto_largo)].copy()
+# Respuestas casi duplicadas (encuesta enviada varias veces o texto pegado en varias preguntas)
+modos_duplicados = {
+    "Incluir todas": "incluir",
+    "Contar una vez": "colapsar",
+    "Excluir": "excluir",
+}
+modo_duplicados = modos_duplicados[st.sidebar.radio(
+    "Respuestas duplicadas",
+    options=list(modos_duplicados),
+    index=list(modos_duplicados.values()).index(MODO_DEFECTO),
+    help="Respuestas casi idénticas del mismo participante o copiadas entre participantes"
+)]
+
+# Filtrar solo preguntas de texto largo, sin respuestas vacías
+df_texto = derivados.texto_largo(edicion, duplicados=modo_duplicados)
+
+resumen_dup = resumen_duplicados(derivados.duplicados_texto(edicion))
+if resumen_dup["duplicadas"]:
+    st.caption(
+        f"🔁 {resumen_dup['duplicadas']} respuestas son copias casi idénticas de otras "
+        f"({resumen_dup['mismo_participante']} del mismo participante) en {resumen_dup['grupos']} grupos. "
+        f"Se están {dict(colapsar='contando una vez', excluir='excluyendo', incluir='incluyendo todas')[modo_duplicados]}."
+    )
 
 if df_texto.empty:
     st.warning("No hay respuestas de texto largo disponibles")
     st.stop()
 
-# Limpiar respuestas vacías
-df_texto = df_texto[df_texto['respuesta'].notna()]
-df_texto = df_texto[df_texto['respuesta'].str.strip() != '']
-
 # Estadísticas generales
 st.subheader("Estadísticas Generales")
 col1, col2, col3, col4 = st.columns(4)
@@ -70,21 +98,25 @@ col4.metric("Longitud Promedio", f"{promedio_longitud:.0f} caracteres")
 
 st.markdown("---")
 
-# Tabs para diferentes análisis
-tab1, tab2, tab3 = st.tabs([
-    "Exploración de Respuestas",
-    "Análisis de Frecuencia de Palabras", 
-    "Análisis de Sentimientos Básico"
-])
 
-with tab1:
-    st.markdown("### Exploración de Respuestas por Pregunta")
-    
-    # Selector de pregunta
-    preguntas_opciones = {
+def opciones_preguntas(edicion: int) -> dict:
+    """{etiqueta: pregunta_id} de las preguntas de texto largo para los selectores"""
+    return {
         f"{p['id']}: {p['texto'][:80]}...": p['id'] 
-        for p in PREGUNTAS_TEXTO_LARGO
+        for p in obtener_preguntas_por_tipo('texto_largo', edicion)
     }
+
+
+# Cada pestaña es un fragmento: al cambiar uno de sus widgets Streamlit vuelve a
+# ejecutar solo esa pestaña, que toma sus datos de la caché de derivados
+@st.fragment
+@perfil_seccion("Análisis de Sentimientos")
+def seccion_exploracion(edicion: int, modo_duplicados: str):
+    """Respuestas y longitudes de una pregunta"""
+    st.markdown("### Exploración de Respuestas por Pregunta")
+    
+    df_texto = derivados.texto_largo(edicion, duplicados=modo_duplicados)
+    preguntas_opciones = opciones_preguntas(edicion)
     
     pregunta_seleccionada = st.selectbox(
         "Selecciona una pregunta para analizar",
@@ -92,7 +124,7 @@ with tab1:
     )
     
     pregunta_id = preguntas_opciones[pregunta_seleccionada]
-    pregunta_info = obtener_pregunta_por_id(pregunta_id)
+    pregunta_info = obtener_pregunta_por_id(pregunta_id, edicion)
     
     # Filtrar respuestas de la pregunta seleccionada
     df_pregunta = df_texto[df_texto['pregunta_id'] == pregunta_id]
@@ -114,27 +146,29 @@ with tab1:
         
         with col1:
             st.markdown("#### Estadísticas de Longitud")
-            longitudes = df_pregunta['respuesta'].str.len()
-            st.metric("Mínimo", f"{longitudes.min()} caracteres")
-            st.metric("Máximo", f"{longitudes.max()} caracteres")
-            st.metric("Promedio", f"{longitudes.mean():.0f} caracteres")
-            st.metric("Mediana", f"{longitudes.median():.0f} caracteres")
+            longitud = estadisticas_longitud(df_pregunta['respuesta']).iloc[0]
+            st.metric("Mínimo", f"{longitud['minimo']:.0f} caracteres")
+            st.metric("Máximo", f"{longitud['maximo']:.0f} caracteres")
+            st.metric("Promedio", f"{longitud['promedio']:.0f} caracteres")
+            st.metric("Mediana", f"{longitud['mediana']:.0f} caracteres")
         
         with col2:
             # Histograma de longitudes
-            fig_long = px.histogram(
-                longitudes,
-                nbins=20,
-                title="Distribución de Longitud de Respuestas",
-                labels={'value': 'Longitud (caracteres)', 'count': 'Frecuencia'}
-            )
+            fig_long = grafica_longitudes(df_pregunta['respuesta'])
             st.plotly_chart(fig_long, use_container_width=True)
     else:
         st.info("No hay respuestas para esta pregunta")
 
-with tab2:
+
+@st.fragment
+@perfil_seccion("Análisis de Sentimientos")
+def seccion_frecuencias(edicion: int, modo_duplicados: str):
+    """Palabras más frecuentes de una pregunta"""
     st.markdown("### Análisis de Frecuencia de Palabras")
     
+    df_texto = derivados.texto_largo(edicion, duplicados=modo_duplicados)
+    preguntas_opciones = opciones_preguntas(edicion)
+    
     # Selector de pregunta
     pregunta_seleccionada_freq = st.selectbox(
         "Selecciona una pregunta para análisis de frecuencia",
@@ -146,51 +180,16 @@ with tab2:
     df_pregunta_freq = df_texto[df_texto['pregunta_id'] == pregunta_id_freq]
     
     if not df_pregunta_freq.empty:
-        # Combinar todas las respuestas
-        texto_completo = ' '.join(df_pregunta_freq['respuesta'].tolist())
-        
-        # Palabras de parada en español (básicas)
-        stopwords_es = {
-            'el', 'la', 'de', 'que', 'y', 'a', 'en', 'un', 'ser', 'se', 'no', 'haber',
-            'por', 'con', 'su', 'para', 'como', 'estar', 'tener', 'le', 'lo', 'todo',
-            'pero', 'más', 'hacer', 'o', 'poder', 'decir', 'este', 'ir', 'otro', 'ese',
-            'si', 'me', 'ya', 'ver', 'porque', 'dar', 'cuando', 'él', 'muy', 'sin',
-            'vez', 'mucho', 'saber', 'qué', 'sobre', 'mi', 'alguno', 'mismo', 'yo',
-            'también', 'hasta', 'año', 'dos', 'querer', 'entre', 'así', 'primero',
-            'desde', 'grande', 'eso', 'ni', 'nos', 'llegar', 'pasar', 'tiempo', 'ella',
-            'una', 'las', 'los', 'del', 'al', 'es', 'son', 'fue', 'han', 'era', 'está',
-            'están', 'fue', 'fueron', 'sido', 'tiene', 'tienen', 'había', 'hay', 'puede',
-            'pueden', 'esta', 'estos', 'estas', 'este', 'esos', 'esas', 'ese', 'esa',
-            'mas', 'aunque', 'solo', 'sólo', 'fue', 'etc'
-        }
-        
-        # Procesar texto
-        palabras = texto_completo.lower().split()
-        palabras = [p.strip('.,;:!?¡¿()[]{}"\'-') for p in palabras]
-        palabras = [p for p in palabras if len(p) > 3 and p not in stopwords_es]
-        
-        # Contar frecuencias
-        frecuencias = Counter(palabras)
+        # Contar frecuencias (sin stopwords ni palabras cortas)
         top_n = st.slider("Número de palabras más frecuentes", 10, 50, 20)
-        top_palabras = frecuencias.most_common(top_n)
+        df_freq = derivados.frecuencias(edicion, pregunta_id_freq, top_n, duplicados=modo_duplicados)
         
-        if top_palabras:
-            df_freq = pd.DataFrame(top_palabras, columns=['Palabra', 'Frecuencia'])
-            
+        if not df_freq.empty:
             col1, col2 = st.columns([2, 1])
             
             with col1:
                 # Gráfico de barras
-                fig_freq = px.bar(
-                    df_freq,
-                    x='Frecuencia',
-                    y='Palabra',
-                    orientation='h',
-                    title=f'Top {top_n} Palabras Más Frecuentes',
-                    text='Frecuencia'
-                )
-                fig_freq.update_traces(textposition='outside')
-                fig_freq.update_layout(yaxis={'categoryorder': 'total ascending'})
+                fig_freq = grafica_frecuencia_palabras(df_freq)
                 st.plotly_chart(fig_freq, use_container_width=True)
             
             with col2:
@@ -201,25 +200,77 @@ with tab2:
     else:
         st.info("No hay respuestas para esta pregunta")
 
-with tab3:
-    st.markdown("### Análisis de Sentimientos Avanzado con TextBlob")
+
+@st.fragment
+@perfil_seccion("Análisis de Sentimientos")
+def seccion_temas(edicion: int, modo_duplicados: str):
+    """Temas descubiertos y respuestas de ejemplo de cada tema"""
+    st.markdown("### Temas de las Respuestas Abiertas")
     
-    if not TEXTBLOB_DISPONIBLE:
-        st.error("""
-        ❌ **TextBlob no está instalado.**
-        
-        Para habilitar el análisis de sentimientos avanzado, ejecuta:
-        ```
-        pip install textblob textblob-es
-        python -m textblob.download_corpora
-        ```
+    df_texto = derivados.texto_largo(edicion, duplicados=modo_duplicados)
+    
+    if not TEMAS_DISPONIBLE:
+        st.warning("⚠️ SciPy no está instalado. Ejecuta: `pip install scipy` para descubrir temas.")
+    else:
+        st.info("""
+        **Temas:** Las respuestas de texto largo se agrupan por similitud de vocabulario (TF-IDF y k-means).
+        Cada tema se nombra con sus palabras más representativas.
         """)
-        st.stop()
+        
+        df_resumen_temas = derivados.resumen_temas(edicion, duplicados=modo_duplicados)
+        df_temas_pregunta = derivados.temas_pregunta(edicion, duplicados=modo_duplicados)
+        
+        if not df_temas_pregunta.empty:
+            st.plotly_chart(grafica_temas_pregunta(df_temas_pregunta), use_container_width=True)
+            
+            st.markdown("#### Temas Encontrados")
+            temas_display = df_resumen_temas.drop(columns=['tema'])
+            temas_display.columns = ['Tema', 'Términos Principales', 'Respuestas']
+            st.dataframe(temas_display, use_container_width=True, hide_index=True)
+            
+            # Ejemplos de un tema (ANÓNIMOS)
+            tema_seleccionado = st.selectbox(
+                "Ver respuestas del tema",
+                options=df_resumen_temas['etiqueta'].tolist(),
+                key="tema_selector"
+            )
+            df_tema = df_texto.join(derivados.temas_respuestas(edicion))
+            df_tema = df_tema[df_tema['etiqueta'] == tema_seleccionado].sort_values('similitud', ascending=False)
+            for _, row in df_tema.head(10).iterrows():
+                st.markdown(f"**P{row['pregunta_id']} · {row.get('participante_anonimo', 'Participante Anónimo')}:** {row['respuesta']}")
+        else:
+            st.info("No hay suficientes respuestas para descubrir temas")
+
+
+@st.fragment
+@perfil_seccion("Análisis de Sentimientos")
+def seccion_sentimiento(edicion: int, modo_duplicados: str):
+    """Sentimiento de las respuestas de una pregunta con el motor elegido"""
+    st.markdown("### Análisis de Sentimientos")
     
+    df_texto = derivados.texto_largo(edicion, duplicados=modo_duplicados)
+    preguntas_opciones = opciones_preguntas(edicion)
+
+    # TextBlob es opcional: el léxico en español no tiene dependencias
+    motores = [m for m in MOTORES_SENTIMIENTO if m != "textblob" or TEXTBLOB_DISPONIBLE]
+    motor = st.radio(
+        "Motor de análisis",
+        options=motores,
+        index=motores.index(MOTOR_DEFECTO),
+        format_func=MOTORES_SENTIMIENTO.get,
+        horizontal=True,
+        key="sent_motor",
+    )
+    if not TEXTBLOB_DISPONIBLE:
+        st.caption("Para comparar con TextBlob: `pip install textblob textblob-es`")
+
     st.info("""
-    **Análisis con TextBlob:** Utiliza procesamiento de lenguaje natural para analizar:
+    **Análisis de sentimiento:** Cada respuesta recibe:
     - **Polaridad:** Mide el sentimiento (negativo a positivo) en escala de -1 a +1
     - **Subjetividad:** Mide qué tan objetivo/subjetivo es el texto (0 = objetivo, 1 = subjetivo)
+
+    El **léxico en español** considera negaciones ("no me gustó") e intensificadores
+    ("muy bueno"). **TextBlob** usa un léxico en inglés y casi no reconoce texto en español.
     """)
     
     # Selector de pregunta
@@ -230,38 +281,12 @@ with tab3:
     )
     
     pregunta_id_sent = preguntas_opciones[pregunta_seleccionada_sent]
-    df_pregunta_sent = df_texto[df_texto['pregunta_id'] == pregunta_id_sent].copy()
+    df_pregunta_sent = df_texto[df_texto['pregunta_id'] == pregunta_id_sent]
     
     if not df_pregunta_sent.empty:
-        # Función para analizar sentimiento con TextBlob
-        @st.cache_data
-        def analizar_sentimiento_textblob(texto):
-            """Analiza el sentimiento usando TextBlob"""
-            try:
-                blob = TextBlob(texto)
-                # Traducir al inglés para mejor precisión (TextBlob funciona mejor en inglés)
-                # pero primero intentamos directamente en español
-                polaridad = blob.sentiment.polarity
-                subjetividad = blob.sentiment.subjectivity
-                
-                # Clasificar según polaridad
-                if polaridad > 0.1:
-                    sentimiento = 'Positivo'
-                elif polaridad < -0.1:
-                    sentimiento = 'Negativo'
-                else:
-                    sentimiento = 'Neutral'
-                
-                return sentimiento, polaridad, subjetividad
-            except Exception as e:
-                return 'Neutral', 0.0, 0.5
-        
-        # Analizar todas las respuestas
-        with st.spinner("Analizando sentimientos con TextBlob..."):
-            resultados = df_pregunta_sent['respuesta'].apply(analizar_sentimiento_textblob)
-            df_pregunta_sent['sentimiento'] = resultados.apply(lambda x: x[0])
-            df_pregunta_sent['polaridad'] = resultados.apply(lambda x: x[1])
-            df_pregunta_sent['subjetividad'] = resultados.apply(lambda x: x[2])
+        # Analizar todas las respuestas (cada texto distinto una sola vez)
+        with st.spinner(f"Analizando sentimientos con {MOTORES_SENTIMIENTO[motor]}..."):
+            df_pregunta_sent = df_pregunta_sent.join(derivados.sentimiento(edicion, motor=motor))
         
         # Estadísticas y visualizaciones
         st.markdown("---")
@@ -291,64 +316,20 @@ with tab3:
         
         with col1:
             # Gráfico de torta - Distribución de sentimientos
-            fig_sent = px.pie(
-                values=conteo_sentimientos.values,
-                names=conteo_sentimientos.index,
-                title='Distribución de Sentimientos',
-                color=conteo_sentimientos.index,
-                color_discrete_map={
-                    'Positivo': '#28a745',
-                    'Neutral': '#ffc107',
-                    'Negativo': '#dc3545'
-                },
-                hole=0.4
-            )
+            fig_sent = grafica_sentimientos(conteo_sentimientos)
             st.plotly_chart(fig_sent, use_container_width=True)
             
             # Histograma de polaridad
-            fig_pol = px.histogram(
-                df_pregunta_sent,
-                x='polaridad',
-                nbins=20,
-                title='Distribución de Polaridad',
-                labels={'polaridad': 'Polaridad', 'count': 'Frecuencia'},
-                color_discrete_sequence=['steelblue']
-            )
-            fig_pol.add_vline(x=0, line_dash="dash", line_color="red", 
-                            annotation_text="Neutral")
+            fig_pol = grafica_polaridad(df_pregunta_sent)
             st.plotly_chart(fig_pol, use_container_width=True)
         
         with col2:
             # Scatter plot: Polaridad vs Subjetividad
-            fig_scatter = px.scatter(
-                df_pregunta_sent,
-                x='polaridad',
-                y='subjetividad',
-                color='sentimiento',
-                title='Polaridad vs Subjetividad',
-                labels={'polaridad': 'Polaridad', 'subjetividad': 'Subjetividad'},
-                color_discrete_map={
-                    'Positivo': '#28a745',
-                    'Neutral': '#ffc107',
-                    'Negativo': '#dc3545'
-                },
-                hover_data=['respuesta']
-            )
-            fig_scatter.add_hline(y=0.5, line_dash="dash", line_color="gray")
-            fig_scatter.add_vline(x=0, line_dash="dash", line_color="gray")
+            fig_scatter = grafica_polaridad_subjetividad(df_pregunta_sent)
             st.plotly_chart(fig_scatter, use_container_width=True)
             
             # Histograma de subjetividad
-            fig_subj = px.histogram(
-                df_pregunta_sent,
-                x='subjetividad',
-                nbins=20,
-                title='Distribución de Subjetividad',
-                labels={'subjetividad': 'Subjetividad', 'count': 'Frecuencia'},
-                color_discrete_sequence=['coral']
-            )
-            fig_subj.add_vline(x=0.5, line_dash="dash", line_color="red", 
-                             annotation_text="Media")
+            fig_subj = grafica_subjetividad(df_pregunta_sent)
             st.plotly_chart(fig_subj, use_container_width=True)
         
         # Mostrar ejemplos por sentimiento (ANÓNIMAS)
@@ -379,6 +360,27 @@ with tab3:
     else:
         st.info("No hay respuestas para esta pregunta")
 
+
+# Tabs para diferentes análisis
+tab1, tab2, tab3, tab4 = st.tabs([
+    "Exploración de Respuestas",
+    "Análisis de Frecuencia de Palabras", 
+    "Temas",
+    "Análisis de Sentimientos Básico"
+])
+
+with tab1:
+    seccion_exploracion(edicion=edicion, modo_duplicados=modo_duplicados)
+
+with tab2:
+    seccion_frecuencias(edicion=edicion, modo_duplicados=modo_duplicados)
+
+with tab3:
+    seccion_temas(edicion=edicion, modo_duplicados=modo_duplicados)
+
+with tab4:
+    seccion_sentimiento(edicion=edicion, modo_duplicados=modo_duplicados)
+
 # Descargar datos
 st.markdown("---")
 st.subheader("Exportar Datos")
@@ -388,10 +390,12 @@ if not df_texto.empty:
     st.download_button(
         label="Descargar Respuestas de Texto (CSV)",
         data=csv_texto,
-        file_name="respuestas_texto_jii2025.csv",
+        file_name=f"respuestas_texto_{sufijo_archivo(edicion)}.csv",
         mime="text/csv"
     )
 
 st.markdown("---")
-st.caption("Dashboard JII 2025 - Análisis de Sentimientos")
+st.caption(f"Dashboard JII {edicion} - Análisis de Sentimientos")
 st.caption("⚠️ Nota: El análisis de sentimientos es básico. Para análisis avanzados, considere integrar modelos de NLP como spaCy o transformers.")
+
+perfil.terminar()
@@ -0,0 +1,115 @@
+"""
+Comparativa entre Ediciones - Jornada de Ingeniería Industrial
+Participación y calificaciones de varias ediciones lado a lado
+"""
+import streamlit as st
+import sys
+from pathlib import Path
+
+# Agregar el directorio raíz al path
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.supabase_client import (
+    obtener_participantes,
+    obtener_inscripciones_workshop,
+    obtener_equipos_concurso,
+    obtener_respuestas_encuesta,
+    mostrar_frescura,
+)
+from utils.perfilador import perfil_pagina
+from utils.ediciones import ediciones_disponibles, nombre_edicion
+from utils.analitica import comparar_participacion, comparar_calificaciones, comparar_categorias
+from utils.graficas import (
+    grafica_comparativa_participacion,
+    grafica_comparativa_categorias,
+    grafica_comparativa_preguntas,
+)
+
+st.set_page_config(
+    page_title="Comparativa entre Ediciones JII",
+    page_icon="📈",
+    layout="wide"
+)
+
+
+st.title("Comparativa entre Ediciones - Jornada de Ingeniería Industrial")
+st.markdown("Participación y calificaciones de cada edición; solo se consultan las ediciones seleccionadas")
+
+ediciones = st.multiselect(
+    "Ediciones a comparar",
+    options=ediciones_disponibles(),
+    default=ediciones_disponibles()[:3]
+)
+
+if not ediciones:
+    st.info("Selecciona al menos una edición")
+    st.stop()
+
+perfil = perfil_pagina("Comparativa entre Ediciones", ediciones=sorted(ediciones))
+
+# Cada consulta toca solo la partición de su edición
+with st.spinner("Cargando datos de las ediciones seleccionadas..."):
+    tablas_por_edicion = {
+        edicion: {
+            "participantes": obtener_participantes(edicion),
+            "inscripciones_workshop": obtener_inscripciones_workshop(edicion),
+            "equipos_concurso": obtener_equipos_concurso(edicion),
+            "encuesta_respuestas": obtener_respuestas_encuesta(edicion=edicion),
+        }
+        for edicion in ediciones
+    }
+mostrar_frescura(["participantes", "asistencias", "equipos_concurso", "encuesta_respuestas"], ediciones)
+
+# Participación
+st.subheader("Participación por Edición")
+participacion = comparar_participacion(tablas_por_edicion)
+participacion['edicion'] = participacion['edicion'].astype(str)
+
+indicadores = {
+    'total_participantes': 'Participantes Registrados',
+    'total_inscripciones': 'Inscripciones a Actividades',
+    'total_equipos': 'Equipos Concurso',
+    'participantes_con_encuesta': 'Encuestas Completadas',
+}
+participacion_larga = participacion.melt(
+    id_vars='edicion',
+    value_vars=list(indicadores),
+    var_name='Indicador',
+    value_name='Cantidad'
+)
+participacion_larga['Indicador'] = participacion_larga['Indicador'].map(indicadores)
+
+fig_part = grafica_comparativa_participacion(participacion_larga)
+st.plotly_chart(fig_part, use_container_width=True)
+
+st.dataframe(
+    participacion.rename(columns={'edicion': 'Edición', **indicadores}),
+    use_container_width=True,
+    hide_index=True
+)
+
+st.markdown("---")
+
+# Calificaciones
+st.subheader("Calificaciones por Edición")
+respuestas_por_edicion = {e: t["encuesta_respuestas"] for e, t in tablas_por_edicion.items()}
+
+categorias = comparar_categorias(respuestas_por_edicion)
+if not categorias.empty:
+    categorias['edicion'] = categorias['edicion'].astype(str)
+    fig_cat = grafica_comparativa_categorias(categorias)
+    st.plotly_chart(fig_cat, use_container_width=True)
+
+preguntas = comparar_calificaciones(respuestas_por_edicion)
+if not preguntas.empty:
+    preguntas['edicion'] = preguntas['edicion'].astype(str)
+    fig_preg = grafica_comparativa_preguntas(preguntas)
+    st.plotly_chart(fig_preg, use_container_width=True)
+else:
+    st.info("No hay respuestas de encuesta en las ediciones seleccionadas")
+
+st.markdown("---")
+st.caption(" · ".join(nombre_edicion(e) for e in sorted(ediciones)))
+
+perfil.terminar()
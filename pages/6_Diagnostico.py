@@ -0,0 +1,199 @@
+"""
+Diagnóstico - Dashboard JII
+Latencia, volumen, errores y caché de las consultas a la base de datos
+(solo para administradores)
+"""
+import os
+import streamlit as st
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Agregar el directorio raíz al path para poder importar utils
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils import almacen, metricas, perfilador, precalentamiento
+from utils.cache import backend_compartido, limpiar_caches, max_obsoleto, ttl_cache
+from utils.conexion import circuito, estado_circuito
+from utils.graficas import grafica_latencias, grafica_histograma_latencia, grafica_fases
+
+st.set_page_config(page_title="Diagnóstico JII", page_icon="🩺", layout="wide")
+
+
+@st.fragment
+def seccion_histograma(tablas: list):
+    """Histograma de latencia de una tabla; cambiar la tabla solo vuelve a ejecutar esta sección"""
+    tabla = st.selectbox("Histograma de la tabla", options=tablas)
+    fig = grafica_histograma_latencia(metricas.histograma(tabla), tabla)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+st.title("Diagnóstico de Consultas")
+
+# Acceso restringido si se configuró una clave de administrador
+clave = os.getenv("JII_ADMIN_CLAVE")
+if clave and st.sidebar.text_input("Clave de administrador", type="password") != clave:
+    st.info("Ingresa la clave de administrador en la barra lateral")
+    st.stop()
+# Sin clave la página es de solo lectura: vaciar la caché o cerrar el circuito obligaría a
+# todas las sesiones a volver a consultar la base de datos
+administrador = bool(clave)
+
+st.markdown(
+    "Métricas de todas las consultas de este proceso desde su inicio (todas las sesiones). "
+    f"Caché de consultas y derivados: {ttl_cache():.0f} s; un resultado vencido se sigue "
+    f"sirviendo hasta {max_obsoleto():.0f} s más mientras se renueva."
+)
+compartida = backend_compartido()
+st.caption(
+    f"Caché compartida entre procesos: {compartida!r}" if compartida is not None
+    else "Caché compartida entre procesos desactivada: cada proceso consulta la fuente por su cuenta (ver JII_CACHE_COMPARTIDA)."
+)
+
+# Circuit breaker de Supabase
+circuito_actual = estado_circuito()
+if circuito_actual["estado"] == "cerrado":
+    st.success(
+        f"Circuito de Supabase cerrado ({circuito_actual['fallas_seguidas']} fallas seguidas, "
+        f"{circuito_actual['aperturas']} aperturas desde el inicio)"
+    )
+elif circuito_actual["estado"] == "abierto":
+    st.error(
+        f"Circuito de Supabase abierto: no se envían consultas; siguiente prueba en "
+        f"{circuito_actual['reintento_en_s']:.0f} s. Se sirven los últimos datos en caché."
+    )
+else:
+    st.warning("Circuito de Supabase semiabierto: probando la conexión con una consulta")
+
+# Estado del precalentamiento de cachés
+estado = precalentamiento.estado
+if estado["en_curso"] and not estado["listo"]:
+    st.info("Precalentando cachés por primera vez...")
+elif estado["listo"]:
+    mensaje = (
+        f"Cachés precalentadas: ciclo {estado['ciclos']} de las ediciones {estado['ediciones']} "
+        f"terminado a las {estado['fin']:%H:%M:%S} en {estado['duracion_s']} s"
+    )
+    if estado["errores"]:
+        st.warning(f"{mensaje}, con {len(estado['errores'])} errores: {estado['errores']}")
+    else:
+        st.success(mensaje)
+    with st.expander("Tiempo de cada tabla y artefacto en el último ciclo"):
+        st.dataframe(
+            pd.DataFrame(list(estado["tiempos_ms"].items()), columns=["Artefacto", "ms"]).sort_values("ms", ascending=False),
+            use_container_width=True,
+            hide_index=True
+        )
+else:
+    st.info("El precalentamiento de cachés no está activo en este proceso")
+
+col1, col2, col3, _ = st.columns([1, 1, 1, 3])
+if col1.button("Reiniciar métricas", disabled=not administrador):
+    metricas.reiniciar()
+if col2.button("Vaciar caché", disabled=not administrador):
+    limpiar_caches()
+if col3.button("Cerrar circuito", disabled=not administrador):
+    circuito.reiniciar()
+if not administrador:
+    st.caption("Las acciones están deshabilitadas: define JII_ADMIN_CLAVE para usarlas.")
+
+resumen = metricas.resumen()
+
+if resumen.empty:
+    st.info("Aún no se ha ejecutado ninguna consulta en este proceso")
+    st.stop()
+
+# Totales
+total_cache = resumen['aciertos_cache'].sum() + resumen['consultas'].sum()
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Consultas a la fuente", int(resumen['consultas'].sum()))
+col2.metric("Tiempo en consultas", f"{resumen['segundos_totales'].sum():.2f} s")
+col3.metric("Aciertos de caché", f"{resumen['aciertos_cache'].sum() / total_cache:.0%}" if total_cache else "-")
+col4.metric("Errores", int(resumen['errores'].sum()))
+
+st.markdown("---")
+
+st.subheader("Resumen por Tabla")
+st.dataframe(
+    resumen.round({'p50_ms': 1, 'p95_ms': 1, 'p99_ms': 1, 'max_ms': 1, 'segundos_totales': 3, 'MB': 3, 'tasa_cache': 2}),
+    use_container_width=True,
+    hide_index=True
+)
+
+col1, col2 = st.columns(2)
+
+with col1:
+    latencias = metricas.latencias_recientes()
+    if not latencias.empty:
+        fig = grafica_latencias(latencias, metricas.VENTANA)
+        st.plotly_chart(fig, use_container_width=True)
+
+with col2:
+    seccion_histograma(resumen['tabla'].tolist())
+
+errores = resumen[resumen['errores'] > 0]
+if not errores.empty:
+    st.subheader("Últimos Errores")
+    st.dataframe(errores[['tabla', 'errores', 'ultimo_error']], use_container_width=True, hide_index=True)
+
+st.markdown("---")
+
+# Fases de las ejecuciones de páginas perfiladas (utils/perfilador.py)
+st.subheader("Tiempo por Fase de las Páginas")
+trazas = perfilador.trazas_recientes()
+if trazas.empty:
+    st.info(
+        f"Aún no hay ejecuciones perfiladas; se perfila la fracción de ejecuciones indicada en {perfilador.VARIABLE_MUESTREO} "
+        f"de las ejecuciones (por defecto {perfilador.MUESTREO_DEFECTO})"
+    )
+else:
+    por_fase = trazas.groupby(['pagina', 'fase'], as_index=False)['ms'].mean()
+    fig = grafica_fases(por_fase, trazas["ts"].nunique())
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption("render es el tiempo del script fuera de las fases medidas: widgets, serialización y envío al navegador.")
+
+st.markdown("---")
+
+# Memoria de los DataFrames compartidos entre sesiones (utils/almacen.py)
+st.subheader("Memoria de los Datos")
+memoria = almacen.resumen_memoria()
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("En caché (compartido)", f"{memoria['MB_cache']:.1f} MB")
+col2.metric("Propio de las sesiones", f"{memoria['MB_propios']:.1f} MB")
+col3.metric("Con copias por sesión", f"{memoria['MB_sin_compartir']:.1f} MB")
+col4.metric("RSS del proceso", f"{memoria['rss_MB']:.0f} MB" if memoria['rss_MB'] is not None else "-")
+
+col1, col2 = st.columns(2)
+with col1:
+    st.markdown("**Por tabla**")
+    st.dataframe(almacen.memoria_por_tabla().round({'MB': 3}), use_container_width=True, hide_index=True)
+with col2:
+    st.markdown(f"**Por sesión** ({memoria['sesiones']})")
+    st.dataframe(
+        almacen.memoria_por_sesion().round({'hace_s': 0, 'MB_compartidos': 3, 'MB_propios': 3}),
+        use_container_width=True,
+        hide_index=True
+    )
+st.caption(
+    "Cada sesión recibe vistas de los DataFrames de la caché: comparte sus buffers y solo copia las columnas "
+    "que modifica o deriva (copy-on-write). «Con copias por sesión» es lo que ocuparían las sesiones si cada "
+    "una recibiera una copia profunda. Las sesiones se miden al final de su última ejecución de página."
+)
+
+st.markdown("---")
+
+texto = metricas.exportar_prometheus()
+with st.expander("Formato Prometheus"):
+    st.code(texto, language="text")
+st.download_button(
+    label="Descargar métricas (Prometheus)",
+    data=texto,
+    file_name="metricas_jii.prom",
+    mime="text/plain"
+)
+
+st.caption(
+    f"Define {metricas.VARIABLE_PUERTO} para servir /metrics a un scraper de Prometheus "
+    f"y {metricas.VARIABLE_LOG} para registrar cada consulta en un archivo JSONL."
+)
@@ -0,0 +1,161 @@
+-- Particionado por edición de la JII
+-- Ejecutar una vez en el editor SQL de Supabase. Los registros existentes quedan en la edición 2025.
+-- Todo corre en una transacción: si algo falla no queda ninguna tabla a medio migrar.
+-- Después volver a ejecutar sql/versiones_tablas.sql para crear los triggers en las tablas nuevas.
+
+BEGIN;
+
+-- Tablas pequeñas: columna edicion + índice para que el filtro eq(edicion) no recorra otras ediciones
+ALTER TABLE participantes ADD COLUMN IF NOT EXISTS edicion smallint NOT NULL DEFAULT 2025;
+ALTER TABLE actividades ADD COLUMN IF NOT EXISTS edicion smallint NOT NULL DEFAULT 2025;
+ALTER TABLE inscripciones_workshop ADD COLUMN IF NOT EXISTS edicion smallint NOT NULL DEFAULT 2025;
+ALTER TABLE equipos_concurso ADD COLUMN IF NOT EXISTS edicion smallint NOT NULL DEFAULT 2025;
+
+CREATE INDEX IF NOT EXISTS participantes_edicion_idx ON participantes (edicion);
+CREATE INDEX IF NOT EXISTS actividades_edicion_idx ON actividades (edicion);
+CREATE INDEX IF NOT EXISTS inscripciones_workshop_edicion_idx ON inscripciones_workshop (edicion);
+CREATE INDEX IF NOT EXISTS equipos_concurso_edicion_idx ON equipos_concurso (edicion);
+
+-- Tablas grandes: particionado nativo por lista de años (el planificador descarta las otras ediciones).
+-- La tabla se reemplaza por una particionada con los mismos datos, llave primaria (id, edicion),
+-- secuencia de id, llaves foráneas, RLS, políticas, permisos y vistas; la anterior se borra al final.
+CREATE FUNCTION pg_temp.particionar_por_edicion(tabla text, indices text[]) RETURNS void
+LANGUAGE plpgsql AS $$
+DECLARE
+    anterior text := tabla || '_sin_particion';
+    particion text := tabla || '_2025';
+    secuencia text;
+    vistas jsonb;
+    foraneas jsonb;
+    diferencia bigint;
+    indice text;
+    r record;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = tabla::regclass) = 'p' THEN
+        RAISE NOTICE '% ya está particionada', tabla;
+        RETURN;
+    END IF;
+
+    -- Con la llave (id, edicion) ninguna tabla puede apuntar solo a id
+    IF EXISTS (SELECT 1 FROM pg_constraint WHERE confrelid = tabla::regclass AND contype = 'f') THEN
+        RAISE EXCEPTION 'Hay llaves foráneas que apuntan a %; ajústalas antes de particionar', tabla;
+    END IF;
+
+    -- Definiciones que hay que leer antes de renombrar (después mencionarían la tabla anterior)
+    SELECT coalesce(jsonb_object_agg(v.oid::regclass::text, format(
+               'CREATE OR REPLACE VIEW %s%s AS %s', v.oid::regclass,
+               coalesce(' WITH (' || array_to_string(v.reloptions, ', ') || ')', ''),
+               rtrim(pg_get_viewdef(v.oid), ';')
+           )), '{}')
+      INTO vistas
+      FROM pg_depend d
+      JOIN pg_rewrite w ON w.oid = d.objid
+      JOIN pg_class v ON v.oid = w.ev_class
+     WHERE d.classid = 'pg_rewrite'::regclass AND d.refobjid = tabla::regclass
+       AND v.oid <> tabla::regclass AND v.relkind = 'v';
+    SELECT coalesce(jsonb_object_agg(conname, pg_get_constraintdef(oid)), '{}')
+      INTO foraneas
+      FROM pg_constraint
+     WHERE conrelid = tabla::regclass AND contype = 'f';
+
+    -- La tabla anterior y sus índices cambian de nombre para liberar los originales
+    EXECUTE format('ALTER TABLE %I RENAME TO %I', tabla, anterior);
+    FOR r IN SELECT i.indexrelid::regclass AS nombre, c.relname
+               FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+              WHERE i.indrelid = anterior::regclass
+    LOOP
+        EXECUTE format('ALTER INDEX %s RENAME TO %I', r.nombre, left(r.relname, 50) || '_sin_particion');
+    END LOOP;
+
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS, '
+        'edicion smallint NOT NULL DEFAULT 2025) PARTITION BY LIST (edicion)',
+        tabla, anterior
+    );
+    EXECUTE format('CREATE TABLE %I PARTITION OF %I FOR VALUES IN (2025)', particion, tabla);
+    EXECUTE format('ALTER TABLE %I ADD PRIMARY KEY (id, edicion)', tabla);
+
+    -- Secuencia de id: la de un serial pasa a la tabla nueva (si no, se borraría con la anterior);
+    -- la de una columna identity no puede cambiar de dueño y se reemplaza por una que sigue su cuenta
+    secuencia := pg_get_serial_sequence(anterior, 'id');
+    IF EXISTS (SELECT 1 FROM pg_attribute
+                WHERE attrelid = anterior::regclass AND attname = 'id' AND attidentity <> '') THEN
+        secuencia := quote_ident(tabla || '_id_edicion_seq');
+        EXECUTE format('CREATE SEQUENCE %s OWNED BY %I.id', secuencia, tabla);
+        EXECUTE format('SELECT setval(%L, coalesce((SELECT max(id) FROM %I), 0) + 1, false)', secuencia, anterior);
+        EXECUTE format('ALTER TABLE %I ALTER COLUMN id SET DEFAULT nextval(%L)', tabla, secuencia);
+    ELSIF secuencia IS NOT NULL THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY %I.id', secuencia, tabla);
+    END IF;
+
+    EXECUTE format('INSERT INTO %I SELECT *, 2025 FROM %I', tabla, anterior);
+    EXECUTE format('SELECT (SELECT count(*) FROM %I) - (SELECT count(*) FROM %I)', anterior, tabla)
+      INTO diferencia;
+    IF diferencia <> 0 THEN
+        RAISE EXCEPTION 'La copia de % perdió % filas', tabla, diferencia;
+    END IF;
+
+    FOREACH indice IN ARRAY indices LOOP
+        EXECUTE format('CREATE INDEX ON %I (%s)', tabla, indice);
+    END LOOP;
+    FOR r IN SELECT key AS nombre, value AS definicion FROM jsonb_each_text(foraneas) LOOP
+        EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I %s', tabla, r.nombre, r.definicion);
+    END LOOP;
+
+    -- RLS: las políticas de la tabla anterior, en la tabla nueva. La partición también lleva RLS
+    -- (sin políticas) para que no se pueda leer directamente saltándose las de la tabla nueva
+    EXECUTE format('ALTER TABLE %I ENABLE ROW LEVEL SECURITY', tabla);
+    EXECUTE format('ALTER TABLE %I ENABLE ROW LEVEL SECURITY', particion);
+    IF (SELECT relforcerowsecurity FROM pg_class WHERE oid = anterior::regclass) THEN
+        EXECUTE format('ALTER TABLE %I FORCE ROW LEVEL SECURITY', tabla);
+    END IF;
+    FOR r IN SELECT * FROM pg_policies WHERE schemaname = current_schema() AND tablename = anterior LOOP
+        EXECUTE format(
+            'CREATE POLICY %I ON %I AS %s FOR %s TO %s',
+            r.policyname, tabla, r.permissive, r.cmd,
+            (SELECT string_agg(CASE WHEN rol = 'public' THEN 'PUBLIC' ELSE quote_ident(rol) END, ', ')
+               FROM unnest(r.roles) AS rol)
+        ) || coalesce(' USING (' || r.qual || ')', '') || coalesce(' WITH CHECK (' || r.with_check || ')', '');
+    END LOOP;
+
+    -- Permisos: los privilegios por defecto de Supabase dan todo a anon y authenticated en las
+    -- tablas nuevas; se quitan y se copian los que tenía la tabla anterior
+    FOR r IN SELECT DISTINCT c.relname, CASE a.grantee WHEN 0 THEN 'PUBLIC' ELSE a.grantee::regrole::text END AS rol
+               FROM pg_class c, aclexplode(c.relacl) a
+              WHERE c.oid IN (tabla::regclass, particion::regclass) AND a.grantee <> c.relowner
+    LOOP
+        EXECUTE format('REVOKE ALL ON %I FROM %s', r.relname, r.rol);
+    END LOOP;
+    FOR r IN SELECT a.privilege_type, a.is_grantable,
+                    CASE a.grantee WHEN 0 THEN 'PUBLIC' ELSE a.grantee::regrole::text END AS rol
+               FROM pg_class c, aclexplode(c.relacl) a
+              WHERE c.oid = anterior::regclass AND a.grantee <> c.relowner
+    LOOP
+        EXECUTE format('GRANT %s ON %I TO %s', r.privilege_type, tabla, r.rol)
+            || CASE WHEN r.is_grantable THEN ' WITH GRANT OPTION' ELSE '' END;
+    END LOOP;
+
+    -- Las vistas (con sus opciones, p. ej. security_invoker) pasan a leer la tabla nueva;
+    -- así la anterior se puede borrar sin CASCADE
+    FOR r IN SELECT value AS sentencia FROM jsonb_each_text(vistas) LOOP
+        EXECUTE r.sentencia;
+    END LOOP;
+
+    -- Sin CASCADE: si algo más depende de la tabla anterior, la migración entera se revierte
+    EXECUTE format('DROP TABLE %I', anterior);
+END;
+$$;
+
+SELECT pg_temp.particionar_por_edicion('asistencias', ARRAY['edicion, fecha_asistencia', 'participante_email']);
+SELECT pg_temp.particionar_por_edicion('encuesta_respuestas', ARRAY['edicion, pregunta_id', 'edicion, "timestamp"', 'participante_email']);
+
+COMMIT;
+
+-- Al abrir una nueva edición (p. ej. 2026), con RLS y sin permisos directos en cada partición:
+-- CREATE TABLE asistencias_2026 PARTITION OF asistencias FOR VALUES IN (2026);
+-- CREATE TABLE encuesta_respuestas_2026 PARTITION OF encuesta_respuestas FOR VALUES IN (2026);
+-- ALTER TABLE asistencias_2026 ENABLE ROW LEVEL SECURITY;
+-- ALTER TABLE encuesta_respuestas_2026 ENABLE ROW LEVEL SECURITY;
+-- REVOKE ALL ON asistencias_2026, encuesta_respuestas_2026 FROM anon, authenticated;
+-- y registrar el año en utils/ediciones.py (EDICIONES) y, si cambia, su cuestionario en
+-- utils/preguntas_encuesta.py (CUESTIONARIOS).
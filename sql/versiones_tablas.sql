@@ -0,0 +1,100 @@
+-- Versiones de las tablas de la JII
+-- Ejecutar una vez en el editor SQL de Supabase (y de nuevo después de sql/particion_ediciones.sql).
+-- Cada INSERT, UPDATE o DELETE incrementa el contador de las ediciones que tocó en su tabla; el
+-- dashboard (utils/versiones.py) lee versiones_tablas en una sola consulta y solo vuelve a descargar
+-- y recalcular lo que depende de las tablas y ediciones que cambiaron.
+-- La fila con edicion = 0 es la de la tabla completa: la incrementa TRUNCATE (que no dice qué filas
+-- borró) y cualquier cambio en una tabla sin columna edicion.
+-- Sin esta tabla el dashboard usa el número de filas, max(id) y la última fecha de cada tabla.
+
+CREATE TABLE IF NOT EXISTS versiones_tablas (
+    tabla text NOT NULL,
+    edicion smallint NOT NULL DEFAULT 0,
+    version bigint NOT NULL DEFAULT 0,
+    actualizado timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (tabla, edicion)
+);
+
+-- Bases creadas con la versión anterior de este script: un contador por tabla, sin edición
+ALTER TABLE versiones_tablas ADD COLUMN IF NOT EXISTS edicion smallint NOT NULL DEFAULT 0;
+ALTER TABLE versiones_tablas DROP CONSTRAINT IF EXISTS versiones_tablas_pkey;
+ALTER TABLE versiones_tablas ADD PRIMARY KEY (tabla, edicion);
+
+ALTER TABLE versiones_tablas ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS versiones_tablas_lectura ON versiones_tablas;
+CREATE POLICY versiones_tablas_lectura ON versiones_tablas FOR SELECT USING (true);
+
+-- Un incremento por sentencia y edición, no por fila: una carga masiva cuesta una escritura por
+-- edición. Las ediciones salen de las tablas de transición (nuevas / viejas) que declara cada
+-- trigger; to_jsonb evita fallar en una tabla que todavía no tiene la columna edicion.
+-- SECURITY DEFINER para escribir en versiones_tablas con RLS; search_path fijo para que nadie
+-- pueda suplantar versiones_tablas ni las funciones que usa con objetos de su propio esquema.
+CREATE OR REPLACE FUNCTION incrementar_version_tabla() RETURNS trigger
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp AS $$
+DECLARE
+    ediciones smallint[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT coalesce((to_jsonb(n) ->> 'edicion')::smallint, 0))
+          INTO ediciones FROM nuevas n;
+    ELSIF TG_OP = 'UPDATE' THEN
+        SELECT array_agg(DISTINCT coalesce((to_jsonb(f) ->> 'edicion')::smallint, 0))
+          INTO ediciones FROM (SELECT * FROM nuevas UNION ALL SELECT * FROM viejas) f;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(DISTINCT coalesce((to_jsonb(v) ->> 'edicion')::smallint, 0))
+          INTO ediciones FROM viejas v;
+    ELSE
+        ediciones := ARRAY[0::smallint];
+    END IF;
+
+    -- Una sentencia que no tocó filas no cambia nada
+    IF ediciones IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO public.versiones_tablas AS v (tabla, edicion, version, actualizado)
+    SELECT TG_TABLE_NAME, e, 1, now() FROM unnest(ediciones) AS e
+    ON CONFLICT (tabla, edicion) DO UPDATE
+        SET version = v.version + 1, actualizado = now();
+    RETURN NULL;
+END;
+$$;
+
+-- Solo la llaman los triggers; nadie la ejecuta desde la API
+REVOKE EXECUTE ON FUNCTION incrementar_version_tabla() FROM PUBLIC, anon, authenticated;
+
+-- Las tablas de transición solo se pueden declarar en triggers de un solo evento:
+-- un trigger por INSERT, UPDATE, DELETE y TRUNCATE en cada tabla
+DO $$
+DECLARE
+    t text;
+    evento text;
+BEGIN
+    FOREACH t IN ARRAY ARRAY[
+        'participantes', 'actividades', 'asistencias',
+        'inscripciones_workshop', 'equipos_concurso', 'encuesta_respuestas'
+    ] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS %I_version ON %I', t, t);  -- un solo trigger, versión anterior
+        FOREACH evento IN ARRAY ARRAY['insert', 'update', 'delete', 'truncate'] LOOP
+            EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t || '_version_' || evento, t);
+        END LOOP;
+        EXECUTE format(
+            'CREATE TRIGGER %I_version_insert AFTER INSERT ON %I REFERENCING NEW TABLE AS nuevas '
+            'FOR EACH STATEMENT EXECUTE FUNCTION incrementar_version_tabla()', t, t
+        );
+        EXECUTE format(
+            'CREATE TRIGGER %I_version_update AFTER UPDATE ON %I REFERENCING OLD TABLE AS viejas NEW TABLE AS nuevas '
+            'FOR EACH STATEMENT EXECUTE FUNCTION incrementar_version_tabla()', t, t
+        );
+        EXECUTE format(
+            'CREATE TRIGGER %I_version_delete AFTER DELETE ON %I REFERENCING OLD TABLE AS viejas '
+            'FOR EACH STATEMENT EXECUTE FUNCTION incrementar_version_tabla()', t, t
+        );
+        EXECUTE format(
+            'CREATE TRIGGER %I_version_truncate AFTER TRUNCATE ON %I '
+            'FOR EACH STATEMENT EXECUTE FUNCTION incrementar_version_tabla()', t, t
+        );
+        INSERT INTO versiones_tablas (tabla) VALUES (t) ON CONFLICT DO NOTHING;
+    END LOOP;
+END;
+$$;
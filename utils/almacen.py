@@ -0,0 +1,382 @@
+"""
+Almacén de DataFrames compartidos del Dashboard JII
+Las cachés (utils/cache.py) guardan una sola copia de cada tabla y de cada artefacto
+derivado. Antes cada sesión recibía una copia profunda; ahora recibe una vista: un
+DataFrame propio que comparte los buffers de las columnas con el guardado. Con
+copy-on-write (siempre activo en pandas 3; aquí se activa en pandas 2.x) la sesión
+puede modificar o agregar columnas y solo esas se copian para ella, sin tocar la
+caché. Cien sesiones que ven la misma tabla ocupan una copia de los datos más las
+columnas que cada una deriva.
+
+El almacén lleva la cuenta de la memoria para la página de Diagnóstico:
+    - por tabla: bytes de los DataFrames guardados en las cachés
+    - por sesión: al final de cada ejecución de página, bytes de sus vistas que siguen
+      compartidos con la caché y bytes propios (columnas copiadas o derivadas)
+
+Los bytes se cuentan por buffer (Arrow o numpy) y sin repetir: las columnas de texto
+con dtype object (pandas 2 sin pyarrow) cuentan solo el arreglo de referencias.
+"""
+
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Sesiones cuyo último resumen de memoria se conserva
+MAX_SESIONES = 500
+
+# Vistas registradas por sesión antes de descartar las que ya no existen
+MAX_VISTAS_SESION = 256
+
+# Segundos sin registrar vistas tras los que se olvida una sesión (antes, si Streamlit ya la cerró)
+EDAD_MAX_SESION = 3600
+
+# Segundos entre revisiones de las sesiones abandonadas
+INTERVALO_PODA = 60
+
+_lock = threading.Lock()
+# id del DataFrame guardado -> _Compartido
+_compartidos = {}
+# sesión -> lista de (referencia a la vista, id del DataFrame guardado)
+_vistas = {}
+# sesión -> resumen de la última ejecución
+_sesiones = OrderedDict()
+# sesión -> momento (time.time()) de la última vista registrada
+_actividad = {}
+_ultima_poda = 0.0
+
+
+def activar_copy_on_write():
+    """Activa copy-on-write en pandas 2.x (en pandas 3 ya es el único modo y la opción está obsoleta)"""
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
+
+
+activar_copy_on_write()
+
+
+# ============================
+# Buffers
+# ============================
+
+def _buffers_arreglo(arreglo) -> dict:
+    """{dirección: bytes} de la memoria de un arreglo de pandas"""
+    datos_arrow = getattr(arreglo, "_pa_array", None)
+    if datos_arrow is not None:
+        return {
+            buffer.address: buffer.size
+            for trozo in datos_arrow.chunks
+            for buffer in trozo.buffers()
+            if buffer is not None and buffer.size
+        }
+
+    # NumpyExtensionArray y fechas (_ndarray), enteros y booleanos con nulos (_data, _mask),
+    # categorías (_codes)
+    buffers = {}
+    for atributo in ("_ndarray", "_data", "_mask", "_codes"):
+        valores = getattr(arreglo, atributo, None)
+        if isinstance(valores, np.ndarray) and valores.nbytes:
+            buffers[valores.__array_interface__["data"][0]] = valores.nbytes
+    if not buffers and isinstance(arreglo, np.ndarray) and arreglo.nbytes:
+        buffers[arreglo.__array_interface__["data"][0]] = arreglo.nbytes
+    if not buffers:
+        # Tipo desconocido: se cuenta como memoria propia del objeto
+        buffers[id(arreglo)] = int(getattr(arreglo, "nbytes", 0))
+    return buffers
+
+
+def buffers(valor) -> dict:
+    """
+    Buffers de un DataFrame o una Series
+
+    Returns:
+        Diccionario {dirección: bytes}; dos objetos que comparten una columna
+        comparten sus direcciones
+    """
+    if isinstance(valor, pd.Series):
+        arreglos = [valor.array]
+    else:
+        # El arreglo de cada columna sin construir una Series (iloc por columna costaba ~35 µs;
+        # esto se recorre en cada terminar() de cada página)
+        arreglos = [valor._get_column_array(i) for i in range(valor.shape[1])]
+    # RangeIndex no ocupa memoria (su .array lo materializaría)
+    if not isinstance(valor.index, pd.RangeIndex):
+        arreglos.append(valor.index.array)
+
+    resultado = {}
+    for arreglo in arreglos:
+        resultado.update(_buffers_arreglo(arreglo))
+    return resultado
+
+
+# ============================
+# Registro
+# ============================
+
+class _Compartido:
+    """DataFrame guardado en una caché y servido como vistas"""
+
+    __slots__ = ("etiqueta", "ref", "filas", "buffers")
+
+    def __init__(self, valor, etiqueta: str):
+        self.etiqueta = etiqueta
+        self.ref = weakref.ref(valor)
+        self.filas = len(valor)
+        self.buffers = buffers(valor)
+
+    def vivo(self):
+        return self.ref()
+
+
+def _sesion_actual():
+    """Id de la sesión de Streamlit del hilo (None fuera de una ejecución de página)"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        contexto = get_script_run_ctx(suppress_warning=True)
+    except Exception:
+        return None
+    return contexto.session_id if contexto is not None else None
+
+
+def compartir(valor, etiqueta: str):
+    """
+    Registra un DataFrame (o Series) guardado en una caché
+
+    Registrarlo otra vez no hace nada. Se guarda una referencia débil: cuando la caché
+    descarta el valor sale de la cuenta.
+
+    Args:
+        valor: DataFrame o Series que no se modificará
+        etiqueta: Tabla o artefacto para el reporte (p. ej. "participantes (2025)")
+    """
+    with _lock:
+        registro = _compartidos.get(id(valor))
+        if registro is not None and registro.vivo() is valor:
+            return
+        # Solo se registran valores nuevos (fallos de caché): buen momento para olvidar los descartados
+        for clave in [clave for clave, r in _compartidos.items() if r.vivo() is None]:
+            del _compartidos[clave]
+        _compartidos[id(valor)] = _Compartido(valor, etiqueta)
+
+
+def vista(valor, etiqueta: str):
+    """
+    Vista propia de un DataFrame (o Series) compartido
+
+    La vista es un objeto nuevo que comparte los buffers del original: quien la recibe
+    puede modificarla (copy-on-write copia solo las columnas que cambian) sin tocar
+    el original.
+
+    Args:
+        valor: DataFrame o Series guardado en una caché
+        etiqueta: Tabla o artefacto para el reporte
+
+    Returns:
+        La vista (valor.copy(deep=False))
+    """
+    compartir(valor, etiqueta)
+    propia = valor.copy(deep=False)
+    sesion = _sesion_actual()
+    if sesion is not None:
+        ahora = time.time()
+        with _lock:
+            vistas = _vistas.setdefault(sesion, [])
+            if len(vistas) >= MAX_VISTAS_SESION:
+                vistas[:] = [(ref, origen) for ref, origen in vistas if ref() is not None]
+            vistas.append((weakref.ref(propia), id(valor)))
+            _actividad[sesion] = ahora
+        if ahora - _ultima_poda >= INTERVALO_PODA:
+            podar_sesiones(ahora)
+    return propia
+
+
+def _sesion_abierta(sesion: str) -> bool:
+    """False si Streamlit ya cerró la sesión (True fuera de Streamlit o si no se puede saber)"""
+    try:
+        from streamlit import runtime
+
+        return not runtime.exists() or runtime.get_instance().is_active_session(sesion)
+    except Exception:
+        return True
+
+
+def podar_sesiones(ahora: float = None) -> int:
+    """
+    Olvida las vistas y el resumen de las sesiones cerradas o sin vistas nuevas en
+    EDAD_MAX_SESION segundos
+
+    Una ejecución que termina en st.stop (o en una excepción) no pasa por
+    cerrar_ejecucion; sin esto sus vistas quedarían registradas para siempre.
+
+    Returns:
+        Número de sesiones olvidadas
+    """
+    global _ultima_poda
+    ahora = time.time() if ahora is None else ahora
+    with _lock:
+        _ultima_poda = ahora
+        candidatas = list(_actividad.items())
+    viejas = [
+        sesion for sesion, momento in candidatas
+        if ahora - momento > EDAD_MAX_SESION or not _sesion_abierta(sesion)
+    ]
+    with _lock:
+        for sesion in viejas:
+            _vistas.pop(sesion, None)
+            _actividad.pop(sesion, None)
+            _sesiones.pop(sesion, None)
+    return len(viejas)
+
+
+def cerrar_ejecucion(pagina: str = None):
+    """
+    Resume la memoria de las vistas de la sesión actual
+
+    Se llama al final del script de cada página (Perfil.terminar, utils/perfilador.py),
+    cuando la página ya derivó sus columnas y las vistas siguen vivas.
+    """
+    sesion = _sesion_actual()
+    if sesion is None:
+        return
+    with _lock:
+        vivas = [(ref(), origen) for ref, origen in _vistas.get(sesion, [])]
+        vivas = [(propia, origen) for propia, origen in vivas if propia is not None]
+        _vistas[sesion] = [(weakref.ref(propia), origen) for propia, origen in vivas]
+        originales = {origen: _compartidos.get(origen) for _, origen in vivas}
+
+    compartidos, propios = {}, {}
+    for propia, origen in vivas:
+        registro = originales.get(origen)
+        de_origen = registro.buffers if registro is not None and registro.vivo() is not None else {}
+        for direccion, tamano in buffers(propia).items():
+            (compartidos if direccion in de_origen else propios)[direccion] = tamano
+
+    with _lock:
+        _sesiones.pop(sesion, None)
+        _sesiones[sesion] = {
+            "pagina": pagina,
+            "momento": time.time(),
+            "vistas": len(vivas),
+            "bytes_compartidos": sum(compartidos.values()),
+            "bytes_propios": sum(propios.values()),
+        }
+        while len(_sesiones) > MAX_SESIONES:
+            antigua = _sesiones.popitem(last=False)[0]
+            _vistas.pop(antigua, None)
+            _actividad.pop(antigua, None)
+
+
+def olvidar_sesiones():
+    """Descarta los resúmenes y las vistas registradas de las sesiones"""
+    with _lock:
+        _sesiones.clear()
+        _vistas.clear()
+        _actividad.clear()
+
+
+# ============================
+# Reportes
+# ============================
+
+def memoria_por_tabla() -> pd.DataFrame:
+    """
+    Memoria de los DataFrames guardados en las cachés, por tabla o artefacto
+
+    Returns:
+        DataFrame [tabla, entradas, filas, MB, vistas] ordenado por MB; vistas son las
+        vistas que siguen vivas en las sesiones
+    """
+    with _lock:
+        vivos = [(clave, registro) for clave, registro in _compartidos.items() if registro.vivo() is not None]
+        vistas_por_origen = {}
+        for vistas in _vistas.values():
+            for ref, origen in vistas:
+                if ref() is not None:
+                    vistas_por_origen[origen] = vistas_por_origen.get(origen, 0) + 1
+
+    filas = {}
+    for clave, registro in vivos:
+        fila = filas.setdefault(registro.etiqueta, {"entradas": 0, "filas": 0, "buffers": {}, "vistas": 0})
+        fila["entradas"] += 1
+        fila["filas"] += registro.filas
+        fila["buffers"].update(registro.buffers)
+        fila["vistas"] += vistas_por_origen.get(clave, 0)
+
+    columnas = ["tabla", "entradas", "filas", "MB", "vistas"]
+    if not filas:
+        return pd.DataFrame(columns=columnas)
+    return pd.DataFrame([
+        {
+            "tabla": etiqueta,
+            "entradas": fila["entradas"],
+            "filas": fila["filas"],
+            "MB": sum(fila["buffers"].values()) / 1e6,
+            "vistas": fila["vistas"],
+        }
+        for etiqueta, fila in filas.items()
+    ], columns=columnas).sort_values("MB", ascending=False, ignore_index=True)
+
+
+def memoria_por_sesion() -> pd.DataFrame:
+    """
+    Memoria de las vistas de cada sesión al final de su última ejecución de página
+
+    Returns:
+        DataFrame [sesion, pagina, hace_s, vistas, MB_compartidos, MB_propios] de la más
+        reciente a la más antigua. MB_compartidos son bytes que la sesión lee de la
+        caché sin copiarlos; MB_propios, las columnas que copió o derivó
+    """
+    ahora = time.time()
+    with _lock:
+        resumenes = list(_sesiones.items())
+    columnas = ["sesion", "pagina", "hace_s", "vistas", "MB_compartidos", "MB_propios"]
+    return pd.DataFrame([
+        {
+            "sesion": sesion[:8],
+            "pagina": resumen["pagina"],
+            "hace_s": ahora - resumen["momento"],
+            "vistas": resumen["vistas"],
+            "MB_compartidos": resumen["bytes_compartidos"] / 1e6,
+            "MB_propios": resumen["bytes_propios"] / 1e6,
+        }
+        for sesion, resumen in reversed(resumenes)
+    ], columns=columnas)
+
+
+def resumen_memoria() -> dict:
+    """
+    Totales de memoria de los datos
+
+    Returns:
+        Diccionario con MB_cache (DataFrames guardados, sin repetir buffers),
+        MB_propios (suma de lo propio de cada sesión), MB_sin_compartir (lo que
+        ocuparían las sesiones con copias profundas), sesiones y rss_MB del proceso
+    """
+    with _lock:
+        registros = [registro for registro in _compartidos.values() if registro.vivo() is not None]
+        resumenes = list(_sesiones.values())
+    en_cache = {}
+    for registro in registros:
+        en_cache.update(registro.buffers)
+    return {
+        "MB_cache": sum(en_cache.values()) / 1e6,
+        "MB_propios": sum(r["bytes_propios"] for r in resumenes) / 1e6,
+        "MB_sin_compartir": sum(r["bytes_compartidos"] + r["bytes_propios"] for r in resumenes) / 1e6,
+        "sesiones": len(resumenes),
+        "rss_MB": rss_proceso(),
+    }
+
+
+def rss_proceso():
+    """Memoria residente actual del proceso en MB (None si el sistema no la expone en /proc)"""
+    try:
+        with open("/proc/self/statm") as archivo:
+            paginas = int(archivo.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return paginas * os.sysconf("SC_PAGE_SIZE") / 1e6
@@ -0,0 +1,576 @@
+"""
+Núcleo de análisis del Dashboard JII 2025
+Funciones puras que reciben DataFrames y retornan DataFrames, sin Streamlit.
+Las páginas solo presentan sus resultados y el CLI las calcula en lote:
+
+    python -m utils.analitica --datos datos/ --salida resultados/
+    python -m utils.analitica kpis calificaciones_pregunta --salida resultados/
+"""
+
+import argparse
+from collections import Counter
+from pathlib import Path
+
+import pandas as pd
+
+from utils.arranque import disponible
+from utils.perfilador import medir_fase
+from utils.preguntas_encuesta import obtener_cuestionario, obtener_preguntas_por_tipo
+
+# TextBlob (y NLTK) tarda cerca de un segundo en importarse: solo se carga al analizar sentimiento
+TEXTBLOB_DISPONIBLE = disponible("textblob")
+
+# Motores de análisis de sentimiento: el léxico en español no tiene dependencias
+MOTORES_SENTIMIENTO = {"lexico": "Léxico en español", "textblob": "TextBlob"}
+MOTOR_DEFECTO = "lexico"
+
+# Palabras de parada en español (básicas)
+STOPWORDS_ES = {
+    'el', 'la', 'de', 'que', 'y', 'a', 'en', 'un', 'ser', 'se', 'no', 'haber',
+    'por', 'con', 'su', 'para', 'como', 'estar', 'tener', 'le', 'lo', 'todo',
+    'pero', 'más', 'hacer', 'o', 'poder', 'decir', 'este', 'ir', 'otro', 'ese',
+    'si', 'me', 'ya', 'ver', 'porque', 'dar', 'cuando', 'él', 'muy', 'sin',
+    'vez', 'mucho', 'saber', 'qué', 'sobre', 'mi', 'alguno', 'mismo', 'yo',
+    'también', 'hasta', 'año', 'dos', 'querer', 'entre', 'así', 'primero',
+    'desde', 'grande', 'eso', 'ni', 'nos', 'llegar', 'pasar', 'tiempo', 'ella',
+    'una', 'las', 'los', 'del', 'al', 'es', 'son', 'fue', 'han', 'era', 'está',
+    'están', 'fue', 'fueron', 'sido', 'tiene', 'tienen', 'había', 'hay', 'puede',
+    'pueden', 'esta', 'estos', 'estas', 'este', 'esos', 'esas', 'ese', 'esa',
+    'mas', 'aunque', 'solo', 'sólo', 'fue', 'etc'
+}
+
+
+
+# Columnas de encuesta_respuestas (las funciones de la encuesta las conservan aun sin respuestas)
+COLUMNAS_RESPUESTAS = [
+    'id', 'participante_email', 'nombre_completo', 'pregunta_id', 'pregunta_texto', 'respuesta', 'timestamp'
+]
+
+# Tabla de Supabase detrás de cada nombre que usan los análisis, igual para ambas fuentes.
+# Como en el Dashboard (obtener_inscripciones_workshop), "inscripciones_workshop" son los
+# registros de asistencias; la tabla inscripciones_workshop, con lista de espera y
+# cancelaciones, es "registro_workshops" (obtener_registro_workshops).
+TABLAS_ANALISIS = {
+    "participantes": "participantes",
+    "actividades": "actividades",
+    "asistencias": "asistencias",
+    "inscripciones_workshop": "asistencias",
+    "registro_workshops": "inscripciones_workshop",
+    "equipos_concurso": "equipos_concurso",
+    "encuesta_respuestas": "encuesta_respuestas",
+}
+
+
+def categorias_calificacion(edicion: int = None) -> dict:
+    """IDs de preguntas de calificación por categoría del cuestionario de una edición"""
+    return {
+        categoria: [p['id'] for p in preguntas if p['tipo'] == 'calificacion_1_5']
+        for categoria, preguntas in obtener_cuestionario(edicion).items()
+    }
+
+
+# ============================
+# Participación
+# ============================
+
+def normalizar_email(emails: pd.Series) -> pd.Series:
+    """Emails sin espacios alrededor y en minúsculas, para unir tablas; vacío pasa a NA"""
+    return emails.astype("string").str.strip().str.lower().replace("", pd.NA)
+
+
+@medir_fase("transform")
+def calcular_kpis(participantes: pd.DataFrame, inscripciones: pd.DataFrame,
+                  equipos: pd.DataFrame, respuestas: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Calcula los indicadores generales de participación
+
+    Returns:
+        DataFrame de una fila con total_participantes, total_inscripciones, total_equipos,
+        total_respuestas_encuesta y participantes_con_encuesta
+    """
+    con_encuesta = 0
+    if not participantes.empty and "encuesta_completada" in participantes.columns:
+        con_encuesta = int((participantes["encuesta_completada"] == True).sum())
+
+    return pd.DataFrame([{
+        "total_participantes": len(participantes),
+        "total_inscripciones": len(inscripciones),
+        "total_equipos": len(equipos),
+        "total_respuestas_encuesta": len(respuestas) if respuestas is not None else 0,
+        "participantes_con_encuesta": con_encuesta,
+    }])
+
+
+@medir_fase("transform")
+def distribucion(df: pd.DataFrame, columna: str, etiqueta: str, etiqueta_cantidad: str = "Cantidad") -> pd.DataFrame:
+    """
+    Cuenta los registros por valor de una columna
+
+    Returns:
+        DataFrame [etiqueta, etiqueta_cantidad] ordenado de mayor a menor
+    """
+    if df.empty or columna not in df.columns:
+        return pd.DataFrame(columns=[etiqueta, etiqueta_cantidad])
+    conteo = df[columna].value_counts().reset_index()
+    conteo.columns = [etiqueta, etiqueta_cantidad]
+    return conteo
+
+
+@medir_fase("transform")
+def serie_temporal(df: pd.DataFrame, columna_fecha: str) -> pd.DataFrame:
+    """
+    Agrupa registros por hora (rango de 2 días o menos) o por día
+
+    Returns:
+        DataFrame [periodo, Cantidad]; la granularidad elegida ("hora" o "dia")
+        queda en attrs["granularidad"]
+    """
+    if df.empty or columna_fecha not in df.columns:
+        resultado = pd.DataFrame(columns=["periodo", "Cantidad"])
+        resultado.attrs["granularidad"] = "dia"
+        return resultado
+
+    fechas = pd.to_datetime(df[columna_fecha], errors='coerce')
+    rango_dias = (fechas.max() - fechas.min()).days
+
+    if rango_dias <= 2:
+        periodo = fechas.dt.floor('h')
+        granularidad = "hora"
+    else:
+        periodo = fechas.dt.date
+        granularidad = "dia"
+
+    resultado = periodo.groupby(periodo).size().rename_axis('periodo').reset_index(name='Cantidad')
+    resultado.attrs["granularidad"] = granularidad
+    return resultado
+
+
+# ============================
+# Encuesta: calificaciones 1-5
+# ============================
+
+def _sin_respuestas(respuestas: pd.DataFrame) -> pd.DataFrame:
+    """Respuestas vacías con al menos las columnas de encuesta_respuestas"""
+    return respuestas.reindex(columns=list(dict.fromkeys([*respuestas.columns, *COLUMNAS_RESPUESTAS])))
+
+
+@medir_fase("transform")
+def filtrar_calificaciones(respuestas: pd.DataFrame, edicion: int = None) -> pd.DataFrame:
+    """Respuestas de preguntas de calificación con la columna numérica respuesta_num"""
+    if respuestas.empty:
+        return _sin_respuestas(respuestas).assign(respuesta_num=pd.Series(dtype=float))
+    ids_calificacion = [p['id'] for p in obtener_preguntas_por_tipo('calificacion_1_5', edicion)]
+    df_calificaciones = respuestas[respuestas['pregunta_id'].isin(ids_calificacion)].copy()
+    df_calificaciones['respuesta_num'] = pd.to_numeric(df_calificaciones['respuesta'], errors='coerce')
+    return df_calificaciones
+
+
+@medir_fase("transform")
+def estadisticas_calificacion(df_calificaciones: pd.DataFrame) -> pd.DataFrame:
+    """
+    Promedio, total y desviación estándar por pregunta
+
+    Returns:
+        DataFrame [pregunta_id, pregunta_texto, promedio, total, desv_std] ordenado por promedio
+    """
+    promedios = df_calificaciones.groupby(['pregunta_id', 'pregunta_texto'])['respuesta_num'].agg([
+        ('promedio', 'mean'),
+        ('total', 'count'),
+        ('desv_std', 'std')
+    ]).reset_index()
+    return promedios.sort_values('promedio', ascending=True)
+
+
+@medir_fase("transform")
+def distribucion_calificacion(df_calificaciones: pd.DataFrame, pregunta_id: int) -> pd.DataFrame:
+    """
+    Frecuencia y porcentaje de cada calificación para una pregunta
+
+    Returns:
+        DataFrame [calificacion, cantidad, porcentaje] ordenado por calificación
+    """
+    valores = df_calificaciones.loc[df_calificaciones['pregunta_id'] == pregunta_id, 'respuesta_num']
+    conteo = valores.value_counts().sort_index()
+    return pd.DataFrame({
+        'calificacion': conteo.index,
+        'cantidad': conteo.values,
+        'porcentaje': conteo.values / max(conteo.sum(), 1) * 100,
+    })
+
+
+@medir_fase("transform")
+def resumen_pregunta(df_calificaciones: pd.DataFrame, pregunta_id: int) -> pd.DataFrame:
+    """
+    Estadísticos descriptivos de una pregunta
+
+    Returns:
+        DataFrame de una fila [promedio, mediana, moda, desv_std, total]
+    """
+    valores = df_calificaciones.loc[df_calificaciones['pregunta_id'] == pregunta_id, 'respuesta_num']
+    moda = valores.mode()
+    return pd.DataFrame([{
+        'promedio': valores.mean(),
+        'mediana': valores.median(),
+        'moda': moda.iloc[0] if not moda.empty else 0,
+        'desv_std': valores.std(),
+        'total': len(valores),
+    }])
+
+
+@medir_fase("transform")
+def promedios_por_categoria(df_calificaciones: pd.DataFrame, edicion: int = None) -> pd.DataFrame:
+    """
+    Calificación promedio por categoría de pregunta (Generales, Workshop, Mundialito)
+
+    Returns:
+        DataFrame [Categoría, Promedio, Total Respuestas]; solo categorías con datos
+    """
+    resultados_categoria = []
+    for categoria, pregunta_ids in categorias_calificacion(edicion).items():
+        df_cat = df_calificaciones[df_calificaciones['pregunta_id'].isin(pregunta_ids)]
+        if not df_cat.empty:
+            resultados_categoria.append({
+                'Categoría': categoria,
+                'Promedio': df_cat['respuesta_num'].mean(),
+                'Total Respuestas': len(df_cat)
+            })
+    return pd.DataFrame(resultados_categoria, columns=['Categoría', 'Promedio', 'Total Respuestas'])
+
+
+# ============================
+# Encuesta: texto largo
+# ============================
+
+@medir_fase("transform")
+def filtrar_texto_largo(respuestas: pd.DataFrame, edicion: int = None) -> pd.DataFrame:
+    """Respuestas no vacías de preguntas de texto largo"""
+    if respuestas.empty:
+        return _sin_respuestas(respuestas)
+    ids_texto_largo = [p['id'] for p in obtener_preguntas_por_tipo('texto_largo', edicion)]
+    df_texto = respuestas[respuestas['pregunta_id'].isin(ids_texto_largo)]
+    df_texto = df_texto[df_texto['respuesta'].notna()]
+    return df_texto[df_texto['respuesta'].str.strip() != ''].copy()
+
+
+@medir_fase("transform")
+def estadisticas_longitud(textos: pd.Series) -> pd.DataFrame:
+    """Mínimo, máximo, promedio y mediana de la longitud en caracteres"""
+    longitudes = textos.str.len()
+    return pd.DataFrame([{
+        'minimo': longitudes.min(),
+        'maximo': longitudes.max(),
+        'promedio': longitudes.mean(),
+        'mediana': longitudes.median(),
+    }])
+
+
+@medir_fase("transform")
+def frecuencia_palabras(textos: pd.Series, top_n: int = 20) -> pd.DataFrame:
+    """
+    Palabras más frecuentes (más de 3 letras, sin stopwords)
+
+    Returns:
+        DataFrame [Palabra, Frecuencia] con a lo más top_n filas
+    """
+    palabras = ' '.join(textos.tolist()).lower().split()
+    palabras = [p.strip('.,;:!?¡¿()[]{}"\'-') for p in palabras]
+    palabras = [p for p in palabras if len(p) > 3 and p not in STOPWORDS_ES]
+    return pd.DataFrame(Counter(palabras).most_common(top_n), columns=['Palabra', 'Frecuencia'])
+
+
+def clasificar_polaridad(polaridad: float) -> str:
+    """Positivo (> 0.1), Negativo (< -0.1) o Neutral"""
+    if polaridad > 0.1:
+        return 'Positivo'
+    if polaridad < -0.1:
+        return 'Negativo'
+    return 'Neutral'
+
+
+def _sentimiento_textblob(texto: str) -> tuple:
+    from textblob import TextBlob
+
+    try:
+        sentimiento = TextBlob(texto).sentiment
+        return sentimiento.polarity, sentimiento.subjectivity
+    except Exception:
+        return 0.0, 0.5
+
+
+def analizar_sentimiento(textos: pd.Series, motor: str = MOTOR_DEFECTO) -> pd.DataFrame:
+    """
+    Sentimiento de cada texto
+
+    Args:
+        textos: Serie de textos
+        motor: "lexico" (léxico en español, utils/sentimiento_es.py) o "textblob"
+
+    Returns:
+        DataFrame [sentimiento, polaridad, subjetividad] con el mismo índice que textos
+    """
+    if motor not in MOTORES_SENTIMIENTO:
+        raise ValueError(f"Motor de sentimiento desconocido: {motor}")
+    if motor == "lexico":
+        from utils.sentimiento_es import puntuar
+        return puntuar(textos)
+    return _analizar_textblob(textos)
+
+
+@medir_fase("sentimiento")
+def _analizar_textblob(textos: pd.Series) -> pd.DataFrame:
+    """Sentimiento con TextBlob; cada texto distinto se analiza una sola vez"""
+    if not TEXTBLOB_DISPONIBLE:
+        raise ImportError("TextBlob no está instalado. Ejecuta: pip install textblob")
+
+    unicos = pd.Series(textos.unique())
+    puntajes = pd.DataFrame(
+        [_sentimiento_textblob(t) for t in unicos],
+        columns=['polaridad', 'subjetividad'],
+        index=unicos.values,
+    )
+    resultado = puntajes.reindex(textos.values)
+    resultado.index = textos.index
+    resultado.insert(0, 'sentimiento', resultado['polaridad'].map(clasificar_polaridad))
+    return resultado
+
+
+# ============================
+# Comparativa entre ediciones
+# ============================
+
+@medir_fase("transform")
+def comparar_participacion(tablas_por_edicion: dict) -> pd.DataFrame:
+    """
+    Indicadores de participación de varias ediciones
+
+    Args:
+        tablas_por_edicion: {año: {nombre_tabla: DataFrame}} con los nombres de
+            TABLAS_ANALISIS ("inscripciones_workshop" son los registros de asistencias)
+
+    Returns:
+        DataFrame con una fila por edición: edicion + columnas de calcular_kpis
+    """
+    filas = [
+        calcular_kpis(
+            t["participantes"], t["inscripciones_workshop"], t["equipos_concurso"], t["encuesta_respuestas"]
+        ).assign(edicion=edicion)
+        for edicion, t in sorted(tablas_por_edicion.items())
+    ]
+    if not filas:
+        return pd.DataFrame(columns=["edicion"])
+    comparativa = pd.concat(filas, ignore_index=True)
+    return comparativa[["edicion"] + [c for c in comparativa.columns if c != "edicion"]]
+
+
+@medir_fase("transform")
+def comparar_calificaciones(respuestas_por_edicion: dict) -> pd.DataFrame:
+    """
+    Promedio por pregunta de calificación en varias ediciones
+
+    Cada edición se filtra con su propio cuestionario.
+
+    Args:
+        respuestas_por_edicion: {año: DataFrame de encuesta_respuestas}
+
+    Returns:
+        DataFrame [edicion, pregunta_id, pregunta_texto, promedio, total, desv_std]
+    """
+    partes = [
+        estadisticas_calificacion(filtrar_calificaciones(respuestas, edicion)).assign(edicion=edicion)
+        for edicion, respuestas in sorted(respuestas_por_edicion.items())
+        if not respuestas.empty
+    ]
+    if not partes:
+        return pd.DataFrame(columns=['edicion', 'pregunta_id', 'pregunta_texto', 'promedio', 'total', 'desv_std'])
+    comparativa = pd.concat(partes, ignore_index=True)
+    return comparativa[['edicion', 'pregunta_id', 'pregunta_texto', 'promedio', 'total', 'desv_std']]
+
+
+@medir_fase("transform")
+def comparar_categorias(respuestas_por_edicion: dict) -> pd.DataFrame:
+    """
+    Promedio por categoría de pregunta en varias ediciones
+
+    Returns:
+        DataFrame [edicion, Categoría, Promedio, Total Respuestas]
+    """
+    partes = [
+        promedios_por_categoria(filtrar_calificaciones(respuestas, edicion), edicion).assign(edicion=edicion)
+        for edicion, respuestas in sorted(respuestas_por_edicion.items())
+        if not respuestas.empty
+    ]
+    if not partes:
+        return pd.DataFrame(columns=['edicion', 'Categoría', 'Promedio', 'Total Respuestas'])
+    comparativa = pd.concat(partes, ignore_index=True)
+    return comparativa[['edicion', 'Categoría', 'Promedio', 'Total Respuestas']]
+
+
+# ============================
+# CLI de cálculo en lote
+# ============================
+
+def _analisis_disponibles(edicion: int = None, motor: str = MOTOR_DEFECTO) -> dict:
+    """Análisis que el CLI sabe calcular: {nombre: funcion(tablas) -> DataFrame}"""
+    def calificaciones(t):
+        return filtrar_calificaciones(t["encuesta_respuestas"], edicion)
+
+    def textos(t):
+        return filtrar_texto_largo(t["encuesta_respuestas"], edicion)
+
+    def sentimiento(t):
+        df_texto = textos(t)
+        return pd.concat([df_texto[['pregunta_id']], analizar_sentimiento(df_texto['respuesta'], motor)], axis=1)
+
+    def palabras_por_pregunta(t):
+        df_texto = textos(t)
+        partes = [
+            frecuencia_palabras(grupo['respuesta'], 50).assign(pregunta_id=pregunta_id)
+            for pregunta_id, grupo in df_texto.groupby('pregunta_id')
+        ]
+        return pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+
+    def distribuciones(t):
+        df_cal = calificaciones(t)
+        partes = [
+            distribucion_calificacion(df_cal, p['id']).assign(pregunta_id=p['id'])
+            for p in obtener_preguntas_por_tipo('calificacion_1_5', edicion)
+        ]
+        return pd.concat(partes, ignore_index=True)
+
+    def matriz(t):
+        from utils.matriz_calificaciones import construir_matriz
+        return construir_matriz(calificaciones(t))
+
+    def correlaciones(t):
+        from utils.matriz_calificaciones import correlaciones as correlacion_preguntas
+        return correlacion_preguntas(matriz(t)).rename_axis('pregunta_id').reset_index()
+
+    def impulsores(t):
+        from utils.matriz_calificaciones import impulsores_clave
+        return impulsores_clave(matriz(t), edicion=edicion)
+
+    def conversion(dimension):
+        def calcular(t):
+            from utils.embudo import construir_indice
+            indice = construir_indice(
+                t["participantes"], t["registro_workshops"], t["asistencias"], t["encuesta_respuestas"]
+            )
+            return indice.conversion(dimension)
+        return calcular
+
+    def personas(t):
+        from utils import identidades
+        # identidades espera la tabla inscripciones_workshop de Supabase (con nombre y teléfono)
+        tablas = dict(t, inscripciones_workshop=t["registro_workshops"])
+        return identidades.resolver(identidades.registros(tablas))
+
+    def pares_actividades(t):
+        from utils import audiencias
+        incidencia = audiencias.construir_incidencia(t["asistencias"])
+        return audiencias.pares_actividades(audiencias.coasistencia(incidencia), t["actividades"])
+
+    def afinidad_equipos(t):
+        from utils import audiencias
+        return audiencias.afinidad_equipos(audiencias.construir_incidencia(t["asistencias"]), t["equipos_concurso"])
+
+    return {
+        "kpis": lambda t: calcular_kpis(
+            t["participantes"], t["inscripciones_workshop"], t["equipos_concurso"], t["encuesta_respuestas"]
+        ),
+        "participantes_programa": lambda t: distribucion(t["participantes"], 'programa', 'Programa'),
+        "participantes_categoria": lambda t: distribucion(t["participantes"], 'categoria', 'Categoría'),
+        "inscripciones_estado": lambda t: distribucion(t["inscripciones_workshop"], 'estado', 'Estado'),
+        "inscripciones_actividad": lambda t: distribucion(t["inscripciones_workshop"], 'actividad_codigo', 'Workshop'),
+        "asistencias_tiempo": lambda t: serie_temporal(t["asistencias"], 'fecha_asistencia'),
+        "equipos_estado": lambda t: distribucion(t["equipos_concurso"], 'estado_registro', 'Estado de Registro'),
+        "equipos_tiempo": lambda t: serie_temporal(t["equipos_concurso"], 'fecha_registro'),
+        "personas": personas,
+        "embudo_workshop": conversion("actividad_codigo"),
+        "embudo_programa": conversion("programa"),
+        "embudo_categoria": conversion("categoria"),
+        "actividades_coasistencia": pares_actividades,
+        "equipos_afinidad": afinidad_equipos,
+        "calificaciones_pregunta": lambda t: estadisticas_calificacion(calificaciones(t)),
+        "calificaciones_categoria": lambda t: promedios_por_categoria(calificaciones(t), edicion),
+        "calificaciones_distribucion": distribuciones,
+        "calificaciones_correlacion": correlaciones,
+        "calificaciones_impulsores": impulsores,
+        "frecuencia_palabras": palabras_por_pregunta,
+        "sentimiento": sentimiento,
+    }
+
+
+def cargar_tablas(datos=None, edicion: int = None) -> dict:
+    """
+    Carga las tablas de la fuente elegida
+
+    Ambas fuentes dan los mismos nombres con las mismas tablas detrás (TABLAS_ANALISIS),
+    así los análisis coinciden con el Dashboard sea cual sea la fuente.
+
+    Args:
+        datos: Carpeta con CSV locales; si es None se consulta Supabase
+        edicion: Año de la edición (por defecto la edición actual)
+
+    Returns:
+        Diccionario {nombre de TABLAS_ANALISIS: DataFrame}
+    """
+    from utils.ediciones import edicion_actual
+
+    edicion = edicion or edicion_actual()
+    if datos:
+        from utils.fuente_local import cargar_tablas_csv
+        leidas = cargar_tablas_csv(datos, sorted(set(TABLAS_ANALISIS.values())), edicion=edicion)
+        return {nombre: leidas[tabla] for nombre, tabla in TABLAS_ANALISIS.items()}
+
+    from utils.supabase_client import (
+        obtener_actividades,
+        obtener_asistencias,
+        obtener_equipos_concurso,
+        obtener_inscripciones_workshop,
+        obtener_participantes,
+        obtener_registro_workshops,
+        obtener_respuestas_encuesta,
+    )
+    return {
+        "participantes": obtener_participantes(edicion),
+        "actividades": obtener_actividades(edicion),
+        "asistencias": obtener_asistencias(edicion),
+        "inscripciones_workshop": obtener_inscripciones_workshop(edicion),
+        "registro_workshops": obtener_registro_workshops(edicion),
+        "equipos_concurso": obtener_equipos_concurso(edicion),
+        "encuesta_respuestas": obtener_respuestas_encuesta(edicion=edicion),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calcula los análisis del dashboard fuera de Streamlit")
+    parser.add_argument("analisis", nargs="*",
+                        help=f"Análisis a calcular (por defecto todos): {', '.join(_analisis_disponibles())}")
+    parser.add_argument("--datos", help="Carpeta con CSV locales; si se omite se usa Supabase")
+    parser.add_argument("--edicion", type=int, help="Año de la edición (por defecto la actual)")
+    parser.add_argument("--salida", default="resultados", help="Carpeta donde escribir los CSV")
+    parser.add_argument("--motor", choices=list(MOTORES_SENTIMIENTO), default=MOTOR_DEFECTO,
+                        help="Motor del análisis de sentimiento")
+    args = parser.parse_args(argv)
+
+    disponibles = _analisis_disponibles(args.edicion, args.motor)
+
+    desconocidos = set(args.analisis) - set(disponibles)
+    if desconocidos:
+        parser.error(f"análisis desconocidos: {', '.join(sorted(desconocidos))}")
+
+    tablas = cargar_tablas(args.datos, args.edicion)
+    destino = Path(args.salida)
+    destino.mkdir(parents=True, exist_ok=True)
+
+    for nombre in args.analisis or list(disponibles):
+        if nombre == "sentimiento" and args.motor == "textblob" and not TEXTBLOB_DISPONIBLE:
+            print(f"{nombre}: omitido (TextBlob no está instalado)")
+            continue
+        resultado = disponibles[nombre](tablas)
+        resultado.to_csv(destino / f"{nombre}.csv", index=False)
+        print(f"{nombre}: {len(resultado)} filas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Arranque en frío del Dashboard JII
+Carga diferida de las librerías pesadas (Plotly, Supabase, TextBlob) y reporte
+del costo de importación de cada página.
+
+La página principal no importa ninguna de ellas; cada página las carga la primera
+vez que realmente las usa. Con utils/servidor.py, Plotly se importa antes de abrir el
+puerto y pandas, Supabase y TextBlob los importa el precalentamiento, así la primera
+visita a las demás páginas tampoco paga su importación.
+
+    python -m utils.arranque              # costo de importación por página
+    python -m utils.arranque --top 25     # más módulos en el detalle
+"""
+
+import argparse
+import ast
+import importlib
+import importlib.util
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Librerías cuyo costo de importación se reporta por separado
+LIBRERIAS_PESADAS = ["pandas", "numpy", "plotly", "supabase", "textblob", "nltk", "scipy"]
+
+
+class _ModuloDiferido:
+    """Módulo que se importa en el primer acceso a uno de sus atributos"""
+
+    def __init__(self, nombre: str):
+        self._nombre = nombre
+        self._modulo = None
+
+    def __getattr__(self, atributo):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nombre)
+        return getattr(self._modulo, atributo)
+
+    def __repr__(self):
+        estado = "cargado" if self._modulo is not None else "diferido"
+        return f"<módulo {self._nombre} ({estado})>"
+
+
+def modulo_diferido(nombre: str):
+    """
+    Referencia a un módulo que se importa hasta que se usa
+
+    Args:
+        nombre: Nombre del módulo, p. ej. "plotly.express"
+
+    Returns:
+        Objeto que se comporta como el módulo a partir del primer acceso
+    """
+    return _ModuloDiferido(nombre)
+
+
+def disponible(nombre: str) -> bool:
+    """True si el módulo está instalado, sin importarlo"""
+    try:
+        return importlib.util.find_spec(nombre) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+# ============================
+# Reporte de costo de importación
+# ============================
+
+def importaciones_de_script(ruta) -> list:
+    """Sentencias import de nivel superior de un script (sin ejecutarlo)"""
+    arbol = ast.parse(Path(ruta).read_text(encoding="utf-8"))
+    sentencias = []
+    for nodo in arbol.body:
+        if isinstance(nodo, (ast.Import, ast.ImportFrom)):
+            sentencias.append(ast.unparse(nodo))
+    return sentencias
+
+
+def medir_importaciones(sentencias: list) -> list:
+    """
+    Ejecuta las sentencias import en un intérprete nuevo con -X importtime
+
+    Returns:
+        Lista de (modulo, propio_ms, acumulado_ms, nivel) en el orden en que se importaron
+    """
+    codigo = f"import sys; sys.path.insert(0, {str(ROOT)!r})\n" + "\n".join(sentencias)
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1])
+
+    resultado = []
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        propio, acumulado, nombre = linea[len("import time:"):].split("|")
+        nivel = (len(nombre) - len(nombre.lstrip())) // 2
+        resultado.append((nombre.strip(), int(propio) / 1000, int(acumulado) / 1000, nivel))
+    return resultado
+
+
+def reporte_paginas(scripts: list = None) -> list:
+    """
+    Costo de importación en frío de cada página
+
+    Returns:
+        Lista de dicts {pagina, total_ms, pesadas, modulos}; pesadas tiene el costo
+        acumulado de cada librería de LIBRERIAS_PESADAS que la página cargó
+    """
+    if scripts is None:
+        scripts = [ROOT / "Analisis_JII2025.py"] + sorted((ROOT / "pages").glob("*.py"))
+
+    # Línea base: lo que cuesta Streamlit por sí solo, que paga cualquier página
+    base = {nombre for nombre, *_ in medir_importaciones(["import streamlit"])}
+
+    reporte = []
+    for script in scripts:
+        modulos = medir_importaciones(importaciones_de_script(script))
+        propios = [m for m in modulos if m[0] not in base]
+        pesadas = {}
+        for nombre, _, acumulado, _ in propios:
+            raiz = nombre.split(".")[0]
+            if raiz in LIBRERIAS_PESADAS and nombre == raiz:
+                pesadas[raiz] = acumulado
+        reporte.append({
+            "pagina": Path(script).name,
+            "total_ms": sum(m[1] for m in propios),
+            "pesadas": pesadas,
+            "modulos": sorted(
+                [(m[0], m[2]) for m in propios if m[3] <= 1],
+                key=lambda m: m[1], reverse=True,
+            ),
+        })
+    return reporte
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Costo de importación en frío de cada página")
+    parser.add_argument("--top", type=int, default=10, help="Módulos a detallar por página")
+    args = parser.parse_args(argv)
+
+    for fila in reporte_paginas():
+        pesadas = ", ".join(f"{n} {ms:.0f} ms" for n, ms in fila["pesadas"].items()) or "ninguna"
+        print(f"{fila['pagina']:<36} {fila['total_ms']:>8.0f} ms   (además de Streamlit)")
+        print(f"    librerías pesadas: {pesadas}")
+        for nombre, ms in fila["modulos"][:args.top]:
+            print(f"    {ms:>8.1f} ms  {nombre}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+"""
+Asignación de lugares de los workshops del Dashboard JII
+Los lugares se dieron por orden de llegada: quien llegó con el cupo lleno quedó en
+lista_espera, y los no-shows dejan lugares vacíos. Aquí se decide a quién promover
+de la lista de espera como un problema de asignación con capacidades (b-matching
+bipartito entre personas y workshops):
+
+    - Cada workshop acepta un objetivo de inscripciones: con su tasa de no-show, el
+      mayor número cuya asistencia pasa de cupo_maximo solo con probabilidad
+      `riesgo` (ver asientos_objetivo). Los lugares libres son el objetivo menos los
+      inscritos que ya tienen lugar.
+    - Una persona recibe a lo más un workshop por franja (workshops con horarios
+      empalmados), y quien ya tiene lugar en una franja no se promueve en ella.
+    - Se atiende por orden de registro: cada persona de la lista entra si hay forma
+      de acomodarla moviendo a los ya promovidos entre los workshops de sus propias
+      listas (camino aumentante). Así se promueve al mayor número posible de
+      personas y, entre esas soluciones, a las que se registraron antes.
+
+La tasa de no-show de cada workshop sale de la asistencia registrada (ver
+tasas_no_show). Resolver miles de inscripciones toma milisegundos, y una inscripción
+nueva a la lista de espera se acomoda sin resolver todo (Asignacion.agregar).
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from utils.analitica import normalizar_email
+from utils.embudo import ESTADO_CANCELADO, ESTADO_LISTA_ESPERA
+from utils.perfilador import medir_fase
+
+ESTADO_INSCRITO = "inscrito"
+
+# Probabilidad aceptada de que asistan más personas que el cupo
+RIESGO_DEFECTO = 0.05
+
+# Nunca se aceptan más inscripciones que este múltiplo del cupo
+SOBREVENTA_MAX = 1.5
+
+# Inscripciones confirmadas con que pesa la tasa global al estimar la de un workshop
+PESO_PREVIO = 10
+
+# Prioridad al deduplicar inscripciones repetidas de una persona a un workshop
+_PRIORIDAD_ESTADO = {ESTADO_INSCRITO: 0, ESTADO_LISTA_ESPERA: 1}
+
+
+def _columna(df: pd.DataFrame, nombre: str) -> pd.Series:
+    return df[nombre] if nombre in df.columns else pd.Series(None, index=df.index, dtype=object)
+
+
+# ============================
+# No-shows y sobreventa
+# ============================
+
+def tasas_no_show(conversion: pd.DataFrame, peso_previo: float = PESO_PREVIO) -> tuple:
+    """
+    Tasa de no-show estimada de cada workshop
+
+    La tasa observada de cada workshop se acerca a la tasa global según sus pocas o
+    muchas inscripciones: (no_show + peso_previo · global) / (confirmados + peso_previo).
+    Un workshop con 5 inscritos no da una tasa de 0 o de 1 por azar.
+
+    Args:
+        conversion: Conversión por workshop de ediciones con asistencia registrada
+            (IndiceEmbudo.conversion("actividad_codigo"), una o varias concatenadas)
+        peso_previo: Inscripciones confirmadas que vale la tasa global
+
+    Returns:
+        Tupla (Serie {actividad_codigo: tasa}, tasa global); la global es para los
+        workshops sin historial y es 0 si no hay historial
+    """
+    if conversion.empty or conversion['confirmados'].sum() == 0:
+        return pd.Series(dtype=float), 0.0
+    por_workshop = conversion.groupby('actividad_codigo')[['confirmados', 'no_show']].sum()
+    tasa_global = float(por_workshop['no_show'].sum() / por_workshop['confirmados'].sum())
+    tasas = (por_workshop['no_show'] + peso_previo * tasa_global) / (por_workshop['confirmados'] + peso_previo)
+    return tasas.rename('tasa_no_show'), tasa_global
+
+
+def _probabilidad_excede(inscritos: int, cupo: int, asiste: float) -> float:
+    """P(X > cupo) con X ~ Binomial(inscritos, asiste)"""
+    log_asiste, log_falta = math.log(asiste), math.log1p(-asiste)
+    total = 0.0
+    for k in range(cupo + 1, inscritos + 1):
+        total += math.exp(
+            math.lgamma(inscritos + 1) - math.lgamma(k + 1) - math.lgamma(inscritos - k + 1)
+            + k * log_asiste + (inscritos - k) * log_falta
+        )
+    return total
+
+
+def asientos_objetivo(cupo: int, tasa_no_show: float, riesgo: float = RIESGO_DEFECTO) -> int:
+    """
+    Inscripciones que puede aceptar un workshop
+
+    El mayor n tal que, si cada inscrito asiste con probabilidad 1 - tasa_no_show, la
+    probabilidad de que asistan más de `cupo` no pasa de `riesgo`. Nunca es menor que
+    el cupo ni mayor que SOBREVENTA_MAX veces el cupo; con tasa o riesgo 0 es el cupo.
+    """
+    cupo = max(int(cupo), 0)
+    asiste = 1.0 - float(tasa_no_show)
+    if cupo == 0 or riesgo <= 0 or asiste >= 1:
+        return cupo
+    limite = int(cupo * SOBREVENTA_MAX)
+    if asiste <= 0:
+        return limite
+    inscritos = cupo
+    while inscritos < limite and _probabilidad_excede(inscritos + 1, cupo, asiste) <= riesgo:
+        inscritos += 1
+    return inscritos
+
+
+def franjas(actividades: pd.DataFrame, codigos) -> pd.Series:
+    """
+    Franja de horario de cada workshop
+
+    Los workshops cuyos horarios se empalman, directamente o en cadena, comparten
+    franja. Un workshop sin horario forma su propia franja.
+
+    Returns:
+        Serie {codigo: número de franja}
+    """
+    codigos = pd.Index(codigos).unique()
+    if actividades.empty or not {"codigo", "fecha_inicio", "fecha_fin"} <= set(actividades.columns):
+        return pd.Series(range(len(codigos)), index=codigos, dtype=int)
+    horarios = actividades.drop_duplicates("codigo").set_index("codigo").reindex(codigos)
+    inicio = pd.to_datetime(horarios["fecha_inicio"], errors="coerce")
+    fin = pd.to_datetime(horarios["fecha_fin"], errors="coerce")
+
+    resultado, franja, fin_franja = {}, -1, None
+    for codigo in inicio.sort_values(na_position="last").index:
+        if pd.isna(inicio[codigo]) or pd.isna(fin[codigo]):
+            franja, fin_franja = franja + 1, None
+        elif fin_franja is None or inicio[codigo] >= fin_franja:
+            franja, fin_franja = franja + 1, fin[codigo]
+        else:
+            fin_franja = max(fin_franja, fin[codigo])
+        resultado[codigo] = franja
+    return pd.Series(resultado, dtype=int).reindex(codigos)
+
+
+# ============================
+# Asignación
+# ============================
+
+class Asignacion:
+    """
+    Promociones de la lista de espera a los workshops
+
+    Un nodo es una persona en una franja, (email, franja); cada nodo ocupa a lo más un
+    lugar libre de los workshops de su lista en esa franja.
+
+    Attributes:
+        workshops: Un renglón por workshop, indexado por código [cupo, franja,
+            tasa_no_show, objetivo, inscritos, libres]
+        conflictos: Lugares de las personas inscritas a más de un workshop de la misma
+            franja [participante_email, participante_nombre, franja, actividad_codigo]
+        asignados: {nodo: código del workshop al que se promueve}
+    """
+
+    def __init__(self, workshops: pd.DataFrame, candidatos: pd.DataFrame, con_lugar: set,
+                 conflictos: pd.DataFrame = None):
+        self.workshops = workshops
+        self.conflictos = conflictos if conflictos is not None else pd.DataFrame(
+            columns=['participante_email', 'participante_nombre', 'franja', 'actividad_codigo'])
+        self._con_lugar = con_lugar
+        self._opciones = {}    # nodo -> códigos en orden de registro
+        self._prioridad = {}   # nodo -> clave de orden (creado, id) de su primera inscripción en la lista
+        self._ultimo = None    # mayor clave de orden registrada
+        self._filas = {}       # (nodo, código) -> (nombre, creado, id)
+        self.asignados = {}
+        # Dicts como conjuntos ordenados: la asignación no depende del orden de los hashes
+        self._ocupantes = {}
+        self._libres = workshops['libres'].to_dict()
+        self._franja = workshops['franja'].astype(int).to_dict()
+        # Workshops llenos desde los que ningún camino llega a un lugar libre (ver _aumentar)
+        self._sin_salida = set()
+        filas = zip(candidatos['participante_email'].tolist(), candidatos['participante_nombre'].tolist(),
+                    candidatos['actividad_codigo'].tolist(), candidatos['creado'].tolist(), candidatos['id'].tolist(),
+                    _claves_orden(candidatos['creado'], candidatos['id']))
+        for email, nombre, codigo, creado, id_, clave in filas:
+            self._registrar(email, nombre, codigo, creado, id_, clave)
+        self.resolver()
+
+    def _registrar(self, email: str, nombre, codigo: str, creado, id_, clave: tuple) -> tuple:
+        nodo = (email, self._franja[codigo])
+        opciones = self._opciones.setdefault(nodo, [])
+        if codigo not in opciones:
+            opciones.append(codigo)
+            self._filas[(nodo, codigo)] = (nombre, creado, id_)
+        if nodo not in self._prioridad or clave < self._prioridad[nodo]:
+            self._prioridad[nodo] = clave
+        if self._ultimo is None or clave > self._ultimo:
+            self._ultimo = clave
+        return nodo
+
+    def resolver(self):
+        """Resuelve la asignación completa en orden de registro"""
+        self.asignados = {}
+        self._ocupantes = {codigo: {} for codigo in self.workshops.index}
+        self._sin_salida = set()
+        for nodo in sorted(self._prioridad, key=self._prioridad.get):
+            self._aumentar(nodo)
+
+    def _aumentar(self, nodo) -> bool:
+        """
+        Acomoda un nodo por un camino aumentante (búsqueda en amplitud sobre workshops)
+
+        Desde los workshops del nodo se pasa de un workshop lleno a los demás workshops
+        de sus promovidos hasta dar con uno con lugar; los promovidos del camino se
+        recorren un lugar. Se prefiere un lugar directo en el orden de la lista del nodo.
+
+        Si la búsqueda falla, los workshops visitados están llenos y sus promovidos solo
+        pueden moverse entre ellos: ningún camino posterior pasa por ahí, así que se
+        marcan sin salida y las búsquedas siguientes no los recorren.
+        """
+        sin_salida = self._sin_salida
+        previo = {}
+        cola = deque()
+        for codigo in self._opciones[nodo]:
+            if codigo not in previo and codigo not in sin_salida:
+                previo[codigo] = (None, nodo)
+                cola.append(codigo)
+        while cola:
+            codigo = cola.popleft()
+            if len(self._ocupantes[codigo]) < self._libres[codigo]:
+                while True:
+                    anterior, quien = previo[codigo]
+                    if anterior is not None:
+                        del self._ocupantes[anterior][quien]
+                    self._ocupantes[codigo][quien] = None
+                    self.asignados[quien] = codigo
+                    if anterior is None:
+                        return True
+                    codigo = anterior
+            for ocupante in self._ocupantes[codigo]:
+                for otro in self._opciones[ocupante]:
+                    if otro not in previo and otro not in sin_salida:
+                        previo[otro] = (codigo, ocupante)
+                        cola.append(otro)
+        sin_salida.update(previo)
+        return False
+
+    def agregar(self, email: str, codigo: str, nombre: str = None, creado=None, id_=None) -> bool:
+        """
+        Agrega una inscripción a la lista de espera y actualiza la asignación
+
+        Si es la persona más reciente en la franja basta con buscarle un camino
+        aumentante; si no (una persona que ya estaba en la lista o un registro fuera
+        de orden), se resuelve todo de nuevo.
+
+        Args:
+            email: Email de la persona (se normaliza)
+            codigo: Código del workshop
+            nombre: Nombre para el reporte
+            creado: Fecha de registro (por defecto, ahora)
+
+        Returns:
+            True si la persona quedó promovida en la franja del workshop
+        """
+        if codigo not in self.workshops.index:
+            return False
+        email = normalizar_email(pd.Series([email])).iloc[0]
+        creado = pd.Timestamp.now() if creado is None else pd.Timestamp(creado)
+        nodo = (email, self._franja[codigo])
+        if nodo in self._con_lugar:
+            return False
+
+        nuevo = nodo not in self._prioridad
+        ultimo = self._ultimo
+        self._registrar(email, nombre, codigo, creado, id_, _claves_orden(pd.Series([creado]), pd.Series([id_]))[0])
+        if nuevo and (ultimo is None or self._prioridad[nodo] >= ultimo):
+            self._aumentar(nodo)
+        else:
+            self.resolver()
+        return nodo in self.asignados
+
+    def promociones(self) -> pd.DataFrame:
+        """
+        Inscripciones de la lista de espera que se promueven, en orden de registro
+
+        Returns:
+            DataFrame [participante_email, participante_nombre, actividad_codigo, creado,
+            posicion_lista, prob_asistencia]; posicion_lista es su lugar en la lista de
+            espera del workshop y prob_asistencia, 1 - tasa de no-show del workshop
+        """
+        columnas = ['participante_email', 'participante_nombre', 'actividad_codigo', 'creado',
+                    'posicion_lista', 'prob_asistencia']
+        filas = self._lista()
+        if filas.empty:
+            return pd.DataFrame(columns=columnas)
+        promovidas = filas[[self.asignados.get(nodo) == codigo for nodo, codigo in zip(filas['nodo'], filas['actividad_codigo'])]]
+        promovidas = promovidas.assign(
+            prob_asistencia=1 - promovidas['actividad_codigo'].map(self.workshops['tasa_no_show'])
+        )
+        return promovidas.sort_values(['creado', 'id'], kind='stable')[columnas].reset_index(drop=True)
+
+    def resumen(self) -> pd.DataFrame:
+        """
+        Resultado por workshop
+
+        Returns:
+            DataFrame [actividad_codigo, cupo, inscritos, tasa_no_show, objetivo, promovidos,
+            asistencia_esperada, lista_espera, sin_lugar]; sin_lugar son las inscripciones de
+            la lista del workshop cuya persona no se promovió a ningún workshop de la franja
+        """
+        filas = self._lista()
+        promovidos = pd.Series([codigo for codigo in self.asignados.values()], dtype=object).value_counts()
+        if filas.empty:
+            en_lista = sin_lugar = pd.Series(dtype=int)
+        else:
+            en_lista = filas['actividad_codigo'].value_counts()
+            sin_lugar = filas.loc[[nodo not in self.asignados for nodo in filas['nodo']], 'actividad_codigo'].value_counts()
+        df = self.workshops.rename_axis('actividad_codigo').reset_index()
+        df['promovidos'] = df['actividad_codigo'].map(promovidos).fillna(0).astype(int)
+        df['asistencia_esperada'] = (df['inscritos'] + df['promovidos']) * (1 - df['tasa_no_show'])
+        df['lista_espera'] = df['actividad_codigo'].map(en_lista).fillna(0).astype(int)
+        df['sin_lugar'] = df['actividad_codigo'].map(sin_lugar).fillna(0).astype(int)
+        return df[['actividad_codigo', 'cupo', 'inscritos', 'tasa_no_show', 'objetivo', 'promovidos',
+                   'asistencia_esperada', 'lista_espera', 'sin_lugar']]
+
+    def _lista(self) -> pd.DataFrame:
+        """Inscripciones en lista de espera registradas [nodo, participante_email, ..., posicion_lista]"""
+        filas = pd.DataFrame(
+            [(nodo, nodo[0], nombre, codigo, creado, id_)
+             for (nodo, codigo), (nombre, creado, id_) in self._filas.items()],
+            columns=['nodo', 'participante_email', 'participante_nombre', 'actividad_codigo', 'creado', 'id'],
+        )
+        if filas.empty:
+            return filas.assign(posicion_lista=pd.Series(dtype=int))
+        filas = filas.sort_values(['creado', 'id'], kind='stable', na_position='last')
+        filas['posicion_lista'] = filas.groupby('actividad_codigo').cumcount() + 1
+        return filas
+
+    def __repr__(self):
+        return f"<Asignacion {len(self.workshops)} workshops, {len(self._prioridad)} en lista, {len(self.asignados)} promovidos>"
+
+
+def _claves_orden(creado: pd.Series, ids: pd.Series) -> list:
+    """
+    Claves de orden de los registros: por fecha y luego por id, los que no tienen al final
+
+    Returns:
+        Lista de tuplas (nanosegundos, id) que se comparan sin pasar por pandas
+    """
+    fechas = pd.to_datetime(creado, errors='coerce', utc=True).dt.tz_convert(None).astype('datetime64[ns]')
+    nanos = np.where(fechas.isna(), np.iinfo(np.int64).max, fechas.to_numpy().view('int64'))
+    ids = pd.to_numeric(ids, errors='coerce').astype(float).fillna(np.inf)
+    return list(zip(nanos.tolist(), ids.tolist()))
+
+
+@medir_fase("transform")
+def construir_asignacion(inscripciones: pd.DataFrame, actividades: pd.DataFrame, tasas: pd.Series = None,
+                         tasa_global: float = 0.0, riesgo: float = RIESGO_DEFECTO) -> Asignacion:
+    """
+    Resuelve las promociones de la lista de espera de una edición
+
+    Args:
+        inscripciones: Tabla inscripciones_workshop (participante_email, participante_nombre,
+            actividad_codigo, estado, creado, id)
+        actividades: Tabla actividades (codigo, cupo_maximo, fecha_inicio, fecha_fin)
+        tasas: Tasa de no-show por workshop (ver tasas_no_show)
+        tasa_global: Tasa de los workshops que no están en `tasas`
+        riesgo: Probabilidad aceptada de que asistan más personas que el cupo
+
+    Returns:
+        Asignacion; los workshops sin cupo_maximo no reciben promociones
+    """
+    df = pd.DataFrame({
+        'participante_email': normalizar_email(_columna(inscripciones, 'participante_email')),
+        'participante_nombre': _columna(inscripciones, 'participante_nombre'),
+        'actividad_codigo': _columna(inscripciones, 'actividad_codigo'),
+        'estado': _columna(inscripciones, 'estado'),
+        'creado': pd.to_datetime(_columna(inscripciones, 'creado'), errors='coerce'),
+        'id': pd.to_numeric(_columna(inscripciones, 'id'), errors='coerce'),
+    }).dropna(subset=['participante_email', 'actividad_codigo'])
+    # Una fila por persona y workshop: la inscripción vigente más antigua
+    df = df[df['estado'] != ESTADO_CANCELADO]
+    df = (
+        df.assign(_prioridad=df['estado'].map(_PRIORIDAD_ESTADO).fillna(0))
+        .sort_values(['_prioridad', 'creado', 'id'], kind='stable', na_position='last')
+        .drop_duplicates(['participante_email', 'actividad_codigo'])
+        .drop(columns='_prioridad')
+    )
+
+    codigos = pd.Index(df['actividad_codigo'].unique())
+    cupos = pd.Series(dtype=float)
+    if {'codigo', 'cupo_maximo'} <= set(actividades.columns):
+        cupos = pd.to_numeric(actividades.drop_duplicates('codigo').set_index('codigo')['cupo_maximo'], errors='coerce')
+    tasas = tasas if tasas is not None else pd.Series(dtype=float)
+
+    lista = df['estado'] == ESTADO_LISTA_ESPERA
+    workshops = pd.DataFrame(index=codigos)
+    workshops['cupo'] = cupos.reindex(codigos)
+    workshops['franja'] = franjas(actividades, codigos)
+    workshops['tasa_no_show'] = tasas.reindex(codigos).fillna(tasa_global).astype(float)
+    workshops['inscritos'] = df.loc[~lista, 'actividad_codigo'].value_counts().reindex(codigos).fillna(0).astype(int)
+    workshops['objetivo'] = [
+        asientos_objetivo(cupo, tasa, riesgo) if pd.notna(cupo) else inscritos
+        for cupo, tasa, inscritos in zip(workshops['cupo'], workshops['tasa_no_show'], workshops['inscritos'])
+    ]
+    workshops['libres'] = (workshops['objetivo'] - workshops['inscritos']).clip(lower=0).astype(int)
+    workshops = workshops[['cupo', 'franja', 'tasa_no_show', 'objetivo', 'inscritos', 'libres']]
+
+    df['franja'] = df['actividad_codigo'].map(workshops['franja'])
+    con_lugar = df.loc[~lista]
+    empalmados = con_lugar[con_lugar.duplicated(['participante_email', 'franja'], keep=False)]
+    conflictos = empalmados[['participante_email', 'participante_nombre', 'franja', 'actividad_codigo']].sort_values(
+        ['participante_email', 'franja', 'actividad_codigo'], ignore_index=True)
+
+    # Quien ya tiene lugar en una franja no entra a la lista de esa franja
+    tiene_lugar = (~lista).groupby([df['participante_email'], df['franja']]).transform('any')
+    candidatos = df[lista & ~tiene_lugar]
+    ocupados = set(zip(con_lugar['participante_email'].tolist(), con_lugar['franja'].tolist()))
+    return Asignacion(workshops, candidatos, ocupados, conflictos)
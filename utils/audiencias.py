@@ -0,0 +1,289 @@
+"""
+Audiencias compartidas del Dashboard JII
+Qué conferencias, workshops y demás sesiones comparten público, para programar la
+siguiente edición sin empalmar las sesiones con más audiencia en común.
+
+Las asistencias se convierten una sola vez en una matriz de incidencia dispersa
+participante × actividad. Con un solo producto disperso (Xᵀ·X) se obtiene la
+coasistencia de todos los pares de actividades, y de ella la similitud de Jaccard
+y el coeficiente de solapamiento sin recorrer participantes. El costo crece con
+el número de asistencias, no con participantes × actividades, así que escala a
+decenas de miles de participantes.
+
+Los equipos del concurso se tratan igual: la matriz participante × equipo (capitán
+y columnas email_miembro_*) da los pares de compañeros y, cruzada con la de
+asistencias, cuánto coincidieron los miembros de cada equipo en las sesiones.
+
+Requiere SciPy (scipy.sparse); sin él AUDIENCIAS_DISPONIBLE es False.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.analitica import normalizar_email
+from utils.arranque import disponible
+from utils.perfilador import medir_fase
+
+AUDIENCIAS_DISPONIBLE = disponible("scipy")
+
+COLUMNA_CAPITAN = "email_capitan"
+PREFIJO_MIEMBRO = "email_miembro_"
+UMBRAL_RED = 0.2   # Jaccard mínimo para dibujar una arista en la red de actividades
+
+
+class Incidencia:
+    """
+    Matriz dispersa de pertenencia (1 si la fila participa en la columna)
+
+    Attributes:
+        matriz: scipy.sparse.csr_matrix int32 (filas, columnas) con unos
+        filas: Identificador de cada fila (email del participante)
+        columnas: Identificador de cada columna (código de actividad o equipo), ordenados
+
+    Los arreglos son de solo lectura: la incidencia se comparte entre sesiones desde la caché.
+    """
+
+    def __init__(self, matriz, filas: np.ndarray, columnas: np.ndarray):
+        for arreglo in (matriz.data, matriz.indices, matriz.indptr, filas, columnas):
+            arreglo.flags.writeable = False
+        self.matriz = matriz
+        self.filas = filas
+        self.columnas = columnas
+
+    @property
+    def forma(self) -> tuple:
+        return self.matriz.shape
+
+    def tamanos(self) -> np.ndarray:
+        """Columnas a las que pertenece cada fila (p. ej. actividades por participante)"""
+        return np.diff(self.matriz.indptr)
+
+    def alinear(self, filas) -> "sparse.csr_matrix":
+        """
+        Filas de la matriz en el orden de otros identificadores
+
+        Los identificadores que no están en la incidencia quedan como filas vacías.
+        """
+        from scipy import sparse
+
+        posicion = pd.Index(self.filas).get_indexer(pd.Index(filas))
+        extendida = sparse.vstack([self.matriz, sparse.csr_matrix((1, self.forma[1]), dtype=self.matriz.dtype)]).tocsr()
+        return extendida[np.where(posicion < 0, self.forma[0], posicion)]
+
+    def __repr__(self):
+        filas, columnas = self.forma
+        return f"<Incidencia {filas}×{columnas}, {self.matriz.nnz} enlaces>"
+
+
+@medir_fase("transform")
+def construir_incidencia(df: pd.DataFrame, columna_fila: str = "participante_email",
+                         columna_columna: str = "actividad_codigo") -> Incidencia:
+    """
+    Matriz de incidencia a partir de una tabla larga de pares (fila, columna)
+
+    Los pares repetidos (dos registros de asistencia a la misma actividad) cuentan una vez.
+
+    Args:
+        df: Tabla con una fila por pertenencia (p. ej. asistencias)
+        columna_fila: Columna de las filas; si es un email se normaliza a minúsculas
+        columna_columna: Columna de las columnas
+
+    Returns:
+        Incidencia (vacía si no hay pares)
+    """
+    from scipy import sparse
+
+    if df.empty or columna_fila not in df.columns or columna_columna not in df.columns:
+        return Incidencia(sparse.csr_matrix((0, 0), dtype=np.int32), np.array([], dtype=object), np.array([], dtype=object))
+
+    filas = normalizar_email(df[columna_fila]) if "email" in columna_fila else df[columna_fila]
+    pares = pd.DataFrame({"fila": filas, "columna": df[columna_columna]}).dropna().drop_duplicates()
+    indice_filas, ids_filas = pd.factorize(pares["fila"])
+    indice_columnas, ids_columnas = pd.factorize(pares["columna"], sort=True)
+    matriz = sparse.csr_matrix(
+        (np.ones(len(pares), dtype=np.int32), (indice_filas, indice_columnas)),
+        shape=(len(ids_filas), len(ids_columnas)),
+    )
+    return Incidencia(matriz, np.asarray(ids_filas, dtype=object), np.asarray(ids_columnas, dtype=object))
+
+
+# ============================
+# Actividades
+# ============================
+
+@medir_fase("transform")
+def coasistencia(incidencia: Incidencia) -> pd.DataFrame:
+    """
+    Participantes en común de cada par de actividades (Xᵀ·X)
+
+    Returns:
+        DataFrame actividad × actividad; la diagonal es la audiencia de cada actividad
+    """
+    x = incidencia.matriz
+    comun = (x.T @ x).toarray()
+    return pd.DataFrame(comun, index=incidencia.columnas, columns=incidencia.columnas)
+
+
+@medir_fase("transform")
+def jaccard(coasistencias: pd.DataFrame) -> pd.DataFrame:
+    """
+    Similitud de Jaccard entre las audiencias de cada par de actividades
+
+    |A ∩ B| / |A ∪ B|, con |A ∪ B| = |A| + |B| - |A ∩ B| tomado de la propia coasistencia.
+
+    Returns:
+        DataFrame actividad × actividad en [0, 1] (0 si ninguna de las dos tiene asistentes)
+    """
+    comun = coasistencias.to_numpy(dtype=np.float64)
+    audiencia = np.diag(comun)
+    union = audiencia[:, None] + audiencia[None, :] - comun
+    similitud = np.divide(comun, union, out=np.zeros_like(comun), where=union > 0)
+    return pd.DataFrame(similitud, index=coasistencias.index, columns=coasistencias.columns)
+
+
+def _choques(actividades: pd.DataFrame, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """True donde los horarios de las actividades a y b se empalman (False si falta alguno)"""
+    if actividades is None or actividades.empty or not {"codigo", "fecha_inicio", "fecha_fin"} <= set(actividades.columns):
+        return np.zeros(len(a), dtype=bool)
+    horarios = actividades.drop_duplicates("codigo").set_index("codigo")
+    inicio = pd.to_datetime(horarios["fecha_inicio"], errors="coerce")
+    fin = pd.to_datetime(horarios["fecha_fin"], errors="coerce")
+    inicio_a, fin_a = inicio.reindex(a).to_numpy(), fin.reindex(a).to_numpy()
+    inicio_b, fin_b = inicio.reindex(b).to_numpy(), fin.reindex(b).to_numpy()
+    return np.asarray((inicio_a < fin_b) & (inicio_b < fin_a), dtype=bool)
+
+
+@medir_fase("transform")
+def pares_actividades(coasistencias: pd.DataFrame, actividades: pd.DataFrame = None,
+                      minimo: int = 1) -> pd.DataFrame:
+    """
+    Pares de actividades con audiencia en común, de mayor a menor similitud
+
+    Args:
+        coasistencias: Resultado de coasistencia
+        actividades: Tabla de actividades (codigo, fecha_inicio, fecha_fin) para marcar choques de horario
+        minimo: Participantes en común mínimos para incluir un par
+
+    Returns:
+        DataFrame [actividad_a, actividad_b, audiencia_a, audiencia_b, en_comun, jaccard,
+        solapamiento, choque]; solapamiento es |A ∩ B| / min(|A|, |B|) (1 si una audiencia
+        está contenida en la otra) y choque indica que sus horarios se empalman
+    """
+    comun = coasistencias.to_numpy()
+    audiencia = np.diag(comun)
+    i, j = np.triu_indices(len(comun), k=1)
+    en_comun = comun[i, j]
+    conservar = en_comun >= minimo
+    i, j, en_comun = i[conservar], j[conservar], en_comun[conservar]
+
+    codigos = coasistencias.index.to_numpy()
+    menor = np.minimum(audiencia[i], audiencia[j])
+    union = audiencia[i] + audiencia[j] - en_comun
+    return pd.DataFrame({
+        "actividad_a": codigos[i],
+        "actividad_b": codigos[j],
+        "audiencia_a": audiencia[i],
+        "audiencia_b": audiencia[j],
+        "en_comun": en_comun,
+        "jaccard": np.divide(en_comun, union, out=np.zeros(len(i)), where=union > 0),
+        "solapamiento": np.divide(en_comun, menor, out=np.zeros(len(i)), where=menor > 0),
+        "choque": _choques(actividades, codigos[i], codigos[j]),
+    }).sort_values(["jaccard", "en_comun"], ascending=False, ignore_index=True)
+
+
+# ============================
+# Equipos del concurso
+# ============================
+
+def miembros_equipos(equipos: pd.DataFrame) -> pd.DataFrame:
+    """
+    Integrantes de cada equipo en formato largo
+
+    Returns:
+        DataFrame [equipo, participante_email, rol] con el capitán y los email_miembro_*,
+        sin vacíos ni repetidos dentro del equipo
+    """
+    columnas = [c for c in equipos.columns if c == COLUMNA_CAPITAN or c.startswith(PREFIJO_MIEMBRO)]
+    if equipos.empty or not columnas:
+        return pd.DataFrame(columns=["equipo", "participante_email", "rol"])
+    equipo = equipos["nombre_equipo"] if "nombre_equipo" in equipos.columns else equipos.index.to_series()
+    largo = (
+        equipos[columnas].assign(equipo=equipo.to_numpy())
+        .melt(id_vars="equipo", var_name="rol", value_name="participante_email")
+    )
+    largo["participante_email"] = normalizar_email(largo["participante_email"])
+    largo["rol"] = np.where(largo["rol"] == COLUMNA_CAPITAN, "capitan", "miembro")
+    return (
+        largo.dropna(subset=["participante_email"])
+        .drop_duplicates(["equipo", "participante_email"])
+        [["equipo", "participante_email", "rol"]]
+        .reset_index(drop=True)
+    )
+
+
+@medir_fase("transform")
+def pares_companeros(miembros: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pares de participantes que comparten equipo (la comembresía B·Bᵀ fuera de la diagonal)
+
+    Returns:
+        DataFrame [equipo, participante_a, participante_b]
+    """
+    pares = miembros[["equipo", "participante_email"]].merge(
+        miembros[["equipo", "participante_email"]], on="equipo", suffixes=("_a", "_b")
+    )
+    pares = pares[pares["participante_email_a"] < pares["participante_email_b"]]
+    return pares.rename(columns={
+        "participante_email_a": "participante_a", "participante_email_b": "participante_b",
+    }).reset_index(drop=True)
+
+
+@medir_fase("transform")
+def afinidad_equipos(incidencia: Incidencia, equipos: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cuánto coincidieron en las sesiones los integrantes de cada equipo
+
+    La matriz equipo × actividad (Bᵀ·X) cuenta cuántos integrantes asistieron a cada
+    actividad; la afinidad es el Jaccard promedio entre las actividades de cada par
+    de compañeros, con las intersecciones de todos los pares calculadas a la vez.
+
+    Returns:
+        DataFrame [equipo, integrantes, con_asistencia, actividades_compartidas, afinidad]
+        ordenado por afinidad; actividades_compartidas son las actividades con al menos
+        dos integrantes y afinidad es NaN si el equipo tiene menos de dos integrantes
+    """
+    from scipy import sparse
+
+    columnas = ["equipo", "integrantes", "con_asistencia", "actividades_compartidas", "afinidad"]
+    miembros = miembros_equipos(equipos)
+    if miembros.empty:
+        return pd.DataFrame(columns=columnas)
+
+    indice_equipo, nombres = pd.factorize(miembros["equipo"])
+    x = incidencia.alinear(miembros["participante_email"])   # una fila por integrante
+    pertenencia = sparse.csr_matrix(
+        (np.ones(len(miembros), dtype=np.int32), (indice_equipo, np.arange(len(miembros)))),
+        shape=(len(nombres), len(miembros)),
+    )
+    por_actividad = pertenencia @ x                              # equipo × actividad
+    compartidas = np.asarray((por_actividad >= 2).sum(axis=1)).ravel()
+    con_asistencia = np.bincount(indice_equipo, weights=np.diff(x.indptr) > 0, minlength=len(nombres))
+
+    # Pares de compañeros como posiciones en `miembros`
+    posicion = pd.DataFrame({"equipo": indice_equipo, "fila": np.arange(len(miembros))})
+    pares = posicion.merge(posicion, on="equipo", suffixes=("_a", "_b"))
+    pares = pares[pares["fila_a"] < pares["fila_b"]]
+    a, b = pares["fila_a"].to_numpy(), pares["fila_b"].to_numpy()
+    interseccion = np.asarray(x[a].multiply(x[b]).sum(axis=1)).ravel()
+    tamano = np.diff(x.indptr)
+    union = tamano[a] + tamano[b] - interseccion
+    similitud = np.divide(interseccion, union, out=np.zeros(len(a)), where=union > 0)
+    afinidad = pd.Series(similitud).groupby(pares["equipo"].to_numpy()).mean()
+
+    return pd.DataFrame({
+        "equipo": np.asarray(nombres),
+        "integrantes": np.bincount(indice_equipo, minlength=len(nombres)),
+        "con_asistencia": con_asistencia.astype(int),
+        "actividades_compartidas": compartidas,
+        "afinidad": afinidad.reindex(range(len(nombres))).to_numpy(),
+    }).sort_values("afinidad", ascending=False, ignore_index=True)
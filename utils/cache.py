@@ -0,0 +1,327 @@
+"""
+Cachés en memoria del Dashboard JII
+Las comparten todas las sesiones del proceso: los resultados de las consultas
+(utils/supabase_client.py) y los artefactos derivados (utils/derivados.py).
+
+Cada entrada vive JII_CACHE_TTL segundos. Si varias sesiones piden a la vez una
+entrada que no está, solo una la calcula y las demás esperan su resultado. Una
+entrada vencida se sigue sirviendo (hasta JII_CACHE_MAX_OBSOLETO segundos más)
+mientras un hilo de fondo la renueva, y si la fuente falla se sirve el último
+valor bueno en lugar de un resultado vacío. El precalentamiento
+(utils/precalentamiento.py) recalcula las entradas dentro de refrescando() antes
+de que expiren, así que las sesiones no encuentran datos fríos.
+
+Las entradas con versión (la huella de sus tablas, utils/versiones.py) también
+expiran a los JII_CACHE_TTL segundos, pero además se tratan como vencidas en cuanto
+la versión cambia. refrescando(antiguedad) solo las recalcula si tienen al menos esa
+antigüedad: el precalentamiento renueva las que vencerían antes del siguiente ciclo
+y deja las demás.
+
+Si JII_CACHE_COMPARTIDA está definida, lo que falta en memoria se busca antes en la
+caché compartida entre procesos (utils/cache_compartida.py), y solo un proceso
+calcula cada entrada.
+"""
+
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+from utils import almacen
+
+logger = logging.getLogger(__name__)
+
+# Segundos que una entrada se sirve desde la caché (0 la desactiva)
+VARIABLE_CACHE_TTL = "JII_CACHE_TTL"
+CACHE_TTL_DEFECTO = 300
+
+# Segundos después del TTL en que una entrada vencida se sirve mientras se renueva
+VARIABLE_MAX_OBSOLETO = "JII_CACHE_MAX_OBSOLETO"
+MAX_OBSOLETO_DEFECTO = 3600
+
+_local = threading.local()
+
+_backend_lock = threading.Lock()
+_backend = None
+_backend_creado = False
+
+
+def ttl_cache() -> float:
+    """TTL de las cachés en segundos"""
+    return float(os.getenv(VARIABLE_CACHE_TTL, CACHE_TTL_DEFECTO))
+
+
+def max_obsoleto() -> float:
+    """Segundos que una entrada vencida se sigue sirviendo mientras se revalida"""
+    return float(os.getenv(VARIABLE_MAX_OBSOLETO, MAX_OBSOLETO_DEFECTO))
+
+
+def backend_compartido():
+    """Backend de la caché compartida entre procesos (None si no se configuró)"""
+    global _backend, _backend_creado
+    with _backend_lock:
+        if not _backend_creado:
+            from utils.cache_compartida import crear_backend
+
+            _backend = crear_backend()
+            _backend_creado = True
+            if _backend is not None:
+                logger.info("Caché compartida entre procesos: %r", _backend)
+    return _backend
+
+
+@contextmanager
+def refrescando(antiguedad: float = 0.0):
+    """
+    Dentro de este bloque las cachés recalculan las entradas en lugar de servirlas
+
+    Args:
+        antiguedad: Segundos que debe tener una entrada con versión vigente para
+            recalcularla; las sin versión se recalculan siempre
+    """
+    anterior = getattr(_local, "refrescar", False), getattr(_local, "antiguedad", 0.0)
+    _local.refrescar, _local.antiguedad = True, antiguedad
+    try:
+        yield
+    finally:
+        _local.refrescar, _local.antiguedad = anterior
+
+
+class CacheTTL:
+    """
+    Diccionario con expiración por tiempo, una sola carga concurrente por clave
+    y stale-while-revalidate: una entrada vencida se sigue sirviendo mientras un
+    hilo de fondo la renueva, y si la fuente falla se sirve el último valor bueno.
+    """
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        # clave -> (momento monotónico, fecha, valor, versión)
+        self._datos = {}
+        self._cargando = {}
+        self._revalidando = set()
+        self._lock = threading.Lock()
+        self._compartida = None
+
+    def obtener_o_calcular(self, clave, calcular, version=None):
+        """
+        Retorna el valor guardado para clave o lo calcula y lo guarda
+
+        Args:
+            clave: Clave hasheable de la entrada
+            calcular: Función sin argumentos que produce el valor; si lanza una
+                excepción no se guarda nada
+            version: Versión de los datos de entrada; si se indica, una entrada guardada
+                con otra versión deja de ser vigente aunque no haya vencido el TTL
+
+        Returns:
+            Tupla (valor, acierto) donde acierto indica si vino de la caché (vigente,
+            vencida en revalidación o último valor bueno tras una falla)
+
+        Raises:
+            La excepción de calcular si no hay ningún valor guardado que servir
+        """
+        ttl = ttl_cache()
+        if ttl <= 0:
+            return calcular(), False
+
+        # Una entrada con versión vigente (misma versión y dentro del TTL) solo se recalcula al
+        # refrescar si ya tiene la antigüedad pedida
+        entrada = self._entrada(clave)
+        refrescar = getattr(_local, "refrescar", False) and (
+            version is None or entrada is None
+            or time.monotonic() - entrada[0] >= getattr(_local, "antiguedad", 0.0)
+        )
+        if not refrescar:
+            if entrada is not None:
+                if self._vigente(entrada, ttl, version):
+                    return entrada[2], True
+                if time.monotonic() - entrada[0] < ttl + max_obsoleto() and not getattr(_local, "refrescar", False):
+                    self._revalidar(clave, calcular, version)
+                    return entrada[2], True
+
+        with self._lock:
+            lock_clave = self._cargando.setdefault(clave, threading.Lock())
+
+        with lock_clave:
+            # Otra sesión pudo haberla calculado mientras se esperaba el lock
+            if not refrescar:
+                entrada = self._entrada(clave)
+                if entrada is not None and self._vigente(entrada, ttl, version):
+                    return entrada[2], True
+            try:
+                valor, acierto = self._calcular(clave, calcular, ttl, version, refrescar)
+            except Exception:
+                entrada = self._entrada(clave)
+                if entrada is None or refrescar:
+                    raise
+                logger.warning("Fuente no disponible para %s; se sirve el último valor bueno", clave)
+                return entrada[2], True
+            self._guardar(clave, valor, version)
+            return valor, acierto
+
+    def compartida(self):
+        """Segundo nivel compartido entre procesos (None si no hay backend)"""
+        if self._compartida is None:
+            backend = backend_compartido()
+            if backend is None:
+                return None
+            from utils.cache_compartida import CacheCompartida
+
+            self._compartida = CacheCompartida(self.nombre, backend)
+        return self._compartida
+
+    def _calcular(self, clave, calcular, ttl, version=None, refrescar=False):
+        """
+        Calcula una entrada que no está vigente en memoria
+
+        Con caché compartida toma el valor que ya guardó otro proceso, o lo calcula
+        un solo proceso. Al refrescar solo se acepta un valor guardado después del
+        que tiene este proceso, para no repetir el refresco que ya hizo otro.
+
+        Returns:
+            Tupla (valor, acierto) donde acierto indica que vino de otro proceso
+        """
+        compartida = self.compartida()
+        if compartida is None:
+            return calcular(), False
+        desde = None
+        if refrescar:
+            entrada = self._entrada(clave)
+            desde = entrada[1].timestamp() if entrada is not None else None
+        hallado = compartida.obtener(clave, ttl, version, desde)
+        if hallado is not None:
+            return hallado[0], True
+        return compartida.calcular_una_vez(clave, calcular, ttl, version, desde)
+
+    @staticmethod
+    def _vigente(entrada, ttl, version) -> bool:
+        # La versión solo invalida antes de tiempo: el TTL sigue siendo el tope, porque
+        # la huella sin trigger no ve los UPDATE (ver utils/versiones.py)
+        if version is not None and entrada[3] != version:
+            return False
+        return time.monotonic() - entrada[0] < ttl
+
+    def _revalidar(self, clave, calcular, version=None):
+        """Renueva una entrada vencida en un hilo de fondo (uno por clave a la vez)"""
+        with self._lock:
+            if clave in self._revalidando:
+                return
+            self._revalidando.add(clave)
+
+        def renovar():
+            try:
+                with self._lock:
+                    lock_clave = self._cargando.setdefault(clave, threading.Lock())
+                with lock_clave:
+                    valor, _ = self._calcular(clave, calcular, ttl_cache(), version)
+                    self._guardar(clave, valor, version)
+            except Exception:
+                logger.warning("No se pudo revalidar %s; se mantiene el valor anterior", clave, exc_info=True)
+            finally:
+                with self._lock:
+                    self._revalidando.discard(clave)
+
+        threading.Thread(target=renovar, name=f"jii-revalidar-{self.nombre}", daemon=True).start()
+
+    def _guardar(self, clave, valor, version=None):
+        with self._lock:
+            self._datos[clave] = (time.monotonic(), datetime.now(), valor, version)
+            self._cargando.pop(clave, None)
+
+    def _entrada(self, clave):
+        with self._lock:
+            return self._datos.get(clave)
+
+    def frescura(self, clave, version=None):
+        """
+        Antigüedad de una entrada
+
+        Args:
+            version: Versión actual de los datos de entrada, si la entrada la usa
+
+        Returns:
+            Tupla (fecha en que se obtuvo, vencida) o None si la entrada no existe
+        """
+        entrada = self._entrada(clave)
+        if entrada is None:
+            return None
+        return entrada[1], not self._vigente(entrada, ttl_cache(), version)
+
+    def limpiar(self):
+        """Descarta todas las entradas (también las compartidas con otros procesos)"""
+        with self._lock:
+            self._datos.clear()
+        if self.compartida() is not None:
+            self._compartida.limpiar()
+
+    def __len__(self):
+        return len(self._datos)
+
+
+def _copia(valor, etiqueta: str):
+    """
+    Vista propia de los DataFrames (utils/almacen.py) para que quien los recibe pueda
+    modificarlos sin tocar la caché; comparte los buffers en lugar de copiarlos
+    """
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return almacen.vista(valor, etiqueta)
+    if isinstance(valor, tuple):
+        return tuple(_copia(v, etiqueta) for v in valor)
+    return valor
+
+
+consultas = CacheTTL("consultas")
+derivados = CacheTTL("derivados")
+
+
+def memoizar(funcion=None, *, tablas=None, ediciones=None):
+    """
+    Guarda el resultado de un artefacto derivado en la caché de derivados
+
+    La clave es el nombre de la función con sus argumentos, que deben ser hasheables
+    (edición, id de pregunta, ...), no DataFrames.
+
+        @memoizar(tablas=["encuesta_respuestas"])
+        def sentimiento(edicion, motor): ...
+
+    Args:
+        tablas: Tablas de las que depende el artefacto. La entrada queda ligada a su
+            versión en la edición del primer argumento y solo se recalcula cuando
+            alguna cambia; sin tablas (o sin versión disponible) expira por TTL
+        ediciones: Función que recibe esa edición y retorna todas las ediciones cuyas
+            tablas lee el artefacto (p. ej. las anteriores); la entrada se liga a la
+            versión de las tablas en cada una. Por defecto solo la del argumento
+    """
+    if funcion is None:
+        return functools.partial(memoizar, tablas=tablas, ediciones=ediciones)
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        clave = (funcion.__name__, args, tuple(sorted(kwargs.items())))
+        version = None
+        if tablas:
+            from utils.versiones import version as version_tablas
+            edicion = args[0] if args else kwargs.get("edicion")
+            if ediciones is None:
+                version = version_tablas(tablas, edicion)
+            else:
+                versiones = tuple(version_tablas(tablas, e) for e in ediciones(edicion))
+                version = None if any(v is None for v in versiones) else versiones
+        valor, _ = derivados.obtener_o_calcular(clave, lambda: funcion(*args, **kwargs), version)
+        return _copia(valor, f"{funcion.__name__}()")
+    return envoltura
+
+
+def limpiar_caches():
+    """Vacía las cachés de consultas y de derivados y olvida las versiones de las tablas"""
+    from utils.versiones import olvidar
+
+    consultas.limpiar()
+    derivados.limpiar()
+    olvidar()
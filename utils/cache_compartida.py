@@ -0,0 +1,441 @@
+"""
+Caché compartida entre procesos del Dashboard JII
+Con varios procesos (dynos, workers o réplicas de `streamlit run` en el mismo host)
+cada uno tendría su propia caché en memoria y haría sus propias consultas a Supabase.
+Aquí se guarda un segundo nivel de las cachés de utils/cache.py que comparten todos
+los procesos: un proceso consulta la fuente y los demás leen su resultado.
+
+Backends:
+    sqlite   archivo SQLite en el host (biblioteca estándar); sirve para procesos
+             del mismo servidor
+    redis    cualquier servidor compatible con Redis (requiere el paquete redis);
+             sirve también entre servidores
+
+Los DataFrames se guardan en formato Arrow IPC, que se lee sin copiar los buffers
+numéricos; los demás valores (índice del embudo, matriz de calificaciones) con pickle
+(protocolo 5). Cada entrada lleva una firma HMAC-SHA256 que se comprueba antes de
+leerla: quien pueda escribir en el backend pero no conozca la clave no puede hacer que
+el dashboard deserialice un valor suyo. La clave sale de JII_CACHE_COMPARTIDA_CLAVE; con
+SQLite, si no se define, se genera una junto al archivo (permisos 0600). Con Redis es
+obligatoria, porque todos los servidores deben firmar con la misma.
+Solo un proceso a la vez calcula una clave: los demás esperan su resultado hasta
+JII_CACHE_COMPARTIDA_ESPERA segundos (un cerrojo con vencimiento en el backend).
+
+Variables de entorno:
+    JII_CACHE_COMPARTIDA       "sqlite", "sqlite:///ruta/cache.sqlite" o "redis://host:6379/0"
+                               (vacía: cada proceso usa solo su caché en memoria). "sqlite"
+                               usa ~/.cache/jii/cache.sqlite (o $XDG_CACHE_HOME/jii), en un
+                               directorio 0700 del usuario del dashboard
+    JII_CACHE_COMPARTIDA_CLAVE  Clave de las firmas de las entradas (texto; obligatoria con Redis)
+    JII_CACHE_COMPARTIDA_ESPERA  Segundos que se espera a otro proceso (por defecto 30)
+"""
+
+import hashlib
+import hmac
+import io
+import logging
+import os
+import pickle
+import secrets
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from utils.arranque import disponible
+
+logger = logging.getLogger(__name__)
+
+REDIS_DISPONIBLE = disponible("redis")
+# pyarrow está en requirements.txt (y Streamlit lo instala); sin él los DataFrames van con pickle
+ARROW_DISPONIBLE = disponible("pyarrow")
+if not ARROW_DISPONIBLE:
+    logger.warning("pyarrow no está instalado: la caché compartida guardará los DataFrames con pickle")
+
+VARIABLE_COMPARTIDA = "JII_CACHE_COMPARTIDA"
+VARIABLE_ESPERA = "JII_CACHE_COMPARTIDA_ESPERA"
+VARIABLE_CLAVE = "JII_CACHE_COMPARTIDA_CLAVE"
+ESPERA_DEFECTO = 30
+
+DIRECTORIO_DEFECTO = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "jii"
+RUTA_SQLITE_DEFECTO = DIRECTORIO_DEFECTO / "cache.sqlite"
+
+# Pausa entre revisiones mientras otro proceso calcula una clave
+SONDEO = 0.05
+
+FORMATO_ARROW = b"A"
+FORMATO_PICKLE = b"P"
+LARGO_FIRMA = hashlib.sha256().digest_size
+
+
+class FirmaInvalida(ValueError):
+    """Entrada de la caché compartida sin firma válida (corrupta o escrita por otro)"""
+
+
+def espera() -> float:
+    """Segundos que un proceso espera a que otro calcule una clave"""
+    return float(os.getenv(VARIABLE_ESPERA, ESPERA_DEFECTO))
+
+
+def clave_texto(cache: str, clave) -> str:
+    """Clave estable entre procesos: las tuplas de la caché en memoria no se pueden compartir tal cual"""
+    return f"jii:{cache}:" + hashlib.sha1(repr(clave).encode("utf-8")).hexdigest()
+
+
+# ============================
+# Serialización
+# ============================
+
+def _firmar(clave: bytes, *partes) -> bytes:
+    firma = hmac.new(clave, digestmod=hashlib.sha256)
+    for parte in partes:
+        firma.update(parte)
+    return firma.digest()
+
+
+def serializar(valor, clave: bytes) -> bytes:
+    """
+    Entrada firmada: formato (1 byte), firma HMAC-SHA256 del formato y el cuerpo, cuerpo
+
+    El cuerpo es el DataFrame en Arrow IPC si se puede; cualquier otro valor con pickle.
+    """
+    formato, cuerpo = _cuerpo(valor)
+    return formato + _firmar(clave, formato, cuerpo) + cuerpo
+
+
+def _cuerpo(valor) -> tuple:
+    if ARROW_DISPONIBLE and isinstance(valor, pd.DataFrame):
+        import pyarrow as pa
+
+        try:
+            tabla = pa.Table.from_pandas(valor, preserve_index=True)
+        except (pa.ArrowException, TypeError, ValueError):
+            # Columnas object con tipos mezclados: Arrow no las representa
+            pass
+        else:
+            destino = pa.BufferOutputStream()
+            with pa.ipc.new_stream(destino, tabla.schema) as escritor:
+                escritor.write_table(tabla)
+            return FORMATO_ARROW, destino.getvalue().to_pybytes()
+    return FORMATO_PICKLE, pickle.dumps(valor, protocol=5)
+
+
+def deserializar(datos: bytes, clave: bytes):
+    """
+    Valor de una entrada de serializar()
+
+    Raises:
+        FirmaInvalida: Si la firma no corresponde a la clave; el cuerpo no se lee
+    """
+    vista = memoryview(datos)
+    formato, firma, cuerpo = datos[:1], vista[1:1 + LARGO_FIRMA], vista[1 + LARGO_FIRMA:]
+    esperada = _firmar(clave, formato, cuerpo)
+    if len(firma) != LARGO_FIRMA or not hmac.compare_digest(esperada, bytes(firma)):
+        raise FirmaInvalida("Entrada de la caché compartida con firma inválida")
+    if formato == FORMATO_ARROW:
+        import pyarrow as pa
+
+        return pa.ipc.open_stream(pa.py_buffer(cuerpo)).read_all().to_pandas()
+    return pickle.load(io.BytesIO(cuerpo))
+
+
+# ============================
+# Archivos privados
+# ============================
+
+def _privado(ruta: Path):
+    """
+    Crea el archivo (si no existe) solo legible por este usuario y comprueba que nadie más
+    lo controle
+
+    Raises:
+        PermissionError: Si el archivo es de otro usuario o lo pueden escribir otros
+    """
+    ruta.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    os.close(os.open(ruta, os.O_CREAT | os.O_RDWR, 0o600))
+    estado = ruta.stat()
+    if hasattr(os, "getuid") and estado.st_uid != os.getuid():
+        raise PermissionError(f"{ruta} es de otro usuario")
+    if estado.st_mode & 0o022:
+        raise PermissionError(f"Otros usuarios pueden escribir en {ruta}")
+    os.chmod(ruta, 0o600)
+
+
+def clave_firma(ruta_clave: Path = None):
+    """
+    Clave de las firmas: JII_CACHE_COMPARTIDA_CLAVE o, si no está y se indica
+    ruta_clave, una clave aleatoria guardada en ese archivo (0600)
+
+    Returns:
+        Bytes de la clave, o None si no hay ninguna
+    """
+    texto = os.getenv(VARIABLE_CLAVE)
+    if texto:
+        return texto.encode("utf-8")
+    if ruta_clave is None:
+        return None
+    _privado(ruta_clave)
+    clave = ruta_clave.read_bytes()
+    if not clave:
+        clave = secrets.token_bytes(32)
+        ruta_clave.write_bytes(clave)
+    return clave
+
+
+# ============================
+# Backends
+# ============================
+
+class BackendSQLite:
+    """
+    Caché en un archivo SQLite del host
+
+    Cada hilo abre su propia conexión; SQLite en modo WAL admite lectores en paralelo
+    con un escritor, y sus transacciones hacen atómico el cerrojo de cada clave. El
+    archivo y la clave de las firmas (<archivo>.clave) quedan con permisos 0600.
+    """
+
+    def __init__(self, ruta=None):
+        self.ruta = Path(ruta or RUTA_SQLITE_DEFECTO)
+        _privado(self.ruta)
+        self.clave = clave_firma(self.ruta.with_name(self.ruta.name + ".clave"))
+        self._local = threading.local()
+        with self._conexion() as conexion:
+            conexion.execute(
+                "CREATE TABLE IF NOT EXISTS entradas ("
+                "clave TEXT PRIMARY KEY, momento REAL, version TEXT, datos BLOB)"
+            )
+            conexion.execute("CREATE TABLE IF NOT EXISTS cerrojos (clave TEXT PRIMARY KEY, vence REAL)")
+
+    def _conexion(self) -> sqlite3.Connection:
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexion = conexion
+        return conexion
+
+    def leer(self, clave: str):
+        """(momento, versión, datos) de la entrada o None"""
+        return self._conexion().execute(
+            "SELECT momento, version, datos FROM entradas WHERE clave = ?", (clave,)
+        ).fetchone()
+
+    def escribir(self, clave: str, momento: float, version: str, datos: bytes):
+        self._conexion().execute(
+            "INSERT OR REPLACE INTO entradas (clave, momento, version, datos) VALUES (?, ?, ?, ?)",
+            (clave, momento, version, sqlite3.Binary(datos)),
+        )
+
+    def bloquear(self, clave: str, segundos: float) -> bool:
+        """Toma el cerrojo de la clave si nadie lo tiene (o si venció)"""
+        ahora = time.time()
+        conexion = self._conexion()
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            fila = conexion.execute("SELECT vence FROM cerrojos WHERE clave = ?", (clave,)).fetchone()
+            if fila is not None and fila[0] > ahora:
+                return False
+            conexion.execute("INSERT OR REPLACE INTO cerrojos (clave, vence) VALUES (?, ?)", (clave, ahora + segundos))
+            return True
+        finally:
+            conexion.execute("COMMIT")
+
+    def liberar(self, clave: str):
+        self._conexion().execute("DELETE FROM cerrojos WHERE clave = ?", (clave,))
+
+    def limpiar(self):
+        conexion = self._conexion()
+        conexion.execute("DELETE FROM entradas")
+        conexion.execute("DELETE FROM cerrojos")
+
+    def __repr__(self):
+        return f"<BackendSQLite {self.ruta}>"
+
+
+class BackendRedis:
+    """
+    Caché en un servidor compatible con Redis
+
+    Args:
+        url: URL del servidor (redis://host:puerto/db)
+        cliente: Cliente ya creado con la interfaz de redis-py (get/set/delete/hset/
+            hgetall); permite usar un sustituto local en pruebas
+        clave: Clave de las firmas (por defecto JII_CACHE_COMPARTIDA_CLAVE)
+
+    Raises:
+        ValueError: Si no hay clave de firmas
+    """
+
+    def __init__(self, url: str = None, cliente=None, clave: bytes = None):
+        self.clave = clave or clave_firma()
+        if not self.clave:
+            raise ValueError(f"La caché compartida en Redis necesita {VARIABLE_CLAVE}")
+        if cliente is None:
+            import redis
+
+            cliente = redis.Redis.from_url(url)
+        self.cliente = cliente
+
+    def leer(self, clave: str):
+        entrada = self.cliente.hgetall(clave)
+        if not entrada:
+            return None
+        version = entrada.get(b"version", b"")
+        return float(entrada[b"momento"]), version.decode("utf-8") if version else None, entrada[b"datos"]
+
+    def escribir(self, clave: str, momento: float, version: str, datos: bytes):
+        self.cliente.hset(clave, mapping={"momento": repr(momento), "version": version or "", "datos": datos})
+
+    def bloquear(self, clave: str, segundos: float) -> bool:
+        return bool(self.cliente.set(f"{clave}:cerrojo", b"1", nx=True, px=int(segundos * 1000)))
+
+    def liberar(self, clave: str):
+        self.cliente.delete(f"{clave}:cerrojo")
+
+    def limpiar(self):
+        claves = list(self.cliente.scan_iter("jii:*"))
+        if claves:
+            self.cliente.delete(*claves)
+
+    def __repr__(self):
+        return f"<BackendRedis {self.cliente!r}>"
+
+
+def crear_backend(configuracion: str = None):
+    """
+    Backend indicado en JII_CACHE_COMPARTIDA (o en configuracion)
+
+    Returns:
+        BackendSQLite, BackendRedis o None si no se configuró o no se puede abrir
+    """
+    configuracion = configuracion if configuracion is not None else os.getenv(VARIABLE_COMPARTIDA, "")
+    if not configuracion:
+        return None
+    try:
+        if configuracion.startswith(("redis://", "rediss://", "unix://")):
+            if not REDIS_DISPONIBLE:
+                logger.warning("%s apunta a Redis pero el paquete redis no está instalado", VARIABLE_COMPARTIDA)
+                return None
+            return BackendRedis(configuracion)
+        if configuracion == "sqlite":
+            return BackendSQLite()
+        if configuracion.startswith("sqlite:///"):
+            return BackendSQLite(configuracion[len("sqlite://"):])
+    except Exception:
+        logger.exception("No se pudo abrir la caché compartida %s", configuracion)
+        return None
+    logger.warning("Valor no reconocido en %s: %s", VARIABLE_COMPARTIDA, configuracion)
+    return None
+
+
+# ============================
+# Caché compartida
+# ============================
+
+class CacheCompartida:
+    """
+    Segundo nivel de una CacheTTL compartido entre procesos
+
+    Args:
+        nombre: Nombre de la caché en memoria (forma parte de la clave)
+        backend: BackendSQLite o BackendRedis
+    """
+
+    def __init__(self, nombre: str, backend):
+        self.nombre = nombre
+        self.backend = backend
+
+    def obtener(self, clave, ttl: float, version=None, desde: float = None):
+        """
+        Valor vigente guardado por cualquier proceso
+
+        Args:
+            clave: Clave de la caché en memoria
+            ttl: Vigencia máxima de las entradas, tengan o no versión
+            version: Versión de los datos de entrada (ver utils/versiones.py)
+            desde: Solo se acepta una entrada guardada después de este momento (time.time())
+
+        Returns:
+            Tupla (valor, momento) o None si no hay una entrada vigente
+        """
+        texto = clave_texto(self.nombre, clave)
+        try:
+            entrada = self.backend.leer(texto)
+        except Exception:
+            logger.warning("No se pudo leer la caché compartida", exc_info=True)
+            return None
+        if entrada is None:
+            return None
+        momento, guardada, datos = entrada
+        if desde is not None and momento <= desde:
+            return None
+        if version is not None and guardada != repr(version):
+            return None
+        if time.time() - momento >= ttl:
+            return None
+        try:
+            return deserializar(datos, self.backend.clave), momento
+        except FirmaInvalida:
+            # Se trata como ausente: el siguiente cálculo la reemplaza con una entrada firmada
+            logger.warning("Entrada %s de la caché compartida con firma inválida; se ignora", texto)
+            return None
+
+    def guardar(self, clave, valor, version=None):
+        try:
+            self.backend.escribir(
+                clave_texto(self.nombre, clave), time.time(),
+                repr(version) if version is not None else None, serializar(valor, self.backend.clave),
+            )
+        except Exception:
+            logger.warning("No se pudo escribir en la caché compartida", exc_info=True)
+
+    def calcular_una_vez(self, clave, calcular, ttl: float, version=None, desde: float = None):
+        """
+        Valor de la clave calculado por un solo proceso
+
+        Si otro proceso ya lo está calculando, espera su resultado; si no llega a
+        tiempo (o el backend falla) lo calcula este proceso.
+
+        Returns:
+            Tupla (valor, acierto) donde acierto indica que lo calculó otro proceso
+        """
+        texto = clave_texto(self.nombre, clave)
+        limite = time.monotonic() + espera()
+        while True:
+            try:
+                propio = self.backend.bloquear(texto, espera())
+            except Exception:
+                logger.warning("No se pudo tomar el cerrojo de la caché compartida", exc_info=True)
+                return calcular(), False
+            if propio:
+                break
+            time.sleep(SONDEO)
+            hallado = self.obtener(clave, ttl, version, desde)
+            if hallado is not None:
+                return hallado[0], True
+            if time.monotonic() >= limite:
+                return calcular(), False
+
+        try:
+            # Otro proceso pudo terminar entre la lectura y el cerrojo
+            hallado = self.obtener(clave, ttl, version, desde)
+            if hallado is not None:
+                return hallado[0], True
+            valor = calcular()
+            self.guardar(clave, valor, version)
+            return valor, False
+        finally:
+            try:
+                self.backend.liberar(texto)
+            except Exception:
+                logger.warning("No se pudo liberar el cerrojo de la caché compartida", exc_info=True)
+
+    def limpiar(self):
+        try:
+            self.backend.limpiar()
+        except Exception:
+            logger.warning("No se pudo vaciar la caché compartida", exc_info=True)
@@ -0,0 +1,343 @@
+"""
+Conexión a Supabase del Dashboard JII
+Fábrica única del cliente de Supabase para la aplicación, los CLI y los hilos de
+fondo. Todas las consultas comparten un pool de conexiones HTTP (keep-alive y
+HTTP/2 si está disponible) con timeouts por petición, y las lecturas se reintentan
+ante fallas transitorias con backoff exponencial con jitter.
+
+Las credenciales se leen de st.secrets (Streamlit Cloud) o de las variables de
+entorno / archivo .env:
+    SUPABASE_URL, SUPABASE_KEY
+
+Configuración del pool y los reintentos (variables de entorno):
+    JII_HTTP_TIMEOUT           Segundos máximos de lectura por petición (por defecto 10)
+    JII_HTTP_TIMEOUT_CONEXION  Segundos máximos para abrir una conexión (por defecto 3)
+    JII_HTTP_CONEXIONES        Conexiones simultáneas en el pool (por defecto 20)
+    JII_HTTP_KEEPALIVE         Conexiones ociosas que se mantienen abiertas (por defecto 10)
+    JII_HTTP2                  "0" desactiva HTTP/2 (por defecto activo si h2 está instalado)
+    JII_REINTENTOS             Reintentos de una lectura fallida (por defecto 3)
+    JII_BACKOFF_BASE           Espera base en segundos antes del primer reintento (por defecto 0.2)
+    JII_BACKOFF_MAX            Espera máxima en segundos entre reintentos (por defecto 5)
+    JII_CIRCUITO_FALLAS        Fallas transitorias seguidas que abren el circuito (por defecto 5)
+    JII_CIRCUITO_ESPERA        Segundos que el circuito queda abierto antes de probar (por defecto 30)
+
+Con el circuito abierto las consultas fallan de inmediato con CircuitoAbierto en
+lugar de esperar timeouts, y las cachés siguen sirviendo el último valor bueno.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from dotenv import load_dotenv
+
+from utils.arranque import disponible
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+# Cargar variables de entorno
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+CONFIGURACION_DEFECTO = {
+    "timeout": 10.0,
+    "timeout_conexion": 3.0,
+    "conexiones": 20,
+    "keepalive": 10,
+    "keepalive_expira": 30.0,
+    "http2": True,
+    "reintentos": 3,
+    "backoff_base": 0.2,
+    "backoff_max": 5.0,
+    "circuito_fallas": 5,
+    "circuito_espera": 30.0,
+}
+
+_VARIABLES = {
+    "timeout": ("JII_HTTP_TIMEOUT", float),
+    "timeout_conexion": ("JII_HTTP_TIMEOUT_CONEXION", float),
+    "conexiones": ("JII_HTTP_CONEXIONES", int),
+    "keepalive": ("JII_HTTP_KEEPALIVE", int),
+    "http2": ("JII_HTTP2", lambda v: v != "0"),
+    "reintentos": ("JII_REINTENTOS", int),
+    "backoff_base": ("JII_BACKOFF_BASE", float),
+    "backoff_max": ("JII_BACKOFF_MAX", float),
+    "circuito_fallas": ("JII_CIRCUITO_FALLAS", int),
+    "circuito_espera": ("JII_CIRCUITO_ESPERA", float),
+}
+
+_lock = threading.Lock()
+_cliente = None
+_cliente_http = None
+
+
+def configuracion() -> dict:
+    """Configuración del pool y los reintentos: valores por defecto sobrescritos por el entorno"""
+    config = dict(CONFIGURACION_DEFECTO)
+    for clave, (variable, tipo) in _VARIABLES.items():
+        valor = os.getenv(variable)
+        if valor:
+            config[clave] = tipo(valor)
+    # HTTP/2 necesita el paquete h2 (pip install "httpx[http2]")
+    config["http2"] = config["http2"] and disponible("h2")
+    return config
+
+
+def credenciales() -> tuple:
+    """
+    URL y llave de Supabase desde st.secrets o el entorno
+
+    Returns:
+        Tupla (url, key); cualquiera puede ser None si no está configurada
+    """
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_KEY")
+    try:
+        import streamlit as st
+        url = st.secrets.get("SUPABASE_URL") or url
+        key = st.secrets.get("SUPABASE_KEY") or key
+    except Exception:
+        # Sin secrets.toml (ejecución local o CLI): solo variables de entorno
+        pass
+    return url, key
+
+
+def cliente_http():
+    """Cliente httpx compartido por el proceso (pool de conexiones con keep-alive)"""
+    global _cliente_http
+    with _lock:
+        if _cliente_http is None:
+            import httpx
+
+            config = configuracion()
+            _cliente_http = httpx.Client(
+                http2=config["http2"],
+                timeout=httpx.Timeout(config["timeout"], connect=config["timeout_conexion"]),
+                limits=httpx.Limits(
+                    max_connections=config["conexiones"],
+                    max_keepalive_connections=config["keepalive"],
+                    keepalive_expiry=config["keepalive_expira"],
+                ),
+            )
+        return _cliente_http
+
+
+def get_supabase_client() -> "Client":
+    """
+    Crea (una sola vez por proceso) y retorna el cliente de Supabase
+
+    Raises:
+        RuntimeError: Si faltan SUPABASE_URL o SUPABASE_KEY
+    """
+    global _cliente
+    if _cliente is not None:
+        return _cliente
+
+    # Importación diferida: con la fuente local nunca se carga el cliente de Supabase
+    from supabase import create_client
+    from supabase.lib.client_options import SyncClientOptions
+
+    url, key = credenciales()
+    if not url or not key:
+        raise RuntimeError("Faltan credenciales de Supabase. Configura SUPABASE_URL y SUPABASE_KEY en el archivo .env")
+
+    http = cliente_http()
+    with _lock:
+        if _cliente is None:
+            _cliente = create_client(url, key, options=SyncClientOptions(httpx_client=http))
+    return _cliente
+
+
+def reiniciar_cliente():
+    """
+    Descarta el cliente de Supabase, el pool HTTP y el estado del circuito
+
+    El siguiente get_supabase_client los vuelve a crear con las credenciales y la
+    configuración actuales (p. ej. para apuntar a utils/supabase_simulado.py).
+    """
+    global _cliente, _cliente_http
+    with _lock:
+        if _cliente_http is not None:
+            _cliente_http.close()
+        _cliente = None
+        _cliente_http = None
+    circuito.reiniciar()
+
+
+def es_transitorio(error: Exception) -> bool:
+    """True si vale la pena reintentar: timeouts, conexiones caídas y errores 5xx o 429"""
+    import httpx
+
+    if isinstance(error, (httpx.TimeoutException, httpx.TransportError)):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500 or error.response.status_code == 429
+
+    # postgrest.APIError: código HTTP en el mensaje cuando la respuesta no es JSON
+    codigo = str(getattr(error, "code", "") or "")
+    return codigo.isdigit() and (int(codigo) >= 500 or int(codigo) == 429)
+
+
+def espera_backoff(intento: int, config: dict = None) -> float:
+    """Espera antes del reintento `intento` (desde 0): exponencial con jitter completo"""
+    config = config or configuracion()
+    return random.uniform(0, min(config["backoff_max"], config["backoff_base"] * 2 ** intento))
+
+
+class CircuitoAbierto(RuntimeError):
+    """La fuente falló repetidamente y no se le envían peticiones por un tiempo"""
+
+
+class Circuito:
+    """
+    Circuit breaker de las lecturas a Supabase
+
+    Cerrado: las peticiones pasan. Tras `fallas` fallas transitorias seguidas se abre
+    y rechaza las peticiones durante `espera` segundos; después pasa a semiabierto y
+    deja pasar una sola petición de prueba, que lo cierra si tiene éxito o lo vuelve
+    a abrir si falla.
+    """
+
+    CERRADO = "cerrado"
+    ABIERTO = "abierto"
+    SEMIABIERTO = "semiabierto"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.estado = self.CERRADO
+        self.fallas = 0
+        self.abierto_desde = None
+        self.aperturas = 0
+        self._probando = False
+
+    def permitir(self, config: dict):
+        """
+        Verifica que se pueda enviar una petición
+
+        Raises:
+            CircuitoAbierto: Si el circuito está abierto o ya hay una prueba en curso
+        """
+        with self._lock:
+            if self.estado == self.ABIERTO:
+                restante = config["circuito_espera"] - (time.monotonic() - self.abierto_desde)
+                if restante > 0:
+                    raise CircuitoAbierto(f"Supabase no responde; siguiente intento en {restante:.0f} s")
+                self.estado = self.SEMIABIERTO
+            if self.estado == self.SEMIABIERTO:
+                if self._probando:
+                    raise CircuitoAbierto("Supabase no responde; probando la conexión")
+                self._probando = True
+
+    def exito(self):
+        with self._lock:
+            if self.estado != self.CERRADO:
+                logger.info("Circuito de Supabase cerrado")
+            self.estado = self.CERRADO
+            self.fallas = 0
+            self._probando = False
+
+    def falla(self, config: dict):
+        with self._lock:
+            self.fallas += 1
+            self._probando = False
+            if self.estado == self.SEMIABIERTO or self.fallas >= config["circuito_fallas"]:
+                if self.estado != self.ABIERTO:
+                    self.aperturas += 1
+                    logger.warning("Circuito de Supabase abierto tras %d fallas seguidas", self.fallas)
+                self.estado = self.ABIERTO
+                self.abierto_desde = time.monotonic()
+
+    def liberar(self):
+        """Libera la prueba de semiabierto cuando la petición falló por un error no transitorio"""
+        with self._lock:
+            self._probando = False
+
+    def reiniciar(self):
+        with self._lock:
+            self.estado = self.CERRADO
+            self.fallas = 0
+            self.abierto_desde = None
+            self._probando = False
+
+
+circuito = Circuito()
+
+
+def estado_circuito() -> dict:
+    """Estado del circuit breaker para la página de Diagnóstico"""
+    config = configuracion()
+    restante = None
+    if circuito.estado == Circuito.ABIERTO:
+        restante = max(0.0, config["circuito_espera"] - (time.monotonic() - circuito.abierto_desde))
+    return {
+        "estado": circuito.estado,
+        "fallas_seguidas": circuito.fallas,
+        "aperturas": circuito.aperturas,
+        "reintento_en_s": restante,
+    }
+
+
+def con_reintentos(funcion, descripcion: str = "consulta"):
+    """
+    Ejecuta una lectura idempotente reintentando las fallas transitorias
+
+    Cada intento pasa por el circuit breaker: si el circuito está abierto la lectura
+    falla de inmediato y no se sigue reintentando.
+
+    Args:
+        funcion: Función sin argumentos que hace la petición
+        descripcion: Texto para el log de reintentos
+
+    Returns:
+        Tupla (resultado, reintentos)
+
+    Raises:
+        CircuitoAbierto: Si el circuito está abierto
+        La última excepción si se agotan los reintentos o si el error no es transitorio
+    """
+    config = configuracion()
+    # postgrest-py (2.x reciente) reintenta por su cuenta los 503/520 con esperas de 1, 2 y 4 s,
+    # fuera del circuito y del backoff configurado: con Supabase caído una consulta tardaba ~28 s
+    # en 16 peticiones. Se desactiva para que los reintentos sean solo los de aquí.
+    consulta = getattr(funcion, "__self__", None)
+    if hasattr(consulta, "retry"):
+        consulta.retry(False)
+    for intento in range(config["reintentos"] + 1):
+        try:
+            circuito.permitir(config)
+        except CircuitoAbierto as e:
+            e.reintentos = intento
+            raise
+        try:
+            resultado = funcion()
+        except Exception as e:
+            transitorio = es_transitorio(e)
+            if transitorio:
+                circuito.falla(config)
+            else:
+                circuito.liberar()
+            if intento >= config["reintentos"] or not transitorio or circuito.estado == Circuito.ABIERTO:
+                # Para que las métricas cuenten también los reintentos de las consultas fallidas
+                e.reintentos = intento
+                raise
+            espera = espera_backoff(intento, config)
+            logger.warning("Reintentando %s en %.2f s (%s: %s)", descripcion, espera, type(e).__name__, e)
+            time.sleep(espera)
+        else:
+            circuito.exito()
+            return resultado, intento
+
+
+def test_connection() -> bool:
+    """Prueba la conexión a Supabase con una consulta mínima"""
+    try:
+        con_reintentos(lambda: get_supabase_client().table("participantes").select("id").limit(1).execute())
+        return True
+    except Exception:
+        logger.exception("Error de conexión a Supabase")
+        return False
@@ -0,0 +1,332 @@
+"""
+Generador de datos sintéticos para el Dashboard JII 2025
+Produce tablas con el mismo esquema que Supabase a escala configurable
+para medir el comportamiento de las páginas con volúmenes grandes.
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.ediciones import EDICION_BASE
+from utils.fuente_local import carpeta_edicion
+from utils.preguntas_encuesta import obtener_preguntas
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Volúmenes de la edición real (escala = 1)
+BASE_PARTICIPANTES = 455
+BASE_ASISTENCIAS_POR_PARTICIPANTE = 2.3
+BASE_INSCRIPCIONES_WORKSHOP = 254
+BASE_EQUIPOS = 20
+PROPORCION_ENCUESTA = 0.6
+
+INICIO_REGISTRO = pd.Timestamp("2025-09-22 12:00:00")
+
+CATEGORIAS = ["Estudiante", "Docente", "Asistente Externo", "Ponente", "Staff"]
+PESOS_CATEGORIAS = [0.89, 0.03, 0.03, 0.025, 0.025]
+
+PROGRAMAS = [
+    "Ingeniería Industrial",
+    "Ingeniería en Logística y Cadena de Suministro",
+    "Ingeniería en Datos e Inteligencia Organizacional",
+    "Ingeniería en Inteligencia Artificial",
+    "Ingeniería Ambiental",
+    "Ingeniería en Industrias Alimentarias",
+]
+PESOS_PROGRAMAS = [0.70, 0.15, 0.09, 0.03, 0.02, 0.01]
+
+NOMBRES = [
+    "Diego", "Valeria", "Mario", "Montserrat", "Edwin", "Melina", "Gabriel", "Ana",
+    "Jonathan", "Tomas", "Néstor", "Daniela", "Luis", "Fernanda", "Carlos", "Sofía",
+]
+APELLIDOS = [
+    "Gomez", "Tamay", "Pat", "Rosas", "Estrada", "Aguayo", "Quijano", "Cabrera",
+    "Esquivel", "Soberanis", "Yañez", "Hau", "Coronado", "Mejia", "Ortiz", "Pinzon",
+]
+
+ESTADOS_INSCRIPCION = ["inscrito", "cancelado", "lista_espera"]
+PESOS_ESTADOS_INSCRIPCION = [0.63, 0.22, 0.15]
+
+ESTADOS_MEXICO = 32
+
+# Fragmentos para componer respuestas abiertas con vocabulario realista
+FRAGMENTOS_POSITIVOS = [
+    "las conferencias fueron muy interesantes",
+    "me gustó mucho el workshop de inventarios",
+    "la organización fue excelente",
+    "los ponentes tenían mucha experiencia",
+    "aprendí herramientas útiles para mi carrera",
+    "el foro de egresados fue inspirador",
+    "buena convivencia con otros estudiantes",
+]
+FRAGMENTOS_NEGATIVOS = [
+    "los horarios se empalmaron con clases",
+    "no me gustó que el auditorio estuviera lleno",
+    "faltó tiempo para preguntas",
+    "el sonido del auditorio era malo",
+    "algunas actividades empezaron tarde",
+    "hubo poca difusión del evento",
+]
+FRAGMENTOS_TEMAS = [
+    "manufactura esbelta", "ciencia de datos", "cadena de suministro",
+    "inteligencia artificial en la industria", "seis sigma", "simulación de procesos",
+    "sostenibilidad", "ergonomía", "logística internacional", "automatización",
+]
+FRAGMENTOS_SUGERENCIAS = [
+    "mejorar la difusión en redes sociales",
+    "más workshops prácticos",
+    "ampliar el cupo de los talleres",
+    "respetar los horarios del programa",
+    "invitar a más empresas de la región",
+    "dar constancias digitales",
+]
+RAZONES_ASISTENCIA = [
+    "Por puntos de actividades complementarias",
+    "Interés en los temas",
+    "Recomendación de un profesor",
+    "Networking con egresados",
+]
+
+
+def _actividades() -> pd.DataFrame:
+    """Catálogo de actividades; se toma del CSV real porque no crece con la escala"""
+    return pd.read_csv(ROOT / "datos" / "actividades.csv")
+
+
+def _nombres(rng: np.random.Generator, n: int) -> np.ndarray:
+    nombres = rng.choice(NOMBRES, n)
+    ap1 = rng.choice(APELLIDOS, n)
+    ap2 = rng.choice(APELLIDOS, n)
+    return (pd.Series(nombres) + " " + ap1 + " " + ap2).to_numpy()
+
+
+def _fechas(rng: np.random.Generator, inicio: pd.Timestamp, horas: float, n: int) -> pd.Series:
+    segundos = rng.uniform(0, horas * 3600, n).astype("int64")
+    return (inicio + pd.to_timedelta(segundos, unit="s")).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _generar_participantes(rng: np.random.Generator, n: int) -> pd.DataFrame:
+    ids = np.arange(1, n + 1)
+    generacion = rng.integers(18, 26, n)
+    institucional = rng.random(n) < 0.88
+    emails = np.where(
+        institucional,
+        pd.Series(generacion).astype(str) + pd.Series(ids).astype(str).str.zfill(7) + "@ucaribe.edu.mx",
+        "usuario" + pd.Series(ids).astype(str) + "@gmail.com",
+    )
+    brazalete = np.where(rng.random(n) < 0.77, ids, np.nan)
+    return pd.DataFrame({
+        "id": ids,
+        "nombre_completo": _nombres(rng, n),
+        "email": emails,
+        "telefono": rng.integers(9_980_000_000, 9_989_999_999, n),
+        "categoria": rng.choice(CATEGORIAS, n, p=PESOS_CATEGORIAS),
+        "programa": rng.choice(PROGRAMAS, n, p=PESOS_PROGRAMAS),
+        "brazalete": brazalete,
+        "encuesta_completada": rng.random(n) < PROPORCION_ENCUESTA,
+        "created_at": _fechas(rng, INICIO_REGISTRO, 72, n),
+    })
+
+
+def _generar_asistencias(
+    rng: np.random.Generator, participantes: pd.DataFrame, actividades: pd.DataFrame, n: int
+) -> pd.DataFrame:
+    # Popularidad relativa observada en la edición real
+    popularidad = actividades["cupo_maximo"].to_numpy(dtype=float)
+    popularidad = popularidad / popularidad.sum()
+    idx_act = rng.choice(len(actividades), n, p=popularidad)
+    idx_part = rng.integers(0, len(participantes), n)
+
+    inicio = pd.to_datetime(actividades["fecha_inicio"]).to_numpy()[idx_act]
+    retraso = pd.to_timedelta(rng.integers(-600, 2400, n), unit="s")
+    fechas = pd.Series(inicio + retraso).dt.strftime("%Y-%m-%d %H:%M:%S")
+
+    return pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "participante_email": participantes["email"].to_numpy()[idx_part],
+        "actividad_codigo": actividades["codigo"].to_numpy()[idx_act],
+        "estado": "registrado",
+        "modo_asistencia": "self",
+        "fecha_asistencia": fechas,
+        "notas": None,
+        "created_at": fechas,
+    })
+
+
+def _generar_inscripciones(
+    rng: np.random.Generator, participantes: pd.DataFrame, actividades: pd.DataFrame, n: int
+) -> pd.DataFrame:
+    workshops = actividades[actividades["tipo"] == "Workshop"].reset_index(drop=True)
+    idx_ws = rng.integers(0, len(workshops), n)
+    idx_part = rng.integers(0, len(participantes), n)
+    return pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "participante_email": participantes["email"].to_numpy()[idx_part],
+        "participante_nombre": participantes["nombre_completo"].to_numpy()[idx_part],
+        "participante_telefono": participantes["telefono"].to_numpy()[idx_part],
+        "actividad_codigo": workshops["codigo"].to_numpy()[idx_ws],
+        "actividad_titulo": workshops["titulo"].to_numpy()[idx_ws],
+        "estado": rng.choice(ESTADOS_INSCRIPCION, n, p=PESOS_ESTADOS_INSCRIPCION),
+        "creado": _fechas(rng, INICIO_REGISTRO, 32, n),
+    })
+
+
+def _generar_equipos(rng: np.random.Generator, participantes: pd.DataFrame, n: int) -> pd.DataFrame:
+    emails = participantes["email"].to_numpy()
+    miembros = rng.integers(0, len(participantes), (n, 6))
+    equipos = pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "nombre_equipo": "Equipo " + pd.Series(np.arange(1, n + 1)).astype(str),
+        "estado_id": rng.integers(1, ESTADOS_MEXICO + 1, n),
+        "email_capitan": emails[miembros[:, 0]],
+        "nombre_capitan": participantes["nombre_completo"].to_numpy()[miembros[:, 0]],
+        "telefono_capitan": participantes["telefono"].to_numpy()[miembros[:, 0]],
+    })
+    for i in range(1, 6):
+        equipos[f"email_miembro_{i}"] = emails[miembros[:, i]]
+    equipos["estado_registro"] = "pendiente"
+    equipos["activo"] = 1
+    equipos["fecha_registro"] = _fechas(rng, INICIO_REGISTRO, 57, n)
+    equipos["fecha_confirmacion"] = None
+    return equipos
+
+
+def _banco_respuestas(rng: np.random.Generator, pregunta: dict, actividades: pd.DataFrame, n: int = 200) -> np.ndarray:
+    """Banco de respuestas posibles para una pregunta; se muestrea por índice"""
+    tipo = pregunta["tipo"]
+    if tipo == "calificacion_1_5":
+        return np.array(["1", "2", "3", "4", "5"])
+    if tipo == "texto_corto":
+        return np.array(RAZONES_ASISTENCIA)
+    if tipo == "select_conferencia":
+        return actividades.loc[actividades["tipo"] == "Conferencia", "titulo"].to_numpy()
+    if tipo == "select_tipo_actividad":
+        return actividades["tipo"].unique()
+
+    if pregunta["id"] == 13:
+        fragmentos = [FRAGMENTOS_TEMAS]
+    elif pregunta["id"] == 14:
+        fragmentos = [FRAGMENTOS_SUGERENCIAS, FRAGMENTOS_NEGATIVOS]
+    elif pregunta["id"] == 12:
+        fragmentos = [FRAGMENTOS_NEGATIVOS]
+    else:
+        fragmentos = [FRAGMENTOS_POSITIVOS, FRAGMENTOS_NEGATIVOS]
+
+    banco = []
+    for _ in range(n):
+        partes = []
+        for _ in range(rng.integers(1, 4)):
+            grupo = fragmentos[rng.integers(0, len(fragmentos))]
+            partes.append(grupo[rng.integers(0, len(grupo))])
+        banco.append(", ".join(partes).capitalize() + ".")
+    return np.array(banco)
+
+
+def _generar_encuesta(
+    rng: np.random.Generator, participantes: pd.DataFrame, actividades: pd.DataFrame, preguntas: list
+) -> pd.DataFrame:
+    encuestados = participantes[participantes["encuesta_completada"]]
+    n_enc = len(encuestados)
+    bloques = []
+    inicio_encuesta = pd.Timestamp("2025-09-26 16:00:00")
+    timestamps = _fechas(rng, inicio_encuesta, 96, n_enc).to_numpy()
+    pesos_calificacion = [0.03, 0.05, 0.17, 0.35, 0.40]
+
+    for pregunta in preguntas:
+        banco = _banco_respuestas(rng, pregunta, actividades)
+        if pregunta["tipo"] == "calificacion_1_5":
+            respuestas = banco[rng.choice(5, n_enc, p=pesos_calificacion)]
+        else:
+            respuestas = banco[rng.integers(0, len(banco), n_enc)]
+        bloques.append(pd.DataFrame({
+            "participante_email": encuestados["email"].to_numpy(),
+            "nombre_completo": encuestados["nombre_completo"].to_numpy(),
+            "pregunta_id": pregunta["id"],
+            "pregunta_texto": pregunta["texto"],
+            "respuesta": respuestas,
+            "timestamp": timestamps,
+        }))
+
+    encuesta = pd.concat(bloques, ignore_index=True)
+    encuesta.insert(0, "id", np.arange(1, len(encuesta) + 1))
+    return encuesta
+
+
+def generar_datos(escala: float = 1.0, semilla: int = 2025, edicion: int = EDICION_BASE) -> dict:
+    """
+    Genera todas las tablas del evento con el esquema de Supabase
+
+    Args:
+        escala: Multiplicador respecto al volumen de la edición real
+        semilla: Semilla del generador aleatorio para reproducibilidad
+        edicion: Año de la edición; define el cuestionario y la columna edicion
+
+    Returns:
+        Diccionario {nombre_tabla: DataFrame}
+    """
+    rng = np.random.default_rng(semilla)
+    actividades = _actividades()
+
+    n_participantes = max(1, int(BASE_PARTICIPANTES * escala))
+    participantes = _generar_participantes(rng, n_participantes)
+    asistencias = _generar_asistencias(
+        rng, participantes, actividades, int(n_participantes * BASE_ASISTENCIAS_POR_PARTICIPANTE)
+    )
+
+    tablas = {
+        "participantes": participantes,
+        "actividades": actividades,
+        "asistencias": asistencias,
+        "inscripciones_workshop": _generar_inscripciones(
+            rng, participantes, actividades, max(1, int(BASE_INSCRIPCIONES_WORKSHOP * escala))
+        ),
+        "equipos_concurso": _generar_equipos(rng, participantes, max(1, int(BASE_EQUIPOS * escala))),
+        "encuesta_respuestas": _generar_encuesta(rng, participantes, actividades, obtener_preguntas(edicion)),
+    }
+    for df in tablas.values():
+        df["edicion"] = edicion
+    return tablas
+
+
+def guardar_csv(tablas: dict, directorio) -> Path:
+    """
+    Escribe las tablas en CSV con el mismo formato que la carpeta datos/
+
+    Args:
+        tablas: Diccionario {nombre_tabla: DataFrame}
+        directorio: Carpeta de destino (se crea si no existe)
+
+    Returns:
+        Ruta de la carpeta escrita
+    """
+    destino = Path(directorio)
+    destino.mkdir(parents=True, exist_ok=True)
+    for nombre, df in tablas.items():
+        df.to_csv(destino / f"{nombre}.csv", index=False)
+    return destino
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos de la JII a escala")
+    parser.add_argument("--escala", type=float, default=10.0, help="Multiplicador del volumen real")
+    parser.add_argument("--semilla", type=int, default=2025)
+    parser.add_argument("--edicion", type=int,
+                        help="Año de la edición; escribe en la partición edicion=<año>/ de la escala")
+    parser.add_argument("--salida", default="datos_sinteticos", help="Carpeta de salida")
+    args = parser.parse_args(argv)
+
+    tablas = generar_datos(args.escala, args.semilla, args.edicion or EDICION_BASE)
+    destino = Path(args.salida) / f"escala_{args.escala:g}"
+    if args.edicion:
+        destino = carpeta_edicion(destino, args.edicion)
+    destino = guardar_csv(tablas, destino)
+    for nombre, df in tablas.items():
+        print(f"{nombre}: {len(df):,} filas")
+    print(f"Datos escritos en {destino}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Artefactos derivados del Dashboard JII
+Resultados de utils/analitica.py calculados por edición a partir de las tablas
+de utils/supabase_client.py y guardados en la caché de derivados. Las páginas los
+piden aquí en lugar de recalcularlos en cada ejecución, y el precalentamiento los
+construye antes de que los pida una sesión.
+
+Cada artefacto declara las tablas de las que depende. Su entrada queda ligada a la
+versión de esas tablas, así que solo se recalcula cuando alguna de ellas cambia.
+"""
+
+import pandas as pd
+
+from utils import (
+    analitica, asignacion, audiencias, duplicados as deteccion_duplicados, embudo, identidades, matriz_calificaciones, temas,
+)
+from utils.cache import memoizar
+from utils.ediciones import ediciones_disponibles
+from utils.supabase_client import (
+    obtener_participantes,
+    obtener_actividades,
+    obtener_inscripciones_workshop,
+    obtener_registro_workshops,
+    obtener_asistencias,
+    obtener_equipos_concurso,
+    obtener_respuestas_encuesta,
+)
+
+# Tablas de las que depende cada artefacto: su caché se invalida cuando alguna cambia
+# (utils/versiones.py). obtener_inscripciones_workshop lee la tabla asistencias.
+TABLAS_ENCUESTA = ["encuesta_respuestas"]
+TABLAS_KPIS = ["participantes", "asistencias", "equipos_concurso", "encuesta_respuestas"]
+TABLAS_EMBUDO = ["participantes", "inscripciones_workshop", "asistencias", "encuesta_respuestas"]
+TABLAS_PERSONAS = TABLAS_EMBUDO + ["equipos_concurso"]
+
+
+def hasta_edicion(edicion: int) -> list:
+    """La edición y las anteriores: las que lee un artefacto que usa el historial"""
+    return [e for e in ediciones_disponibles() if e <= edicion]
+
+
+# ============================
+# Dashboard
+# ============================
+
+@memoizar(tablas=TABLAS_KPIS)
+def kpis(edicion: int) -> pd.DataFrame:
+    """Indicadores de participación de la edición (una fila)"""
+    return analitica.calcular_kpis(
+        obtener_participantes(edicion),
+        obtener_inscripciones_workshop(edicion),
+        obtener_equipos_concurso(edicion),
+        obtener_respuestas_encuesta(edicion=edicion),
+    )
+
+
+@memoizar(tablas=["asistencias"])
+def serie_asistencias(edicion: int) -> pd.DataFrame:
+    """Asistencias por hora o por día"""
+    return analitica.serie_temporal(obtener_asistencias(edicion), 'fecha_asistencia')
+
+
+@memoizar(tablas=["equipos_concurso"])
+def serie_equipos(edicion: int) -> pd.DataFrame:
+    """Registro de equipos por hora o por día"""
+    return analitica.serie_temporal(obtener_equipos_concurso(edicion), 'fecha_registro')
+
+
+# ============================
+# Identidades
+# ============================
+
+@memoizar(tablas=TABLAS_PERSONAS)
+def personas(edicion: int) -> pd.DataFrame:
+    """
+    persona_id de cada email que aparece en las tablas de la edición
+
+    Unifica los emails de una misma persona (mayúsculas, variantes de Gmail, correo
+    personal e institucional con el mismo teléfono o nombre); ver utils/identidades.py
+    """
+    return identidades.resolver(identidades.registros({
+        "participantes": obtener_participantes(edicion),
+        "inscripciones_workshop": obtener_registro_workshops(edicion),
+        "asistencias": obtener_asistencias(edicion),
+        "encuesta_respuestas": obtener_respuestas_encuesta(edicion=edicion),
+        "equipos_concurso": obtener_equipos_concurso(edicion),
+    }))
+
+
+# ============================
+# Embudo de conversión
+# ============================
+
+@memoizar(tablas=TABLAS_EMBUDO)
+def indice_embudo(edicion: int) -> embudo.IndiceEmbudo:
+    """
+    Índice del embudo inscripción → asistencia → encuesta
+
+    Se reconstruye solo si cambió alguna de sus tablas; la conversión por workshop,
+    programa y categoría y los no-shows de cada grupo se consultan en él sin cruces nuevos.
+    """
+    return embudo.indice_versionado(
+        edicion,
+        obtener_participantes(edicion),
+        obtener_registro_workshops(edicion),
+        obtener_asistencias(edicion),
+        obtener_respuestas_encuesta(edicion=edicion),
+    )
+
+
+# ============================
+# Lista de espera de los workshops
+# ============================
+
+@memoizar(tablas=TABLAS_EMBUDO, ediciones=hasta_edicion)
+def tasas_no_show(edicion: int) -> tuple:
+    """
+    Tasa de no-show de cada workshop según la asistencia registrada
+
+    Se estima con las ediciones anteriores que tienen asistencia a workshops; si no
+    hay ninguna, con la misma edición (sirve para revisar una edición ya pasada).
+    Se recalcula cuando cambian las tablas de cualquiera de esas ediciones.
+
+    Returns:
+        Tupla (Serie {actividad_codigo: tasa}, tasa global, ediciones usadas)
+    """
+    anteriores = [e for e in ediciones_disponibles() if e < edicion]
+    for candidatas in (anteriores, [edicion]):
+        historial = {e: indice_embudo(e).conversion("actividad_codigo") for e in candidatas}
+        historial = {e: c for e, c in historial.items() if not c.empty and c['asistieron'].sum() > 0}
+        if historial:
+            tasas, tasa_global = asignacion.tasas_no_show(pd.concat(historial.values(), ignore_index=True))
+            return tasas, tasa_global, tuple(historial)
+    return pd.Series(dtype=float), 0.0, ()
+
+
+@memoizar(tablas=TABLAS_EMBUDO + ["actividades"], ediciones=hasta_edicion)
+def asignacion_lista_espera(edicion: int, riesgo: float = asignacion.RIESGO_DEFECTO) -> asignacion.Asignacion:
+    """
+    Promociones de la lista de espera con el cupo de cada workshop y su tasa de no-show
+
+    Se recalcula cuando cambian las inscripciones, las actividades o la asistencia, de
+    esta edición o de las anteriores (de ellas salen las tasas de no-show).
+    """
+    tasas, tasa_global, _ = tasas_no_show(edicion)
+    return asignacion.construir_asignacion(
+        obtener_registro_workshops(edicion), obtener_actividades(edicion), tasas, tasa_global, riesgo
+    )
+
+
+# ============================
+# Audiencias compartidas (requieren SciPy)
+# ============================
+
+@memoizar(tablas=["asistencias"])
+def incidencia_asistencias(edicion: int) -> audiencias.Incidencia:
+    """Matriz dispersa participante × actividad de las asistencias (solo lectura)"""
+    return audiencias.construir_incidencia(obtener_asistencias(edicion))
+
+
+@memoizar(tablas=["asistencias"])
+def coasistencia(edicion: int) -> pd.DataFrame:
+    """Participantes en común de cada par de actividades; la diagonal es la audiencia"""
+    return audiencias.coasistencia(incidencia_asistencias(edicion))
+
+
+@memoizar(tablas=["asistencias"])
+def jaccard_actividades(edicion: int) -> pd.DataFrame:
+    """Similitud de Jaccard entre las audiencias de las actividades"""
+    return audiencias.jaccard(coasistencia(edicion))
+
+
+@memoizar(tablas=["asistencias", "actividades"])
+def pares_actividades(edicion: int) -> pd.DataFrame:
+    """Pares de actividades con audiencia en común y si sus horarios se empalman"""
+    return audiencias.pares_actividades(coasistencia(edicion), obtener_actividades(edicion))
+
+
+@memoizar(tablas=["asistencias", "equipos_concurso"])
+def afinidad_equipos(edicion: int) -> pd.DataFrame:
+    """Coincidencia en las sesiones de los integrantes de cada equipo del concurso"""
+    return audiencias.afinidad_equipos(incidencia_asistencias(edicion), obtener_equipos_concurso(edicion))
+
+
+# ============================
+# Análisis de encuesta
+# ============================
+
+@memoizar(tablas=TABLAS_ENCUESTA)
+def calificaciones(edicion: int) -> pd.DataFrame:
+    """Respuestas de calificación 1-5 con respuesta_num"""
+    respuestas = obtener_respuestas_encuesta(edicion=edicion, tipos=['calificacion_1_5'])
+    return analitica.filtrar_calificaciones(respuestas, edicion)
+
+
+@memoizar(tablas=TABLAS_ENCUESTA)
+def estadisticas_calificaciones(edicion: int) -> pd.DataFrame:
+    """Promedio, total y desviación estándar por pregunta de calificación"""
+    df_calificaciones = calificaciones(edicion)
+    if df_calificaciones.empty:
+        return pd.DataFrame(columns=['pregunta_id', 'pregunta_texto', 'promedio', 'total', 'desv_std'])
+    return analitica.estadisticas_calificacion(df_calificaciones)
+
+
+@memoizar(tablas=TABLAS_ENCUESTA)
+def promedios_categoria(edicion: int) -> pd.DataFrame:
+    """Promedio por categoría de pregunta (Generales, Workshop, ...)"""
+    return analitica.promedios_por_categoria(calificaciones(edicion), edicion)
+
+
+@memoizar(tablas=TABLAS_ENCUESTA)
+def matriz(edicion: int) -> matriz_calificaciones.MatrizCalificaciones:
+    """Matriz participante × pregunta de las calificaciones (int8 con máscara, solo lectura)"""
+    return matriz_calificaciones.construir_matriz(calificaciones(edicion))
+
+
+@memoizar(tablas=TABLAS_ENCUESTA)
+def correlaciones(edicion: int) -> pd.DataFrame:
+    """Correlación entre preguntas de calificación"""
+    return matriz_calificaciones.correlaciones(matriz(edicion))
+
+
+@memoizar(tablas=TABLAS_ENCUESTA)
+def alfa_cronbach(edicion: int) -> dict:
+    """Alfa de Cronbach de todas las preguntas de calificación"""
+    return matriz_calificaciones.alfa_cronbach(matriz(edicion))
+
+
+@memoizar(tablas=TABLAS_ENCUESTA)
+def impulsores(edicion: int) -> pd.DataFrame:
+    """Ranking de las preguntas que explican la calificación general"""
+    return matriz_calificaciones.impulsores_clave(matriz(edicion), edicion=edicion)
+
+
+# ============================
+# Análisis de sentimientos
+# ============================
+
+@memoizar(tablas=TABLAS_ENCUESTA)
+def texto_largo(edicion: int, duplicados: str = "incluir") -> pd.DataFrame:
+    """
+    Respuestas de texto largo anonimizadas y sin respuestas vacías
+
+    Args:
+        edicion: Año de la edición
+        duplicados: "incluir", "colapsar" o "excluir" las respuestas casi duplicadas
+            (ver utils/duplicados.py); el índice es siempre un subconjunto del de "incluir"
+    """
+    if duplicados != "incluir":
+        return deteccion_duplicados.filtrar_duplicados(texto_largo(edicion), duplicados_texto(edicion), duplicados)
+    respuestas = obtener_respuestas_encuesta(anonimizar=True, edicion=edicion, tipos=['texto_largo'])
+    return analitica.filtrar_texto_largo(respuestas, edicion)
+
+
+@memoizar(tablas=TABLAS_ENCUESTA)
+def duplicados_texto(edicion: int) -> pd.DataFrame:
+    """
+    Respuestas de texto largo casi duplicadas (MinHash + LSH)
+
+    Returns:
+        DataFrame [grupo, duplicado, mismo_participante, similitud] con el mismo índice que texto_largo(edicion)
+    """
+    return deteccion_duplicados.detectar_duplicados(texto_largo(edicion))
+
+
+@memoizar(tablas=TABLAS_ENCUESTA)
+def frecuencias(edicion: int, pregunta_id: int, top_n: int = 20, duplicados: str = "incluir") -> pd.DataFrame:
+    """Palabras más frecuentes en las respuestas de una pregunta de texto largo"""
+    df_texto = texto_largo(edicion, duplicados=duplicados)
+    if df_texto.empty:
+        return pd.DataFrame(columns=['Palabra', 'Frecuencia'])
+    return analitica.frecuencia_palabras(df_texto.loc[df_texto['pregunta_id'] == pregunta_id, 'respuesta'], top_n)
+
+
+@memoizar(tablas=TABLAS_ENCUESTA)
+def sentimiento(edicion: int, motor: str = analitica.MOTOR_DEFECTO) -> pd.DataFrame:
+    """
+    Sentimiento de todas las respuestas de texto largo
+
+    Args:
+        edicion: Año de la edición
+        motor: "lexico" o "textblob" (requiere TextBlob)
+
+    Returns:
+        DataFrame [sentimiento, polaridad, subjetividad] con el mismo índice que texto_largo(edicion)
+    """
+    df_texto = texto_largo(edicion)
+    if df_texto.empty:
+        return pd.DataFrame(columns=['sentimiento', 'polaridad', 'subjetividad'])
+    return analitica.analizar_sentimiento(df_texto['respuesta'], motor)
+
+
+@memoizar(tablas=TABLAS_ENCUESTA)
+def temas_respuestas(edicion: int) -> pd.DataFrame:
+    """
+    Tema de cada respuesta de texto largo (requiere SciPy)
+
+    El modelo de la edición se ajusta una vez, sin las copias de respuestas duplicadas, y
+    después solo incorpora las respuestas nuevas.
+
+    Returns:
+        DataFrame [tema, etiqueta, similitud] con el mismo índice que texto_largo(edicion)
+    """
+    df_texto = texto_largo(edicion)
+    if df_texto.empty:
+        return pd.DataFrame(columns=['tema', 'etiqueta', 'similitud'])
+    modelo = temas.modelo_incremental(edicion, texto_largo(edicion, duplicados="colapsar"))
+    return temas.temas_de_respuestas(modelo, df_texto)
+
+
+@memoizar(tablas=TABLAS_ENCUESTA)
+def resumen_temas(edicion: int, duplicados: str = "incluir") -> pd.DataFrame:
+    """Temas de la edición con sus términos principales y número de respuestas"""
+    df_texto = texto_largo(edicion, duplicados=duplicados)
+    if df_texto.empty:
+        return pd.DataFrame(columns=['tema', 'etiqueta', 'terminos', 'respuestas'])
+    modelo = temas.modelo_incremental(edicion, texto_largo(edicion, duplicados="colapsar"))
+    return temas.resumen_temas(modelo, temas_respuestas(edicion).loc[df_texto.index])
+
+
+@memoizar(tablas=TABLAS_ENCUESTA)
+def temas_pregunta(edicion: int, duplicados: str = "incluir") -> pd.DataFrame:
+    """Proporción de cada tema en las respuestas de cada pregunta de texto largo"""
+    df_texto = texto_largo(edicion, duplicados=duplicados)
+    if df_texto.empty:
+        return pd.DataFrame(columns=['pregunta_id', 'etiqueta', 'respuestas', 'proporcion'])
+    return temas.temas_por_pregunta(df_texto, temas_respuestas(edicion).loc[df_texto.index])
@@ -0,0 +1,248 @@
+"""
+Respuestas duplicadas de la encuesta del Dashboard JII
+Detecta respuestas de texto casi idénticas con firmas MinHash y LSH por bandas,
+sin comparar todos los pares: un participante que envió la encuesta varias veces o
+pegó el mismo texto en todas las preguntas abiertas, y textos copiados entre
+participantes.
+
+Las respuestas cortas ("Nada", "Ninguna") se repiten legítimamente entre
+participantes; por eso solo se marcan si las repite el mismo participante.
+
+Los análisis eligen qué hacer con los duplicados (ver filtrar_duplicados):
+    incluir   todas las respuestas, como antes
+    colapsar  una sola respuesta por grupo de duplicados (la primera)
+    excluir   ninguna respuesta de un grupo de duplicados
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from utils.perfilador import medir_fase
+
+MODOS = ("incluir", "colapsar", "excluir")
+# Las páginas incluyen todo salvo que el usuario elija otro modo
+MODO_DEFECTO = "incluir"
+
+UMBRAL = 0.8            # similitud de Jaccard estimada a partir de la cual dos respuestas son duplicadas
+PERMUTACIONES = 128
+BANDAS = 16             # 16 bandas de 8 filas: los pares con Jaccard >~ 0.7 caen juntos en alguna banda
+TAMANO_SHINGLE = 5
+MIN_CARACTERES = 25     # más cortas solo cuentan como duplicadas dentro del mismo participante
+
+_SIN_ACENTOS = str.maketrans("áéíóúüàèìòù", "aeiouuaeiou")
+_NO_ALFANUMERICO = re.compile(r"[^a-z0-9ñ ]+")
+_ESPACIOS = re.compile(r"\s+")
+
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas, sin acentos ni puntuación y con espacios simples"""
+    texto = str(texto).lower().translate(_SIN_ACENTOS)
+    return _ESPACIOS.sub(" ", _NO_ALFANUMERICO.sub(" ", texto)).strip()
+
+
+def _hashes_shingles(textos: list) -> tuple:
+    """
+    Hash de cada n-grama de bytes de todos los textos, calculado de una vez sobre el
+    buffer concatenado (los n-gramas que cruzan de un texto al siguiente se descartan)
+
+    Returns:
+        Tupla (hashes uint64, inicio de los hashes de cada texto en el arreglo)
+    """
+    codificados = [t.encode("utf-8") or b" " for t in textos]
+    longitudes = np.fromiter((len(c) for c in codificados), dtype=np.int64, count=len(codificados))
+    buffer = np.frombuffer(b"".join(codificados), dtype=np.uint8).astype(np.uint64)
+    fin_texto = np.cumsum(longitudes)
+    inicio_texto = fin_texto - longitudes
+
+    # Textos más cortos que el shingle: un solo n-grama con el texto completo
+    ancho = np.minimum(longitudes, TAMANO_SHINGLE)
+    por_texto = longitudes - ancho + 1
+    inicios = np.repeat(inicio_texto, por_texto) + (np.arange(por_texto.sum()) - np.repeat(np.cumsum(por_texto) - por_texto, por_texto))
+    anchos = np.repeat(ancho, por_texto)
+
+    hashes = np.zeros(len(inicios), dtype=np.uint64)
+    relleno = np.concatenate([buffer, np.zeros(TAMANO_SHINGLE, dtype=np.uint64)])
+    for k in range(TAMANO_SHINGLE):
+        byte = np.where(k < anchos, relleno[inicios + k], 0)
+        hashes = hashes * np.uint64(257) + byte
+    return hashes, np.cumsum(por_texto) - por_texto
+
+
+@medir_fase("transform")
+def firmas_minhash(textos: list, permutaciones: int = PERMUTACIONES, semilla: int = 0) -> np.ndarray:
+    """
+    Firmas MinHash de textos ya normalizados
+
+    Los shingles de todos los textos se concatenan y cada función hash
+    (multiplicar-desplazar: los 32 bits altos de a·x + b módulo 2^64) se reduce por
+    texto con np.minimum.reduceat, sin ciclos por texto.
+
+    Returns:
+        ndarray uint32 (textos, permutaciones)
+    """
+    firmas = np.empty((len(textos), permutaciones), dtype=np.uint32)
+    if not len(textos):
+        return firmas
+    hashes, inicios = _hashes_shingles(textos)
+
+    rng = np.random.default_rng(semilla)
+    a = rng.integers(0, 2 ** 63, permutaciones, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 2 ** 63, permutaciones, dtype=np.uint64)
+    desplazamiento = np.uint64(32)
+    with np.errstate(over="ignore"):
+        for i in range(permutaciones):
+            firmas[:, i] = np.minimum.reduceat((a[i] * hashes + b[i]) >> desplazamiento, inicios)
+    return firmas
+
+
+def _pares_candidatos(firmas: np.ndarray, bandas: int = BANDAS) -> np.ndarray:
+    """
+    Pares (i, j) con i < j que coinciden en al menos una banda de la firma
+
+    Cada banda se agrupa con np.unique; solo se generan pares dentro de las cubetas
+    con más de un texto, que en textos reales son pocas y pequeñas.
+    """
+    filas = firmas.shape[1] // bandas
+    tipo_banda = np.dtype((np.void, firmas.dtype.itemsize * filas))
+    pares = []
+    for banda in range(bandas):
+        segmento = np.ascontiguousarray(firmas[:, banda * filas:(banda + 1) * filas])
+        _, cubeta, conteo = np.unique(segmento.view(tipo_banda).ravel(), return_inverse=True, return_counts=True)
+        compartidos = np.flatnonzero(conteo[cubeta] > 1)
+        if not len(compartidos):
+            continue
+        orden = compartidos[np.argsort(cubeta[compartidos], kind="stable")]
+        limites = np.flatnonzero(np.diff(cubeta[orden])) + 1
+        for grupo in np.split(orden, limites):
+            i, j = np.triu_indices(len(grupo), k=1)
+            pares.append(np.column_stack([grupo[i], grupo[j]]))
+    if not pares:
+        return np.zeros((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(pares), axis=0)
+
+
+def componentes(n: int, pares: np.ndarray) -> np.ndarray:
+    """
+    Componente conexa de cada nodo, identificada por su nodo menor
+
+    Propagación de la etiqueta mínima por las aristas con saltos de puntero,
+    vectorizada; converge en pocas iteraciones.
+    """
+    etiqueta = np.arange(n)
+    if not len(pares):
+        return etiqueta
+    origen, destino = pares[:, 0], pares[:, 1]
+    while True:
+        anterior = etiqueta.copy()
+        minimo = np.minimum(etiqueta[origen], etiqueta[destino])
+        np.minimum.at(etiqueta, origen, minimo)
+        np.minimum.at(etiqueta, destino, minimo)
+        np.minimum.at(etiqueta, anterior, etiqueta)
+        etiqueta = etiqueta[etiqueta]
+        if np.array_equal(etiqueta, anterior):
+            return etiqueta
+
+
+@medir_fase("transform")
+def detectar_duplicados(respuestas: pd.DataFrame, umbral: float = UMBRAL,
+                        columna_participante: str = None) -> pd.DataFrame:
+    """
+    Marca las respuestas casi duplicadas
+
+    Los textos idénticos tras normalizar se agrupan primero con un hash exacto, así
+    las firmas y el LSH solo se calculan una vez por texto distinto.
+
+    Args:
+        respuestas: DataFrame con respuesta y una columna de participante
+        umbral: Similitud de Jaccard estimada mínima
+        columna_participante: Por defecto participante_anonimo o participante_email
+
+    Returns:
+        DataFrame [grupo, duplicado, mismo_participante, similitud] con el mismo índice que
+        respuestas: grupo es -1 si la respuesta no tiene duplicados; duplicado es True para
+        todas las del grupo salvo la primera; mismo_participante indica si todo el grupo es
+        de un solo participante
+    """
+    columnas = ['grupo', 'duplicado', 'mismo_participante', 'similitud']
+    if respuestas.empty:
+        return pd.DataFrame(columns=columnas, index=respuestas.index)
+    if columna_participante is None:
+        columna_participante = next(
+            (c for c in ('participante_anonimo', 'participante_email') if c in respuestas.columns), None
+        )
+
+    textos = respuestas['respuesta'].fillna('').map(normalizar_texto).to_numpy()
+    participantes = (respuestas[columna_participante].to_numpy() if columna_participante
+                     else np.arange(len(respuestas)))
+
+    # Textos distintos: las copias exactas comparten firma sin calcularla de nuevo
+    distintos, texto_de = np.unique(textos, return_inverse=True)
+    firmas = firmas_minhash(list(distintos))
+    pares = _pares_candidatos(firmas)
+    similitud_pares = (firmas[pares[:, 0]] == firmas[pares[:, 1]]).mean(axis=1) if len(pares) else np.zeros(0)
+    pares = pares[similitud_pares >= umbral]
+    similitud_pares = similitud_pares[similitud_pares >= umbral]
+
+    # Respuestas con el mismo texto distinto quedan en la misma componente que su texto
+    n = len(respuestas)
+    enlaces = [np.column_stack([np.arange(n), n + texto_de]), n + pares]
+    componente = componentes(n + len(distintos), np.concatenate(enlaces))[:n]
+
+    # Similitud de cada texto distinto con su vecino más parecido (1 si solo tiene copias exactas)
+    similitud_texto = np.zeros(len(distintos))
+    if len(pares):
+        np.maximum.at(similitud_texto, pares[:, 0], similitud_pares)
+        np.maximum.at(similitud_texto, pares[:, 1], similitud_pares)
+    similitud_texto[similitud_texto == 0] = 1.0
+
+    # Las respuestas cortas o vacías que comparten participantes distintos no son duplicados
+    # (p. ej. "Nada"): se reagrupan por (componente, participante)
+    componente = pd.Series(componente, index=respuestas.index)
+    participante = pd.Series(participantes, index=respuestas.index)
+    varios = participante.groupby(componente).transform('nunique') > 1
+    cortas = pd.Series(pd.Series(textos).str.len().to_numpy() < MIN_CARACTERES, index=respuestas.index)
+    clave = componente.astype(str)
+    clave[cortas & varios] = clave[cortas & varios] + "|" + participante[cortas & varios].astype(str)
+
+    grupo = pd.Series(pd.factorize(clave)[0], index=respuestas.index)
+    grupo[grupo.groupby(grupo).transform('size') == 1] = -1
+    grupo = pd.Series(pd.factorize(grupo.where(grupo >= 0))[0], index=respuestas.index)
+
+    return pd.DataFrame({
+        'grupo': grupo,
+        'duplicado': grupo.duplicated() & (grupo >= 0),
+        'mismo_participante': participante.groupby(grupo).transform('nunique') == 1,
+        'similitud': np.where(grupo >= 0, similitud_texto[texto_de], np.nan),
+    }, index=respuestas.index)
+
+
+def filtrar_duplicados(respuestas: pd.DataFrame, marcas: pd.DataFrame, modo: str = MODO_DEFECTO) -> pd.DataFrame:
+    """
+    Aplica el tratamiento de duplicados a un DataFrame de respuestas
+
+    Args:
+        respuestas: Respuestas (mismo índice que marcas o un subconjunto)
+        marcas: Resultado de detectar_duplicados
+        modo: "incluir", "colapsar" (una por grupo) o "excluir" (ninguna del grupo)
+    """
+    if modo not in MODOS:
+        raise ValueError(f"Modo de duplicados desconocido: {modo}")
+    if modo == "incluir" or respuestas.empty:
+        return respuestas
+    marcas = marcas.reindex(respuestas.index)
+    if modo == "colapsar":
+        return respuestas[~marcas['duplicado'].fillna(False).astype(bool)]
+    return respuestas[marcas['grupo'].fillna(-1).to_numpy() < 0]
+
+
+def resumen_duplicados(marcas: pd.DataFrame) -> dict:
+    """Conteos para mostrar en las páginas: grupos, respuestas duplicadas y cuántas son del mismo participante"""
+    en_grupo = marcas[marcas['grupo'] >= 0]
+    return {
+        "grupos": int(en_grupo['grupo'].nunique()),
+        "respuestas_en_grupos": int(len(en_grupo)),
+        "duplicadas": int(marcas['duplicado'].sum()),
+        "mismo_participante": int((marcas['duplicado'] & marcas['mismo_participante']).sum()),
+    }
@@ -0,0 +1,60 @@
+"""
+Ediciones de la Jornada de Ingeniería Industrial
+Cada tabla está particionada por año de edición (columna `edicion` en Supabase,
+carpeta `edicion=<año>/` en la fuente local) y todas las consultas se limitan
+a las ediciones seleccionadas.
+"""
+
+import os
+
+# Edición a la que pertenecen los datos cargados antes de particionar por año
+EDICION_BASE = 2025
+
+# Ediciones conocidas {año: nombre}
+EDICIONES = {
+    2025: "Jornada de Ingeniería Industrial 2025",
+}
+
+# Variable de entorno para fijar la edición por defecto (p. ej. en el servidor de la nueva edición)
+VARIABLE_EDICION = "JII_EDICION"
+
+
+def ediciones_disponibles() -> list:
+    """Años de las ediciones registradas, del más reciente al más antiguo"""
+    return sorted(EDICIONES, reverse=True)
+
+
+def edicion_actual() -> int:
+    """Edición por defecto: la de JII_EDICION o la más reciente registrada"""
+    valor = os.getenv(VARIABLE_EDICION)
+    return int(valor) if valor else ediciones_disponibles()[0]
+
+
+def nombre_edicion(edicion: int = None) -> str:
+    """Nombre largo de una edición, p. ej. "Jornada de Ingeniería Industrial 2025" """
+    edicion = edicion or edicion_actual()
+    return EDICIONES.get(edicion, f"Jornada de Ingeniería Industrial {edicion}")
+
+
+def sufijo_archivo(edicion: int = None) -> str:
+    """Sufijo para nombres de archivos exportados, p. ej. "jii2025" """
+    return f"jii{edicion or edicion_actual()}"
+
+
+def selector_edicion() -> int:
+    """
+    Selector de edición en la barra lateral, compartido entre páginas
+
+    Returns:
+        Año de la edición seleccionada
+    """
+    import streamlit as st
+
+    opciones = ediciones_disponibles()
+    # La selección se guarda fuera del widget para que sobreviva al cambiar de página
+    seleccion = st.session_state.get("edicion_seleccionada", edicion_actual())
+    if seleccion not in opciones:
+        seleccion = opciones[0]
+    edicion = st.sidebar.selectbox("Edición", options=opciones, index=opciones.index(seleccion))
+    st.session_state["edicion_seleccionada"] = edicion
+    return edicion
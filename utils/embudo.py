@@ -0,0 +1,227 @@
+"""
+Embudo de conversión del Dashboard JII
+Sigue a cada inscripción a workshop por las etapas inscripción → lista de espera →
+asistencia → encuesta, cruzando inscripciones_workshop, asistencias, participantes
+y encuesta_respuestas por el email normalizado.
+
+Los cruces no usan merges: cada tabla se indexa una vez (pd.Index, una tabla hash)
+y las columnas de las demás se traen con get_indexer. El índice precalcula
+la conversión por workshop, programa y categoría y las posiciones de cada grupo,
+así que consultar un grupo (p. ej. los no-shows de un workshop) es una búsqueda.
+
+El índice de cada edición se guarda junto con la huella de sus tablas y solo se
+reconstruye cuando los datos cambian, no cada vez que vence la caché.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.analitica import normalizar_email
+from utils.perfilador import medir_fase
+
+ESTADO_CANCELADO = "cancelado"
+ESTADO_LISTA_ESPERA = "lista_espera"
+SIN_DATO = "Sin registro"
+
+# Dimensiones por las que se desglosa la conversión: {columna: etiqueta}
+DIMENSIONES = {
+    "actividad_codigo": "Workshop",
+    "programa": "Programa",
+    "categoria": "Categoría",
+}
+
+ETAPAS = ["Inscritos", "Confirmados", "Asistieron", "Respondieron la encuesta"]
+
+# Prioridad al deduplicar inscripciones repetidas de una persona a un workshop
+_PRIORIDAD_ESTADO = {ESTADO_CANCELADO: 2, ESTADO_LISTA_ESPERA: 1}
+
+
+def huella(*tablas: pd.DataFrame) -> tuple:
+    """Versión del contenido de unas tablas: cambia si cambia cualquier fila"""
+    return tuple(
+        (len(t), int(pd.util.hash_pandas_object(t, index=False).sum()) if len(t) else 0)
+        for t in tablas
+    )
+
+
+def _columna(df: pd.DataFrame, nombre: str, defecto=None) -> pd.Series:
+    return df[nombre] if nombre in df.columns else pd.Series(defecto, index=df.index, dtype=object)
+
+
+class IndiceEmbudo:
+    """
+    Inscripciones a workshops con sus etapas del embudo ya resueltas
+
+    Attributes:
+        personas: Participantes indexados por email normalizado [programa, categoria, asistio, respondio]
+        inscripciones: Una fila por persona y workshop [participante_email, participante_nombre,
+            actividad_codigo, estado, programa, categoria, confirmado, lista_espera, asistio, respondio]
+        grupos: {dimension: {valor: posiciones en inscripciones}}
+        version: Huella de las tablas con que se construyó
+    """
+
+    def __init__(self, personas: pd.DataFrame, inscripciones: pd.DataFrame, version: tuple = None):
+        self.personas = personas
+        self.inscripciones = inscripciones
+        self.version = version
+        self.grupos = {
+            dimension: inscripciones.groupby(dimension, sort=True).indices if not inscripciones.empty else {}
+            for dimension in DIMENSIONES
+        }
+        self._conversion = {dimension: self._calcular_conversion(dimension) for dimension in DIMENSIONES}
+
+    def _calcular_conversion(self, dimension: str) -> pd.DataFrame:
+        df = self.inscripciones
+        columnas = [dimension, 'inscritos', 'lista_espera', 'confirmados', 'asistieron', 'no_show',
+                    'respondieron', 'tasa_asistencia', 'tasa_encuesta']
+        if df.empty:
+            return pd.DataFrame(columns=columnas)
+        conteo = pd.DataFrame({
+            dimension: df[dimension],
+            'inscritos': 1,
+            'lista_espera': df['lista_espera'],
+            'confirmados': df['confirmado'],
+            'asistieron': df['asistio'],
+            'no_show': df['confirmado'] & ~df['asistio'],
+            'respondieron': df['asistio'] & df['respondio'],
+        }).groupby(dimension, sort=True).sum().astype(int).reset_index()
+        conteo['tasa_asistencia'] = conteo['asistieron'] / conteo['inscritos']
+        conteo['tasa_encuesta'] = (conteo['respondieron'] / conteo['asistieron'].where(conteo['asistieron'] > 0))
+        return conteo[columnas]
+
+    def filas(self, dimension: str = None, valor=None) -> pd.DataFrame:
+        """Inscripciones de un grupo (todas si no se indica), buscadas en el índice"""
+        if dimension is None:
+            return self.inscripciones
+        posiciones = self.grupos[dimension].get(valor)
+        return self.inscripciones.iloc[posiciones if posiciones is not None else []]
+
+    def conversion(self, dimension: str) -> pd.DataFrame:
+        """
+        Conversión por grupo de una dimensión (precalculada)
+
+        Returns:
+            DataFrame [dimension, inscritos, lista_espera, confirmados, asistieron, no_show,
+            respondieron, tasa_asistencia, tasa_encuesta]; inscritos excluye las cancelaciones,
+            tasa_asistencia es asistieron / inscritos y tasa_encuesta respondieron / asistieron
+        """
+        return self._conversion[dimension].copy(deep=False)
+
+    def etapas(self, dimension: str = None, valor=None) -> pd.DataFrame:
+        """Personas en cada etapa del embudo [etapa, cantidad] de un grupo o de toda la edición"""
+        df = self.filas(dimension, valor)
+        return pd.DataFrame({
+            'etapa': ETAPAS,
+            'cantidad': [
+                len(df),
+                int(df['confirmado'].sum()),
+                int(df['asistio'].sum()),
+                int((df['asistio'] & df['respondio']).sum()),
+            ],
+        })
+
+    def no_shows(self, dimension: str = None, valor=None) -> pd.DataFrame:
+        """Inscripciones confirmadas sin asistencia al workshop"""
+        df = self.filas(dimension, valor)
+        return df.loc[df['confirmado'] & ~df['asistio'],
+                      ['participante_email', 'participante_nombre', 'actividad_codigo', 'programa', 'categoria']]
+
+    def __repr__(self):
+        return f"<IndiceEmbudo {len(self.personas)} personas, {len(self.inscripciones)} inscripciones>"
+
+
+@medir_fase("transform")
+def construir_indice(participantes: pd.DataFrame, inscripciones: pd.DataFrame,
+                     asistencias: pd.DataFrame, respuestas: pd.DataFrame, version: tuple = None) -> IndiceEmbudo:
+    """
+    Construye el índice del embudo de una edición
+
+    Args:
+        participantes: Tabla participantes (email, programa, categoria, encuesta_completada)
+        inscripciones: Tabla inscripciones_workshop (participante_email, actividad_codigo, estado)
+        asistencias: Tabla asistencias (participante_email, actividad_codigo)
+        respuestas: Tabla encuesta_respuestas (participante_email)
+        version: Huella de las tablas (ver huella)
+
+    Returns:
+        IndiceEmbudo; una persona cuenta como que respondió si tiene respuestas en la
+        encuesta o encuesta_completada en participantes
+    """
+    # Personas: email normalizado -> atributos (un pd.Index único es una tabla hash)
+    personas = pd.DataFrame({
+        'email': normalizar_email(_columna(participantes, 'email')),
+        'programa': _columna(participantes, 'programa', SIN_DATO).fillna(SIN_DATO),
+        'categoria': _columna(participantes, 'categoria', SIN_DATO).fillna(SIN_DATO),
+        'encuesta_completada': _columna(participantes, 'encuesta_completada', False).fillna(False) == True,
+    }).dropna(subset=['email']).drop_duplicates('email').set_index('email')
+
+    emails_asistencia = normalizar_email(_columna(asistencias, 'participante_email'))
+    emails_encuesta = pd.Index(normalizar_email(_columna(respuestas, 'participante_email')).dropna().unique())
+    personas['asistio'] = pd.Index(emails_asistencia.dropna().unique()).get_indexer(personas.index) >= 0
+    personas['respondio'] = personas['encuesta_completada'] | (emails_encuesta.get_indexer(personas.index) >= 0)
+    personas = personas.drop(columns='encuesta_completada')
+
+    columnas = ['participante_email', 'participante_nombre', 'actividad_codigo', 'estado', 'programa',
+                'categoria', 'confirmado', 'lista_espera', 'asistio', 'respondio']
+    if inscripciones.empty:
+        return IndiceEmbudo(personas, pd.DataFrame(columns=columnas), version)
+
+    # Una fila por persona y workshop; una cancelación no oculta otra inscripción vigente
+    df = pd.DataFrame({
+        'participante_email': normalizar_email(_columna(inscripciones, 'participante_email')),
+        'participante_nombre': _columna(inscripciones, 'participante_nombre'),
+        'actividad_codigo': _columna(inscripciones, 'actividad_codigo'),
+        'estado': _columna(inscripciones, 'estado'),
+    }).dropna(subset=['participante_email', 'actividad_codigo'])
+    df = (
+        df.assign(_prioridad=df['estado'].map(_PRIORIDAD_ESTADO).fillna(0))
+        .sort_values('_prioridad', kind='stable')
+        .drop_duplicates(['participante_email', 'actividad_codigo'])
+        .drop(columns='_prioridad')
+    )
+    df = df[df['estado'] != ESTADO_CANCELADO].sort_index().reset_index(drop=True)
+
+    # Atributos de la persona por búsqueda en el índice de personas
+    posicion = personas.index.get_indexer(df['participante_email'])
+    encontrada = posicion >= 0
+    for columna in ('programa', 'categoria'):
+        df[columna] = np.where(encontrada, personas[columna].to_numpy()[posicion], SIN_DATO)
+    df['respondio'] = np.where(encontrada, personas['respondio'].to_numpy()[posicion],
+                               emails_encuesta.get_indexer(df['participante_email']) >= 0)
+
+    # Asistencia al mismo workshop: índice hash de los pares (email, actividad)
+    pares_asistencia = pd.MultiIndex.from_arrays(
+        [emails_asistencia, _columna(asistencias, 'actividad_codigo')]
+    ).dropna().unique()
+    df['asistio'] = pares_asistencia.get_indexer(pd.MultiIndex.from_frame(df[['participante_email', 'actividad_codigo']])) >= 0
+    df['lista_espera'] = df['estado'] == ESTADO_LISTA_ESPERA
+    df['confirmado'] = ~df['lista_espera']
+    return IndiceEmbudo(personas, df[columnas], version)
+
+
+# ============================
+# Índices por edición
+# ============================
+
+_lock = threading.Lock()
+_indices = {}  # clave -> IndiceEmbudo
+
+
+def indice_versionado(clave, participantes: pd.DataFrame, inscripciones: pd.DataFrame,
+                      asistencias: pd.DataFrame, respuestas: pd.DataFrame) -> IndiceEmbudo:
+    """
+    Índice del embudo de un conjunto de tablas, reutilizado mientras no cambien
+
+    Args:
+        clave: Identificador del conjunto (p. ej. la edición)
+    """
+    respuestas = respuestas[['participante_email']] if 'participante_email' in respuestas.columns else respuestas
+    version = huella(participantes, inscripciones, asistencias, respuestas)
+    with _lock:
+        indice = _indices.get(clave)
+        if indice is None or indice.version != version:
+            indice = construir_indice(participantes, inscripciones, asistencias, respuestas, version)
+            _indices[clave] = indice
+        return indice
@@ -0,0 +1,160 @@
+"""
+Filtros de consulta del Dashboard JII
+Objetos de filtro tipados que ejecutar_query traduce a PostgREST (Supabase) o
+aplica sobre el DataFrame de la fuente local, con la misma semántica en ambos
+casos. Así las páginas filtran en el servidor y descargan solo las filas que usan.
+
+    from utils import filtros as f
+    ejecutar_query("encuesta_respuestas", filtros=[f.en("pregunta_id", [1, 2, 3])], edicion=2025)
+    ejecutar_query("asistencias", filtros=f.entre("fecha_asistencia", "2025-03-01", "2025-03-02"))
+
+Un diccionario {columna: valor} sigue significando igualdad en cada columna.
+"""
+
+from dataclasses import dataclass
+
+import pandas as pd
+
+OPERADORES = ("eq", "neq", "gt", "gte", "lt", "lte", "in", "es_nulo", "no_es_nulo")
+
+
+@dataclass(frozen=True)
+class Filtro:
+    """
+    Condición sobre una columna
+
+    Es inmutable y hasheable para formar parte de la clave de la caché de consultas;
+    los valores de "in" se guardan como tupla.
+    """
+    columna: str
+    operador: str
+    valor: object = None
+
+    def __post_init__(self):
+        if self.operador not in OPERADORES:
+            raise ValueError(f"Operador de filtro desconocido: {self.operador}")
+
+
+def eq(columna: str, valor) -> Filtro:
+    """columna = valor"""
+    return Filtro(columna, "eq", valor)
+
+
+def neq(columna: str, valor) -> Filtro:
+    """columna <> valor"""
+    return Filtro(columna, "neq", valor)
+
+
+def gt(columna: str, valor) -> Filtro:
+    """columna > valor"""
+    return Filtro(columna, "gt", valor)
+
+
+def gte(columna: str, valor) -> Filtro:
+    """columna >= valor"""
+    return Filtro(columna, "gte", valor)
+
+
+def lt(columna: str, valor) -> Filtro:
+    """columna < valor"""
+    return Filtro(columna, "lt", valor)
+
+
+def lte(columna: str, valor) -> Filtro:
+    """columna <= valor"""
+    return Filtro(columna, "lte", valor)
+
+
+def en(columna: str, valores) -> Filtro:
+    """columna IN (valores); el orden y los duplicados no importan"""
+    return Filtro(columna, "in", tuple(sorted(set(valores), key=str)))
+
+
+def entre(columna: str, desde=None, hasta=None) -> list:
+    """desde <= columna <= hasta; cualquiera de los extremos puede omitirse"""
+    condiciones = []
+    if desde is not None:
+        condiciones.append(gte(columna, desde))
+    if hasta is not None:
+        condiciones.append(lte(columna, hasta))
+    return condiciones
+
+
+def es_nulo(columna: str) -> Filtro:
+    """columna IS NULL"""
+    return Filtro(columna, "es_nulo")
+
+
+def no_es_nulo(columna: str) -> Filtro:
+    """columna IS NOT NULL"""
+    return Filtro(columna, "no_es_nulo")
+
+
+def normalizar(filtros) -> tuple:
+    """
+    Convierte los filtros aceptados por ejecutar_query en una tupla de Filtro
+
+    Args:
+        filtros: None, diccionario {columna: valor} (igualdad), un Filtro o una
+            lista de Filtro y listas de Filtro (como las que retorna entre)
+
+    Returns:
+        Tupla de Filtro en orden estable, usable como clave de caché
+    """
+    if not filtros:
+        return ()
+    if isinstance(filtros, dict):
+        return tuple(eq(columna, valor) for columna, valor in sorted(filtros.items()))
+    if isinstance(filtros, Filtro):
+        return (filtros,)
+
+    resultado = []
+    for filtro in filtros:
+        if isinstance(filtro, Filtro):
+            resultado.append(filtro)
+        else:
+            resultado.extend(normalizar(filtro))
+    return tuple(sorted(set(resultado), key=lambda f: (f.columna, f.operador, str(f.valor))))
+
+
+def aplicar_postgrest(query, filtros: tuple):
+    """Agrega los filtros a una consulta de postgrest (supabase.table(...).select(...))"""
+    for filtro in filtros:
+        if filtro.operador == "in":
+            query = query.in_(filtro.columna, list(filtro.valor))
+        elif filtro.operador == "es_nulo":
+            query = query.is_(filtro.columna, "null")
+        elif filtro.operador == "no_es_nulo":
+            query = query.not_.is_(filtro.columna, "null")
+        else:
+            query = getattr(query, filtro.operador)(filtro.columna, filtro.valor)
+    return query
+
+
+def mascara(df: pd.DataFrame, filtros: tuple) -> pd.Series:
+    """
+    Filas de un DataFrame que cumplen todos los filtros (fuente local)
+
+    Como en PostgREST, una comparación con un valor nulo no cumple el filtro.
+    """
+    cumple = pd.Series(True, index=df.index)
+    for filtro in filtros:
+        columna = df[filtro.columna]
+        if filtro.operador == "es_nulo":
+            cumple &= columna.isna()
+        elif filtro.operador == "no_es_nulo":
+            cumple &= columna.notna()
+        elif filtro.operador == "in":
+            cumple &= columna.isin(filtro.valor)
+        elif filtro.operador == "neq":
+            cumple &= columna.notna() & (columna != filtro.valor)
+        else:
+            comparar = {
+                "eq": columna.__eq__,
+                "gt": columna.__gt__,
+                "gte": columna.__ge__,
+                "lt": columna.__lt__,
+                "lte": columna.__le__,
+            }[filtro.operador]
+            cumple &= comparar(filtro.valor).fillna(False).astype(bool)
+    return cumple
@@ -0,0 +1,99 @@
+"""
+Fuente de datos local para el Dashboard JII 2025
+Lee las tablas desde archivos CSV con el mismo esquema que Supabase
+(la carpeta datos/ o la salida de utils/datos_sinteticos.py).
+
+Las tablas se particionan por edición en subcarpetas `edicion=<año>/`; los CSV
+directamente en la carpeta raíz pertenecen a la edición base (2025).
+"""
+
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from utils.ediciones import EDICION_BASE
+from utils.filtros import mascara, normalizar
+
+# Si esta variable apunta a una carpeta, ejecutar_query lee de ahí en lugar de Supabase
+VARIABLE_DATOS_LOCALES = "JII_DATOS_LOCALES"
+
+TABLAS = [
+    "participantes",
+    "actividades",
+    "asistencias",
+    "inscripciones_workshop",
+    "equipos_concurso",
+    "encuesta_respuestas",
+]
+
+
+def directorio_local():
+    """Retorna la carpeta de datos locales configurada o None si se usa Supabase"""
+    directorio = os.getenv(VARIABLE_DATOS_LOCALES)
+    return Path(directorio) if directorio else None
+
+
+def carpeta_edicion(directorio, edicion: int) -> Path:
+    """Carpeta de la partición de una edición dentro de la fuente local"""
+    return Path(directorio) / f"edicion={edicion}"
+
+
+def ruta_tabla(directorio, tabla: str, edicion: int = None):
+    """Archivo que contiene la tabla para la edición pedida (solo se lee esa partición)"""
+    directorio = Path(directorio)
+    if edicion is None:
+        return directorio / f"{tabla}.csv"
+
+    particion = carpeta_edicion(directorio, edicion)
+    if particion.is_dir():
+        return particion / f"{tabla}.csv"
+    if edicion == EDICION_BASE:
+        return directorio / f"{tabla}.csv"
+    return None
+
+
+def leer_tabla_csv(directorio, tabla: str, columnas: str = "*", filtros=None, orden: str = None,
+                   edicion: int = None, limite: int = None, desplazamiento: int = 0) -> pd.DataFrame:
+    """
+    Lee una tabla desde CSV aplicando la misma semántica que ejecutar_query.
+
+    Args:
+        directorio: Carpeta con los archivos <tabla>.csv
+        tabla: Nombre de la tabla
+        columnas: Columnas separadas por coma (por defecto "*")
+        filtros: Diccionario {columna: valor} de igualdad o lista de utils.filtros.Filtro
+        orden: Columna por la cual ordenar
+        edicion: Año de la edición; solo se lee su partición
+        limite: Máximo de filas a retornar (después de ordenar)
+        desplazamiento: Filas a saltar antes de aplicar el límite
+
+    Returns:
+        DataFrame con los resultados (vacío si el archivo no existe)
+    """
+    ruta = ruta_tabla(directorio, tabla, edicion)
+    if ruta is None or not ruta.exists():
+        return pd.DataFrame()
+
+    df = pd.read_csv(ruta)
+
+    filtros = normalizar(filtros)
+    if filtros:
+        df = df[mascara(df, filtros)]
+
+    if orden and orden in df.columns:
+        df = df.sort_values(orden, kind="stable")
+
+    if limite is not None or desplazamiento:
+        fin = desplazamiento + limite if limite is not None else None
+        df = df.iloc[desplazamiento:fin]
+
+    if columnas != "*":
+        df = df[[c.strip() for c in columnas.split(",")]]
+
+    return df.reset_index(drop=True)
+
+
+def cargar_tablas_csv(directorio, tablas: list = None, edicion: int = None) -> dict:
+    """Carga varias tablas de una carpeta local como {nombre_tabla: DataFrame}"""
+    return {tabla: leer_tabla_csv(directorio, tabla, edicion=edicion) for tabla in (tablas or TABLAS)}
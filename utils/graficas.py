@@ -0,0 +1,469 @@
+"""
+Gráficas del Dashboard JII 2025
+Construyen las figuras de Plotly a partir de los resultados de utils/analitica.py.
+Las usan tanto las páginas como el generador de reportes estáticos.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.arranque import modulo_diferido
+from utils.perfilador import medir_fase
+
+# Plotly se importa con la primera figura, no al cargar la página
+px = modulo_diferido("plotly.express")
+go = modulo_diferido("plotly.graph_objects")
+
+COLORES_SENTIMIENTO = {
+    'Positivo': '#28a745',
+    'Neutral': '#ffc107',
+    'Negativo': '#dc3545'
+}
+
+
+# ============================
+# Dashboard
+# ============================
+
+@medir_fase("figura")
+def grafica_barras_conteo(conteo: pd.DataFrame) -> "go.Figure":
+    """Barras coloreadas por categoría para una tabla [etiqueta, Cantidad]"""
+    etiqueta = conteo.columns[0]
+    return px.bar(conteo, x=etiqueta, y='Cantidad', color=etiqueta, text='Cantidad')
+
+
+@medir_fase("figura")
+def grafica_pastel_conteo(conteo: pd.DataFrame) -> "go.Figure":
+    """Dona para una tabla [etiqueta, Cantidad]"""
+    return px.pie(conteo, names=conteo.columns[0], values='Cantidad', hole=0.4)
+
+
+@medir_fase("figura")
+def grafica_serie_temporal(serie: pd.DataFrame, titulo: str, etiqueta_y: str, color: str) -> "go.Figure":
+    """
+    Línea de una serie [periodo, Cantidad] de analitica.serie_temporal
+
+    Args:
+        serie: Resultado de serie_temporal
+        titulo: Qué se cuenta, p. ej. "Asistencias"; se completa con "por Hora" o "por Día"
+        etiqueta_y: Etiqueta del eje vertical
+        color: Color de la línea
+    """
+    if serie.attrs.get("granularidad") == "hora":
+        titulo = f'{titulo} por Hora'
+        label_x = 'Hora'
+    else:
+        titulo = f'{titulo} por Día'
+        label_x = 'Fecha'
+
+    fig = px.line(
+        serie,
+        x='periodo',
+        y='Cantidad',
+        markers=True,
+        title=titulo,
+        labels={'periodo': label_x, 'Cantidad': etiqueta_y}
+    )
+    fig.update_traces(line_color=color, line_width=2, marker=dict(size=8))
+    fig.update_layout(hovermode='x unified')
+    return fig
+
+
+@medir_fase("figura")
+def grafica_embudo(etapas: pd.DataFrame, titulo: str) -> "go.Figure":
+    """Embudo de conversión para una tabla [etapa, cantidad] (embudo.IndiceEmbudo.etapas)"""
+    fig = px.funnel(etapas, x='cantidad', y='etapa', title=titulo)
+    fig.update_traces(textinfo='value+percent initial')
+    fig.update_layout(yaxis_title="", xaxis_title="Personas")
+    return fig
+
+
+@medir_fase("figura")
+def grafica_coasistencia(similitud: pd.DataFrame) -> "go.Figure":
+    """Mapa de calor de la similitud de Jaccard entre las audiencias de las actividades (audiencias.jaccard)"""
+    etiquetas = [str(c) for c in similitud.columns]
+    fig = px.imshow(
+        similitud.to_numpy(),
+        x=etiquetas,
+        y=etiquetas,
+        zmin=0,
+        zmax=max(float(similitud.to_numpy()[~np.eye(len(etiquetas), dtype=bool)].max(initial=0)), 0.05),
+        color_continuous_scale='Blues',
+        text_auto='.2f',
+        title='Audiencia Compartida entre Actividades (Jaccard)'
+    )
+    fig.update_layout(height=max(400, len(etiquetas) * 40))
+    return fig
+
+
+@medir_fase("figura")
+def grafica_red_actividades(pares: pd.DataFrame, audiencia: pd.Series, umbral: float) -> "go.Figure":
+    """
+    Red de actividades en círculo: el tamaño del nodo es su audiencia y cada arista une
+    dos actividades con Jaccard >= umbral (audiencias.pares_actividades)
+    """
+    codigos = [str(c) for c in audiencia.index]
+    angulo = np.linspace(0, 2 * np.pi, len(codigos), endpoint=False)
+    posicion = dict(zip(codigos, zip(np.cos(angulo), np.sin(angulo))))
+    fig = go.Figure()
+
+    aristas = pares[pares['jaccard'] >= umbral]
+    maximo = aristas['jaccard'].max() if not aristas.empty else 1
+    for _, par in aristas.iterrows():
+        (x0, y0), (x1, y1) = posicion[str(par['actividad_a'])], posicion[str(par['actividad_b'])]
+        fig.add_trace(go.Scatter(
+            x=[x0, x1], y=[y0, y1], mode='lines',
+            line=dict(width=1 + 7 * par['jaccard'] / maximo, color='#d62728' if par['choque'] else '#7f7f7f'),
+            hoverinfo='text',
+            text=f"{par['actividad_a']}–{par['actividad_b']}: Jaccard {par['jaccard']:.2f}, {par['en_comun']} en común",
+            showlegend=False,
+        ))
+
+    tamano = audiencia.to_numpy(dtype=float)
+    fig.add_trace(go.Scatter(
+        x=[posicion[c][0] for c in codigos], y=[posicion[c][1] for c in codigos],
+        mode='markers+text', text=codigos, textposition='top center',
+        marker=dict(size=12 + 28 * tamano / max(tamano.max(initial=0), 1), color='#1f77b4'),
+        hovertext=[f"{c}: {int(t)} asistentes" for c, t in zip(codigos, tamano)], hoverinfo='text',
+        showlegend=False,
+    ))
+    fig.update_layout(
+        title=f'Red de Audiencias (Jaccard ≥ {umbral:.2f}; rojo = horarios empalmados)',
+        xaxis=dict(visible=False), yaxis=dict(visible=False, scaleanchor='x'),
+        height=550,
+    )
+    return fig
+
+
+# ============================
+# Análisis de encuesta
+# ============================
+
+@medir_fase("figura")
+def grafica_promedios(promedios: pd.DataFrame) -> "go.Figure":
+    """Barras horizontales del promedio por pregunta (analitica.estadisticas_calificacion)"""
+    fig = px.bar(
+        promedios,
+        y='pregunta_texto',
+        x='promedio',
+        orientation='h',
+        text='promedio',
+        title='Calificación Promedio por Pregunta',
+        color='promedio',
+        color_continuous_scale='RdYlGn',
+        range_color=[1, 5]
+    )
+    fig.update_traces(texttemplate='%{text:.2f}', textposition='outside')
+    fig.update_layout(
+        xaxis_title="Calificación Promedio",
+        yaxis_title="",
+        height=max(400, len(promedios) * 40),
+        showlegend=False
+    )
+    return fig
+
+
+@medir_fase("figura")
+def grafica_distribucion_calificacion(distribucion: pd.DataFrame, texto_pregunta: str) -> "go.Figure":
+    """Histograma de calificaciones 1-5 (analitica.distribucion_calificacion)"""
+    fig = px.bar(
+        x=distribucion['calificacion'],
+        y=distribucion['cantidad'],
+        labels={'x': 'Calificación', 'y': 'Cantidad'},
+        title=f"Distribución de Respuestas: {texto_pregunta[:80]}...",
+        text=distribucion['cantidad']
+    )
+    fig.update_traces(textposition='outside', marker_color='steelblue')
+    fig.update_layout(
+        xaxis=dict(tickmode='linear', tick0=1, dtick=1),
+        showlegend=False
+    )
+    return fig
+
+
+@medir_fase("figura")
+def grafica_promedios_categoria(df_categorias: pd.DataFrame) -> "go.Figure":
+    """Barras del promedio por categoría de pregunta (analitica.promedios_por_categoria)"""
+    fig = px.bar(
+        df_categorias,
+        x='Categoría',
+        y='Promedio',
+        text='Promedio',
+        title='Calificación Promedio por Categoría',
+        color='Promedio',
+        color_continuous_scale='RdYlGn',
+        range_color=[1, 5]
+    )
+    fig.update_traces(texttemplate='%{text:.2f}', textposition='outside')
+    fig.update_layout(showlegend=False, yaxis_range=[0, 5.5])
+    return fig
+
+
+@medir_fase("figura")
+def grafica_radar_categoria(df_categorias: pd.DataFrame) -> "go.Figure":
+    """Radar del promedio por categoría de pregunta"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolar(
+        r=df_categorias['Promedio'].tolist() + [df_categorias['Promedio'].iloc[0]],
+        theta=df_categorias['Categoría'].tolist() + [df_categorias['Categoría'].iloc[0]],
+        fill='toself',
+        name='Promedio'
+    ))
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 5]
+            )
+        ),
+        title='Comparativa por Categoría',
+        showlegend=True
+    )
+    return fig
+
+
+@medir_fase("figura")
+def grafica_correlaciones(correlaciones: pd.DataFrame) -> "go.Figure":
+    """Mapa de calor de la correlación entre preguntas (matriz_calificaciones.correlaciones)"""
+    etiquetas = [f"P{p}" for p in correlaciones.columns]
+    fig = px.imshow(
+        correlaciones.to_numpy(),
+        x=etiquetas,
+        y=etiquetas,
+        zmin=-1,
+        zmax=1,
+        color_continuous_scale='RdBu',
+        text_auto='.2f',
+        title='Correlación entre Preguntas de Calificación'
+    )
+    fig.update_layout(height=max(400, len(etiquetas) * 45))
+    return fig
+
+
+@medir_fase("figura")
+def grafica_impulsores(impulsores: pd.DataFrame, pregunta_general: int) -> "go.Figure":
+    """Barras de la importancia de cada pregunta sobre la calificación general (matriz_calificaciones.impulsores_clave)"""
+    fig = px.bar(
+        impulsores.assign(etiqueta=[f"P{p}: {t[:50]}" for p, t in zip(impulsores['pregunta_id'], impulsores['pregunta_texto'])]),
+        y='etiqueta',
+        x='participacion',
+        orientation='h',
+        text='participacion',
+        color='correlacion',
+        color_continuous_scale='RdYlGn',
+        range_color=[-1, 1],
+        title=f'Qué explica la Calificación General (P{pregunta_general})'
+    )
+    fig.update_traces(texttemplate='%{text:.0%}', textposition='outside')
+    fig.update_layout(
+        xaxis_title="Participación en el R²",
+        yaxis_title="",
+        yaxis=dict(autorange='reversed'),
+        xaxis_tickformat='.0%'
+    )
+    return fig
+
+
+# ============================
+# Análisis de sentimientos
+# ============================
+
+@medir_fase("figura")
+def grafica_longitudes(textos: pd.Series) -> "go.Figure":
+    """Histograma de la longitud en caracteres de las respuestas"""
+    return px.histogram(
+        textos.str.len(),
+        nbins=20,
+        title="Distribución de Longitud de Respuestas",
+        labels={'value': 'Longitud (caracteres)', 'count': 'Frecuencia'}
+    )
+
+
+@medir_fase("figura")
+def grafica_frecuencia_palabras(df_freq: pd.DataFrame) -> "go.Figure":
+    """Barras horizontales de analitica.frecuencia_palabras"""
+    fig = px.bar(
+        df_freq,
+        x='Frecuencia',
+        y='Palabra',
+        orientation='h',
+        title=f'Top {len(df_freq)} Palabras Más Frecuentes',
+        text='Frecuencia'
+    )
+    fig.update_traces(textposition='outside')
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'})
+    return fig
+
+
+@medir_fase("figura")
+def grafica_temas_pregunta(temas_pregunta: pd.DataFrame) -> "go.Figure":
+    """Barras apiladas de la proporción de cada tema por pregunta (temas.temas_por_pregunta)"""
+    fig = px.bar(
+        temas_pregunta.assign(Pregunta=temas_pregunta['pregunta_id'].map(lambda p: f"P{p}")),
+        x='proporcion',
+        y='Pregunta',
+        color='etiqueta',
+        orientation='h',
+        title='Temas por Pregunta',
+        labels={'proporcion': 'Proporción de respuestas', 'etiqueta': 'Tema'},
+        custom_data=['respuestas']
+    )
+    fig.update_traces(hovertemplate='%{y}: %{x:.0%} (%{customdata[0]} respuestas)')
+    fig.update_layout(barmode='stack', xaxis_tickformat='.0%', legend=dict(orientation='h', y=-0.2))
+    return fig
+
+
+@medir_fase("figura")
+def grafica_sentimientos(conteo_sentimientos: pd.Series) -> "go.Figure":
+    """Dona con el número de respuestas por sentimiento"""
+    return px.pie(
+        values=conteo_sentimientos.values,
+        names=conteo_sentimientos.index,
+        title='Distribución de Sentimientos',
+        color=conteo_sentimientos.index,
+        color_discrete_map=COLORES_SENTIMIENTO,
+        hole=0.4
+    )
+
+
+@medir_fase("figura")
+def grafica_polaridad(df_sentimiento: pd.DataFrame) -> "go.Figure":
+    """Histograma de polaridad con la referencia neutral en 0"""
+    fig = px.histogram(
+        df_sentimiento,
+        x='polaridad',
+        nbins=20,
+        title='Distribución de Polaridad',
+        labels={'polaridad': 'Polaridad', 'count': 'Frecuencia'},
+        color_discrete_sequence=['steelblue']
+    )
+    fig.add_vline(x=0, line_dash="dash", line_color="red",
+                  annotation_text="Neutral")
+    return fig
+
+
+@medir_fase("figura")
+def grafica_polaridad_subjetividad(df_sentimiento: pd.DataFrame) -> "go.Figure":
+    """Dispersión polaridad vs subjetividad coloreada por sentimiento"""
+    fig = px.scatter(
+        df_sentimiento,
+        x='polaridad',
+        y='subjetividad',
+        color='sentimiento',
+        title='Polaridad vs Subjetividad',
+        labels={'polaridad': 'Polaridad', 'subjetividad': 'Subjetividad'},
+        color_discrete_map=COLORES_SENTIMIENTO,
+        hover_data=['respuesta']
+    )
+    fig.add_hline(y=0.5, line_dash="dash", line_color="gray")
+    fig.add_vline(x=0, line_dash="dash", line_color="gray")
+    return fig
+
+
+@medir_fase("figura")
+def grafica_subjetividad(df_sentimiento: pd.DataFrame) -> "go.Figure":
+    """Histograma de subjetividad con la referencia en 0.5"""
+    fig = px.histogram(
+        df_sentimiento,
+        x='subjetividad',
+        nbins=20,
+        title='Distribución de Subjetividad',
+        labels={'subjetividad': 'Subjetividad', 'count': 'Frecuencia'},
+        color_discrete_sequence=['coral']
+    )
+    fig.add_vline(x=0.5, line_dash="dash", line_color="red",
+                  annotation_text="Media")
+    return fig
+
+
+# ============================
+# Comparativa entre ediciones
+# ============================
+
+@medir_fase("figura")
+def grafica_comparativa_participacion(participacion_larga: pd.DataFrame) -> "go.Figure":
+    """Barras agrupadas por edición de una tabla larga [edicion, Indicador, Cantidad]"""
+    return px.bar(
+        participacion_larga,
+        x='Indicador',
+        y='Cantidad',
+        color='edicion',
+        barmode='group',
+        text='Cantidad',
+        labels={'edicion': 'Edición'}
+    )
+
+
+@medir_fase("figura")
+def grafica_comparativa_categorias(categorias: pd.DataFrame) -> "go.Figure":
+    """Promedio por categoría de cada edición (analitica.comparar_categorias)"""
+    fig = px.bar(
+        categorias,
+        x='Categoría',
+        y='Promedio',
+        color='edicion',
+        barmode='group',
+        text='Promedio',
+        title='Calificación Promedio por Categoría',
+        labels={'edicion': 'Edición'}
+    )
+    fig.update_traces(texttemplate='%{text:.2f}', textposition='outside')
+    fig.update_layout(yaxis_range=[0, 5.5])
+    return fig
+
+
+@medir_fase("figura")
+def grafica_comparativa_preguntas(preguntas: pd.DataFrame) -> "go.Figure":
+    """Promedio por pregunta de cada edición (analitica.comparar_calificaciones)"""
+    fig = px.bar(
+        preguntas,
+        x='pregunta_id',
+        y='promedio',
+        color='edicion',
+        barmode='group',
+        hover_data=['pregunta_texto', 'total'],
+        title='Calificación Promedio por Pregunta',
+        labels={'pregunta_id': 'ID Pregunta', 'promedio': 'Promedio', 'edicion': 'Edición'}
+    )
+    fig.update_layout(xaxis=dict(type='category'), yaxis_range=[0, 5.5])
+    return fig
+
+
+# ============================
+# Diagnóstico
+# ============================
+
+def grafica_latencias(latencias: pd.DataFrame, ventana: int) -> "go.Figure":
+    """Cajas de latencia por tabla (metricas.latencias_recientes)"""
+    return px.box(
+        latencias,
+        x='tabla',
+        y='latencia_ms',
+        points='outliers',
+        title=f'Latencia de las últimas {ventana} consultas por tabla',
+        labels={'tabla': 'Tabla', 'latencia_ms': 'Latencia (ms)'}
+    )
+
+
+def grafica_histograma_latencia(histograma: pd.DataFrame, tabla: str) -> "go.Figure":
+    """Consultas por intervalo de latencia de una tabla (metricas.histograma)"""
+    return px.bar(
+        histograma,
+        x='Latencia',
+        y='Consultas',
+        text='Consultas',
+        title=f'Distribución de latencia - {tabla}'
+    )
+
+
+def grafica_fases(por_fase: pd.DataFrame, ejecuciones: int) -> "go.Figure":
+    """Barras apiladas del tiempo promedio por fase de cada página (perfilador.trazas_recientes)"""
+    return px.bar(
+        por_fase,
+        x='ms',
+        y='pagina',
+        color='fase',
+        orientation='h',
+        title=f'Tiempo promedio por fase ({ejecuciones} ejecuciones perfiladas)',
+        labels={'ms': 'Milisegundos', 'pagina': '', 'fase': 'Fase'}
+    )
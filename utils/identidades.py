@@ -0,0 +1,264 @@
+"""
+Resolución de identidades del Dashboard JII
+Las tablas exportadas nombran a la misma persona de formas distintas: nombres con
+espacios dobles, emails con mayúsculas, y quien usa a la vez un Gmail personal y
+el correo institucional @ucaribe.edu.mx. Aquí se asigna un persona_id canónico a
+cada email de todas las tablas, para contar personas y no emails.
+
+Etapas:
+    normalizar   emails en minúsculas (en Gmail sin puntos ni +etiqueta), nombres
+                 sin acentos ni espacios dobles y teléfonos a sus últimos 10 dígitos
+    bloquear     solo se comparan emails que comparten teléfono, prefijo de
+                 matrícula (generación) y nombre, o un par de palabras del nombre;
+                 los bloques de más de MAX_BLOQUE emails se descartan, así el
+                 número de comparaciones crece casi linealmente
+    comparar     similitud de Dice entre los trigramas de los nombres; con el mismo
+                 teléfono basta UMBRAL_CON_TELEFONO, sin él se pide UMBRAL_NOMBRE.
+                 Dos matrículas distintas o dos teléfonos distintos nunca se unen
+    agrupar      componentes conexas de los pares aceptados; el email canónico de
+                 cada persona es el institucional si lo tiene
+"""
+
+import re
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from utils.analitica import normalizar_email
+from utils.duplicados import componentes
+from utils.perfilador import medir_fase
+
+DOMINIO_INSTITUCIONAL = "ucaribe.edu.mx"
+DOMINIOS_GMAIL = {"gmail.com", "googlemail.com"}
+
+UMBRAL_NOMBRE = 0.9          # similitud de nombre para unir sin teléfono en común
+UMBRAL_CON_TELEFONO = 0.5    # similitud de nombre para unir emails con el mismo teléfono
+MAX_BLOQUE = 100             # bloques más grandes no aportan candidatos (nombres muy comunes)
+PREFIJO_MATRICULA = 2        # dígitos de la matrícula que indican la generación
+
+# Columnas de cada tabla: (email, nombre, teléfono); None si la tabla no la tiene
+FUENTES = {
+    "participantes": [("email", "nombre_completo", "telefono")],
+    "inscripciones_workshop": [("participante_email", "participante_nombre", "participante_telefono")],
+    "asistencias": [("participante_email", None, None)],
+    "encuesta_respuestas": [("participante_email", "nombre_completo", None)],
+    "equipos_concurso": [("email_capitan", "nombre_capitan", "telefono_capitan")]
+    + [(f"email_miembro_{i}", None, None) for i in range(1, 6)],
+}
+
+_SIN_ACENTOS = str.maketrans("áéíóúüàèìòùñ", "aeiouuaeioun")
+_NO_LETRA = re.compile(r"[^a-z ]+")
+_ESPACIOS = re.compile(r"\s+")
+
+
+def normalizar_nombre(nombres: pd.Series) -> pd.Series:
+    """Minúsculas, sin acentos ni signos y con espacios simples ("Diego  Ubaldo" → "diego ubaldo")"""
+    return (
+        nombres.astype("string").str.lower().str.translate(_SIN_ACENTOS)
+        .str.replace(_NO_LETRA, " ", regex=True).str.replace(_ESPACIOS, " ", regex=True).str.strip()
+        .replace("", pd.NA)
+    )
+
+
+def normalizar_telefono(telefonos: pd.Series) -> pd.Series:
+    """Últimos 10 dígitos del teléfono (sin lada internacional); NA si tiene menos"""
+    digitos = telefonos.astype("string").str.replace(r"\.0$", "", regex=True).str.replace(r"\D", "", regex=True)
+    return digitos.where(digitos.str.len() >= 10).str[-10:]
+
+
+def canonizar_email(emails: pd.Series) -> pd.Series:
+    """Email normalizado; en Gmail sin puntos ni +etiqueta en la parte local, que Gmail ignora"""
+    emails = normalizar_email(emails)
+    unicos = pd.Series(emails.dropna().unique(), dtype="string")
+    partes = unicos.str.partition("@")
+    local, dominio = partes[0].str.replace(r"\+.*$", "", regex=True), partes[2]
+    local = local.where(~dominio.isin(DOMINIOS_GMAIL), local.str.replace(".", "", regex=False))
+    canonico = (local + "@" + dominio).where(partes[1] == "@", unicos)
+    return pd.Series(canonico.to_numpy()[pd.Index(unicos).get_indexer(emails)], index=emails.index,
+                     dtype="string").where(emails.notna())
+
+
+@medir_fase("transform")
+def registros(tablas: dict) -> pd.DataFrame:
+    """
+    Todas las menciones de personas en las tablas, en formato largo
+
+    Args:
+        tablas: {nombre_tabla: DataFrame} con las tablas de FUENTES que haya
+
+    Returns:
+        DataFrame [email, email_original, nombre, telefono] con los valores ya normalizados
+    """
+    partes = []
+    for tabla, columnas in FUENTES.items():
+        df = tablas.get(tabla)
+        if df is None or df.empty:
+            continue
+        for columna_email, columna_nombre, columna_telefono in columnas:
+            if columna_email not in df.columns:
+                continue
+            vacia = pd.Series(pd.NA, index=df.index, dtype="string")
+            partes.append(pd.DataFrame({
+                "email_original": normalizar_email(df[columna_email]),
+                "nombre": df[columna_nombre] if columna_nombre in df.columns else vacia,
+                "telefono": df[columna_telefono] if columna_telefono in df.columns else vacia,
+            }))
+    if not partes:
+        return pd.DataFrame(columns=["email", "email_original", "nombre", "telefono"])
+    df = pd.concat(partes, ignore_index=True).dropna(subset=["email_original"]).drop_duplicates()
+    return pd.DataFrame({
+        "email": canonizar_email(df["email_original"]),
+        "email_original": df["email_original"],
+        "nombre": normalizar_nombre(df["nombre"]),
+        "telefono": normalizar_telefono(df["telefono"]),
+    }).reset_index(drop=True)
+
+
+def _mas_frecuente(df: pd.DataFrame, columna: str) -> pd.Series:
+    """Valor más frecuente (no nulo) de una columna para cada email"""
+    conteo = df.dropna(subset=[columna]).groupby(["email", columna]).size().rename("n").reset_index()
+    return conteo.sort_values("n", ascending=False, kind="stable").drop_duplicates("email").set_index("email")[columna]
+
+
+def _trigramas(nombre) -> frozenset:
+    if not isinstance(nombre, str):
+        return frozenset()
+    texto = f"  {nombre} "
+    return frozenset(texto[i:i + 3] for i in range(len(texto) - 2))
+
+
+def _pares_por_bloque(nodo: np.ndarray, clave: pd.Series) -> np.ndarray:
+    """Pares (i, j), i < j, de nodos que comparten clave de bloque, sin bloques de más de MAX_BLOQUE"""
+    bloques = pd.DataFrame({"nodo": nodo, "clave": clave.to_numpy()}).dropna().drop_duplicates()
+    cubeta, _ = pd.factorize(bloques["clave"])
+    nodo = bloques["nodo"].to_numpy()
+    conteo = np.bincount(cubeta)
+    validos = np.flatnonzero((conteo[cubeta] > 1) & (conteo[cubeta] <= MAX_BLOQUE))
+    orden = validos[np.lexsort((nodo[validos], cubeta[validos]))]
+    limites = np.flatnonzero(np.diff(cubeta[orden])) + 1
+    pares = []
+    for grupo in np.split(nodo[orden], limites) if len(orden) else []:
+        i, j = np.triu_indices(len(grupo), k=1)
+        pares.append(np.column_stack([grupo[i], grupo[j]]))
+    return np.concatenate(pares) if pares else np.zeros((0, 2), dtype=np.int64)
+
+
+@medir_fase("transform")
+def resolver(menciones: pd.DataFrame) -> pd.DataFrame:
+    """
+    Asigna un persona_id a cada email
+
+    Args:
+        menciones: Resultado de registros
+
+    Returns:
+        DataFrame [email_original, email, persona_id, email_canonico, nombre, telefono, emails]
+        con una fila por email tal como aparece en las tablas (normalizado); emails es el
+        número de emails distintos de la persona
+    """
+    columnas = ["email_original", "email", "persona_id", "email_canonico", "nombre", "telefono", "emails"]
+    if menciones.empty:
+        return pd.DataFrame(columns=columnas)
+
+    # Un nodo por email canonizado, con su nombre y teléfono más frecuentes
+    nodos = pd.DataFrame(index=pd.Index(menciones["email"].unique(), name="email"))
+    nodos["nombre"] = _mas_frecuente(menciones, "nombre")
+    nodos["telefono"] = _mas_frecuente(menciones, "telefono")
+    nodos["menciones"] = menciones.groupby("email").size()
+    local_dominio = nodos.index.to_series().astype("string").str.partition("@")
+    institucional = (local_dominio[2] == DOMINIO_INSTITUCIONAL).fillna(False).to_numpy(dtype=bool)
+    es_matricula = local_dominio[0].str.isdigit().fillna(False).to_numpy(dtype=bool)
+    nodos["matricula"] = local_dominio[0].where(institucional & es_matricula).to_numpy()
+
+    # Bloques: teléfono, generación + primer nombre, y cada par de palabras del nombre
+    n = len(nodos)
+    posiciones = np.arange(n)
+    tokens = nodos["nombre"].str.split()
+    primer_nombre = tokens.str[0]
+    claves = [
+        (posiciones, "t:" + nodos["telefono"]),
+        (posiciones, "m:" + nodos["matricula"].str[:PREFIJO_MATRICULA] + "|" + primer_nombre),
+    ]
+    pares_nombre = tokens.dropna().map(lambda t: ["|".join(p) for p in combinations(sorted(set(t)), 2)]).explode()
+    claves.append((nodos.index.get_indexer(pares_nombre.index), "n:" + pares_nombre.astype("string")))
+    pares = np.concatenate([_pares_por_bloque(nodo, clave) for nodo, clave in claves])
+    pares = np.unique(pares, axis=0) if len(pares) else pares
+
+    # Comparar los candidatos
+    aceptados = np.zeros(len(pares), dtype=bool)
+    if len(pares):
+        a, b = pares[:, 0], pares[:, 1]
+        nombres = nodos["nombre"].to_numpy(dtype=object, na_value=None)
+        trigramas = {i: _trigramas(nombres[i]) for i in np.unique(pares)}
+        similitud = np.fromiter(
+            (2 * len(trigramas[i] & trigramas[j]) / (len(trigramas[i]) + len(trigramas[j]) or 1)
+             for i, j in zip(a, b)),
+            dtype=np.float64, count=len(a),
+        )
+        telefono = nodos["telefono"].to_numpy(dtype=object, na_value=None)
+        mat = nodos["matricula"].to_numpy(dtype=object, na_value=None)
+        tel_a, tel_b = telefono[a], telefono[b]
+        mismo_telefono = (tel_a != None) & (tel_a == tel_b)
+        telefono_distinto = (tel_a != None) & (tel_b != None) & (tel_a != tel_b)
+        matricula_distinta = (mat[a] != None) & (mat[b] != None) & (mat[a] != mat[b])
+        aceptados = ~matricula_distinta & (
+            (mismo_telefono & (similitud >= UMBRAL_CON_TELEFONO))
+            | (~telefono_distinto & (similitud >= UMBRAL_NOMBRE))
+        )
+
+    grupo = componentes(n, pares[aceptados])
+
+    # Email canónico: el institucional, luego el más mencionado, luego el menor
+    nodos["grupo"] = grupo
+    nodos["institucional"] = institucional
+    canonicos = (
+        nodos.reset_index()
+        .sort_values(["grupo", "institucional", "menciones", "email"], ascending=[True, False, False, True])
+        .drop_duplicates("grupo").set_index("grupo")
+    )
+    orden = canonicos["email"].sort_values()
+    persona_id = pd.Series(np.arange(1, len(orden) + 1), index=orden.index)
+    nodos["persona_id"] = persona_id.reindex(grupo).to_numpy()
+    nodos["email_canonico"] = canonicos["email"].reindex(grupo).to_numpy()
+    nodos["nombre"] = canonicos["nombre"].reindex(grupo).to_numpy()
+    nodos["emails"] = nodos.groupby("grupo")["menciones"].transform("size")
+
+    mapa = (
+        menciones[["email_original", "email"]].drop_duplicates("email_original")
+        .join(nodos[["persona_id", "email_canonico", "nombre", "telefono", "emails"]], on="email")
+    )
+    return mapa[columnas].reset_index(drop=True)
+
+
+def asignar_persona(df: pd.DataFrame, mapa: pd.DataFrame, columna_email: str = "participante_email") -> pd.Series:
+    """
+    persona_id de cada fila de una tabla, buscando su email en el mapa
+
+    Returns:
+        Serie Int64 con el mismo índice que df (NA si el email no está en el mapa)
+    """
+    indice = pd.Index(mapa["email_original"])
+    posicion = indice.get_indexer(normalizar_email(df[columna_email]))
+    ids = mapa["persona_id"].to_numpy()
+    return pd.Series(np.where(posicion >= 0, ids[posicion], 0), index=df.index).astype("Int64").where(posicion >= 0)
+
+
+def emails_canonicos(mapa: pd.DataFrame) -> pd.Series:
+    """{email normalizado: email canónico de la persona}, para unir tablas por persona"""
+    return pd.Series(mapa["email_canonico"].to_numpy(), index=pd.Index(mapa["email_original"]))
+
+
+def resumen_identidades(mapa: pd.DataFrame) -> dict:
+    """Emails distintos, personas y cuántos emails sobran por pertenecer a la misma persona"""
+    emails, personas = int(len(mapa)), int(mapa["persona_id"].nunique())
+    return {"emails": emails, "personas": personas, "unificados": emails - personas}
+
+
+def personas_con_varios_emails(mapa: pd.DataFrame) -> pd.DataFrame:
+    """Personas con más de un email [persona_id, nombre, email_canonico, emails_alternos]"""
+    varios = mapa[mapa["email_original"] != mapa["email_canonico"]]
+    return (
+        varios.groupby(["persona_id", "nombre", "email_canonico"], dropna=False)["email_original"]
+        .agg(", ".join).rename("emails_alternos").reset_index()
+    )
@@ -0,0 +1,200 @@
+"""
+Matriz de calificaciones del Dashboard JII
+La encuesta se guarda en formato largo (una fila por participante y pregunta). Aquí
+las respuestas de calificación 1-5 se pivotean una sola vez a una matriz compacta
+participante × pregunta (int8, con una máscara de respuestas faltantes) y sobre ella
+se calculan con NumPy vectorizado la matriz de correlación, el alfa de Cronbach y el
+ranking de impulsores de la calificación general, sin groupbys repetidos.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.perfilador import medir_fase
+from utils.preguntas_encuesta import obtener_pregunta_por_id
+
+# Calificación general de la JII y las preguntas que la explican
+PREGUNTA_GENERAL = 15
+PREGUNTAS_IMPULSORAS = (1, 2, 3, 5, 6, 7)
+
+
+class MatrizCalificaciones:
+    """
+    Calificaciones participante × pregunta
+
+    Attributes:
+        valores: ndarray int8 (participantes, preguntas); 0 donde no hay respuesta
+        mascara: ndarray bool con True donde hay respuesta
+        participantes: Identificador de cada fila
+        preguntas: ID de pregunta de cada columna (ordenados)
+
+    Los arreglos son de solo lectura: la matriz se comparte entre sesiones desde la caché.
+    """
+
+    def __init__(self, valores: np.ndarray, mascara: np.ndarray, participantes: np.ndarray, preguntas: np.ndarray):
+        for arreglo in (valores, mascara, participantes, preguntas):
+            arreglo.flags.writeable = False
+        self.valores = valores
+        self.mascara = mascara
+        self.participantes = participantes
+        self.preguntas = preguntas
+
+    @property
+    def forma(self) -> tuple:
+        return self.valores.shape
+
+    def columnas(self, preguntas) -> np.ndarray:
+        """Índices de columna de unos IDs de pregunta (los que no están en la matriz se omiten)"""
+        posiciones = {int(p): i for i, p in enumerate(self.preguntas)}
+        return np.array([posiciones[p] for p in preguntas if p in posiciones], dtype=np.intp)
+
+    def completas(self, columnas: np.ndarray) -> np.ndarray:
+        """Filas que respondieron todas las columnas indicadas"""
+        return self.mascara[:, columnas].all(axis=1)
+
+    def a_dataframe(self) -> pd.DataFrame:
+        """Matriz como DataFrame con NaN en las respuestas faltantes"""
+        return pd.DataFrame(
+            np.where(self.mascara, self.valores, np.nan),
+            index=self.participantes,
+            columns=self.preguntas,
+        )
+
+    def __repr__(self):
+        filas, columnas = self.forma
+        return f"<MatrizCalificaciones {filas}×{columnas}, {self.mascara.mean():.0%} respondido>"
+
+
+@medir_fase("transform")
+def construir_matriz(df_calificaciones: pd.DataFrame) -> MatrizCalificaciones:
+    """
+    Pivotea las respuestas de calificación a la matriz participante × pregunta
+
+    Args:
+        df_calificaciones: Respuestas con pregunta_id, respuesta_num y participante_email
+            (o participante_anonimo); si un participante respondió dos veces vale la última
+
+    Returns:
+        MatrizCalificaciones (vacía si no hay respuestas)
+    """
+    columna_participante = (
+        'participante_email' if 'participante_email' in df_calificaciones.columns else 'participante_anonimo'
+    )
+    df = df_calificaciones[df_calificaciones['respuesta_num'].between(1, 5)] if not df_calificaciones.empty else df_calificaciones
+    if df.empty:
+        return MatrizCalificaciones(
+            np.zeros((0, 0), dtype=np.int8), np.zeros((0, 0), dtype=bool), np.array([]), np.array([], dtype=np.int64)
+        )
+
+    filas, participantes = pd.factorize(df[columna_participante])
+    columnas, preguntas = pd.factorize(df['pregunta_id'], sort=True)
+
+    valores = np.zeros((len(participantes), len(preguntas)), dtype=np.int8)
+    mascara = np.zeros(valores.shape, dtype=bool)
+    valores[filas, columnas] = df['respuesta_num'].to_numpy().round().astype(np.int8)
+    mascara[filas, columnas] = True
+    return MatrizCalificaciones(valores, mascara, np.asarray(participantes), np.asarray(preguntas, dtype=np.int64))
+
+
+@medir_fase("transform")
+def correlaciones(matriz: MatrizCalificaciones) -> pd.DataFrame:
+    """
+    Correlación de Pearson entre preguntas con eliminación por pares
+
+    Cada par usa solo los participantes que respondieron ambas preguntas; las sumas
+    de todos los pares se obtienen con productos matriciales sobre la máscara.
+
+    Returns:
+        DataFrame pregunta × pregunta (NaN si un par tiene menos de 3 respuestas o varianza cero)
+    """
+    m = matriz.mascara.astype(np.float64)
+    x = matriz.valores.astype(np.float64)
+
+    n = m.T @ m                   # respuestas en común de cada par
+    suma = x.T @ m                # suma[i, j]: suma de i donde también se respondió j
+    suma_cuadrados = (x * x).T @ m
+    productos = x.T @ x
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        covarianza = n * productos - suma * suma.T
+        varianza = n * suma_cuadrados - suma ** 2
+        r = covarianza / np.sqrt(varianza * varianza.T)
+    r[n < 3] = np.nan
+    np.fill_diagonal(r, np.where(np.diag(n) >= 3, 1.0, np.nan))
+
+    return pd.DataFrame(np.clip(r, -1, 1), index=matriz.preguntas, columns=matriz.preguntas)
+
+
+@medir_fase("transform")
+def alfa_cronbach(matriz: MatrizCalificaciones, preguntas=None) -> dict:
+    """
+    Alfa de Cronbach de un conjunto de preguntas (consistencia interna)
+
+    Args:
+        matriz: Matriz de calificaciones
+        preguntas: IDs de las preguntas de la escala (por defecto todas las de la matriz)
+
+    Returns:
+        Diccionario {alfa, preguntas, participantes} con los participantes que respondieron
+        todas las preguntas; alfa es NaN si hay menos de 2 preguntas o de 2 participantes
+    """
+    columnas = matriz.columnas(matriz.preguntas if preguntas is None else preguntas)
+    x = matriz.valores[matriz.completas(columnas)][:, columnas].astype(np.float64)
+    k, n = x.shape[1], x.shape[0]
+    if k < 2 or n < 2:
+        return {"alfa": np.nan, "preguntas": k, "participantes": n}
+
+    varianza_total = x.sum(axis=1).var(ddof=1)
+    alfa = k / (k - 1) * (1 - x.var(axis=0, ddof=1).sum() / varianza_total) if varianza_total > 0 else np.nan
+    return {"alfa": float(alfa), "preguntas": k, "participantes": n}
+
+
+@medir_fase("transform")
+def impulsores_clave(matriz: MatrizCalificaciones, objetivo: int = PREGUNTA_GENERAL,
+                     predictores=PREGUNTAS_IMPULSORAS, edicion: int = None) -> pd.DataFrame:
+    """
+    Qué preguntas explican mejor la calificación general
+
+    Regresión lineal estandarizada de la pregunta objetivo sobre los predictores con
+    los participantes que respondieron todas. La importancia de cada predictor es la
+    medida de Pratt (beta × correlación), que se reparte el R² del modelo.
+
+    Returns:
+        DataFrame [pregunta_id, pregunta_texto, correlacion, beta, importancia, participacion]
+        ordenado por importancia; participacion es la fracción del R² (los atributos
+        r2 y participantes del DataFrame describen el modelo)
+    """
+    columnas_predictores = matriz.columnas(predictores)
+    columna_objetivo = matriz.columnas([objetivo])
+    columnas_resultado = ['pregunta_id', 'pregunta_texto', 'correlacion', 'beta', 'importancia', 'participacion']
+    if len(columna_objetivo) == 0 or len(columnas_predictores) == 0:
+        return pd.DataFrame(columns=columnas_resultado)
+
+    filas = matriz.completas(np.concatenate([columnas_predictores, columna_objetivo]))
+    x = matriz.valores[filas][:, columnas_predictores].astype(np.float64)
+    y = matriz.valores[filas][:, columna_objetivo[0]].astype(np.float64)
+    if len(y) <= len(columnas_predictores) + 1 or y.std() == 0:
+        return pd.DataFrame(columns=columnas_resultado)
+
+    # Estandarizar; una pregunta sin varianza no aporta y queda con beta 0
+    desviacion = x.std(axis=0)
+    desviacion[desviacion == 0] = np.inf
+    zx = (x - x.mean(axis=0)) / desviacion
+    zy = (y - y.mean()) / y.std()
+
+    beta, *_ = np.linalg.lstsq(zx, zy, rcond=None)
+    correlacion = zx.T @ zy / len(zy)
+    importancia = beta * correlacion
+    r2 = float(importancia.sum())
+
+    ids = matriz.preguntas[columnas_predictores]
+    resultado = pd.DataFrame({
+        'pregunta_id': ids,
+        'pregunta_texto': [(obtener_pregunta_por_id(int(p), edicion) or {}).get('texto', str(p)) for p in ids],
+        'correlacion': correlacion,
+        'beta': beta,
+        'importancia': importancia,
+        'participacion': importancia / r2 if r2 > 0 else np.nan,
+    }).sort_values('importancia', ascending=False, ignore_index=True)
+    resultado.attrs.update(r2=r2, participantes=int(filas.sum()))
+    return resultado
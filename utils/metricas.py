@@ -0,0 +1,249 @@
+"""
+Métricas de consultas del Dashboard JII
+Registra latencia, filas, bytes, reintentos, errores y aciertos de caché de cada
+consulta a la base de datos, agrupados por tabla. Los histogramas viven en memoria
+(compartidos por todas las sesiones del proceso) y se exponen en la página de
+Diagnóstico, en formato de texto de Prometheus y, opcionalmente, como log JSONL.
+
+Variables de entorno:
+    JII_METRICAS_LOG     Archivo JSONL donde se agrega una línea por consulta
+    JII_METRICAS_PUERTO  Puerto para servir /metrics en formato Prometheus
+    JII_METRICAS_HOST    Interfaz donde se sirve /metrics (por defecto 127.0.0.1, solo local;
+                         0.0.0.0 para que Prometheus lo lea desde otra máquina)
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+VARIABLE_LOG = "JII_METRICAS_LOG"
+VARIABLE_PUERTO = "JII_METRICAS_PUERTO"
+VARIABLE_HOST = "JII_METRICAS_HOST"
+HOST_DEFECTO = "127.0.0.1"
+
+# Límites superiores (segundos) de los histogramas de latencia, como en Prometheus
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Número de consultas recientes por tabla usadas para los percentiles
+VENTANA = 1000
+
+
+class _MetricasTabla:
+    """Contadores, histograma acumulado y ventana móvil de una tabla"""
+
+    def __init__(self):
+        self.consultas = 0
+        self.errores = 0
+        self.reintentos = 0
+        self.cache_aciertos = 0
+        self.cache_fallos = 0
+        self.filas = 0
+        self.bytes = 0
+        self.segundos = 0.0
+        self.buckets = [0] * (len(BUCKETS_LATENCIA) + 1)
+        self.recientes = deque(maxlen=VENTANA)
+        self.ultimo_error = None
+
+    def registrar(self, duracion, filas, bytes_, reintentos, cache, error):
+        if cache:
+            self.cache_aciertos += 1
+        else:
+            # Solo las consultas reales a la fuente entran al histograma de latencia
+            self.cache_fallos += 1
+            self.consultas += 1
+            self.segundos += duracion
+            self.buckets[bisect_left(BUCKETS_LATENCIA, duracion)] += 1
+            self.recientes.append(duracion)
+        self.filas += filas
+        self.bytes += bytes_
+        self.reintentos += reintentos
+        if error:
+            self.errores += 1
+            self.ultimo_error = error
+
+
+_lock = threading.Lock()
+_tablas = {}
+_inicio = time.time()
+
+
+def registrar_consulta(tabla: str, duracion: float, filas: int = 0, bytes_: int = 0, reintentos: int = 0,
+                       cache: bool = False, error: str = None, fuente: str = "supabase"):
+    """
+    Registra una consulta en los histogramas del proceso
+
+    Args:
+        tabla: Tabla consultada
+        duracion: Segundos que tardó la consulta (incluye reintentos)
+        filas: Filas devueltas
+        bytes_: Tamaño aproximado de la respuesta en bytes
+        reintentos: Intentos adicionales después del primero
+        cache: True si el resultado se sirvió desde la caché
+        error: Mensaje de error si la consulta falló
+        fuente: "supabase" o "local"
+    """
+    with _lock:
+        _tablas.setdefault(tabla, _MetricasTabla()).registrar(duracion, filas, bytes_, reintentos, cache, error)
+
+    ruta_log = os.getenv(VARIABLE_LOG)
+    if ruta_log:
+        registro = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "tabla": tabla,
+            "fuente": fuente,
+            "duracion_ms": round(duracion * 1000, 2),
+            "filas": filas,
+            "bytes": bytes_,
+            "reintentos": reintentos,
+            "cache": "acierto" if cache else "fallo",
+            "error": error,
+        }
+        with _lock, open(ruta_log, "a", encoding="utf-8") as archivo:
+            archivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+
+def resumen() -> pd.DataFrame:
+    """
+    Resumen por tabla para la página de Diagnóstico
+
+    Returns:
+        DataFrame con consultas, percentiles de latencia (ms), filas, MB, reintentos,
+        errores y tasa de aciertos de caché de cada tabla
+    """
+    filas = []
+    with _lock:
+        for tabla, m in sorted(_tablas.items()):
+            recientes = np.array(m.recientes) * 1000 if m.recientes else np.array([np.nan])
+            total_cache = m.cache_aciertos + m.cache_fallos
+            filas.append({
+                "tabla": tabla,
+                "consultas": m.consultas,
+                "p50_ms": np.percentile(recientes, 50),
+                "p95_ms": np.percentile(recientes, 95),
+                "p99_ms": np.percentile(recientes, 99),
+                "max_ms": recientes.max(),
+                "segundos_totales": m.segundos,
+                "filas": m.filas,
+                "MB": m.bytes / 1024 ** 2,
+                "reintentos": m.reintentos,
+                "errores": m.errores,
+                "aciertos_cache": m.cache_aciertos,
+                "tasa_cache": m.cache_aciertos / total_cache if total_cache else 0.0,
+                "ultimo_error": m.ultimo_error,
+            })
+    return pd.DataFrame(filas)
+
+
+def histograma(tabla: str) -> pd.DataFrame:
+    """Conteo de consultas de una tabla por intervalo de latencia (no acumulado)"""
+    with _lock:
+        m = _tablas.get(tabla)
+        conteos = list(m.buckets) if m else [0] * (len(BUCKETS_LATENCIA) + 1)
+    etiquetas = [f"≤ {int(b * 1000)} ms" for b in BUCKETS_LATENCIA] + [f"> {int(BUCKETS_LATENCIA[-1] * 1000)} ms"]
+    return pd.DataFrame({"Latencia": etiquetas, "Consultas": conteos})
+
+
+def latencias_recientes() -> pd.DataFrame:
+    """Latencias (ms) de la ventana móvil de cada tabla en formato largo"""
+    with _lock:
+        datos = [(tabla, d * 1000) for tabla, m in _tablas.items() for d in m.recientes]
+    return pd.DataFrame(datos, columns=["tabla", "latencia_ms"])
+
+
+def reiniciar():
+    """Borra todas las métricas del proceso"""
+    global _inicio
+    with _lock:
+        _tablas.clear()
+        _inicio = time.time()
+
+
+def exportar_prometheus() -> str:
+    """Métricas en formato de texto de exposición de Prometheus"""
+    lineas = [
+        "# HELP jii_consulta_segundos Latencia de las consultas a la fuente de datos",
+        "# TYPE jii_consulta_segundos histogram",
+    ]
+    contadores = {
+        "jii_consulta_filas_total": ("Filas devueltas", "filas"),
+        "jii_consulta_bytes_total": ("Bytes recibidos", "bytes"),
+        "jii_consulta_reintentos_total": ("Reintentos de consultas", "reintentos"),
+        "jii_consulta_errores_total": ("Consultas fallidas", "errores"),
+        "jii_cache_aciertos_total": ("Consultas servidas desde la caché", "cache_aciertos"),
+        "jii_cache_fallos_total": ("Consultas que fueron a la fuente", "cache_fallos"),
+    }
+
+    with _lock:
+        tablas = sorted(_tablas.items())
+        for tabla, m in tablas:
+            acumulado = 0
+            for limite, conteo in zip(BUCKETS_LATENCIA, m.buckets):
+                acumulado += conteo
+                lineas.append(f'jii_consulta_segundos_bucket{{tabla="{tabla}",le="{limite}"}} {acumulado}')
+            lineas.append(f'jii_consulta_segundos_bucket{{tabla="{tabla}",le="+Inf"}} {m.consultas}')
+            lineas.append(f'jii_consulta_segundos_sum{{tabla="{tabla}"}} {m.segundos:.6f}')
+            lineas.append(f'jii_consulta_segundos_count{{tabla="{tabla}"}} {m.consultas}')
+
+        for nombre, (ayuda, atributo) in contadores.items():
+            lineas.append(f"# HELP {nombre} {ayuda}")
+            lineas.append(f"# TYPE {nombre} counter")
+            for tabla, m in tablas:
+                lineas.append(f'{nombre}{{tabla="{tabla}"}} {getattr(m, atributo)}')
+
+    lineas.append("# HELP jii_metricas_inicio_segundos Inicio de la ventana de métricas (epoch)")
+    lineas.append("# TYPE jii_metricas_inicio_segundos gauge")
+    lineas.append(f"jii_metricas_inicio_segundos {_inicio:.0f}")
+    return "\n".join(lineas) + "\n"
+
+
+_servidor = None
+
+
+def iniciar_exportador(puerto: int = None, host: str = None):
+    """
+    Sirve /metrics en formato Prometheus desde un hilo del proceso de Streamlit
+
+    Args:
+        puerto: Puerto a escuchar (por defecto JII_METRICAS_PUERTO; sin valor no se inicia)
+        host: Interfaz a escuchar (por defecto JII_METRICAS_HOST o 127.0.0.1)
+
+    Returns:
+        Puerto en el que se sirve o None si el exportador está desactivado
+    """
+    global _servidor
+    puerto = puerto or (int(os.getenv(VARIABLE_PUERTO)) if os.getenv(VARIABLE_PUERTO) else None)
+    if not puerto:
+        return None
+
+    with _lock:
+        if _servidor is not None:
+            return _servidor.server_address[1]
+
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                cuerpo = exportar_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, *args):
+                pass
+
+        host = host or os.getenv(VARIABLE_HOST) or HOST_DEFECTO
+        _servidor = ThreadingHTTPServer((host, puerto), _Handler)
+        threading.Thread(target=_servidor.serve_forever, name="jii-metricas", daemon=True).start()
+        return _servidor.server_address[1]
@@ -0,0 +1,363 @@
+"""
+Perfilador de páginas del Dashboard JII
+Mide cuánto tarda cada ejecución de una página en sus fases: consulta de datos
+(fetch), transformación con pandas (transform), análisis de sentimiento, construcción
+de figuras de Plotly (figura) y el resto del script, que es el render de Streamlit.
+
+Solo se perfila una fracción de las ejecuciones; en las demás cada fase cuesta una
+lectura de una variable local del hilo, así que el perfilador puede quedarse activo
+en producción. Las trazas se escriben en un JSONL rotativo.
+
+    perfil = perfil_pagina("Dashboard", edicion=edicion)
+    ...
+    perfil.terminar()
+
+Las secciones de las páginas que son st.fragment se decoran con perfil_seccion, para
+medir también las ejecuciones en que Streamlit repite solo esa sección.
+
+Variables de entorno:
+    JII_PERFIL_MUESTREO  Fracción de ejecuciones perfiladas (por defecto 0.1; 0 lo desactiva)
+    JII_PERFIL_PILAS     "cprofile" o "pyinstrument" para guardar también las pilas
+    JII_PERFIL_LOG       Archivo JSONL de trazas (por defecto perfiles/trazas.jsonl)
+    JII_PERFIL_MAX_MB    Tamaño máximo de cada archivo antes de rotar (por defecto 10)
+"""
+
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from utils import almacen
+from utils.arranque import disponible
+
+# pyinstrument se importa solo al arrancar un perfil con JII_PERFIL_PILAS=pyinstrument
+PYINSTRUMENT_DISPONIBLE = disponible("pyinstrument")
+
+ROOT = Path(__file__).resolve().parent.parent
+
+VARIABLE_MUESTREO = "JII_PERFIL_MUESTREO"
+VARIABLE_PILAS = "JII_PERFIL_PILAS"
+VARIABLE_LOG = "JII_PERFIL_LOG"
+VARIABLE_MAX_MB = "JII_PERFIL_MAX_MB"
+
+MUESTREO_DEFECTO = 0.1
+ARCHIVOS_ROTADOS = 5
+
+# Fase a la que se asigna el tiempo que no cae en ninguna fase medida
+FASE_RENDER = "render"
+
+# Número de funciones guardadas de cada perfil de cProfile
+FUNCIONES_CPROFILE = 25
+
+# Trazas recientes en memoria para la página de Diagnóstico
+_recientes = deque(maxlen=500)
+_local = threading.local()
+_lock = threading.Lock()
+_escritor = None
+
+
+class _Traza:
+    """Una ejecución perfilada: tiempo propio de cada fase y pilas opcionales"""
+
+    def __init__(self, pagina: str, contexto: dict):
+        self.pagina = pagina
+        self.contexto = contexto
+        self.fases = {}
+        self.llamadas = {}
+        # Pila de [fase, inicio, tiempo de fases anidadas]
+        self._pila = []
+        self._perfilador = _iniciar_pilas(os.getenv(VARIABLE_PILAS, "").lower())
+        self.inicio = time.perf_counter()
+
+    def entrar(self, fase: str):
+        self._pila.append([fase, time.perf_counter(), 0.0])
+
+    def salir(self):
+        fase, inicio, anidado = self._pila.pop()
+        duracion = time.perf_counter() - inicio
+        # Tiempo propio: las fases anidadas (p. ej. una consulta dentro de una transformación) no se cuentan dos veces
+        self.fases[fase] = self.fases.get(fase, 0.0) + duracion - anidado
+        self.llamadas[fase] = self.llamadas.get(fase, 0) + 1
+        if self._pila:
+            self._pila[-1][2] += duracion
+
+    def descartar(self):
+        """Abandona la traza de una ejecución que no llegó al final (st.stop)"""
+        _detener_pilas(self._perfilador)
+
+    def terminar(self):
+        total = time.perf_counter() - self.inicio
+        pilas = _detener_pilas(self._perfilador)
+        fases = {fase: round(segundos * 1000, 3) for fase, segundos in self.fases.items()}
+        fases[FASE_RENDER] = round(max(total - sum(self.fases.values()), 0.0) * 1000, 3)
+
+        registro = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "pagina": self.pagina,
+            "total_ms": round(total * 1000, 3),
+            "fases_ms": fases,
+            "llamadas": self.llamadas,
+            **self.contexto,
+        }
+        if pilas:
+            registro["pilas"] = pilas
+        _recientes.append(registro)
+        _escribir(registro)
+
+
+class _Fase:
+    """Context manager de una fase sobre la traza activa del hilo"""
+
+    __slots__ = ("traza", "nombre")
+
+    def __init__(self, traza, nombre):
+        self.traza = traza
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.traza.entrar(self.nombre)
+
+    def __exit__(self, *exc):
+        self.traza.salir()
+        return False
+
+
+class _SinFase:
+    """Fase vacía para las ejecuciones que no se perfilan"""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_SIN_FASE = _SinFase()
+
+
+class Perfil:
+    """Perfil de una ejecución de página (vacío si no entró en la muestra)"""
+
+    def __init__(self, traza: _Traza = None, pagina: str = None):
+        self._traza = traza
+        self.pagina = pagina
+
+    @property
+    def activo(self) -> bool:
+        return self._traza is not None
+
+    def fase(self, nombre: str):
+        """Context manager que asigna el bloque a la fase `nombre`"""
+        return _Fase(self._traza, nombre) if self._traza else _SIN_FASE
+
+    def terminar(self):
+        """
+        Cierra la traza y la escribe; se llama al final del script de la página
+
+        También resume la memoria de las vistas de la sesión (utils/almacen.py), con o
+        sin traza.
+        """
+        if self._traza is not None and getattr(_local, "traza", None) is self._traza:
+            _local.traza = None
+            self._traza.terminar()
+        self._traza = None
+        almacen.cerrar_ejecucion(self.pagina)
+
+    def descartar(self):
+        """Abandona la traza sin escribirla; no hace nada si ya se terminó"""
+        if self._traza is not None and getattr(_local, "traza", None) is self._traza:
+            _local.traza = None
+            self._traza.descartar()
+        self._traza = None
+
+
+def perfil_pagina(pagina: str, **contexto) -> Perfil:
+    """
+    Inicia el perfil de la ejecución actual de una página
+
+    Args:
+        pagina: Nombre de la página
+        **contexto: Datos adicionales que se guardan en la traza (p. ej. edicion)
+
+    Returns:
+        Perfil de la ejecución; hay que llamar a terminar() al final del script.
+        Si la ejecución se detiene antes (st.stop), la traza se descarta.
+    """
+    anterior = getattr(_local, "traza", None)
+    if anterior is not None:
+        anterior.descartar()
+
+    muestreo = float(os.getenv(VARIABLE_MUESTREO, MUESTREO_DEFECTO))
+    if muestreo <= 0 or random.random() >= muestreo:
+        _local.traza = None
+        return Perfil(pagina=pagina)
+
+    _local.traza = _Traza(pagina, contexto)
+    return Perfil(_local.traza, pagina)
+
+
+def fase(nombre: str):
+    """Context manager de una fase sobre el perfil activo del hilo (si lo hay)"""
+    traza = getattr(_local, "traza", None)
+    return _Fase(traza, nombre) if traza else _SIN_FASE
+
+
+def medir_fase(nombre: str):
+    """
+    Decorador que asigna el tiempo de la función a una fase del perfil activo
+
+    Args:
+        nombre: Fase ("fetch", "transform", "sentimiento", "figura", ...)
+    """
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            traza = getattr(_local, "traza", None)
+            if traza is None:
+                return funcion(*args, **kwargs)
+            traza.entrar(nombre)
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                traza.salir()
+        return envoltura
+    return decorador
+
+
+def _solo_fragmento() -> bool:
+    """True si Streamlit está ejecutando solo fragmentos y no la página completa"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return False
+    ctx = get_script_run_ctx()
+    return bool(ctx is not None and ctx.fragment_ids_this_run)
+
+
+def perfil_seccion(pagina: str):
+    """
+    Decorador de las secciones de una página que son st.fragment
+
+    En la ejecución completa de la página la sección es parte de la traza de la
+    página. Cuando cambia un widget de la sección, Streamlit vuelve a ejecutar solo
+    el fragmento; esa ejecución se perfila como una traza propia con la sección y
+    los argumentos escalares (p. ej. edicion) en el contexto.
+
+        @st.fragment
+        @perfil_seccion("Dashboard")
+        def seccion_embudo(edicion): ...
+
+    Args:
+        pagina: Nombre de la página, el mismo que en perfil_pagina
+    """
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not _solo_fragmento():
+                return funcion(*args, **kwargs)
+            contexto = {k: v for k, v in kwargs.items() if isinstance(v, (int, float, str))}
+            perfil = perfil_pagina(pagina, seccion=funcion.__name__, **contexto)
+            try:
+                resultado = funcion(*args, **kwargs)
+                perfil.terminar()
+                return resultado
+            finally:
+                # Si la sección lanzó una excepción (o st.stop / st.rerun), su traza no se
+                # queda en el hilo para la siguiente ejecución
+                perfil.descartar()
+        return envoltura
+    return decorador
+
+
+def _iniciar_pilas(modo: str):
+    """Arranca cProfile o pyinstrument para la ejecución (None si no se piden pilas)"""
+    try:
+        if modo == "cprofile":
+            import cProfile
+            perfilador = cProfile.Profile()
+            perfilador.enable()
+            return perfilador
+        if modo == "pyinstrument" and PYINSTRUMENT_DISPONIBLE:
+            import pyinstrument
+            perfilador = pyinstrument.Profiler(async_mode="disabled")
+            perfilador.start()
+            return perfilador
+    except (RuntimeError, ValueError):
+        # Otro perfilador ya está activo en el hilo (p. ej. otra sesión con cProfile)
+        pass
+    return None
+
+
+def _detener_pilas(perfilador):
+    """Detiene el perfilador y resume sus pilas en algo serializable a JSON"""
+    if perfilador is None:
+        return None
+    # pyinstrument.Profiler (sin importarlo aquí: si no se usó, no está cargado)
+    if hasattr(perfilador, "output_text"):
+        perfilador.stop()
+        return perfilador.output_text(unicode=True, color=False)
+
+    import pstats
+    perfilador.disable()
+    estadisticas = pstats.Stats(perfilador)
+    funciones = sorted(estadisticas.stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        {
+            "funcion": f"{Path(archivo).name}:{linea}({nombre})",
+            "llamadas": llamadas,
+            "propio_ms": round(propio * 1000, 3),
+            "acumulado_ms": round(acumulado * 1000, 3),
+        }
+        for (archivo, linea, nombre), (_, llamadas, propio, acumulado, _) in funciones[:FUNCIONES_CPROFILE]
+    ]
+
+
+def _escribir(registro: dict):
+    """Agrega la traza al JSONL rotativo"""
+    global _escritor
+    with _lock:
+        if _escritor is None:
+            ruta = Path(os.getenv(VARIABLE_LOG) or ROOT / "perfiles" / "trazas.jsonl")
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                ruta,
+                maxBytes=int(float(os.getenv(VARIABLE_MAX_MB, 10)) * 1024 ** 2),
+                backupCount=ARCHIVOS_ROTADOS,
+                encoding="utf-8",
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            _escritor = logging.getLogger("jii.perfiles")
+            _escritor.propagate = False
+            _escritor.setLevel(logging.INFO)
+            _escritor.addHandler(handler)
+    _escritor.info(json.dumps(registro, ensure_ascii=False, default=str))
+
+
+def _etiqueta(registro: dict) -> str:
+    seccion = registro.get("seccion")
+    return f"{registro['pagina']} › {seccion}" if seccion else registro["pagina"]
+
+
+def trazas_recientes() -> pd.DataFrame:
+    """
+    Trazas recientes del proceso en formato largo
+
+    Returns:
+        DataFrame [ts, pagina, fase, ms, total_ms]; las ejecuciones de una sección sola
+        (ver perfil_seccion) aparecen como "pagina › seccion"
+    """
+    filas = [
+        {"ts": r["ts"], "pagina": _etiqueta(r), "fase": fase, "ms": ms, "total_ms": r["total_ms"]}
+        for r in list(_recientes)
+        for fase, ms in r["fases_ms"].items()
+    ]
+    return pd.DataFrame(filas, columns=["ts", "pagina", "fase", "ms", "total_ms"])
@@ -0,0 +1,233 @@
+"""
+Precalentamiento de cachés del Dashboard JII
+Carga todas las tablas con los helpers obtener_* y construye los artefactos
+derivados (estadísticas de calificación, frecuencias de palabras, sentimiento,
+series temporales) al arrancar el proceso y después en intervalos, antes de que
+expiren las cachés. Así ninguna sesión espera datos fríos durante el evento.
+Las tablas y artefactos ligados a la versión de sus tablas (utils/versiones.py)
+solo se recalculan en un ciclo si sus tablas cambiaron o si vencerían (JII_CACHE_TTL)
+antes del ciclo siguiente.
+
+Arranca con el servidor: utils/servidor.py lo inicia antes de levantar Streamlit.
+Si el servidor se levantó con `streamlit run` directamente, lo inicia
+utils/supabase_client.py al importarse por primera vez. El módulo no importa nada
+pesado al cargarse.
+
+Variables de entorno:
+    JII_PRECALENTAR            "0" desactiva el precalentamiento (por defecto activo)
+    JII_PRECALENTAR_INTERVALO  Segundos entre ciclos (por defecto 80% de JII_CACHE_TTL)
+    JII_PRECALENTAR_EDICIONES  Años separados por coma (por defecto la edición actual)
+
+    python -m utils.precalentamiento      # un ciclo con el tiempo de cada artefacto
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+VARIABLE_PRECALENTAR = "JII_PRECALENTAR"
+VARIABLE_INTERVALO = "JII_PRECALENTAR_INTERVALO"
+VARIABLE_EDICIONES = "JII_PRECALENTAR_EDICIONES"
+
+# Fracción del TTL a la que se repite el ciclo, para refrescar antes de expirar
+FRACCION_TTL = 0.8
+
+# Número de palabras que muestra por defecto la página de Sentimientos
+TOP_PALABRAS = 20
+
+_lock = threading.Lock()
+_hilo = None
+
+# Estado del último ciclo, para la página de Diagnóstico
+estado = {
+    "listo": False,
+    "en_curso": False,
+    "ciclos": 0,
+    "inicio": None,
+    "fin": None,
+    "duracion_s": None,
+    "ediciones": [],
+    "errores": {},
+    "tiempos_ms": {},
+}
+
+
+def _ediciones() -> list:
+    from utils.ediciones import edicion_actual
+
+    valor = os.getenv(VARIABLE_EDICIONES)
+    if valor:
+        return [int(e) for e in valor.split(",") if e.strip()]
+    return [edicion_actual()]
+
+
+def _intervalo() -> float:
+    from utils.cache import ttl_cache
+
+    valor = os.getenv(VARIABLE_INTERVALO)
+    return float(valor) if valor else ttl_cache() * FRACCION_TTL
+
+
+def tareas(edicion: int) -> list:
+    """
+    Tablas y artefactos a calentar de una edición, en orden de dependencia
+
+    Returns:
+        Lista de (nombre, función sin argumentos)
+    """
+    from utils import derivados
+    from utils.analitica import MOTOR_DEFECTO, TEXTBLOB_DISPONIBLE
+    from utils.audiencias import AUDIENCIAS_DISPONIBLE
+    from utils.temas import TEMAS_DISPONIBLE
+    from utils.duplicados import MODO_DEFECTO
+    from utils.preguntas_encuesta import obtener_preguntas_por_tipo
+    from utils.supabase_client import (
+        obtener_participantes,
+        obtener_actividades,
+        obtener_inscripciones_workshop,
+        obtener_registro_workshops,
+        obtener_asistencias,
+        obtener_equipos_concurso,
+        obtener_respuestas_encuesta,
+    )
+
+    lista = [
+        ("participantes", lambda: obtener_participantes(edicion)),
+        ("actividades", lambda: obtener_actividades(edicion)),
+        ("inscripciones_workshop", lambda: obtener_inscripciones_workshop(edicion)),
+        ("registro_workshops", lambda: obtener_registro_workshops(edicion)),
+        ("asistencias", lambda: obtener_asistencias(edicion)),
+        ("equipos_concurso", lambda: obtener_equipos_concurso(edicion)),
+        ("encuesta_respuestas", lambda: obtener_respuestas_encuesta(edicion=edicion)),
+        ("encuesta_calificacion", lambda: obtener_respuestas_encuesta(edicion=edicion, tipos=['calificacion_1_5'])),
+        ("encuesta_texto_largo", lambda: obtener_respuestas_encuesta(anonimizar=True, edicion=edicion, tipos=['texto_largo'])),
+        ("kpis", lambda: derivados.kpis(edicion)),
+        ("serie_asistencias", lambda: derivados.serie_asistencias(edicion)),
+        ("serie_equipos", lambda: derivados.serie_equipos(edicion)),
+        ("calificaciones", lambda: derivados.calificaciones(edicion)),
+        ("estadisticas_calificaciones", lambda: derivados.estadisticas_calificaciones(edicion)),
+        ("promedios_categoria", lambda: derivados.promedios_categoria(edicion)),
+        ("matriz", lambda: derivados.matriz(edicion)),
+        ("correlaciones", lambda: derivados.correlaciones(edicion)),
+        ("alfa_cronbach", lambda: derivados.alfa_cronbach(edicion)),
+        ("impulsores", lambda: derivados.impulsores(edicion)),
+        ("texto_largo", lambda: derivados.texto_largo(edicion)),
+        ("duplicados_texto", lambda: derivados.duplicados_texto(edicion)),
+        # Sin copias: con este conjunto se ajusta el modelo de temas
+        ("texto_largo_colapsado", lambda: derivados.texto_largo(edicion, duplicados="colapsar")),
+    ]
+    for pregunta in obtener_preguntas_por_tipo('texto_largo', edicion):
+        lista.append((
+            f"frecuencias_{pregunta['id']}",
+            lambda pregunta_id=pregunta['id']: derivados.frecuencias(
+                edicion, pregunta_id, TOP_PALABRAS, duplicados=MODO_DEFECTO
+            ),
+        ))
+    lista.append(("personas", lambda: derivados.personas(edicion)))
+    lista.append(("indice_embudo", lambda: derivados.indice_embudo(edicion)))
+    lista.append(("asignacion_lista_espera", lambda: derivados.asignacion_lista_espera(edicion)))
+    if AUDIENCIAS_DISPONIBLE:
+        lista.append(("incidencia_asistencias", lambda: derivados.incidencia_asistencias(edicion)))
+        lista.append(("coasistencia", lambda: derivados.coasistencia(edicion)))
+        lista.append(("jaccard_actividades", lambda: derivados.jaccard_actividades(edicion)))
+        lista.append(("pares_actividades", lambda: derivados.pares_actividades(edicion)))
+        lista.append(("afinidad_equipos", lambda: derivados.afinidad_equipos(edicion)))
+    if TEMAS_DISPONIBLE:
+        lista.append(("temas_respuestas", lambda: derivados.temas_respuestas(edicion)))
+        lista.append(("resumen_temas", lambda: derivados.resumen_temas(edicion, duplicados=MODO_DEFECTO)))
+        lista.append(("temas_pregunta", lambda: derivados.temas_pregunta(edicion, duplicados=MODO_DEFECTO)))
+    lista.append(("sentimiento", lambda: derivados.sentimiento(edicion, motor=MOTOR_DEFECTO)))
+    if TEXTBLOB_DISPONIBLE and MOTOR_DEFECTO != "textblob":
+        lista.append(("sentimiento_textblob", lambda: derivados.sentimiento(edicion, motor="textblob")))
+    return lista
+
+
+def precalentar(ediciones: list = None) -> dict:
+    """
+    Ejecuta un ciclo completo: recalcula cada tabla y artefacto y los deja en caché
+
+    Args:
+        ediciones: Años a calentar (por defecto JII_PRECALENTAR_EDICIONES o la edición actual)
+
+    Returns:
+        Estado del ciclo (también disponible en precalentamiento.estado)
+    """
+    from utils.cache import refrescando, ttl_cache
+
+    ediciones = ediciones or _ediciones()
+    tiempos, errores = {}, {}
+    inicio = time.perf_counter()
+    estado.update(en_curso=True, inicio=datetime.now())
+
+    # refrescando(): se reemplazan las entradas aunque sigan vigentes, así no expiran entre ciclos.
+    # Las que tienen versión solo si vencerían antes de que termine el siguiente ciclo
+    antiguedad = ttl_cache() - _intervalo() - 2 * (estado["duracion_s"] or 0)
+    with refrescando(max(antiguedad, 0.0)):
+        for edicion in ediciones:
+            for nombre, tarea in tareas(edicion):
+                clave = f"{edicion}/{nombre}"
+                t0 = time.perf_counter()
+                try:
+                    tarea()
+                except Exception as e:
+                    logger.exception("Error al precalentar %s", clave)
+                    errores[clave] = f"{type(e).__name__}: {e}"
+                tiempos[clave] = round((time.perf_counter() - t0) * 1000, 1)
+
+    duracion = time.perf_counter() - inicio
+    estado.update(
+        listo=True,
+        en_curso=False,
+        ciclos=estado["ciclos"] + 1,
+        fin=datetime.now(),
+        duracion_s=round(duracion, 2),
+        ediciones=list(ediciones),
+        errores=errores,
+        tiempos_ms=tiempos,
+    )
+    logger.info("Cachés listas para %s en %.2f s (%d errores)", ediciones, duracion, len(errores))
+    return estado
+
+
+def _ciclo():
+    while True:
+        try:
+            precalentar()
+        except Exception:
+            logger.exception("Error en el ciclo de precalentamiento")
+        time.sleep(_intervalo())
+
+
+def iniciar_precalentamiento() -> bool:
+    """
+    Inicia el precalentamiento en un hilo del proceso (una sola vez por proceso)
+
+    Returns:
+        True si el precalentamiento está activo
+    """
+    global _hilo
+    if os.getenv(VARIABLE_PRECALENTAR, "1") == "0":
+        return False
+    with _lock:
+        if _hilo is None:
+            _hilo = threading.Thread(target=_ciclo, name="jii-precalentamiento", daemon=True)
+            _hilo.start()
+    return True
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    resultado = precalentar()
+    for clave, ms in sorted(resultado["tiempos_ms"].items(), key=lambda t: t[1], reverse=True):
+        print(f"{ms:>10.1f} ms  {clave}")
+    for clave, error in resultado["errores"].items():
+        print(f"ERROR {clave}: {error}")
+    print(f"Ciclo completo en {resultado['duracion_s']} s")
+
+
+if __name__ == "__main__":
+    main()
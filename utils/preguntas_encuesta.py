@@ -2,6 +2,8 @@
 Definición de preguntas de la encuesta JII 2025
 """
 
+from utils.ediciones import edicion_actual
+
 # Preguntas generales de la encuesta
 PREGUNTAS_GENERALES = [
     {"id": 1, "texto": "¿Cómo calificas la organización de la JII?", "tipo": "calificacion_1_5"},
@@ -42,31 +44,63 @@ PREGUNTAS_CALIFICACION = [p for p in TODAS_PREGUNTAS if p["tipo"] == "calificaci
 # Preguntas de texto largo (para análisis de sentimientos)
 PREGUNTAS_TEXTO_LARGO = [p for p in TODAS_PREGUNTAS if p["tipo"] == "texto_largo"]
 
+# Cuestionarios versionados por edición {año: {categoría: [preguntas]}}.
+# Una edición sin cuestionario propio usa el de la edición anterior más reciente.
+CUESTIONARIOS = {
+    2025: {
+        "Preguntas Generales": PREGUNTAS_GENERALES,
+        "Workshop": PREGUNTAS_WORKSHOP,
+        "Mundialito Mexicano": PREGUNTAS_MUNDIALITO,
+    },
+}
+
+
+def obtener_cuestionario(edicion: int = None) -> dict:
+    """
+    Obtiene el cuestionario vigente en una edición
+    
+    Args:
+        edicion: Año de la edición (por defecto la edición actual)
+        
+    Returns:
+        Diccionario {categoría: [preguntas]}
+    """
+    edicion = edicion or edicion_actual()
+    vigentes = [anio for anio in CUESTIONARIOS if anio <= edicion]
+    return CUESTIONARIOS[max(vigentes) if vigentes else min(CUESTIONARIOS)]
+
+
+def obtener_preguntas(edicion: int = None) -> list:
+    """Lista plana de todas las preguntas del cuestionario de una edición"""
+    return [p for preguntas in obtener_cuestionario(edicion).values() for p in preguntas]
+
 
-def obtener_pregunta_por_id(pregunta_id: int) -> dict:
+def obtener_pregunta_por_id(pregunta_id: int, edicion: int = None) -> dict:
     """
     Obtiene la información de una pregunta por su ID
     
     Args:
         pregunta_id: ID de la pregunta
+        edicion: Año de la edición (por defecto la edición actual)
         
     Returns:
         Diccionario con la información de la pregunta o None si no existe
     """
-    for pregunta in TODAS_PREGUNTAS:
+    for pregunta in obtener_preguntas(edicion):
         if pregunta["id"] == pregunta_id:
             return pregunta
     return None
 
 
-def obtener_preguntas_por_tipo(tipo: str) -> list:
+def obtener_preguntas_por_tipo(tipo: str, edicion: int = None) -> list:
     """
     Obtiene todas las preguntas de un tipo específico
     
     Args:
         tipo: Tipo de pregunta (calificacion_1_5, texto_largo, etc.)
+        edicion: Año de la edición (por defecto la edición actual)
         
     Returns:
         Lista de preguntas del tipo especificado
     """
-    return [p for p in TODAS_PREGUNTAS if p["tipo"] == tipo]
+    return [p for p in obtener_preguntas(edicion) if p["tipo"] == tipo]
@@ -0,0 +1,220 @@
+"""
+Reporte estático del Dashboard JII 2025
+Pre-renderiza todas las vistas del Dashboard, la Encuesta y los Sentimientos
+en un único HTML autocontenido (Plotly JS embebido una sola vez) junto con
+las tablas precalculadas. Las figuras se construyen en un pool de procesos.
+
+    python -m utils.reporte_estatico --salida reporte/jii2025.html
+    python -m utils.reporte_estatico --datos datos_sinteticos/escala_10 --procesos 4
+"""
+
+import argparse
+import html
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from utils import analitica, graficas
+from utils.ediciones import edicion_actual, nombre_edicion
+from utils.preguntas_encuesta import obtener_preguntas_por_tipo
+
+SECCIONES = ["Dashboard", "Análisis de Encuesta", "Análisis de Sentimientos"]
+
+
+def construir_vistas(tablas: dict, edicion: int = None) -> list:
+    """
+    Calcula los análisis de una edición y describe cada vista a renderizar
+
+    Args:
+        tablas: Tablas de la edición como las da analitica.cargar_tablas, con los
+            nombres de analitica.TABLAS_ANALISIS para cualquier fuente
+        edicion: Año de la edición
+
+    Returns:
+        Lista de vistas {seccion, titulo, grafica, args} o {seccion, titulo, tabla};
+        "grafica" es el nombre de la función en utils.graficas
+    """
+    participantes = tablas["participantes"]
+    # Registros de asistencias, como en el Dashboard (no la tabla inscripciones_workshop)
+    inscripciones = tablas["inscripciones_workshop"]
+    asistencias = tablas["asistencias"]
+    equipos = tablas["equipos_concurso"]
+    respuestas = tablas["encuesta_respuestas"]
+
+    vistas = []
+
+    def grafica(seccion, titulo, funcion, *args):
+        vistas.append({"seccion": seccion, "titulo": titulo, "grafica": funcion, "args": args})
+
+    def tabla(seccion, titulo, df):
+        vistas.append({"seccion": seccion, "titulo": titulo, "tabla": df})
+
+    # Dashboard
+    seccion = "Dashboard"
+    tabla(seccion, "Indicadores Clave", analitica.calcular_kpis(participantes, inscripciones, equipos, respuestas))
+    conteos = [
+        ("Participantes por Programa Académico", participantes, 'programa', 'Programa', "grafica_barras_conteo"),
+        ("Participantes por Categoría", participantes, 'categoria', 'Categoría', "grafica_pastel_conteo"),
+        ("Inscripciones a Workshops por Estado", inscripciones, 'estado', 'Estado', "grafica_barras_conteo"),
+        ("Inscripciones por Actividad", inscripciones, 'actividad_codigo', 'Workshop', "grafica_barras_conteo"),
+        ("Equipos por Estado de Registro", equipos, 'estado_registro', 'Estado de Registro', "grafica_barras_conteo"),
+    ]
+    for titulo, df, columna, etiqueta, funcion in conteos:
+        conteo = analitica.distribucion(df, columna, etiqueta)
+        if not conteo.empty:
+            grafica(seccion, titulo, funcion, conteo)
+
+    serie = analitica.serie_temporal(asistencias, 'fecha_asistencia')
+    if not serie.empty:
+        grafica(seccion, "Evolución Temporal de Asistencias", "grafica_serie_temporal",
+                serie, 'Asistencias', 'Número de Asistencias', '#1f77b4')
+    serie = analitica.serie_temporal(equipos, 'fecha_registro')
+    if not serie.empty:
+        grafica(seccion, "Evolución Temporal de Registro de Equipos", "grafica_serie_temporal",
+                serie, 'Registro de Equipos', 'Número de Equipos', '#ff7f0e')
+
+    # Análisis de encuesta
+    seccion = "Análisis de Encuesta"
+    df_calificaciones = analitica.filtrar_calificaciones(respuestas, edicion)
+    if not df_calificaciones.empty:
+        promedios = analitica.estadisticas_calificacion(df_calificaciones)
+        grafica(seccion, "Calificaciones Promedio por Pregunta", "grafica_promedios", promedios)
+        tabla(seccion, "Tabla de Resultados", promedios.round(2))
+
+        for pregunta in obtener_preguntas_por_tipo('calificacion_1_5', edicion):
+            dist = analitica.distribucion_calificacion(df_calificaciones, pregunta['id'])
+            if not dist.empty:
+                grafica(seccion, f"Distribución - Pregunta {pregunta['id']}",
+                        "grafica_distribucion_calificacion", dist, pregunta['texto'])
+
+        df_categorias = analitica.promedios_por_categoria(df_calificaciones, edicion)
+        if not df_categorias.empty:
+            grafica(seccion, "Calificación Promedio por Categoría", "grafica_promedios_categoria", df_categorias)
+            grafica(seccion, "Comparativa por Categoría", "grafica_radar_categoria", df_categorias)
+
+    # Análisis de sentimientos
+    seccion = "Análisis de Sentimientos"
+    df_texto = analitica.filtrar_texto_largo(respuestas, edicion)
+    for pregunta in obtener_preguntas_por_tipo('texto_largo', edicion):
+        df_pregunta = df_texto[df_texto['pregunta_id'] == pregunta['id']] if not df_texto.empty else df_texto
+        if df_pregunta.empty:
+            continue
+        prefijo = f"Pregunta {pregunta['id']}"
+        df_freq = analitica.frecuencia_palabras(df_pregunta['respuesta'], 20)
+        if not df_freq.empty:
+            grafica(seccion, f"{prefijo} - Palabras Más Frecuentes", "grafica_frecuencia_palabras", df_freq)
+
+        df_sent = df_pregunta[['respuesta']].join(analitica.analizar_sentimiento(df_pregunta['respuesta']))
+        grafica(seccion, f"{prefijo} - Distribución de Sentimientos", "grafica_sentimientos",
+                df_sent['sentimiento'].value_counts())
+        grafica(seccion, f"{prefijo} - Polaridad vs Subjetividad", "grafica_polaridad_subjetividad", df_sent)
+
+    return vistas
+
+
+def _renderizar_grafica(vista: dict) -> str:
+    """Construye la figura y la serializa como <div> sin Plotly JS (se ejecuta en el pool)"""
+    figura = getattr(graficas, vista["grafica"])(*vista["args"])
+    return figura.to_html(full_html=False, include_plotlyjs=False)
+
+
+def renderizar_vistas(vistas: list, procesos: int = None) -> list:
+    """
+    Renderiza las gráficas en paralelo y las tablas en el proceso principal
+
+    Returns:
+        Lista de fragmentos HTML en el mismo orden que vistas
+    """
+    con_grafica = [v for v in vistas if "grafica" in v]
+    if procesos == 1:
+        divs = [_renderizar_grafica(v) for v in con_grafica]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            divs = list(pool.map(_renderizar_grafica, con_grafica, chunksize=4))
+
+    divs = iter(divs)
+    return [
+        next(divs) if "grafica" in v else v["tabla"].to_html(index=False, classes="tabla", border=0)
+        for v in vistas
+    ]
+
+
+def construir_html(vistas: list, fragmentos: list, titulo: str) -> str:
+    """Arma el documento con Plotly JS embebido una única vez"""
+    from plotly.offline import get_plotlyjs
+
+    cuerpo = []
+    for seccion in SECCIONES:
+        bloques = [(v, f) for v, f in zip(vistas, fragmentos) if v["seccion"] == seccion]
+        if not bloques:
+            continue
+        cuerpo.append(f'<h2 id="{html.escape(seccion)}">{html.escape(seccion)}</h2>')
+        for vista, fragmento in bloques:
+            cuerpo.append(f'<section><h3>{html.escape(vista["titulo"])}</h3>{fragmento}</section>')
+
+    indice = " · ".join(f'<a href="#{html.escape(s)}">{html.escape(s)}</a>' for s in SECCIONES)
+    generado = datetime.now().strftime("%Y-%m-%d %H:%M")
+
+    return f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(titulo)}</title>
+<script type="text/javascript">{get_plotlyjs()}</script>
+<style>
+body {{ font-family: sans-serif; max-width: 1200px; margin: auto; padding: 1rem; }}
+section {{ margin-bottom: 2rem; }}
+table.tabla {{ border-collapse: collapse; }}
+table.tabla td, table.tabla th {{ border: 1px solid #ddd; padding: 4px 8px; }}
+</style>
+</head>
+<body>
+<h1>{html.escape(titulo)}</h1>
+<p>{indice}</p>
+<p><small>Generado el {generado}</small></p>
+{chr(10).join(cuerpo)}
+</body>
+</html>
+"""
+
+
+def construir_reporte(tablas: dict, salida, procesos: int = None, edicion: int = None) -> Path:
+    """
+    Genera el reporte estático completo de una edición
+
+    Args:
+        tablas: Tablas de la edición de analitica.cargar_tablas (ver construir_vistas)
+        salida: Ruta del archivo HTML a escribir
+        procesos: Tamaño del pool (None = número de CPUs, 1 = sin pool)
+        edicion: Año de la edición (por defecto la edición actual)
+
+    Returns:
+        Ruta del archivo escrito
+    """
+    edicion = edicion or edicion_actual()
+    vistas = construir_vistas(tablas, edicion)
+    fragmentos = renderizar_vistas(vistas, procesos)
+    destino = Path(salida)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    titulo = f"Reporte - {nombre_edicion(edicion)}"
+    destino.write_text(construir_html(vistas, fragmentos, titulo), encoding="utf-8")
+    return destino
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera el reporte HTML estático del dashboard")
+    parser.add_argument("--datos", help="Carpeta con CSV locales; si se omite se usa Supabase")
+    parser.add_argument("--edicion", type=int, help="Año de la edición (por defecto la actual)")
+    parser.add_argument("--salida", help="Archivo HTML (por defecto reporte/jii<edición>.html)")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    edicion = args.edicion or edicion_actual()
+    salida = args.salida or f"reporte/jii{edicion}.html"
+    destino = construir_reporte(analitica.cargar_tablas(args.datos, edicion), salida, args.procesos, edicion)
+    print(f"Reporte escrito en {destino} ({destino.stat().st_size / 1024 ** 2:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
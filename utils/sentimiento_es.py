@@ -0,0 +1,266 @@
+"""
+Sentimiento en español del Dashboard JII
+Motor de léxico propio para las respuestas abiertas de la encuesta, sin modelos
+descargados ni red. TextBlob solo trae un léxico en inglés y casi todas las
+respuestas en español le dan polaridad 0.
+
+El léxico se compila a arreglos (polaridad, intensidad, alcance de negación) por
+id de token, y una Serie completa se puntúa de una vez: los textos se tokenizan a
+un solo arreglo plano de ids y las reglas se aplican con búsquedas y acumulados
+de NumPy, sin ciclos por texto.
+
+Reglas (al estilo de VADER):
+    negación      "no", "nunca", "nada"... invierten (× NEGACION) las palabras de
+                  opinión de las siguientes VENTANA_NEGACION palabras, hasta la
+                  siguiente puntuación; "sin" solo a la palabra que le sigue
+    intensidad    "muy", "bastante", "super"... multiplican la palabra que les
+                  sigue (hasta dos intensificadores seguidos: "muy muy bueno")
+    contraste     lo que va después del último "pero" pesa más que lo anterior
+
+Las claves del léxico van en minúsculas y sin acentos; las que terminan en "*"
+son raíces que cubren sus flexiones ("aburrid*" → aburrido, aburrida, aburridas).
+"""
+
+import re
+import threading
+from functools import lru_cache
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from utils.perfilador import medir_fase
+
+NEGACION = -0.74           # factor de una palabra negada
+VENTANA_NEGACION = 3       # palabras que alcanza una negación
+PESO_ANTES_CONTRASTE = 0.5
+PESO_DESPUES_CONTRASTE = 1.5
+ALFA = 15                  # normalización de la suma a (-1, 1): s / sqrt(s² + ALFA)
+UMBRAL = 0.1               # como clasificar_polaridad
+
+# Polaridad de -3 a 3
+LEXICO = {
+    # Positivas
+    "excelent*": 3, "exelente": 3, "increible*": 3, "maravillos*": 3, "fantastic*": 3, "genial*": 3,
+    "espectacular*": 3, "perfect*": 3, "encant*": 3, "fascin*": 3, "extraordinari*": 3, "impecable*": 3,
+    "buen": 2, "bueno": 2, "buena": 2, "buenos": 2, "buenas": 2, "bien": 2, "gust*": 2, "agrad*": 2,
+    "interesant*": 2, "util": 2, "utiles": 2, "provechos*": 2, "enriquecedor*": 2, "divertid*": 2,
+    "entretenid*": 2, "dinamic*": 1, "clar*": 1, "organizad*": 1, "puntual*": 1, "amable*": 2, "atent*": 1,
+    "satisfech*": 2, "contento": 2, "contenta": 2, "feliz": 2, "motivad*": 2, "inspirador*": 2, "recomend*": 2,
+    "aprend*": 1, "valio*": 2, "mejor": 1, "mejores": 1, "destac*": 2, "felicit*": 3, "gracias": 2,
+    "agradezco": 2, "agradecid*": 2, "comod*": 1, "complet*": 1, "facil*": 1, "rapid*": 1,
+    "practic*": 1, "innovador*": 2, "calidad": 1, "emocionant*": 2, "padre": 2, "padrisim*": 3, "chido": 2,
+    "chida": 2, "increiblemente": 2, "exito*": 2, "logr*": 1, "disfrut*": 2, "ameno": 2, "amena": 2,
+    "relevant*": 1, "adecuad*": 1, "suficient*": 1, "profesional*": 1, "bonit*": 2, "lind*": 2,
+    # Negativas
+    "mal": -2, "malo": -2, "mala": -2, "malos": -2, "malas": -2, "pesim*": -3, "horribl*": -3,
+    "terribl*": -3, "fatal": -3, "desastr*": -3, "decepcion*": -3, "aburrid*": -2, "aburr*": -2,
+    "tedios*": -2, "cansad*": -1, "cansado": -1, "largo": -1, "largas": -1, "lento": -1, "lenta": -1, "tardad*": -1, "tardanza": -1,
+    "retras*": -2, "impuntual*": -2, "desorganiz*": -2, "caotic*": -2, "confus*": -2, "dificil*": -1,
+    "complicad*": -1, "incomod*": -2, "problema*": -1, "falla*": -2, "fallo*": -2, "error*": -1,
+    "deficient*": -2, "insuficient*": -2, "escas*": -1, "poca": -1, "pocas": -1, "pocos": -1,
+    "falt*": -1, "carec*": -1, "molest*": -2, "frustr*": -2, "inutil*": -2, "irrelevant*": -1,
+    "repetitiv*": -1, "monoton*": -2, "desagrad*": -2, "queja*": -2, "peor": -2, "peores": -2,
+    "nefast*": -3, "lamentabl*": -2, "ruido*": -1, "calor": -1, "frio": -1, "sucio*": -2, "caro": -1,
+    "cara": -1, "perdid*": -1, "saturad*": -1, "mejorar": -1, "mejorarse": -1, "deberian": -1,
+    "deberia": -1, "pena": -1, "triste*": -2, "odi*": -3,
+}
+
+# Multiplicador de la palabra que les sigue
+INTENSIFICADORES = {
+    "muy": 1.5, "super": 1.5, "sumamente": 1.6, "extremadamente": 1.7, "bastante": 1.3, "demasiado": 1.4,
+    "demasiada": 1.4, "tan": 1.3, "realmente": 1.3, "totalmente": 1.4, "completamente": 1.4,
+    "altamente": 1.4, "mucho": 1.3, "muchisimo": 1.6, "re": 1.3, "algo": 0.7,
+    "poco": -0.5, "apenas": 0.5, "medio": 0.6, "ligeramente": 0.6, "casi": 0.7,
+}
+
+# Palabras que niegan y cuántas palabras siguientes alcanzan
+NEGADORES = {
+    "no": VENTANA_NEGACION, "nunca": VENTANA_NEGACION, "jamas": VENTANA_NEGACION, "ni": VENTANA_NEGACION,
+    "tampoco": VENTANA_NEGACION, "nada": VENTANA_NEGACION, "ningun": VENTANA_NEGACION,
+    "ninguna": VENTANA_NEGACION, "ninguno": VENTANA_NEGACION, "sin": 1,
+}
+
+CONTRASTES = {"pero", "sino", "aunque"}
+
+_SIN_ACENTOS = str.maketrans("áéíóúüàèìòù", "aeiouuaeiou")
+_TOKEN = re.compile(r"[a-zñ]+|[.,;:!?¡¿()\n]")
+
+
+class LexicoCompilado:
+    """
+    Léxico con las propiedades de cada token en arreglos indexados por id
+
+    Los tokens se agregan la primera vez que aparecen en un texto, así que el
+    tamaño crece con el vocabulario real de las respuestas, no con el léxico.
+
+    Attributes:
+        ids: {token: id}
+        polaridad: Polaridad de cada id (0 si no es palabra de opinión)
+        intensidad: Multiplicador que aplica a la palabra siguiente (1 si no intensifica)
+        alcance: Palabras que niega (0 si no es negación)
+        contraste: True para "pero" y similares
+        corte: True para la puntuación, que termina el alcance de una negación
+        contenido: True para las palabras que cuentan en la subjetividad
+    """
+
+    def __init__(self, lexico: dict = None, intensificadores: dict = None, negadores: dict = None,
+                 contrastes=None):
+        lexico = LEXICO if lexico is None else lexico
+        self._exactas = {k: float(v) for k, v in lexico.items() if not k.endswith("*")}
+        self._raices = {k[:-1]: float(v) for k, v in lexico.items() if k.endswith("*")}
+        self._largo_raiz = max((len(r) for r in self._raices), default=0)
+        self._intensificadores = INTENSIFICADORES if intensificadores is None else intensificadores
+        self._negadores = NEGADORES if negadores is None else negadores
+        self._contrastes = CONTRASTES if contrastes is None else set(contrastes)
+        self._lock = threading.Lock()
+
+        self.ids = {}
+        self.polaridad = np.zeros(0)
+        self.intensidad = np.ones(0)
+        self.alcance = np.zeros(0, dtype=np.int64)
+        self.contraste = np.zeros(0, dtype=bool)
+        self.corte = np.zeros(0, dtype=bool)
+        self.contenido = np.zeros(0, dtype=bool)
+        self.polaridad_token = lru_cache(maxsize=None)(self._polaridad_token)
+
+    def _polaridad_token(self, token: str) -> float:
+        """Polaridad exacta o de la raíz más larga que sea prefijo del token"""
+        if token in self._exactas:
+            return self._exactas[token]
+        for largo in range(min(len(token), self._largo_raiz), 2, -1):
+            valor = self._raices.get(token[:largo])
+            if valor is not None:
+                return valor
+        return 0.0
+
+    def compilar(self, tokens) -> np.ndarray:
+        """
+        Ids de unos tokens, agregando a los arreglos los que aún no estaban
+
+        Args:
+            tokens: Tokens distintos
+
+        Returns:
+            ndarray con el id de cada token
+        """
+        from utils.analitica import STOPWORDS_ES
+
+        with self._lock:
+            nuevos = [t for t in tokens if t not in self.ids]
+            if nuevos:
+                inicio = len(self.ids)
+                self.ids.update((t, inicio + i) for i, t in enumerate(nuevos))
+                es_negador = [t in self._negadores for t in nuevos]
+                self.polaridad = np.concatenate([self.polaridad, [
+                    0.0 if negador or t in self._intensificadores else self.polaridad_token(t)
+                    for t, negador in zip(nuevos, es_negador)
+                ]])
+                self.intensidad = np.concatenate([self.intensidad, [self._intensificadores.get(t, 1.0) for t in nuevos]])
+                self.alcance = np.concatenate([self.alcance, [self._negadores.get(t, 0) for t in nuevos]])
+                self.contraste = np.concatenate([self.contraste, [t in self._contrastes for t in nuevos]])
+                self.corte = np.concatenate([self.corte, [not t.isalpha() for t in nuevos]])
+                self.contenido = np.concatenate([self.contenido, [
+                    t.isalpha() and len(t) > 2 and t not in STOPWORDS_ES and not negador
+                    for t, negador in zip(nuevos, es_negador)
+                ]])
+            return np.fromiter((self.ids[t] for t in tokens), dtype=np.int64, count=len(tokens))
+
+
+_lexico = None
+
+
+def lexico() -> LexicoCompilado:
+    """Léxico por defecto, compartido por todo el proceso"""
+    global _lexico
+    if _lexico is None:
+        _lexico = LexicoCompilado()
+    return _lexico
+
+
+def tokenizar(textos: pd.Series) -> tuple:
+    """
+    Tokens de todos los textos en un solo arreglo
+
+    Returns:
+        Tupla (tokens ndarray de objetos, tokens por texto ndarray)
+    """
+    normalizados = textos.fillna("").astype(str).str.lower().str.translate(_SIN_ACENTOS)
+    listas = normalizados.str.findall(_TOKEN)
+    longitudes = listas.str.len().to_numpy(dtype=np.int64)
+    tokens = np.fromiter(chain.from_iterable(listas), dtype=object, count=int(longitudes.sum()))
+    return tokens, longitudes
+
+
+@medir_fase("sentimiento")
+def puntuar(textos: pd.Series, modelo: LexicoCompilado = None) -> pd.DataFrame:
+    """
+    Sentimiento de cada texto con el léxico en español
+
+    Args:
+        textos: Serie de textos
+        modelo: Léxico compilado (por defecto el del proceso)
+
+    Returns:
+        DataFrame [sentimiento, polaridad, subjetividad] con el mismo índice que textos;
+        polaridad en (-1, 1) y subjetividad en [0, 1] (fracción de palabras de opinión)
+    """
+    modelo = modelo or lexico()
+    n_textos = len(textos)
+    tokens, longitudes = tokenizar(textos)
+    codigos, distintos = pd.factorize(tokens) if len(tokens) else (np.zeros(0, dtype=np.int64), [])
+    ids = modelo.compilar(list(distintos))[codigos] if len(tokens) else np.zeros(0, dtype=np.int64)
+
+    n = len(ids)
+    posicion = np.arange(n)
+    texto = np.repeat(np.arange(n_textos), longitudes)
+    inicio = (np.cumsum(longitudes) - longitudes)[texto]
+
+    polaridad = modelo.polaridad[ids]
+    intensidad = modelo.intensidad[ids]
+
+    # Intensificadores: la palabra anterior y la previa a esa, si están en el mismo texto
+    factor = np.ones(n)
+    for atras in (1, 2):
+        previo = posicion - atras
+        valido = previo >= inicio
+        previo_intensidad = np.where(valido, intensidad[np.maximum(previo, 0)], 1.0)
+        if atras == 2:
+            # Solo encadena "muy muy bueno", no "muy, bueno" ni "muy mal organizado"
+            valido &= np.where(valido, intensidad[np.maximum(posicion - 1, 0)] != 1.0, False)
+            previo_intensidad = np.where(valido, previo_intensidad, 1.0)
+        factor *= previo_intensidad
+
+    # Negación: la última negación antes de la palabra, si no hay puntuación en medio
+    alcance = modelo.alcance[ids]
+    ultima_negacion = np.maximum.accumulate(np.where(alcance > 0, posicion, -1)) if n else posicion
+    ultimo_corte = np.maximum.accumulate(np.where(modelo.corte[ids], posicion, -1)) if n else posicion
+    negacion_previa = np.concatenate([[-1], ultima_negacion[:-1]]) if n else posicion
+    distancia = posicion - negacion_previa
+    negada = (
+        (negacion_previa >= inicio)
+        & (negacion_previa > ultimo_corte)
+        & (distancia <= alcance[np.maximum(negacion_previa, 0)])
+    )
+    factor *= np.where(negada, NEGACION, 1.0)
+
+    # Contraste: el último "pero" de cada texto divide lo que pesa menos y lo que pesa más
+    ultimo_contraste = np.full(n_textos, -1)
+    es_contraste = modelo.contraste[ids]
+    np.maximum.at(ultimo_contraste, texto[es_contraste], posicion[es_contraste])
+    contraste = ultimo_contraste[texto]
+    factor *= np.where(
+        contraste < 0, 1.0, np.where(posicion < contraste, PESO_ANTES_CONTRASTE, PESO_DESPUES_CONTRASTE)
+    )
+
+    suma = np.bincount(texto, weights=polaridad * factor, minlength=n_textos)
+    opinion = np.bincount(texto, weights=polaridad != 0, minlength=n_textos)
+    contenido = np.bincount(texto, weights=modelo.contenido[ids], minlength=n_textos)
+
+    puntaje = suma / np.sqrt(suma ** 2 + ALFA)
+    subjetividad = np.divide(opinion, contenido, out=np.zeros(n_textos), where=contenido > 0).clip(0, 1)
+    return pd.DataFrame({
+        'sentimiento': np.select([puntaje > UMBRAL, puntaje < -UMBRAL], ['Positivo', 'Negativo'], 'Neutral'),
+        'polaridad': puntaje,
+        'subjetividad': subjetividad,
+    }, index=textos.index)
@@ -0,0 +1,39 @@
+"""
+Arranque del servidor del Dashboard JII
+Inicia el precalentamiento de cachés (utils/precalentamiento.py) y después levanta
+Streamlit en el mismo proceso, así las cachés ya se están llenando antes de que el
+servidor acepte la primera conexión y ningún visitante espera la primera carga.
+
+    python -m utils.servidor                                   # streamlit run Analisis_JII2025.py
+    python -m utils.servidor --server.port 8080 --server.address 0.0.0.0
+
+Los argumentos se pasan tal cual a `streamlit run`.
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PAGINA_PRINCIPAL = ROOT / "Analisis_JII2025.py"
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    argumentos = list(sys.argv[1:] if argv is None else argv)
+
+    # Streamlit (y con él pandas) y Plotly se importan antes de arrancar el hilo: importarlos
+    # a la vez desde dos hilos deja módulos a medio inicializar. Así la primera visita
+    # tampoco paga su importación
+    import plotly.express  # noqa: F401
+    from streamlit.web import cli
+
+    from utils.precalentamiento import iniciar_precalentamiento
+
+    iniciar_precalentamiento()
+    sys.argv = ["streamlit", "run", str(PAGINA_PRINCIPAL), *argumentos]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()
@@ -3,109 +3,261 @@ Cliente de Supabase para el Dashboard JII 2025
 Proporciona funciones para consultar las tablas de la base de datos.
 """
 
+import json
+import logging
 import os
+import time
+from datetime import datetime
+
 import streamlit as st
-from supabase import create_client, Client
-from dotenv import load_dotenv
 import pandas as pd
+from streamlit import runtime
+
+from utils import almacen, cache
+from utils.conexion import con_reintentos, estado_circuito, get_supabase_client
+from utils.ediciones import edicion_actual
+from utils.filtros import aplicar_postgrest, en, normalizar
+from utils.fuente_local import directorio_local, leer_tabla_csv
+from utils.metricas import iniciar_exportador, registrar_consulta
+from utils.perfilador import medir_fase
+from utils.precalentamiento import iniciar_precalentamiento
+from utils.versiones import huella
+
+logger = logging.getLogger(__name__)
+
+VARIABLE_FILAS_POR_PAGINA = "JII_FILAS_POR_PAGINA"
+FILAS_POR_PAGINA_DEFECTO = 1000
+
+# Exportador de Prometheus (solo si JII_METRICAS_PUERTO está definido)
+iniciar_exportador()
+
+# Precalentamiento de cachés: utils/servidor.py lo inicia antes de abrir el puerto. Si el
+# servidor se levantó con `streamlit run` directamente, inicia aquí, la primera vez que una
+# página importa este módulo (una sola vez por proceso; fuera de Streamlit no se inicia)
+if runtime.exists():
+    iniciar_precalentamiento()
+
 
-# Cargar variables de entorno
-load_dotenv()
+def filas_por_pagina() -> int:
+    """Filas por petición a Supabase; no debe pasar del max-rows del servidor (1000 en Supabase)"""
+    return int(os.getenv(VARIABLE_FILAS_POR_PAGINA, FILAS_POR_PAGINA_DEFECTO))
 
-@st.cache_resource
-def get_supabase_client() -> Client:
+
+def _consultar_supabase(tabla: str, columnas: str, filtros: tuple, orden: str, edicion: int,
+                        limite: int = None, desplazamiento: int = 0):
     """
-    Crea y retorna un cliente de Supabase.
-    Las credenciales deben estar en las variables de entorno:
-    - SUPABASE_URL
-    - SUPABASE_KEY
+    Ejecuta la consulta en Supabase y retorna (DataFrame, bytes de las respuestas, reintentos)
+
+    PostgREST corta cada respuesta en max-rows filas sin avisar, así que la consulta se
+    pide por páginas de filas_por_pagina() hasta que llega una incompleta (o se junta
+    el límite). Las páginas se ordenan también por id para que no se repitan ni se
+    salten filas entre una y otra.
     """
-    url = os.getenv("SUPABASE_URL")
-    key = os.getenv("SUPABASE_KEY")
-    
-    if not url or not key:
-        st.error("❌ Faltan credenciales de Supabase. Configura SUPABASE_URL y SUPABASE_KEY en el archivo .env")
-        st.stop()
-    
-    return create_client(url, key)
+    supabase = get_supabase_client()
+
+    def armar():
+        query = supabase.table(tabla).select(columnas)
+
+        # Limitar a la partición de la edición
+        if edicion is not None:
+            query = query.eq("edicion", edicion)
 
+        # Aplicar filtros en el servidor (eq, in, rangos, nulos)
+        query = aplicar_postgrest(query, filtros)
 
-def ejecutar_query(tabla: str, columnas: str = "*", filtros: dict = None, orden: str = None) -> pd.DataFrame:
+        # Aplicar ordenamiento si existe; id desempata entre páginas
+        if orden:
+            query = query.order(orden)
+        if orden != "id":
+            query = query.order("id")
+        return query
+
+    bloque = filas_por_pagina()
+    paginas, bytes_, reintentos = [], 0, 0
+    pedidas = 0
+    while limite is None or pedidas < limite:
+        tamano = bloque if limite is None else min(bloque, limite - pedidas)
+        inicio = desplazamiento + pedidas
+        query = armar().range(inicio, inicio + tamano - 1)
+
+        # Ejecutar query (lectura idempotente: se reintenta ante fallas transitorias)
+        response, reintentos_pagina = con_reintentos(query.execute, f"query en tabla {tabla}")
+        reintentos += reintentos_pagina
+        filas = response.data or []
+        if filas:
+            paginas.extend(filas)
+            bytes_ += len(json.dumps(filas, default=str).encode("utf-8"))
+        pedidas += len(filas)
+        if len(filas) < tamano:
+            break
+
+    # Convertir a DataFrame
+    if paginas:
+        return pd.DataFrame(paginas), bytes_, reintentos
+    return pd.DataFrame(), 0, reintentos
+
+
+@medir_fase("fetch")
+def ejecutar_query(tabla: str, columnas: str = "*", filtros=None, orden: str = None,
+                   edicion: int = None, limite: int = None, desplazamiento: int = 0) -> pd.DataFrame:
     """
     Ejecuta una consulta a Supabase y retorna un DataFrame de pandas.
     
+    Los resultados se guardan en la caché de consultas (utils/cache.py) ligados a la
+    versión de la tabla (utils/versiones.py): se vuelven a descargar cuando la tabla
+    cambia, o cada JII_CACHE_TTL segundos si no hay versión. Cada consulta queda
+    registrada en utils/metricas.py (latencia, filas, bytes, acierto de caché y errores). Un resultado vencido se sigue sirviendo mientras se
+    renueva en segundo plano, y si Supabase falla se sirve el último resultado bueno.
+    
     Args:
         tabla: Nombre de la tabla a consultar
         columnas: Columnas a seleccionar (por defecto "*")
-        filtros: Diccionario con filtros {columna: valor}
+        filtros: Diccionario {columna: valor} de igualdad, o lista de filtros de utils.filtros
+            (eq, neq, gt, gte, lt, lte, en, entre, es_nulo, no_es_nulo) que se aplican en el servidor
         orden: Columna por la cual ordenar
+        edicion: Año de la edición; la consulta solo toca esa partición
+        limite: Máximo de filas a retornar
+        desplazamiento: Filas a saltar antes de aplicar el límite
         
     Returns:
-        DataFrame con los resultados
+        DataFrame con los resultados (vacío si la consulta falla y no hay un resultado anterior)
     """
+    # Fuente local (CSV) para ejecutar sin conexión a Supabase
+    directorio = directorio_local()
+    fuente = "local" if directorio else "supabase"
+    filtros = normalizar(filtros)
+    clave = (str(directorio), tabla, columnas, filtros, orden, edicion, limite, desplazamiento)
+    version = huella(tabla, edicion)
+
+    # Se registra aquí dentro para medir también las renovaciones en segundo plano
+    def consultar():
+        inicio = time.perf_counter()
+        try:
+            if directorio:
+                df = leer_tabla_csv(directorio, tabla, columnas, filtros, orden, edicion, limite, desplazamiento)
+                bytes_, reintentos = int(df.memory_usage(index=False).sum()), 0
+            else:
+                df, bytes_, reintentos = _consultar_supabase(tabla, columnas, filtros, orden, edicion,
+                                                             limite, desplazamiento)
+        except Exception as e:
+            logger.exception("Error al ejecutar query en tabla %s", tabla)
+            registrar_consulta(tabla, time.perf_counter() - inicio, reintentos=getattr(e, "reintentos", 0),
+                               error=f"{type(e).__name__}: {e}", fuente=fuente)
+            raise
+        registrar_consulta(tabla, time.perf_counter() - inicio, len(df), bytes_, reintentos, fuente=fuente)
+        return df
+
     try:
-        supabase = get_supabase_client()
-        query = supabase.table(tabla).select(columnas)
-        
-        # Aplicar filtros si existen
-        if filtros:
-            for columna, valor in filtros.items():
-                query = query.eq(columna, valor)
-        
-        # Aplicar ordenamiento si existe
-        if orden:
-            query = query.order(orden)
-        
-        # Ejecutar query
-        response = query.execute()
-        
-        # Convertir a DataFrame
-        if response.data:
-            return pd.DataFrame(response.data)
-        else:
-            return pd.DataFrame()
-            
+        df, acierto = cache.consultas.obtener_o_calcular(clave, consultar, version)
     except Exception as e:
         st.error(f"Error al ejecutar query en tabla {tabla}: {e}")
         return pd.DataFrame()
 
+    if acierto:
+        registrar_consulta(tabla, 0.0, len(df), 0, cache=True, fuente=fuente)
+    _frescura[(tabla, edicion)] = cache.consultas.frescura(clave, version) or (datetime.now(), False)
+    # Vista copy-on-write del resultado guardado: comparte sus buffers con las demás sesiones
+    return almacen.vista(df, f"{tabla} ({edicion})" if edicion is not None else tabla)
+
+
+# (tabla, edición) -> (fecha en que se obtuvieron los datos servidos, vencidos)
+_frescura = {}
+
+
+def frescura(tablas: list, edicion=None) -> tuple:
+    """
+    Antigüedad de los datos servidos de unas tablas
+
+    Args:
+        tablas: Nombres de las tablas que usa la página
+        edicion: Año de la edición o lista de años (por defecto la edición actual)
+
+    Returns:
+        Tupla (fecha del dato más antiguo, True si alguno está vencido) o (None, False)
+        si todavía no se ha consultado ninguna
+    """
+    ediciones = edicion if isinstance(edicion, (list, tuple)) else [edicion or edicion_actual()]
+    datos = [_frescura[(t, e)] for e in ediciones for t in tablas if (t, e) in _frescura]
+    if not datos:
+        return None, False
+    return min(fecha for fecha, _ in datos), any(vencido for _, vencido in datos)
+
 
-def obtener_participantes() -> pd.DataFrame:
+def mostrar_frescura(tablas: list, edicion=None):
+    """
+    Muestra a qué hora se obtuvieron los datos de la página
+
+    Si algún dato está vencido o el circuito de Supabase está abierto, muestra un
+    aviso de que se están mostrando los últimos datos disponibles.
+    """
+    fecha, vencido = frescura(tablas, edicion)
+    if fecha is None:
+        return
+    minutos = int((datetime.now() - fecha).total_seconds() // 60)
+    hace = "hace menos de un minuto" if minutos < 1 else f"hace {minutos} min"
+    texto = f"Datos actualizados a las {fecha:%H:%M:%S} ({hace})"
+    if vencido or estado_circuito()["estado"] != "cerrado":
+        st.warning(f"⚠️ {texto}. No se pudo consultar la base de datos; se muestran los últimos datos disponibles mientras se reintenta.")
+    else:
+        st.caption(f"🕒 {texto}")
+
+
+def obtener_participantes(edicion: int = None) -> pd.DataFrame:
     """Obtiene todos los participantes registrados"""
-    return ejecutar_query("participantes", orden="created_at")
+    return ejecutar_query("participantes", orden="created_at", edicion=edicion or edicion_actual())
 
 
-def obtener_actividades() -> pd.DataFrame:
+def obtener_actividades(edicion: int = None) -> pd.DataFrame:
     """Obtiene todas las actividades"""
-    return ejecutar_query("actividades", orden="fecha_inicio")
+    return ejecutar_query("actividades", orden="fecha_inicio", edicion=edicion or edicion_actual())
 
 
-def obtener_inscripciones_workshop() -> pd.DataFrame:
+def obtener_inscripciones_workshop(edicion: int = None) -> pd.DataFrame:
     """Obtiene todas las inscripciones a workshops"""
-    return ejecutar_query("asistencias", orden="created_at")
+    return ejecutar_query("asistencias", orden="created_at", edicion=edicion or edicion_actual())
+
+
+def obtener_registro_workshops(edicion: int = None) -> pd.DataFrame:
+    """
+    Obtiene la tabla inscripciones_workshop, con lista de espera y cancelaciones
+
+    obtener_inscripciones_workshop lee asistencias (los registros a actividades que
+    muestra el Dashboard); el embudo de conversión necesita las inscripciones propiamente.
+    """
+    return ejecutar_query("inscripciones_workshop", orden="creado", edicion=edicion or edicion_actual())
 
 
-def obtener_asistencias() -> pd.DataFrame:
+def obtener_asistencias(edicion: int = None) -> pd.DataFrame:
     """Obtiene todas las asistencias con fecha_asistencia para análisis temporal"""
-    return ejecutar_query("asistencias", orden="fecha_asistencia")
+    return ejecutar_query("asistencias", orden="fecha_asistencia", edicion=edicion or edicion_actual())
 
 
-def obtener_equipos_concurso() -> pd.DataFrame:
+def obtener_equipos_concurso(edicion: int = None) -> pd.DataFrame:
     """Obtiene todos los equipos del concurso"""
-    return ejecutar_query("equipos_concurso", orden="fecha_registro")
+    return ejecutar_query("equipos_concurso", orden="fecha_registro", edicion=edicion or edicion_actual())
 
 
-def obtener_respuestas_encuesta(anonimizar: bool = False) -> pd.DataFrame:
+def obtener_respuestas_encuesta(anonimizar: bool = False, edicion: int = None, tipos: list = None) -> pd.DataFrame:
     """
-    Obtiene todas las respuestas de la encuesta
+    Obtiene las respuestas de la encuesta
     
     Args:
         anonimizar: Si es True, oculta información identificable del participante
+        edicion: Año de la edición (por defecto la edición actual)
+        tipos: Tipos de pregunta a descargar (p. ej. ['calificacion_1_5']); por defecto todas.
+            El filtro se aplica en el servidor, así solo se descargan esas filas
         
     Returns:
         DataFrame con las respuestas (anonimizadas si se solicita)
     """
-    df = ejecutar_query("encuesta_respuestas", orden="timestamp")
+    from utils.preguntas_encuesta import obtener_preguntas_por_tipo
+
+    edicion = edicion or edicion_actual()
+    filtros = None
+    if tipos:
+        ids = [p['id'] for tipo in tipos for p in obtener_preguntas_por_tipo(tipo, edicion)]
+        filtros = [en("pregunta_id", ids)]
+    df = ejecutar_query("encuesta_respuestas", filtros=filtros, orden="timestamp", edicion=edicion)
     
     if anonimizar and not df.empty:
         # Generar IDs anónimos únicos
@@ -118,43 +270,46 @@ def obtener_respuestas_encuesta(anonimizar: bool = False) -> pd.DataFrame:
     return df
 
 
-def obtener_respuestas_por_pregunta(pregunta_id: int) -> pd.DataFrame:
+def obtener_respuestas_por_pregunta(pregunta_id, edicion: int = None) -> pd.DataFrame:
     """
-    Obtiene las respuestas de una pregunta específica
+    Obtiene las respuestas de una o varias preguntas
     
     Args:
-        pregunta_id: ID de la pregunta
+        pregunta_id: ID de la pregunta o lista de IDs
+        edicion: Año de la edición (por defecto la edición actual)
         
     Returns:
-        DataFrame con las respuestas de esa pregunta
+        DataFrame con las respuestas de esas preguntas
     """
+    ids = pregunta_id if isinstance(pregunta_id, (list, tuple, set)) else [pregunta_id]
     return ejecutar_query(
         "encuesta_respuestas",
-        filtros={"pregunta_id": pregunta_id},
-        orden="timestamp"
+        filtros=[en("pregunta_id", ids)],
+        orden="timestamp",
+        edicion=edicion or edicion_actual()
     )
 
 
-def obtener_estadisticas_participacion() -> dict:
+def obtener_estadisticas_participacion(edicion: int = None) -> dict:
     """
     Calcula estadísticas generales de participación
     
+    Args:
+        edicion: Año de la edición (por defecto la edición actual)
+    
     Returns:
         Diccionario con métricas clave
     """
+    from utils.analitica import calcular_kpis
+
     try:
-        participantes = obtener_participantes()
-        inscripciones = obtener_inscripciones_workshop()
-        equipos = obtener_equipos_concurso()
-        respuestas = obtener_respuestas_encuesta()
+        participantes = obtener_participantes(edicion)
+        inscripciones = obtener_inscripciones_workshop(edicion)
+        equipos = obtener_equipos_concurso(edicion)
+        respuestas = obtener_respuestas_encuesta(edicion=edicion)
         
-        return {
-            "total_participantes": len(participantes),
-            "total_inscripciones": len(inscripciones),
-            "total_equipos": len(equipos),
-            "total_respuestas_encuesta": len(respuestas),
-            "participantes_con_encuesta": len(participantes[participantes["encuesta_completada"] == True]) if not participantes.empty else 0
-        }
+        return calcular_kpis(participantes, inscripciones, equipos, respuestas).iloc[0].to_dict()
     except Exception as e:
+        logger.exception("Error al calcular estadísticas")
         st.error(f"Error al calcular estadísticas: {e}")
         return {}
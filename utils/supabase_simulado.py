@@ -0,0 +1,600 @@
+"""
+Supabase simulado para pruebas de rendimiento del Dashboard JII
+Un servidor HTTP local que responde como la API REST de Supabase (PostgREST) a las
+consultas que hace la aplicación, para medir la caché, la paginación, la
+concurrencia y los reintentos sin el proyecto real y en condiciones de red
+reproducibles.
+
+Fuentes de las respuestas, en este orden:
+    fixtures   respuestas grabadas (un JSON por consulta en --fixtures)
+    csv        generadas de los CSV de una carpeta (datos/ o utils/datos_sinteticos.py),
+               con la misma partición por edición que utils/fuente_local.py
+    upstream   con --grabar y --upstream, el proyecto real; la respuesta se guarda como
+               fixture y las siguientes corridas ya no necesitan la red
+
+Con --grabar sin --upstream las respuestas generadas de los CSV también se guardan,
+para congelar un conjunto de datos.
+
+Condiciones de red (por petición): latencia con jitter, ancho de banda, tope de filas
+por respuesta (como max-rows de PostgREST; Supabase usa 1000) y tasas de errores 5xx,
+timeouts y conexiones cortadas.
+
+Uso:
+    python -m utils.supabase_simulado --datos datos --latencia 0.08 --jitter 0.02 --tasa-error 0.05
+    SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_KEY=simulado streamlit run Analisis_JII2025.py
+
+    with SupabaseSimulado(directorio="datos", condiciones=CondicionesRed(latencia=0.05)) as simulado:
+        os.environ["SUPABASE_URL"] = simulado.url
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+import pandas as pd
+
+from utils import filtros as f
+from utils.fuente_local import TABLAS, ruta_tabla
+
+logger = logging.getLogger(__name__)
+
+PREFIJO_REST = "/rest/v1/"
+RUTA_ESTADISTICAS = "/__simulado/estadisticas"
+PUERTO_DEFECTO = 54321
+
+# Parámetros de PostgREST que no son filtros
+PARAMETROS_CONSULTA = {"select", "order", "limit", "offset"}
+
+_OPERADORES_POSTGREST = {"eq", "neq", "gt", "gte", "lt", "lte"}
+
+# Bloque de escritura al simular el ancho de banda
+BLOQUE = 16 * 1024
+
+
+@dataclass
+class CondicionesRed:
+    """
+    Condiciones de red de cada petición
+
+    Attributes:
+        latencia: Segundos antes de responder
+        jitter: Variación uniforme de la latencia (± segundos)
+        ancho_banda: Bytes por segundo del cuerpo (None: sin límite)
+        filas_max: Filas máximas por respuesta, como max-rows de PostgREST (None: sin tope)
+        tasa_error: Fracción de peticiones que responden estado_error
+        estado_error: Código HTTP de los errores inyectados (503 como un Supabase saturado)
+        tasa_timeout: Fracción de peticiones que no responden en espera_timeout segundos
+        espera_timeout: Segundos que se retiene una petición con timeout
+        tasa_corte: Fracción de peticiones cuya conexión se cierra sin respuesta
+        semilla: Semilla de las fallas y el jitter (None: aleatorio)
+    """
+    latencia: float = 0.0
+    jitter: float = 0.0
+    ancho_banda: float = None
+    filas_max: int = None
+    tasa_error: float = 0.0
+    estado_error: int = 503
+    tasa_timeout: float = 0.0
+    espera_timeout: float = 30.0
+    tasa_corte: float = 0.0
+    semilla: int = None
+
+
+def condiciones_desde_texto(pares) -> CondicionesRed:
+    """
+    CondicionesRed a partir de textos "clave=valor"
+
+        condiciones_desde_texto(["latencia=0.05", "tasa_error=0.02", "filas_max=1000"])
+
+    Raises:
+        ValueError: Si una clave no es un campo de CondicionesRed
+    """
+    tipos = {campo.name: campo.type for campo in fields(CondicionesRed)}
+    valores = {}
+    for par in pares or []:
+        clave, _, texto = par.partition("=")
+        clave = clave.strip().replace("-", "_")
+        if clave not in tipos:
+            raise ValueError(f"Condición de red desconocida: {clave} (opciones: {', '.join(tipos)})")
+        valores[clave] = tipos[clave](texto)
+    return CondicionesRed(**valores)
+
+
+# ============================
+# Consultas PostgREST sobre CSV
+# ============================
+
+def _valor(texto: str, serie: pd.Series):
+    """Valor de un filtro de la URL convertido al tipo de la columna"""
+    if texto == "null":
+        return None
+    if pd.api.types.is_bool_dtype(serie):
+        return texto.lower() == "true"
+    if pd.api.types.is_numeric_dtype(serie):
+        try:
+            return float(texto)
+        except ValueError:
+            return texto
+    return texto
+
+
+def _lista_in(texto: str) -> list:
+    """Valores de in.(a,b,"c,d") sin paréntesis ni comillas"""
+    cuerpo = texto[1:-1] if texto.startswith("(") and texto.endswith(")") else texto
+    valores, actual, entre_comillas = [], "", False
+    for caracter in cuerpo:
+        if caracter == '"':
+            entre_comillas = not entre_comillas
+        elif caracter == "," and not entre_comillas:
+            valores.append(actual)
+            actual = ""
+        else:
+            actual += caracter
+    valores.append(actual)
+    return valores
+
+
+def filtro_postgrest(columna: str, expresion: str, df: pd.DataFrame):
+    """
+    Filtro de utils.filtros equivalente a un parámetro de PostgREST (columna=op.valor)
+
+    Returns:
+        Filtro, o None si la columna no existe en la tabla
+    """
+    if columna not in df.columns:
+        return None
+    if expresion == "is.null":
+        return f.es_nulo(columna)
+    if expresion == "not.is.null":
+        return f.no_es_nulo(columna)
+    operador, _, texto = expresion.partition(".")
+    if operador == "in":
+        return f.en(columna, [_valor(v, df[columna]) for v in _lista_in(texto)])
+    if operador not in _OPERADORES_POSTGREST:
+        raise ValueError(f"Operador no soportado por el simulador: {expresion}")
+    return f.Filtro(columna, operador, _valor(texto, df[columna]))
+
+
+def _ordenar(df: pd.DataFrame, orden: str) -> pd.DataFrame:
+    """order=col.desc.nullslast,col2 de PostgREST"""
+    columnas, ascendentes, nulos = [], [], None
+    for parte in orden.split(","):
+        columna, *modificadores = parte.split(".")
+        if columna not in df.columns:
+            continue
+        descendente = "desc" in modificadores
+        columnas.append(columna)
+        ascendentes.append(not descendente)
+        if nulos is None:
+            # PostgREST: nulos al final en asc y al principio en desc, salvo que se indique
+            primero = "nullsfirst" in modificadores or (descendente and "nullslast" not in modificadores)
+            nulos = "first" if primero else "last"
+    if not columnas:
+        return df
+    return df.sort_values(columnas, ascending=ascendentes, na_position=nulos, kind="stable")
+
+
+class _TablasCSV:
+    """Tablas de una carpeta local leídas una vez (se releen si cambia el archivo)"""
+
+    def __init__(self, directorio):
+        self.directorio = Path(directorio)
+        self._lock = threading.Lock()
+        self._tablas = {}  # ruta -> (mtime, DataFrame)
+
+    def leer(self, tabla: str, edicion: int = None):
+        """DataFrame de la tabla en la partición de la edición, o None si la tabla no existe"""
+        ruta = ruta_tabla(self.directorio, tabla, edicion)
+        if ruta is None or not ruta.exists():
+            return pd.DataFrame() if tabla in TABLAS else None
+        mtime = ruta.stat().st_mtime_ns
+        with self._lock:
+            guardada = self._tablas.get(ruta)
+        if guardada is not None and guardada[0] == mtime:
+            return guardada[1]
+        df = pd.read_csv(ruta)
+        with self._lock:
+            self._tablas[ruta] = (mtime, df)
+        return df
+
+    def consultar(self, tabla: str, parametros: list, contar: bool, filas_max: int = None):
+        """
+        Respuesta de PostgREST a una consulta GET
+
+        Args:
+            tabla: Tabla de la URL
+            parametros: Pares (nombre, valor) de la query string
+            contar: True si la petición trae Prefer: count=exact
+            filas_max: Tope de filas de la respuesta
+
+        Returns:
+            Tupla (estado, encabezados, cuerpo)
+        """
+        consulta = dict(p for p in parametros if p[0] in PARAMETROS_CONSULTA)
+        condiciones = [p for p in parametros if p[0] not in PARAMETROS_CONSULTA]
+
+        # La edición elige la partición, como en utils/fuente_local.py
+        edicion = None
+        for columna, expresion in condiciones:
+            if columna == "edicion" and expresion.startswith("eq."):
+                edicion = int(expresion[3:])
+        df = self.leer(tabla, edicion)
+        if df is None:
+            return _error_postgrest(404, "PGRST205", f"Could not find the table 'public.{tabla}' in the schema cache")
+        if edicion is not None and "edicion" not in df.columns:
+            df = df.assign(edicion=edicion)
+
+        try:
+            filtros = tuple(
+                filtro for columna, expresion in condiciones
+                if (filtro := filtro_postgrest(columna, expresion, df)) is not None
+            )
+        except ValueError as e:
+            return _error_postgrest(400, "PGRST100", str(e))
+        if filtros:
+            df = df[f.mascara(df, filtros)]
+        total = len(df)
+
+        if consulta.get("order"):
+            df = _ordenar(df, consulta["order"])
+        desplazamiento = int(consulta.get("offset", 0))
+        limite = int(consulta["limit"]) if "limit" in consulta else None
+        if filas_max is not None:
+            limite = min(limite, filas_max) if limite is not None else filas_max
+        df = df.iloc[desplazamiento:desplazamiento + limite if limite is not None else None]
+
+        seleccion = consulta.get("select", "*")
+        if seleccion != "*":
+            df = df[[c.strip() for c in seleccion.split(",") if c.strip() in df.columns]]
+
+        cuerpo = df.to_json(orient="records", force_ascii=False, date_format="iso").encode("utf-8")
+        encabezados = {
+            "Content-Type": "application/json; charset=utf-8",
+            "Content-Range": _rango(desplazamiento, len(df), total if contar else None),
+        }
+        return 200, encabezados, cuerpo
+
+
+def _rango(desplazamiento: int, filas: int, total: int = None) -> str:
+    fin = f"{desplazamiento}-{desplazamiento + filas - 1}" if filas else "*"
+    return f"{fin}/{total if total is not None else '*'}"
+
+
+def _error_postgrest(estado: int, codigo: str, mensaje: str):
+    cuerpo = json.dumps({"code": codigo, "details": None, "hint": None, "message": mensaje}).encode("utf-8")
+    return estado, {"Content-Type": "application/json; charset=utf-8"}, cuerpo
+
+
+def _recortar(estado: int, encabezados: dict, cuerpo: bytes, filas_max: int):
+    """Aplica filas_max a una respuesta grabada"""
+    if filas_max is None or estado != 200:
+        return cuerpo, encabezados
+    filas = json.loads(cuerpo)
+    if not isinstance(filas, list) or len(filas) <= filas_max:
+        return cuerpo, encabezados
+    inicio = encabezados.get("Content-Range", "0-0/*").split("-")[0]
+    total = encabezados.get("Content-Range", "*/*").split("/")[-1]
+    desplazamiento = int(inicio) if inicio.isdigit() else 0
+    encabezados = {**encabezados, "Content-Range": _rango(desplazamiento, filas_max, int(total) if total.isdigit() else None)}
+    return json.dumps(filas[:filas_max], ensure_ascii=False).encode("utf-8"), encabezados
+
+
+# ============================
+# Fixtures
+# ============================
+
+def clave_peticion(ruta: str, parametros: list, prefer: str = "") -> str:
+    """Clave estable de una consulta: tabla, parámetros ordenados y Prefer"""
+    texto = json.dumps([ruta, sorted(parametros), prefer or ""], ensure_ascii=False)
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+class Fixtures:
+    """Respuestas grabadas, un JSON por consulta en <carpeta>/<tabla>/<clave>.json"""
+
+    def __init__(self, carpeta):
+        self.carpeta = Path(carpeta)
+
+    def _ruta(self, tabla: str, clave: str) -> Path:
+        return self.carpeta / tabla / f"{clave}.json"
+
+    def leer(self, tabla: str, clave: str):
+        """(estado, encabezados, cuerpo) grabados o None"""
+        ruta = self._ruta(tabla, clave)
+        if not ruta.exists():
+            return None
+        grabada = json.loads(ruta.read_text(encoding="utf-8"))
+        return grabada["estado"], grabada["encabezados"], grabada["cuerpo"].encode("utf-8")
+
+    def guardar(self, tabla: str, clave: str, peticion: dict, estado: int, encabezados: dict, cuerpo: bytes):
+        ruta = self._ruta(tabla, clave)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        ruta.write_text(json.dumps({
+            "peticion": peticion,
+            "estado": estado,
+            "encabezados": {k: v for k, v in encabezados.items() if k in ("Content-Type", "Content-Range")},
+            "cuerpo": cuerpo.decode("utf-8"),
+        }, ensure_ascii=False, indent=1), encoding="utf-8")
+
+
+def _consultar_upstream(upstream: str, ruta_completa: str, encabezados_peticion):
+    """Reenvía la petición al proyecto real y retorna (estado, encabezados, cuerpo)"""
+    import httpx
+
+    reenviados = {
+        k: v for k, v in encabezados_peticion.items()
+        if k.lower() in ("apikey", "authorization", "prefer", "accept", "range", "range-unit", "accept-profile")
+    }
+    respuesta = httpx.get(upstream.rstrip("/") + ruta_completa, headers=reenviados, timeout=60)
+    encabezados = {"Content-Type": respuesta.headers.get("content-type", "application/json")}
+    if "content-range" in respuesta.headers:
+        encabezados["Content-Range"] = respuesta.headers["content-range"]
+    return respuesta.status_code, encabezados, respuesta.content
+
+
+# ============================
+# Servidor
+# ============================
+
+class SupabaseSimulado:
+    """
+    Servidor local con la API REST de Supabase
+
+    Args:
+        directorio: Carpeta de CSV de donde generar las respuestas
+        fixtures: Carpeta de respuestas grabadas
+        grabar: Guardar en fixtures las respuestas que no estaban grabadas
+        upstream: URL del proyecto real (con grabar, las consultas sin fixture se le reenvían)
+        condiciones: CondicionesRed de cada petición
+        host: Interfaz donde escucha
+        puerto: Puerto (0: uno libre)
+    """
+
+    def __init__(self, directorio=None, fixtures=None, grabar: bool = False, upstream: str = None,
+                 condiciones: CondicionesRed = None, host: str = "127.0.0.1", puerto: int = 0):
+        if directorio is None and fixtures is None:
+            raise ValueError("Indica una carpeta de CSV, una de fixtures o ambas")
+        if grabar and fixtures is None:
+            raise ValueError("Para grabar hace falta una carpeta de fixtures")
+        self.tablas = _TablasCSV(directorio) if directorio is not None else None
+        self.fixtures = Fixtures(fixtures) if fixtures is not None else None
+        self.grabar = grabar
+        self.upstream = upstream
+        self.condiciones = condiciones or CondicionesRed()
+        self._azar = random.Random(self.condiciones.semilla)
+        self._lock = threading.Lock()
+        self.estadisticas = {}
+        self.reiniciar_estadisticas()
+        self._servidor = ThreadingHTTPServer((host, puerto), self._manejador())
+        self._servidor.daemon_threads = True
+        self._hilo = None
+
+    @property
+    def url(self) -> str:
+        host, puerto = self._servidor.server_address[:2]
+        return f"http://{host}:{puerto}"
+
+    def reiniciar_estadisticas(self):
+        with self._lock:
+            self.estadisticas = {
+                "peticiones": 0, "filas": 0, "bytes": 0, "errores": 0, "timeouts": 0, "cortes": 0,
+                "fixtures": 0, "csv": 0, "upstream": 0, "por_tabla": {},
+            }
+
+    def _contar(self, **incrementos):
+        with self._lock:
+            for clave, valor in incrementos.items():
+                if clave == "tabla":
+                    self.estadisticas["por_tabla"][valor] = self.estadisticas["por_tabla"].get(valor, 0) + 1
+                else:
+                    self.estadisticas[clave] += valor
+
+    def _sortear(self) -> str:
+        """Falla inyectada en la petición: None, "error", "timeout" o "corte\""""
+        c = self.condiciones
+        with self._lock:
+            sorteo = self._azar.random()
+            retraso = c.latencia + (self._azar.uniform(-c.jitter, c.jitter) if c.jitter else 0.0)
+        time.sleep(max(retraso, 0.0))
+        for falla, tasa in (("error", c.tasa_error), ("timeout", c.tasa_timeout), ("corte", c.tasa_corte)):
+            if sorteo < tasa:
+                return falla
+            sorteo -= tasa
+        return None
+
+    def responder(self, ruta_completa: str, encabezados_peticion) -> tuple:
+        """
+        Respuesta a un GET de la API REST
+
+        Returns:
+            Tupla (estado, encabezados, cuerpo, origen)
+        """
+        partes = urlsplit(ruta_completa)
+        tabla = partes.path[len(PREFIJO_REST):].strip("/")
+        parametros = parse_qsl(partes.query, keep_blank_values=True)
+        prefer = encabezados_peticion.get("Prefer", "")
+        filas_max = self.condiciones.filas_max
+        clave = clave_peticion(partes.path, parametros, prefer)
+
+        if self.fixtures is not None:
+            grabada = self.fixtures.leer(tabla, clave)
+            if grabada is not None:
+                estado, encabezados, cuerpo = grabada
+                cuerpo, encabezados = _recortar(estado, encabezados, cuerpo, filas_max)
+                return estado, encabezados, cuerpo, "fixtures"
+
+        if self.grabar and self.upstream:
+            estado, encabezados, cuerpo = _consultar_upstream(self.upstream, ruta_completa, encabezados_peticion)
+            origen = "upstream"
+        elif self.tablas is not None:
+            # Al grabar se guarda la respuesta completa; filas_max se aplica al servirla
+            estado, encabezados, cuerpo = self.tablas.consultar(
+                tabla, parametros, "count=" in prefer, None if self.grabar else filas_max
+            )
+            origen = "csv"
+        else:
+            estado, encabezados, cuerpo = _error_postgrest(
+                404, "PGRST205", f"Sin fixture para la consulta {ruta_completa}"
+            )
+            return estado, encabezados, cuerpo, "fixtures"
+
+        if self.grabar and estado < 500:
+            peticion = {"ruta": partes.path, "parametros": parametros, "prefer": prefer}
+            self.fixtures.guardar(tabla, clave, peticion, estado, encabezados, cuerpo)
+            cuerpo, encabezados = _recortar(estado, encabezados, cuerpo, filas_max)
+        return estado, encabezados, cuerpo, origen
+
+    def _manejador(self):
+        simulado = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            # HTTP/1.1 para que el pool de la aplicación reutilice las conexiones
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, formato, *args):
+                logger.debug("%s " + formato, self.address_string(), *args)
+
+            def _enviar(self, estado: int, encabezados: dict, cuerpo: bytes):
+                self.send_response(estado)
+                for nombre, valor in encabezados.items():
+                    self.send_header(nombre, valor)
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                ancho_banda = simulado.condiciones.ancho_banda
+                if not ancho_banda:
+                    self.wfile.write(cuerpo)
+                    return
+                for inicio in range(0, len(cuerpo), BLOQUE):
+                    bloque = cuerpo[inicio:inicio + BLOQUE]
+                    self.wfile.write(bloque)
+                    self.wfile.flush()
+                    time.sleep(len(bloque) / ancho_banda)
+
+            def do_GET(self):
+                if self.path.startswith(RUTA_ESTADISTICAS):
+                    with simulado._lock:
+                        cuerpo = json.dumps(simulado.estadisticas).encode("utf-8")
+                    self._enviar(200, {"Content-Type": "application/json"}, cuerpo)
+                    return
+                if not self.path.startswith(PREFIJO_REST):
+                    self._enviar(*_error_postgrest(404, "PGRST000", f"Ruta no simulada: {self.path}"))
+                    return
+
+                tabla = urlsplit(self.path).path[len(PREFIJO_REST):].strip("/")
+                simulado._contar(peticiones=1, tabla=tabla)
+                falla = simulado._sortear()
+                if falla == "corte":
+                    simulado._contar(cortes=1)
+                    self.close_connection = True
+                    return
+                if falla == "timeout":
+                    simulado._contar(timeouts=1)
+                    time.sleep(simulado.condiciones.espera_timeout)
+                    self.close_connection = True
+                    return
+                if falla == "error":
+                    simulado._contar(errores=1)
+                    estado = simulado.condiciones.estado_error
+                    # Como el balanceador de Supabase: el cuerpo no es JSON de PostgREST
+                    self._enviar(estado, {"Content-Type": "text/plain"}, f"Error {estado} simulado".encode())
+                    return
+
+                try:
+                    estado, encabezados, cuerpo, origen = simulado.responder(self.path, self.headers)
+                except Exception as e:
+                    logger.exception("Error del simulador en %s", self.path)
+                    estado, encabezados, cuerpo = _error_postgrest(500, "PGRST000", str(e))
+                    origen = None
+                if origen:
+                    simulado._contar(**{origen: 1})
+                simulado._contar(bytes=len(cuerpo))
+                if estado == 200 and encabezados.get("Content-Range", "*").split("/")[0] != "*":
+                    inicio, fin = encabezados["Content-Range"].split("/")[0].split("-")
+                    simulado._contar(filas=int(fin) - int(inicio) + 1)
+                try:
+                    self._enviar(estado, encabezados, cuerpo)
+                except (BrokenPipeError, ConnectionResetError):
+                    # El cliente se rindió (timeout) antes de recibir la respuesta
+                    self.close_connection = True
+
+        return Manejador
+
+    def iniciar(self) -> "SupabaseSimulado":
+        """Atiende peticiones en un hilo de fondo"""
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, name="supabase-simulado", daemon=True)
+        self._hilo.start()
+        logger.info("Supabase simulado en %s", self.url)
+        return self
+
+    def detener(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+        if self._hilo is not None:
+            self._hilo.join()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local con la API REST de Supabase para pruebas")
+    parser.add_argument("--datos", help="Carpeta de CSV de donde generar las respuestas")
+    parser.add_argument("--fixtures", help="Carpeta de respuestas grabadas")
+    parser.add_argument("--grabar", action="store_true", help="Guardar en --fixtures las respuestas nuevas")
+    parser.add_argument("--upstream", help="URL del proyecto real para grabar (por defecto SUPABASE_URL)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO_DEFECTO)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Segundos antes de responder")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Variación de la latencia (± segundos)")
+    parser.add_argument("--ancho-banda", type=float, help="KB/s del cuerpo de las respuestas")
+    parser.add_argument("--filas-max", type=int, help="Filas máximas por respuesta (Supabase: 1000)")
+    parser.add_argument("--tasa-error", type=float, default=0.0, help="Fracción de respuestas con error")
+    parser.add_argument("--estado-error", type=int, default=503, help="Código HTTP de los errores")
+    parser.add_argument("--tasa-timeout", type=float, default=0.0, help="Fracción de peticiones sin respuesta")
+    parser.add_argument("--espera-timeout", type=float, default=30.0)
+    parser.add_argument("--tasa-corte", type=float, default=0.0, help="Fracción de conexiones cortadas")
+    parser.add_argument("--semilla", type=int)
+    args = parser.parse_args(argv)
+
+    upstream = args.upstream
+    if args.grabar and not upstream and not args.datos:
+        from utils.conexion import credenciales
+        upstream = credenciales()[0]
+
+    condiciones = CondicionesRed(
+        latencia=args.latencia, jitter=args.jitter,
+        ancho_banda=args.ancho_banda * 1024 if args.ancho_banda else None, filas_max=args.filas_max,
+        tasa_error=args.tasa_error, estado_error=args.estado_error, tasa_timeout=args.tasa_timeout,
+        espera_timeout=args.espera_timeout, tasa_corte=args.tasa_corte, semilla=args.semilla,
+    )
+    try:
+        simulado = SupabaseSimulado(args.datos, args.fixtures, args.grabar, upstream, condiciones,
+                                    args.host, args.puerto)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"Supabase simulado en {simulado.url} ({asdict(condiciones)})")
+    print(f"  SUPABASE_URL={simulado.url} SUPABASE_KEY=simulado streamlit run Analisis_JII2025.py")
+    print(f"  Estadísticas: {simulado.url}{RUTA_ESTADISTICAS}")
+    try:
+        simulado._servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulado._servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Temas de las respuestas abiertas del Dashboard JII
+Agrupa las respuestas de texto largo en temas con una matriz TF-IDF dispersa y
+k-means esférico por mini-lotes (similitud coseno), sin modelos descargados ni red.
+Cada tema se etiqueta con sus términos de mayor peso.
+
+El modelo ajustado se guarda por edición en el proceso. Cuando llegan respuestas
+nuevas, sus mini-lotes actualizan los centroides en lugar de reajustar desde cero.
+Solo se reajusta si las respuestas nuevas superan FACTOR_REAJUSTE veces las del
+ajuste, porque el vocabulario ya no las representa bien.
+
+Requiere SciPy (scipy.sparse); sin él TEMAS_DISPONIBLE es False.
+"""
+
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from utils.analitica import STOPWORDS_ES
+from utils.arranque import disponible
+from utils.perfilador import medir_fase
+
+TEMAS_DISPONIBLE = disponible("scipy")
+
+N_TEMAS = 6
+MIN_DOCUMENTOS = 2        # un término debe aparecer en al menos este número de respuestas
+MAX_TERMINOS = 3000       # tamaño máximo del vocabulario
+TAMANO_LOTE = 256
+ITERACIONES = 60          # mini-lotes del ajuste inicial
+FACTOR_REAJUSTE = 1.0     # reajustar si las respuestas nuevas superan este múltiplo de las del ajuste
+
+_PALABRA = re.compile(r"[^\W\d_]+")
+
+
+def tokenizar(texto: str) -> list:
+    """Palabras en minúsculas de más de 3 letras que no son stopwords"""
+    return [p for p in _PALABRA.findall(str(texto).lower()) if len(p) > 3 and p not in STOPWORDS_ES]
+
+
+class ModeloTemas:
+    """
+    TF-IDF + k-means esférico por mini-lotes
+
+    Attributes:
+        vocabulario: {término: columna}
+        idf: Peso IDF de cada columna
+        centroides: ndarray (n_temas, términos) con filas de norma 1
+        conteos: Documentos que ha absorbido cada centroide (tasa de aprendizaje)
+        documentos_ajuste: Respuestas con que se ajustó el vocabulario
+        documentos_nuevos: Respuestas incorporadas después con actualizar()
+    """
+
+    def __init__(self, n_temas: int = N_TEMAS, semilla: int = 0):
+        self.n_temas = n_temas
+        self.semilla = semilla
+        self.vocabulario = {}
+        self.idf = np.zeros(0)
+        self.centroides = np.zeros((0, 0))
+        self.conteos = np.zeros(0)
+        self.documentos_ajuste = 0
+        self.documentos_nuevos = 0
+
+    # ---------- TF-IDF ----------
+
+    def _contar(self, textos) -> "sparse.csr_matrix":
+        """Matriz dispersa documento × término con las frecuencias crudas"""
+        from scipy import sparse
+
+        filas, columnas, valores = [], [], []
+        for i, texto in enumerate(textos):
+            conteo = Counter(t for t in tokenizar(texto) if t in self.vocabulario)
+            filas.extend([i] * len(conteo))
+            columnas.extend(self.vocabulario[t] for t in conteo)
+            valores.extend(conteo.values())
+        return sparse.csr_matrix(
+            (np.asarray(valores, dtype=np.float64), (filas, columnas)),
+            shape=(len(textos), len(self.vocabulario)),
+        )
+
+    def transformar(self, textos) -> "sparse.csr_matrix":
+        """TF-IDF (tf sublineal) con filas de norma 1; una respuesta sin términos conocidos queda en cero"""
+        from scipy import sparse
+
+        x = self._contar(list(textos))
+        x.data = 1 + np.log(x.data)
+        x = x @ sparse.diags(self.idf)
+        normas = np.sqrt(np.asarray(x.multiply(x).sum(axis=1)).ravel())
+        normas[normas == 0] = 1
+        return sparse.csr_matrix(sparse.diags(1 / normas) @ x)
+
+    def _construir_vocabulario(self, textos: list):
+        frecuencia_documentos = Counter()
+        for texto in textos:
+            frecuencia_documentos.update(set(tokenizar(texto)))
+        terminos = [t for t, df in frecuencia_documentos.most_common(MAX_TERMINOS) if df >= MIN_DOCUMENTOS]
+        self.vocabulario = {t: i for i, t in enumerate(sorted(terminos))}
+        df = np.array([frecuencia_documentos[t] for t in sorted(terminos)], dtype=np.float64)
+        self.idf = np.log((1 + len(textos)) / (1 + df)) + 1
+
+    # ---------- k-means ----------
+
+    def _similitudes(self, x) -> np.ndarray:
+        return np.asarray(x @ self.centroides.T)
+
+    def _iniciar_centroides(self, x, rng):
+        """k-means++ con distancia coseno"""
+        n = x.shape[0]
+        elegidos = [rng.integers(n)]
+        distancia = 1 - np.asarray(x @ x[elegidos[0]].T.toarray()).ravel()
+        for _ in range(1, min(self.n_temas, n)):
+            pesos = np.clip(distancia, 0, None) ** 2
+            siguiente = rng.choice(n, p=pesos / pesos.sum()) if pesos.sum() > 0 else rng.integers(n)
+            elegidos.append(siguiente)
+            distancia = np.minimum(distancia, 1 - np.asarray(x @ x[siguiente].T.toarray()).ravel())
+        self.centroides = x[elegidos].toarray()
+        self.conteos = np.ones(len(elegidos))
+
+    def _paso(self, lote):
+        """Actualización de mini-lote (Sculley 2010) seguida de normalizar los centroides"""
+        from scipy import sparse
+
+        etiquetas = self._similitudes(lote).argmax(axis=1)
+        pertenencia = sparse.csr_matrix(
+            (np.ones(lote.shape[0]), (etiquetas, np.arange(lote.shape[0]))),
+            shape=(len(self.centroides), lote.shape[0]),
+        )
+        sumas = (pertenencia @ lote).toarray()
+        cantidad = np.bincount(etiquetas, minlength=len(self.centroides)).astype(np.float64)
+        self.conteos += cantidad
+        tasa = (cantidad / self.conteos)[:, None]
+        con_datos = cantidad > 0
+        medias = np.divide(sumas, cantidad[:, None], out=np.zeros_like(sumas), where=con_datos[:, None])
+        self.centroides[con_datos] = ((1 - tasa) * self.centroides + tasa * medias)[con_datos]
+        normas = np.linalg.norm(self.centroides, axis=1, keepdims=True)
+        self.centroides /= np.where(normas == 0, 1, normas)
+
+    @medir_fase("transform")
+    def ajustar(self, textos) -> "ModeloTemas":
+        """Construye el vocabulario y ajusta los temas desde cero"""
+        textos = list(textos)
+        rng = np.random.default_rng(self.semilla)
+        self._construir_vocabulario(textos)
+        self.documentos_ajuste, self.documentos_nuevos = len(textos), 0
+        x = self.transformar(textos)
+        x = x[np.diff(x.indptr) > 0]
+        if x.shape[0] == 0:
+            self.centroides, self.conteos = np.zeros((0, len(self.vocabulario))), np.zeros(0)
+            return self
+
+        self._iniciar_centroides(x, rng)
+        tamano = min(TAMANO_LOTE, x.shape[0])
+        for _ in range(ITERACIONES):
+            self._paso(x[rng.choice(x.shape[0], tamano, replace=False)])
+        return self
+
+    @medir_fase("transform")
+    def actualizar(self, textos) -> "ModeloTemas":
+        """Incorpora respuestas nuevas a los centroides sin reajustar el vocabulario"""
+        textos = list(textos)
+        if not len(self.centroides):
+            return self.ajustar(textos)
+        x = self.transformar(textos)
+        x = x[np.diff(x.indptr) > 0]
+        for inicio in range(0, x.shape[0], TAMANO_LOTE):
+            self._paso(x[inicio:inicio + TAMANO_LOTE])
+        self.documentos_nuevos += len(textos)
+        return self
+
+    def requiere_reajuste(self, nuevos: int) -> bool:
+        """True si con `nuevos` respuestas más conviene reajustar el vocabulario"""
+        return self.documentos_nuevos + nuevos > FACTOR_REAJUSTE * max(self.documentos_ajuste, 1)
+
+    def asignar(self, textos) -> tuple:
+        """
+        Tema de cada respuesta
+
+        Returns:
+            Tupla (temas, similitud) de ndarrays; tema -1 para respuestas sin términos del vocabulario
+        """
+        if not len(self.centroides):
+            return np.full(len(textos), -1), np.zeros(len(textos))
+        similitudes = self._similitudes(self.transformar(textos))
+        temas = similitudes.argmax(axis=1)
+        similitud = similitudes[np.arange(len(temas)), temas]
+        temas[similitud <= 0] = -1
+        return temas, similitud
+
+    def terminos(self, n: int = 8) -> list:
+        """Términos de mayor peso de cada tema"""
+        inverso = np.array(sorted(self.vocabulario, key=self.vocabulario.get))
+        return [list(inverso[np.argsort(-c)[:n]]) for c in self.centroides]
+
+    def etiquetas(self, n: int = 3) -> list:
+        """Nombre corto de cada tema: sus n términos principales"""
+        return [", ".join(t) for t in self.terminos(n)]
+
+
+# ============================
+# Modelos por edición
+# ============================
+
+_lock = threading.Lock()
+_modelos = {}  # clave -> (ModeloTemas, ids de respuestas ya incorporadas)
+
+
+def modelo_incremental(clave, respuestas: pd.DataFrame, n_temas: int = N_TEMAS) -> ModeloTemas:
+    """
+    Modelo de temas de un conjunto de respuestas que crece con el tiempo
+
+    La primera vez ajusta el modelo; después solo incorpora las respuestas cuyo id no
+    había visto (o reajusta si ya son demasiadas, ver FACTOR_REAJUSTE).
+
+    Args:
+        clave: Identificador del conjunto (p. ej. la edición)
+        respuestas: DataFrame con las columnas id y respuesta
+        n_temas: Número de temas
+    """
+    with _lock:
+        modelo, vistos = _modelos.get(clave, (None, set()))
+        nuevas = respuestas[~respuestas['id'].isin(vistos)]
+        if modelo is None or modelo.n_temas != n_temas or modelo.requiere_reajuste(len(nuevas)):
+            modelo = ModeloTemas(n_temas).ajustar(respuestas['respuesta'])
+            vistos = set(respuestas['id'])
+        elif not nuevas.empty:
+            modelo.actualizar(nuevas['respuesta'])
+            vistos = vistos | set(nuevas['id'])
+        _modelos[clave] = (modelo, vistos)
+        return modelo
+
+
+@medir_fase("transform")
+def temas_de_respuestas(modelo: ModeloTemas, respuestas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tema de cada respuesta
+
+    Returns:
+        DataFrame [tema, etiqueta, similitud] con el mismo índice que respuestas;
+        etiqueta es "Sin tema" para las respuestas sin términos del vocabulario
+    """
+    temas, similitud = modelo.asignar(respuestas['respuesta'].tolist())
+    etiquetas = np.array(modelo.etiquetas() + ["Sin tema"], dtype=object)
+    return pd.DataFrame({
+        'tema': temas,
+        'etiqueta': etiquetas[temas],  # -1 toma "Sin tema"
+        'similitud': similitud,
+    }, index=respuestas.index)
+
+
+@medir_fase("transform")
+def resumen_temas(modelo: ModeloTemas, asignados: pd.DataFrame, n_terminos: int = 8) -> pd.DataFrame:
+    """Temas con sus términos principales y cuántas respuestas tienen [tema, etiqueta, terminos, respuestas]"""
+    conteo = asignados['tema'].value_counts()
+    return pd.DataFrame({
+        'tema': range(len(modelo.centroides)),
+        'etiqueta': modelo.etiquetas(),
+        'terminos': [", ".join(t) for t in modelo.terminos(n_terminos)],
+        'respuestas': [int(conteo.get(i, 0)) for i in range(len(modelo.centroides))],
+    })
+
+
+@medir_fase("transform")
+def temas_por_pregunta(respuestas: pd.DataFrame, asignados: pd.DataFrame) -> pd.DataFrame:
+    """
+    Proporción de cada tema en las respuestas de cada pregunta
+
+    Returns:
+        DataFrame largo [pregunta_id, etiqueta, respuestas, proporcion]
+    """
+    tabla = pd.crosstab(respuestas['pregunta_id'], asignados['etiqueta'])
+    proporcion = tabla.div(tabla.sum(axis=1), axis=0)
+    return (
+        tabla.stack().rename('respuestas').to_frame()
+        .join(proporcion.stack().rename('proporcion'))
+        .reset_index()
+    )
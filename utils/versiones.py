@@ -0,0 +1,169 @@
+"""
+Versiones de las tablas del Dashboard JII
+Una huella barata del contenido de cada tabla por edición, para que las cachés
+(utils/cache.py) solo recalculen cuando los datos cambian y no cada vez que vence
+el TTL.
+
+Huella de cada fuente:
+    local      tamaño y fecha de modificación del CSV de la partición
+    supabase   los contadores de la tabla en versiones_tablas si existe: el de la
+               edición y el de la tabla completa (edicion = 0, lo incrementa TRUNCATE);
+               los incrementa un trigger, ver sql/versiones_tablas.sql. Si no, dos
+               consultas de una fila: número de filas + max(id) y el máximo de la
+               columna de fecha
+
+Una huella se consulta como mucho una vez cada JII_VERSION_INTERVALO segundos por
+tabla y edición (por defecto 10). Si no se puede obtener (Supabase caído, tabla sin
+id) la huella es None y las cachés vuelven a expirar por tiempo. Aun con huella, las
+cachés no sirven una entrada más vieja que el TTL: sin trigger la huella solo ve filas
+nuevas o borradas, no los UPDATE.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from utils.fuente_local import directorio_local, ruta_tabla
+
+logger = logging.getLogger(__name__)
+
+VARIABLE_INTERVALO = "JII_VERSION_INTERVALO"
+INTERVALO_DEFECTO = 10
+
+TABLA_VERSIONES = "versiones_tablas"
+
+# Columna de fecha de cada tabla para la huella sin trigger. En la mayoría es la fecha de
+# registro, que no cambia con un UPDATE: esos cambios los recoge el TTL de las cachés
+COLUMNA_CAMBIO = {
+    "participantes": "created_at",
+    "actividades": "actualizado",
+    "asistencias": "fecha_asistencia",
+    "inscripciones_workshop": "creado",
+    "equipos_concurso": "fecha_registro",
+    "encuesta_respuestas": "timestamp",
+}
+
+_lock = threading.Lock()
+# (fuente, tabla, edición) -> (momento monotónico de la consulta, huella)
+_huellas = {}
+# None: no se ha probado; False: la base no tiene la tabla versiones_tablas
+_con_trigger = None
+
+
+def intervalo() -> float:
+    """Segundos que se reutiliza una huella antes de volver a consultarla"""
+    return float(os.getenv(VARIABLE_INTERVALO, INTERVALO_DEFECTO))
+
+
+def _huella_local(directorio, tabla: str, edicion: int):
+    ruta = ruta_tabla(directorio, tabla, edicion)
+    if ruta is None or not ruta.exists():
+        return ("sin_archivo",)
+    estado = ruta.stat()
+    return (estado.st_size, estado.st_mtime_ns)
+
+
+def _versiones_trigger():
+    """{(tabla, edición): (version, actualizado)} de versiones_tablas, o None si la base no la tiene"""
+    global _con_trigger
+    if _con_trigger is False:
+        return None
+    from utils.conexion import con_reintentos, get_supabase_client
+
+    query = get_supabase_client().table(TABLA_VERSIONES).select("*")
+    try:
+        respuesta, _ = con_reintentos(query.execute, f"consulta de {TABLA_VERSIONES}")
+    except Exception as e:
+        # PostgREST responde PGRST205 si la tabla no existe: no se vuelve a intentar
+        if "PGRST205" in str(e) or "does not exist" in str(e):
+            logger.info("La base no tiene %s; las versiones se calculan con consultas por tabla", TABLA_VERSIONES)
+            _con_trigger = False
+            return None
+        raise
+    _con_trigger = True
+    # Con "*" también se lee la tabla de la versión anterior del script, sin columna edicion
+    return {
+        (fila["tabla"], fila.get("edicion", 0)): (fila["version"], fila["actualizado"])
+        for fila in respuesta.data or []
+    }
+
+
+def _huella_supabase(tabla: str, edicion: int):
+    from utils.conexion import con_reintentos, get_supabase_client
+
+    # Con el trigger, una sola consulta trae la versión de todas las tablas y ediciones
+    por_trigger = _consultar_una_vez(("supabase", TABLA_VERSIONES, None), _versiones_trigger)
+    if por_trigger is not None:
+        if edicion is None:
+            return tuple(sorted((e, v) for (t, e), v in por_trigger.items() if t == tabla)) or ("sin_cambios",)
+        return por_trigger.get((tabla, edicion), ("sin_cambios",)), por_trigger.get((tabla, 0), ("sin_cambios",))
+
+    def de_la_edicion(query):
+        return query.eq("edicion", edicion) if edicion is not None else query
+
+    supabase = get_supabase_client()
+    query = de_la_edicion(supabase.table(tabla).select("id", count="exact")).order("id", desc=True).limit(1)
+    respuesta, _ = con_reintentos(query.execute, f"versión de {tabla}")
+    huella = [respuesta.count, respuesta.data[0]["id"] if respuesta.data else None]
+
+    columna = COLUMNA_CAMBIO.get(tabla)
+    if columna:
+        query = de_la_edicion(supabase.table(tabla).select(columna)).order(columna, desc=True, nullsfirst=False).limit(1)
+        respuesta, _ = con_reintentos(query.execute, f"versión de {tabla}")
+        huella.append(respuesta.data[0][columna] if respuesta.data else None)
+    return tuple(huella)
+
+
+def _consultar_una_vez(clave, consultar):
+    """Resultado de consultar() reutilizado durante intervalo() segundos"""
+    with _lock:
+        guardada = _huellas.get(clave)
+    if guardada is not None and time.monotonic() - guardada[0] < intervalo():
+        return guardada[1]
+    valor = consultar()
+    with _lock:
+        _huellas[clave] = (time.monotonic(), valor)
+    return valor
+
+
+def huella(tabla: str, edicion: int = None):
+    """
+    Huella del contenido de una tabla en una edición
+
+    Args:
+        tabla: Nombre de la tabla
+        edicion: Año de la edición (None: la tabla completa, como en ejecutar_query)
+
+    Returns:
+        Tupla que cambia cuando la tabla cambia, o None si no se pudo obtener
+    """
+    directorio = directorio_local()
+
+    def consultar():
+        try:
+            return _huella_local(directorio, tabla, edicion) if directorio else _huella_supabase(tabla, edicion)
+        except Exception as e:
+            logger.warning("No se pudo obtener la versión de %s: %s", tabla, e)
+            return None
+
+    return _consultar_una_vez((str(directorio), tabla, edicion), consultar)
+
+
+def version(tablas, edicion: int = None):
+    """
+    Versión conjunta de varias tablas de una edición
+
+    Returns:
+        Tupla con la huella de cada tabla, o None si falta alguna
+    """
+    huellas = tuple(huella(tabla, edicion) for tabla in tablas)
+    return None if any(h is None for h in huellas) else huellas
+
+
+def olvidar():
+    """Descarta las huellas guardadas; la siguiente consulta las vuelve a pedir"""
+    global _con_trigger
+    with _lock:
+        _huellas.clear()
+        _con_trigger = None